@@ -1547,6 +1547,8 @@ class AutomationRenameHosts(Automation):
         # SNMP walks
         if self._rename_host_file(str(snmpwalks_dir), oldname, newname):
             actions.append("snmpwalk")
+        # The index of the walk stays valid, as the walk is only renamed
+        self._rename_host_file(str(snmpwalks_dir), f".{oldname}.idx", f".{newname}.idx")
 
         # HW/SW Inventory
         actions.extend(
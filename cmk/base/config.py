@@ -983,6 +983,16 @@ def get_derived_config_variable_names() -> set[str]:
     return {"service_service_levels", "host_service_levels"}
 
 
+def get_config_variables() -> Mapping[str, object]:
+    """The current values of the (not derived) configuration variables"""
+    global_variables = globals()
+    return {
+        varname: global_variables[varname]
+        for varname in default_config.__dict__
+        if varname[0] != "_" and varname in global_variables
+    }
+
+
 def save_packed_config(
     config_path: Path,
     config_cache: ConfigCache,
@@ -1560,6 +1570,20 @@ class AutochecksConfigurer:
         )
 
 
+def _rulesets_by_name() -> Mapping[str, Sequence[RuleSpec[Any]]]:
+    """The rulesets of the configuration variables by their name
+
+    The rulesets of a dictionary, e.g. extra_host_conf, are named VARIABLE:KEY.
+    """
+    rulesets: dict[str, Sequence[RuleSpec[Any]]] = {}
+    for varname, value in get_config_variables().items():
+        if isinstance(value, list):
+            rulesets[varname] = value
+        elif isinstance(value, dict):
+            rulesets.update((f"{varname}:{k}", v) for k, v in value.items() if isinstance(v, list))
+    return rulesets
+
+
 class ConfigCache:
     def __init__(self, loaded_config: LoadedConfigFragment) -> None:
         super().__init__()
@@ -1907,6 +1931,20 @@ class ConfigCache:
         self.__notification_plugin_parameters.clear()
         self.__snmp_backend.clear()
 
+    def match_host_rulesets_in_bulk(self) -> None:
+        """Match each host ruleset for all hosts at once on its first use
+
+        This is meant for the config generation, which looks up the host rulesets of all
+        hosts anyway. The time needed by each ruleset is reported by host_ruleset_durations().
+        """
+        self.ruleset_matcher.match_host_rulesets_in_bulk(_rulesets_by_name())
+
+    def host_ruleset_durations(self) -> Mapping[str, float]:
+        return self.ruleset_matcher.host_ruleset_durations()
+
+    def add_host_ruleset_durations(self, durations: Mapping[str, float]) -> None:
+        self.ruleset_matcher.add_host_ruleset_durations(durations)
+
     @staticmethod
     def _get_host_paths(config_host_paths: dict[HostName, str]) -> dict[HostName, str]:
         """Reference hostname -> dirname including /"""
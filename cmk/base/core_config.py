@@ -4,25 +4,39 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import abc
+import hashlib
 import os
+import pickle
 import shutil
 import socket
 import sys
+import types
 from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, Sequence
 from contextlib import contextmanager, suppress
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Literal
+from typing import Any, Final, Literal, TypeGuard
 
 import cmk.ccc.debug
+import cmk.ccc.version as cmk_version
 import cmk.utils.password_store
 import cmk.utils.paths
 from cmk import trace
-from cmk.base.config import ConfigCache, ObjectAttributes
+from cmk.base.config import ConfigCache, get_config_variables, ObjectAttributes
 from cmk.base.configlib.servicename import PassiveServiceNameConfig
 from cmk.base.nagios_utils import do_check_nagiosconfig
+from cmk.ccc import store
 from cmk.ccc.exceptions import MKGeneralException
 from cmk.ccc.hostaddress import HostAddress, HostName, Hosts
-from cmk.checkengine.plugins import AgentBasedPlugins, ConfiguredService, ServiceID
+from cmk.checkengine.plugins import (
+    AgentBasedPlugins,
+    CheckPlugin,
+    CheckPluginName,
+    ConfiguredService,
+    ServiceID,
+)
+from cmk.discover_plugins import family_libexec_dir
+from cmk.server_side_calls_backend import load_active_checks, load_special_agents
 from cmk.utils import config_warnings, ip_lookup
 from cmk.utils.config_path import VersionedConfigPath
 from cmk.utils.ip_lookup import IPStackConfig
@@ -30,7 +44,7 @@ from cmk.utils.labels import Labels
 from cmk.utils.licensing.handler import LicensingHandler
 from cmk.utils.licensing.helper import get_licensed_state_file_path
 from cmk.utils.rulesets import RuleSetName
-from cmk.utils.rulesets.ruleset_matcher import RuleSpec
+from cmk.utils.rulesets.ruleset_matcher import is_disabled, RuleSpec
 from cmk.utils.servicename import Item, ServiceName
 from cmk.utils.tags import TagGroupID, TagID
 
@@ -419,6 +433,9 @@ def _create_core_config(
     passwords = config_cache.collect_passwords()
     cmk.utils.password_store.save(passwords, cmk.utils.password_store.pending_password_store_path())
 
+    # The check tables of all hosts are needed, at least for precompiling the host checks
+    config_cache.autochecks_memoizer.read_all()
+
     config_path = VersionedConfigPath.next()
     with config_path.create(is_cmc=core.is_cmc()), _backup_objects_file(core):
         core.create_config(
@@ -452,6 +469,299 @@ def _verify_non_duplicate_hosts(duplicates: Collection[HostName]) -> None:
         )
 
 
+# Config variables with values per host (or host entry). The configuration of a host only
+# depends on its own values, so editing a host does not invalidate the other hosts.
+_HOST_CONFIG_VARIABLES: Final = frozenset(
+    {
+        "additional_ipv4addresses",
+        "additional_ipv6addresses",
+        "all_hosts",
+        "clustered_services_of",
+        "clusters",
+        "cmk_agent_connection",
+        "explicit_host_conf",
+        "explicit_service_custom_variables",
+        "explicit_snmp_communities",
+        "host_attributes",
+        "host_labels",
+        "host_paths",
+        "host_tags",
+        "ipaddresses",
+        "ipv6addresses",
+        "management_ipmi_credentials",
+        "management_protocol",
+        "management_snmp_credentials",
+        "shadow_hosts",
+    }
+)
+
+_HOST_CONFIG_FRAGMENTS_FORMAT: Final = 1
+
+
+@dataclass(frozen=True)
+class HostConfigFingerprints:
+    """Fingerprints of everything the core configuration of the hosts is created from
+
+    The configuration shared by all hosts has its own fingerprint. A host has to be
+    created again if its fingerprint or the shared one changed.
+    """
+
+    config: str
+    hosts: Mapping[HostName, str]
+
+
+def compute_host_config_fingerprints(
+    config_cache: ConfigCache,
+    hostnames: Sequence[HostName],
+    plugins: Mapping[CheckPluginName, CheckPlugin],
+    discovery_rules: Mapping[RuleSetName, Sequence[RuleSpec]],
+    passwords: Mapping[str, str],
+    ip_address_of: ip_lookup.IPLookup,
+) -> HostConfigFingerprints:
+    """Compute the fingerprints of the configuration of the given hosts
+
+    The fingerprint of a host covers the values of the per host config variables (like
+    its host attributes), the rules matching the host, its labels, its IP addresses and
+    its autochecks. Clusters and nodes also depend on each other, a host depends on its
+    parents. All other config variables, the passwords, the check plug-ins and the
+    server side calls (active checks and special agents with their executables) make up
+    the shared fingerprint.
+    """
+    shared = [cmk_version.__version__, _stable_repr(passwords)]
+    shared.extend(_server_side_calls_fingerprint())
+    shared.extend(
+        _stable_repr(
+            (
+                plugin.name,
+                plugin.sections,
+                plugin.service_name,
+                plugin.check_default_parameters,
+                plugin.check_ruleset_name,
+                plugin.cluster_check_function is None,
+            )
+        )
+        for plugin in sorted(plugins.values(), key=lambda p: p.name)
+    )
+
+    rulesets: dict[str, Sequence[RuleSpec]] = {str(n): r for n, r in discovery_rules.items()}
+    values_of_host: dict[str, list[tuple[str, object]]] = {}
+    for varname, value in sorted(get_config_variables().items()):
+        if varname in _HOST_CONFIG_VARIABLES:
+            for host_name, host_value in _values_by_host(varname, value):
+                values_of_host.setdefault(host_name, []).append((varname, host_value))
+        elif _is_ruleset(value):
+            rulesets[varname] = value
+        elif isinstance(value, dict) and value and all(_is_ruleset(v) for v in value.values()):
+            rulesets.update({f"{varname}:{key}": ruleset for key, ruleset in value.items()})
+        elif not (callable(value) or isinstance(value, types.ModuleType)):
+            shared.append(f"{varname}={_stable_repr(value)}")
+
+    # Rules with the same conditions share the set of matching hosts, so these hosts only
+    # have to be visited once for all of the rules.
+    labels_of_host = config_cache.label_manager.labels_of_host
+    rules_by_hosts: dict[int, tuple[set[HostName], list[str]]] = {}
+    for name, ruleset in sorted(rulesets.items()):
+        for index, rule in enumerate(ruleset):
+            if is_disabled(rule):
+                continue
+            matching = config_cache.ruleset_matcher.get_matching_hosts(
+                rule["condition"], labels_of_host
+            )
+            rules_by_hosts.setdefault(id(matching), (matching, []))[1].append(
+                f"{name}:{index}:{_stable_repr(rule)}"
+            )
+    rules_of_host: dict[HostName, list[str]] = {}
+    for matching, rules in rules_by_hosts.values():
+        rules_digest = _digest("\n".join(rules))
+        for host_name in matching:
+            rules_of_host.setdefault(host_name, []).append(rules_digest)
+
+    own_fingerprints: dict[HostName, str] = {}
+
+    def own_fingerprint(host_name: HostName) -> str:
+        if (fingerprint := own_fingerprints.get(host_name)) is not None:
+            return fingerprint
+        autochecks = _stat_fingerprint(cmk.utils.paths.autochecks_dir / f"{host_name}.mk")
+        ip_stack_config = config_cache.ip_stack_config(host_name)
+        # The values of the hosts are not expected to contain sets (which would only lead
+        # to needless updates), so the faster repr() will do.
+        return own_fingerprints.setdefault(
+            host_name,
+            _digest(
+                repr(
+                    (
+                        values_of_host.get(host_name, []),
+                        rules_of_host.get(host_name, []),
+                        labels_of_host(host_name),
+                        config_cache.label_manager.label_sources_of_host(host_name),
+                        autochecks,
+                        # The lookups are cached, they are done for the configuration anyway
+                        ip_address_of(host_name, socket.AddressFamily.AF_INET)
+                        if IPStackConfig.IPv4 in ip_stack_config
+                        else None,
+                        ip_address_of(host_name, socket.AddressFamily.AF_INET6)
+                        if IPStackConfig.IPv6 in ip_stack_config
+                        else None,
+                    )
+                )
+            ),
+        )
+
+    return HostConfigFingerprints(
+        config=_digest("\n".join(shared)),
+        hosts={
+            host_name: _digest(
+                "".join(
+                    f"{h}:{own_fingerprint(h)}"
+                    for h in (
+                        host_name,
+                        *config_cache.nodes(host_name),
+                        *config_cache.clusters_of(host_name),
+                        # Parents are only used if they are active and online
+                        *sorted(config_cache.parents(host_name)),
+                    )
+                )
+            )
+            for host_name in hostnames
+        },
+    )
+
+
+def _server_side_calls_fingerprint() -> Iterator[str]:
+    """Identify the active check and special agent plug-ins and their executables
+
+    The plug-ins are identified by the stat of their modules, the executables by the
+    listings of the directories they are looked up in.
+    """
+    locations = sorted(
+        [
+            *load_active_checks(raise_errors=cmk.ccc.debug.enabled()),
+            *load_special_agents(raise_errors=cmk.ccc.debug.enabled()),
+        ],
+        key=str,
+    )
+    search_paths = {
+        cmk.utils.paths.local_nagios_plugins_dir,
+        cmk.utils.paths.nagios_plugins_dir,
+        cmk.utils.paths.local_special_agents_dir,
+        cmk.utils.paths.special_agents_dir,
+    }
+    for location in locations:
+        module = sys.modules.get(location.module)
+        if module is not None and module.__file__ is not None:
+            yield f"{location}={_stat_fingerprint(Path(module.__file__))}"
+            search_paths.add(family_libexec_dir(location.module))
+        else:
+            yield str(location)
+    for path in sorted(search_paths):
+        try:
+            entries = sorted(path.iterdir())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        yield from (f"{entry}={_stat_fingerprint(entry)}" for entry in entries)
+
+
+def _stat_fingerprint(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _is_ruleset(value: object) -> TypeGuard[list[RuleSpec[Any]]]:
+    return isinstance(value, list) and all(
+        isinstance(rule, dict) and "condition" in rule and "value" in rule for rule in value
+    )
+
+
+def _values_by_host(varname: str, value: Any) -> Iterator[tuple[str, object]]:
+    if varname == "all_hosts":
+        # host entries are "<host name>|<tag>|<tag>..." in old configurations
+        yield from ((entry.split("|", 1)[0], entry) for entry in value)
+    elif varname == "explicit_host_conf":
+        for attribute, value_of_host in value.items():
+            yield from ((h, (attribute, v)) for h, v in value_of_host.items())
+    else:
+        for key, host_value in value.items():
+            # keys are host names, (host name, service name) or "<cluster name>|<tag>..."
+            host_name = key[0] if isinstance(key, tuple) else key.split("|", 1)[0]
+            yield host_name, (key, host_value)
+
+
+def _stable_repr(value: object) -> str:
+    """Like repr(), but independent of the (randomized) iteration order of sets"""
+    if isinstance(value, dict):
+        return "{%s}" % ", ".join(f"{_stable_repr(k)}: {_stable_repr(v)}" for k, v in value.items())
+    if isinstance(value, list):
+        return "[%s]" % ", ".join(_stable_repr(v) for v in value)
+    if isinstance(value, tuple):
+        return "(%s)" % ", ".join(_stable_repr(v) for v in value)
+    if isinstance(value, set | frozenset):
+        return "{%s}" % ", ".join(sorted(_stable_repr(v) for v in value))
+    return repr(value)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _host_config_fragments_dir() -> Path:
+    return cmk.utils.paths.var_dir / "core_config_fragments"
+
+
+def clear_host_config_fragments() -> None:
+    """Forget the stored configuration of the hosts, the next run creates all of them"""
+    shutil.rmtree(_host_config_fragments_dir(), ignore_errors=True)
+
+
+class HostConfigFragments[TFragment]:
+    """The core configuration of the hosts, as created by the previous run
+
+    The configuration of every host is stored together with the fingerprint it has
+    been created from and is only reused if the fingerprint did not change. Only the
+    hosts of the current run are stored again, the others are dropped.
+    """
+
+    def __init__(self, core_name: str, fingerprints: HostConfigFingerprints) -> None:
+        self.path: Final = _host_config_fragments_dir() / core_name
+        self._fingerprints: Final = fingerprints
+        self._stored: Final = self._load()
+        self._fragments: dict[HostName, tuple[str, TFragment]] = {}
+        self.num_reused = 0
+
+    def _load(self) -> Mapping[HostName, tuple[str, TFragment]]:
+        try:
+            fmt, config_fingerprint, fragments = pickle.loads(  # nosec B301 # BNS:c3c5e9
+                store.load_bytes_from_file(self.path, default=b"")
+            )
+        except Exception:
+            # No (usable) fragments, e.g. on the first run or after an update
+            return {}
+        if fmt != _HOST_CONFIG_FRAGMENTS_FORMAT or config_fingerprint != self._fingerprints.config:
+            return {}
+        return fragments
+
+    def get(self, host_name: HostName) -> TFragment | None:
+        stored = self._stored.get(host_name)
+        if stored is None or stored[0] != self._fingerprints.hosts.get(host_name):
+            return None
+        self._fragments[host_name] = stored
+        self.num_reused += 1
+        return stored[1]
+
+    def update(self, host_name: HostName, fragment: TFragment) -> None:
+        self._fragments[host_name] = (self._fingerprints.hosts[host_name], fragment)
+
+    def save(self) -> None:
+        store.save_bytes_to_file(
+            self.path,
+            pickle.dumps(
+                (_HOST_CONFIG_FRAGMENTS_FORMAT, self._fingerprints.config, self._fragments)
+            ),
+        )
+
+
 def get_cmk_passive_service_attributes(
     config_cache: ConfigCache,
     host_name: HostName,
@@ -6,15 +6,18 @@
 
 import base64
 import itertools
+import os
+import re
 import socket
 import sys
 from collections import Counter
 from collections.abc import Callable, Mapping, Sequence
 from contextlib import suppress
+from dataclasses import dataclass
 from io import StringIO
 from pathlib import Path
 from socket import AddressFamily
-from typing import Any, assert_never, IO, Literal
+from typing import Any, assert_never, Final, IO, Literal
 
 import cmk.ccc.debug
 from cmk.base import config, core_config
@@ -50,6 +53,7 @@ from cmk.utils.config_path import VersionedConfigPath
 from cmk.utils.ip_lookup import IPStackConfig
 from cmk.utils.labels import LabelManager, Labels
 from cmk.utils.licensing.handler import LicensingHandler
+from cmk.utils.log import console
 from cmk.utils.macros import replace_macros_in_str
 from cmk.utils.notify import NotificationHostConfig, write_notify_host_file
 from cmk.utils.notify_types import Contact
@@ -59,10 +63,17 @@ from cmk.utils.servicename import MAX_SERVICE_NAME_LEN, ServiceName
 from cmk.utils.timeperiod import add_builtin_timeperiods
 
 from ._precompile_host_checks import precompile_hostchecks, PrecompileMode
+from ._workers import num_workers, process_in_workers
 
 _ContactgroupName = str
 ObjectSpec = dict[str, Any]
 
+# Don't start a worker process for less hosts than this
+_MIN_HOSTS_PER_WORKER: Final = 100
+# The host check commands of the workers are numbered when merging their configuration
+_HOSTCHECK_COMMAND_PLACEHOLDER: Final = "\0%d\0"
+_HOSTCHECK_COMMAND_PLACEHOLDER_RE: Final = re.compile("\0([0-9]+)\0")
+
 
 class NagiosCore(core_config.MonitoringCore):
     @classmethod
@@ -102,6 +113,7 @@ class NagiosCore(core_config.MonitoringCore):
             service_name_config,
             enforced_services_table,
             plugins.check_plugins,
+            discovery_rules,
             licensing_handler,
             passwords,
             get_ip_stack_config,
@@ -134,6 +146,7 @@ class NagiosCore(core_config.MonitoringCore):
             [HostName], Mapping[ServiceID, tuple[object, ConfiguredService]]
         ],
         plugins: Mapping[CheckPluginName, CheckPlugin],
+        discovery_rules: Mapping[RuleSetName, Sequence[RuleSpec]],
         licensing_handler: LicensingHandler,
         passwords: Mapping[str, str],
         get_ip_stack_config: Callable[[HostName], IPStackConfig],
@@ -154,6 +167,28 @@ class NagiosCore(core_config.MonitoringCore):
 
         config_buffer = StringIO()
         hosts_config = self._config_cache.hosts_config
+        hostnames = sorted(
+            {
+                hn
+                for hn in itertools.chain(hosts_config.hosts, hosts_config.clusters)
+                if self._config_cache.is_active(hn) and self._config_cache.is_online(hn)
+            }
+        )
+        host_config_fragments = (
+            core_config.HostConfigFragments[_HostsFragment](
+                self.name(),
+                core_config.compute_host_config_fingerprints(
+                    self._config_cache,
+                    hostnames,
+                    plugins,
+                    discovery_rules,
+                    passwords,
+                    ip_address_of,
+                ),
+            )
+            if config.incremental_core_config
+            else None
+        )
         create_config(
             config_buffer,
             config_path,
@@ -161,22 +196,24 @@ class NagiosCore(core_config.MonitoringCore):
             service_name_config,
             enforced_services_table,
             plugins,
-            hostnames=sorted(
-                {
-                    hn
-                    for hn in itertools.chain(hosts_config.hosts, hosts_config.clusters)
-                    if self._config_cache.is_active(hn) and self._config_cache.is_online(hn)
-                }
-            ),
+            hostnames=hostnames,
+            workers=config.nagios_config_workers or os.cpu_count() or 1,
             licensing_handler=licensing_handler,
             passwords=passwords,
             get_ip_stack_config=get_ip_stack_config,
             default_address_family=default_address_family,
             ip_address_of=ip_address_of,
             service_depends_on=service_depends_on,
+            host_config_fragments=host_config_fragments,
         )
 
         store.save_text_to_file(cmk.utils.paths.nagios_objects_file, config_buffer.getvalue())
+        if host_config_fragments is not None:
+            host_config_fragments.save()
+            console.verbose(
+                f"Reused the configuration of {host_config_fragments.num_reused} of"
+                f" {len(hostnames)} hosts"
+            )
 
     def _precompile_hostchecks(
         self,
@@ -205,6 +242,7 @@ class NagiosCore(core_config.MonitoringCore):
             get_ip_stack_config,
             ip_address_of,
             precompile_mode=precompile_mode,
+            workers=config.nagios_config_workers or os.cpu_count() or 1,
         )
         with suppress(IOError):
             sys.stdout.write(tty.ok + "\n")
@@ -224,10 +262,17 @@ class NagiosCore(core_config.MonitoringCore):
 
 
 class NagiosConfig:
-    def __init__(self, outfile: IO[str], hostnames: Sequence[HostName] | None) -> None:
+    def __init__(
+        self,
+        outfile: IO[str],
+        hostnames: Sequence[HostName] | None,
+        *,
+        hostcheck_command_number: str = "%d",
+    ) -> None:
         super().__init__()
         self._outfile = outfile
         self.hostnames = hostnames
+        self._hostcheck_command_number = hostcheck_command_number
 
         self.hostgroups_to_define: set[HostgroupName] = set()
         self.servicegroups_to_define: set[ServicegroupName] = set()
@@ -243,6 +288,54 @@ class NagiosConfig:
     def write_object(self, name: str, spec: ObjectSpec) -> None:
         self._outfile.write(_format_nagios_object(name, spec))
 
+    def next_hostcheck_command(self) -> CoreCommand:
+        return "check-mk-host-custom-" + self._hostcheck_command_number % (
+            len(self.hostcheck_commands_to_define) + 1
+        )
+
+    def add_fragment(self, fragment: "_HostsFragment") -> None:
+        """Add the configuration of some hosts created separately"""
+        offset = len(self.hostcheck_commands_to_define)
+
+        def number_commands(text: str) -> str:
+            return _HOSTCHECK_COMMAND_PLACEHOLDER_RE.sub(
+                lambda m: str(offset + int(m.group(1))), text
+            )
+
+        self.write_str(
+            number_commands(fragment.config)
+            if fragment.hostcheck_commands_to_define
+            else fragment.config
+        )
+        self.hostgroups_to_define.update(fragment.hostgroups_to_define)
+        self.servicegroups_to_define.update(fragment.servicegroups_to_define)
+        self.contactgroups_to_define.update(fragment.contactgroups_to_define)
+        self.checknames_to_define.update(fragment.checknames_to_define)
+        self.active_checks_to_define.update(fragment.active_checks_to_define)
+        self.custom_commands_to_define.update(fragment.custom_commands_to_define)
+        self.hostcheck_commands_to_define.extend(
+            (number_commands(command), command_line)
+            for command, command_line in fragment.hostcheck_commands_to_define
+        )
+
+
+@dataclass(frozen=True)
+class _HostsFragment:
+    """The configuration of some of the hosts, created by a worker process or stored"""
+
+    config: str
+    notify_host_configs: Mapping[HostName, NotificationHostConfig]
+    num_services: int
+    hostgroups_to_define: set[HostgroupName]
+    servicegroups_to_define: set[ServicegroupName]
+    contactgroups_to_define: set[_ContactgroupName]
+    checknames_to_define: set[CheckPluginName]
+    active_checks_to_define: dict[str, str]
+    custom_commands_to_define: set[CoreCommandName]
+    hostcheck_commands_to_define: list[tuple[CoreCommand, str]]
+    warnings: Sequence[str]
+    failed_ip_lookups: Mapping[HostName, Exception]
+
 
 def _validate_licensing(
     hosts: Hosts, licensing_handler: LicensingHandler, licensing_counter: Counter
@@ -271,16 +364,34 @@ def create_config(
     ],
     ip_address_of: ip_lookup.IPLookup,
     service_depends_on: Callable[[HostAddress, ServiceName], Sequence[ServiceName]],
+    workers: int = 1,
+    host_config_fragments: core_config.HostConfigFragments["_HostsFragment"] | None = None,
 ) -> None:
+    """Create the Nagios configuration of the given hosts
+
+    With more than one worker, the hosts are split into chunks which are processed by
+    forked worker processes. Each worker gets at least _MIN_HOSTS_PER_WORKER hosts, so less
+    workers are used for few hosts. They share the ConfigCache (copy on write) of this
+    process, which creates the configuration of the first host before forking them, so the
+    host rulesets are matched once by this process. The configurations of the workers are
+    merged in the order of the hosts, so the result is the same as the one created by this
+    process alone.
+
+    With the host config fragments of the previous run, only the hosts which changed
+    since then are created. The others are taken from the fragments.
+    """
     cfg = NagiosConfig(outfile, hostnames)
 
     _output_conf_header(cfg)
 
     licensing_counter = Counter("services")
     all_notify_host_configs: dict[HostName, NotificationHostConfig] = {}
-    for hostname in hostnames:
-        all_notify_host_configs[hostname] = _create_nagios_config_host(
-            cfg,
+
+    def create_host_config(
+        host_cfg: NagiosConfig, hostname: HostName, counter: Counter
+    ) -> NotificationHostConfig:
+        return _create_nagios_config_host(
+            host_cfg,
             config_cache,
             service_name_config,
             enforced_services_table,
@@ -289,11 +400,83 @@ def create_config(
             get_ip_stack_config(hostname),
             default_address_family(hostname),
             passwords,
-            licensing_counter,
+            counter,
             ip_address_of,
             service_depends_on,
         )
 
+    def create_fragment(chunk: Sequence[HostName]) -> _HostsFragment:
+        num_warnings = len(config_warnings.g_configuration_warnings)
+        failed_before = set(ip_lookup.failed_ip_lookups(ip_address_of))
+        outfile = StringIO()
+        chunk_cfg = NagiosConfig(
+            outfile, chunk, hostcheck_command_number=_HOSTCHECK_COMMAND_PLACEHOLDER
+        )
+        counter = Counter("services")
+        notify_host_configs = {hn: create_host_config(chunk_cfg, hn, counter) for hn in chunk}
+        # The warnings are issued when the fragment is added
+        warnings = config_warnings.g_configuration_warnings[num_warnings:]
+        del config_warnings.g_configuration_warnings[num_warnings:]
+        return _HostsFragment(
+            config=outfile.getvalue(),
+            notify_host_configs=notify_host_configs,
+            num_services=counter["services"],
+            hostgroups_to_define=chunk_cfg.hostgroups_to_define,
+            servicegroups_to_define=chunk_cfg.servicegroups_to_define,
+            contactgroups_to_define=chunk_cfg.contactgroups_to_define,
+            checknames_to_define=chunk_cfg.checknames_to_define,
+            active_checks_to_define=chunk_cfg.active_checks_to_define,
+            custom_commands_to_define=chunk_cfg.custom_commands_to_define,
+            hostcheck_commands_to_define=chunk_cfg.hostcheck_commands_to_define,
+            warnings=warnings,
+            failed_ip_lookups={
+                hn: exc
+                for hn, exc in ip_lookup.failed_ip_lookups(ip_address_of).items()
+                if hn not in failed_before
+            },
+        )
+
+    def add_fragment(fragment: _HostsFragment) -> None:
+        cfg.add_fragment(fragment)
+        all_notify_host_configs.update(fragment.notify_host_configs)
+        licensing_counter["services"] += fragment.num_services
+        config_warnings.g_configuration_warnings.extend(fragment.warnings)
+        if isinstance(ip_address_of, ip_lookup.ConfiguredIPLookup):
+            for hostname, exc in fragment.failed_ip_lookups.items():
+                ip_address_of.error_handler(hostname, exc)
+
+    if host_config_fragments is not None:
+        fragments = {
+            hn: fragment
+            for hn in hostnames
+            if (fragment := host_config_fragments.get(hn)) is not None
+        }
+        changed = [hn for hn in hostnames if hn not in fragments]
+        changed_workers = num_workers(len(changed), workers, _MIN_HOSTS_PER_WORKER)
+        for hostname, fragment in zip(
+            changed,
+            process_in_workers(
+                config_cache,
+                changed,
+                changed_workers,
+                lambda chunk: [create_fragment([hn]) for hn in chunk],
+            )
+            if changed_workers > 1
+            else (create_fragment([hn]) for hn in changed),
+        ):
+            host_config_fragments.update(hostname, fragment)
+            fragments[hostname] = fragment
+        for hostname in hostnames:
+            add_fragment(fragments[hostname])
+    elif (workers := num_workers(len(hostnames), workers, _MIN_HOSTS_PER_WORKER)) > 1:
+        for fragment in process_in_workers(
+            config_cache, hostnames, workers, lambda chunk: [create_fragment(chunk)]
+        ):
+            add_fragment(fragment)
+    else:
+        for hostname in hostnames:
+            all_notify_host_configs[hostname] = create_host_config(cfg, hostname, licensing_counter)
+
     _validate_licensing(config_cache.hosts_config, licensing_handler, licensing_counter)
 
     write_notify_host_file(config_path, all_notify_host_configs)
@@ -418,7 +601,7 @@ def create_nagios_host_spec(
             host_spec[key] = value
 
     def host_check_via_service_status(service: ServiceName) -> CoreCommand:
-        command = "check-mk-host-custom-%d" % (len(cfg.hostcheck_commands_to_define) + 1)
+        command = cfg.next_hostcheck_command()
         service_with_hostname = replace_macros_in_str(
             service,
             {"$HOSTNAME$": hostname},
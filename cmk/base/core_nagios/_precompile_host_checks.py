@@ -18,9 +18,11 @@ import py_compile
 import re
 import socket
 import sys
+import time
 from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import assert_never
+from typing import assert_never, Final
 
 import cmk.ccc.debug
 import cmk.checkengine.plugin_backend as agent_based_register
@@ -42,12 +44,14 @@ from cmk.checkengine.plugins import (
 )
 from cmk.discover_plugins import PluginLocation
 from cmk.server_side_calls_backend import load_special_agents
+from cmk.utils import ip_lookup
 from cmk.utils.ip_lookup import IPLookup, IPStackConfig
 from cmk.utils.log import console
 from cmk.utils.rulesets import RuleSetName
 from cmk.utils.rulesets.ruleset_matcher import RuleSpec
 
 from ._host_check_config import HostCheckConfig
+from ._workers import num_workers, process_in_workers
 
 _TEMPLATE_FILE = Path(__file__).parent / "_host_check_template.py"
 
@@ -56,6 +60,9 @@ _INSTANTIATION_PATTERN = re.compile(
     re.DOTALL,
 )
 
+# Don't fork workers for a handful of host checks
+_MIN_HOSTS_PER_WORKER: Final = 50
+
 
 class PrecompileMode(enum.Enum):
     DELAYED = enum.auto()
@@ -104,7 +111,20 @@ class HostCheckStore:
             case other:
                 assert_never(other)
 
-        console.verbose(f" ==> {compiled_filename}.", file=sys.stderr)
+        console.verbose(
+            f"{tty.bold}{tty.blue}{hostname:<16}{tty.normal}: ==> {compiled_filename}.",
+            file=sys.stderr,
+        )
+
+
+@dataclass(frozen=True)
+class _PrecompileResult:
+    hostname: HostName
+    error: str | None = None
+    # The precompilation has to be aborted
+    fatal: bool = False
+    # Failed IP lookups of a worker process are reported by the main process
+    failed_ip_lookups: Mapping[HostName, Exception] = field(default_factory=dict)
 
 
 def precompile_hostchecks(
@@ -120,6 +140,7 @@ def precompile_hostchecks(
     ip_address_of: IPLookup,
     *,
     precompile_mode: PrecompileMode,
+    workers: int = 1,
 ) -> None:
     console.verbose("Creating precompiled host check config...")
     hosts_config = config_cache.hosts_config
@@ -127,18 +148,26 @@ def precompile_hostchecks(
     save_packed_config(config_path, config_cache, discovery_rules)
 
     console.verbose("Precompiling host checks...")
+    start_time = time.monotonic()
+
+    hostnames = sorted(
+        {
+            # Inconsistent with `create_config` above.
+            hn
+            for hn in itertools.chain(hosts_config.hosts, hosts_config.clusters)
+            if config_cache.is_active(hn) and config_cache.is_online(hn)
+        }
+    )
+    workers = num_workers(len(hostnames), workers, _MIN_HOSTS_PER_WORKER)
 
     host_check_store = HostCheckStore()
-    for hostname in {
-        # Inconsistent with `create_config` above.
-        hn
-        for hn in itertools.chain(hosts_config.hosts, hosts_config.clusters)
-        if config_cache.is_active(hn) and config_cache.is_online(hn)
-    }:
+    resolve_plugin_locations = _PluginLocationsResolver(config_cache, plugins)
+
+    def precompile(hostname: HostName) -> _PrecompileResult:
+        failed_before = set(ip_lookup.failed_ip_lookups(ip_address_of))
+        error: str | None = None
+        fatal = False
         try:
-            console.verbose_no_lf(
-                f"{tty.bold}{tty.blue}{hostname:<16}{tty.normal}:", file=sys.stderr
-            )
             host_check = dump_precompiled_hostcheck(
                 config_cache,
                 service_name_config,
@@ -149,19 +178,57 @@ def precompile_hostchecks(
                 plugins,
                 ip_address_of=ip_address_of,
                 precompile_mode=precompile_mode,
+                resolve_plugin_locations=resolve_plugin_locations,
             )
 
             host_check_store.write(
                 config_path, hostname, host_check, precompile_mode=precompile_mode
             )
         except MKIPAddressLookupError as e:
-            console.error(f"Error precompiling checks for host {hostname}: {e}", file=sys.stderr)
+            error = str(e)
         except Exception as e:
             if cmk.ccc.debug.enabled():
                 raise
-            console.error(f"Error precompiling checks for host {hostname}: {e}", file=sys.stderr)
+            error, fatal = str(e), True
+        return _PrecompileResult(
+            hostname,
+            error,
+            fatal,
+            failed_ip_lookups={
+                hn: exc
+                for hn, exc in ip_lookup.failed_ip_lookups(ip_address_of).items()
+                if hn not in failed_before
+            },
+        )
+
+    num_errors = 0
+    for result in (
+        process_in_workers(
+            config_cache, hostnames, workers, lambda chunk: [precompile(hn) for hn in chunk]
+        )
+        if workers > 1
+        else (precompile(hn) for hn in hostnames)
+    ):
+        if isinstance(ip_address_of, ip_lookup.ConfiguredIPLookup):
+            for hostname, exc in result.failed_ip_lookups.items():
+                ip_address_of.error_handler(hostname, exc)
+        if result.error is None:
+            continue
+        num_errors += 1
+        console.error(
+            f"Error precompiling checks for host {result.hostname}: {result.error}",
+            file=sys.stderr,
+        )
+        if result.fatal:
             sys.exit(5)
 
+    console.verbose(
+        f"Precompiled {len(hostnames) - num_errors} of {len(hostnames)} host checks"
+        f" in {time.monotonic() - start_time:.2f}s"
+        f" ({workers} worker{'s' if workers > 1 else ''},"
+        f" {resolve_plugin_locations.num_resolved} distinct sets of plug-ins)"
+    )
+
 
 def dump_precompiled_hostcheck(
     config_cache: ConfigCache,
@@ -177,9 +244,15 @@ def dump_precompiled_hostcheck(
     ip_address_of: IPLookup,
     verify_site_python: bool = True,
     precompile_mode: PrecompileMode,
+    resolve_plugin_locations: "_PluginLocationsResolver | None" = None,
 ) -> str:
     locations, legacy_checks_to_load = _make_needed_plugins_locations(
-        config_cache, service_name_config, enforced_services_table, hostname, plugins
+        config_cache,
+        service_name_config,
+        enforced_services_table,
+        hostname,
+        plugins,
+        resolve_plugin_locations or _PluginLocationsResolver(config_cache, plugins),
     )
     ip_stack_config = get_ip_stack_config(hostname)
 
@@ -240,6 +313,65 @@ def dump_precompiled_hostcheck(
     )
 
 
+class _PluginLocationsResolver:
+    """Determine the locations of the plug-ins needed by a host
+
+    Most hosts share the same set of plug-ins with many others, so the locations
+    are determined only once per set of plug-ins.
+    """
+
+    def __init__(self, config_cache: ConfigCache, plugins: AgentBasedPlugins) -> None:
+        self._config_cache: Final = config_cache
+        self._plugins: Final = plugins
+        self._ssc_api_special_agents: Final = {
+            p.name for p in load_special_agents(raise_errors=cmk.ccc.debug.enabled()).values()
+        }
+        self._resolved: dict[
+            tuple[frozenset[tuple[type, str]], frozenset[str]],
+            tuple[list[PluginLocation], list[str]],
+        ] = {}
+
+    @property
+    def num_resolved(self) -> int:
+        return len(self._resolved)
+
+    def __call__(
+        self,
+        host_name: HostName,
+        needed_agent_based_plugins: Sequence[CheckPlugin | InventoryPlugin],
+    ) -> tuple[list[PluginLocation], list[str]]:
+        """The returned lists are shared between the hosts and must not be modified"""
+        needed_legacy_special_agents = _get_needed_legacy_special_agents(
+            self._config_cache, host_name, self._ssc_api_special_agents
+        )
+        key = (
+            frozenset((type(p), p.name) for p in needed_agent_based_plugins),
+            frozenset(needed_legacy_special_agents),
+        )
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        needed_agent_based_sections = agent_based_register.filter_relevant_raw_sections(
+            consumers=needed_agent_based_plugins,
+            sections=itertools.chain(
+                self._plugins.agent_sections.values(), self._plugins.snmp_sections.values()
+            ),
+        ).values()
+
+        resolved = self._resolved[key] = (
+            _get_needed_agent_based_locations(
+                itertools.chain(needed_agent_based_sections, needed_agent_based_plugins)
+            ),
+            _get_needed_legacy_check_files(
+                itertools.chain(needed_agent_based_sections, needed_agent_based_plugins),
+                needed_legacy_special_agents,
+            ),
+        )
+        return resolved
+
+
 def _make_needed_plugins_locations(
     config_cache: ConfigCache,
     service_name_config: PassiveServiceNameConfig,
@@ -248,6 +380,7 @@ def _make_needed_plugins_locations(
     ],
     hostname: HostName,
     plugins: AgentBasedPlugins,
+    resolve_plugin_locations: _PluginLocationsResolver,
 ) -> tuple[  # we need `list` for the weird template replacement technique
     list[PluginLocation],
     list[str],  # TODO: change this to `LegacyPluginLocation` once the special agents are migrated
@@ -266,22 +399,7 @@ def _make_needed_plugins_locations(
                 )
             )
 
-    needed_legacy_special_agents = _get_needed_legacy_special_agents(config_cache, hostname)
-
-    needed_agent_based_sections = agent_based_register.filter_relevant_raw_sections(
-        consumers=needed_agent_based_plugins,
-        sections=itertools.chain(plugins.agent_sections.values(), plugins.snmp_sections.values()),
-    ).values()
-
-    return (
-        _get_needed_agent_based_locations(
-            itertools.chain(needed_agent_based_sections, needed_agent_based_plugins)
-        ),
-        _get_needed_legacy_check_files(
-            itertools.chain(needed_agent_based_sections, needed_agent_based_plugins),
-            needed_legacy_special_agents,
-        ),
-    )
+    return resolve_plugin_locations(hostname, needed_agent_based_plugins)
 
 
 def _get_needed_plugins(
@@ -324,10 +442,9 @@ def _get_needed_plugins(
     ]
 
 
-def _get_needed_legacy_special_agents(config_cache: ConfigCache, host_name: HostName) -> set[str]:
-    ssc_api_special_agents = {
-        p.name for p in load_special_agents(raise_errors=cmk.ccc.debug.enabled()).values()
-    }
+def _get_needed_legacy_special_agents(
+    config_cache: ConfigCache, host_name: HostName, ssc_api_special_agents: set[str]
+) -> set[str]:
     return {
         f"agent_{name}"
         for name, _p in config_cache.special_agents(host_name)
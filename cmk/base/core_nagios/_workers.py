@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Process the hosts in forked worker processes"""
+
+import multiprocessing
+import sys
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import suppress
+from typing import Any
+
+from cmk.base.config import ConfigCache
+from cmk.ccc.hostaddress import HostName
+
+# The function processing a chunk of hosts in the worker processes and the ConfigCache
+# it uses. They are inherited by the forked workers, so they do not have to be pickled.
+_process_chunk: Callable[[Sequence[HostName]], Sequence[Any]] | None = None
+_config_cache: ConfigCache | None = None
+
+
+def _process_chunk_in_worker(
+    hostnames: Sequence[HostName],
+) -> tuple[Sequence[Any], Mapping[str, float]]:
+    """Process the chunk, also return the time needed to match host rulesets meanwhile"""
+    assert _process_chunk is not None and _config_cache is not None
+    before = dict(_config_cache.host_ruleset_durations())
+    results = _process_chunk(hostnames)
+    return results, {
+        name: duration - before.get(name, 0.0)
+        for name, duration in _config_cache.host_ruleset_durations().items()
+        if duration != before.get(name)
+    }
+
+
+def num_workers(num_hosts: int, workers: int, min_hosts_per_worker: int) -> int:
+    """Don't start more workers than needed to give each of them enough hosts"""
+    return max(1, min(workers, num_hosts // min_hosts_per_worker))
+
+
+def process_in_workers[T](
+    config_cache: ConfigCache,
+    hostnames: Sequence[HostName],
+    workers: int,
+    process_chunk: Callable[[Sequence[HostName]], Sequence[T]],
+) -> Iterator[T]:
+    """Process the hosts in chunks by forked worker processes
+
+    The workers share the state of this process (copy on write), only the results of
+    process_chunk are pickled. They are yielded in the order of the hosts.
+
+    The first host is processed by this process before forking. Processing it computes
+    what is computed for all hosts on first use, most notably the host rulesets are
+    matched for all hosts, so the workers inherit this instead of computing it each.
+    The time the workers need to match further host rulesets is added to the host ruleset
+    durations of config_cache.
+    """
+    global _process_chunk, _config_cache
+
+    if not hostnames:
+        return
+    yield from process_chunk(hostnames[:1])
+    if not (hostnames := hostnames[1:]):
+        return
+
+    # Several chunks per worker, to even out the differences between the hosts
+    chunk_size = -(-len(hostnames) // (4 * workers))
+    chunks = [hostnames[i : i + chunk_size] for i in range(0, len(hostnames), chunk_size)]
+
+    # Don't let the workers inherit (and output) buffered output
+    with suppress(IOError):
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    _process_chunk, _config_cache = process_chunk, config_cache
+    try:
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            for results, host_ruleset_durations in pool.imap(_process_chunk_in_worker, chunks):
+                config_cache.add_host_ruleset_durations(host_ruleset_durations)
+                yield from results
+    finally:
+        _process_chunk, _config_cache = None, None
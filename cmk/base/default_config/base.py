@@ -167,6 +167,11 @@ passive_service_template_perf = "check_mk_passive_perf"
 summary_service_template = "check_mk_summarized"
 service_dependency_template = "check_mk"
 generate_hostconf = True
+# Number of processes creating the Nagios configuration and precompiling the host checks,
+# None: one per CPU
+nagios_config_workers: int | None = None
+# Reuse the configuration of the hosts which did not change since the previous run
+incremental_core_config = True
 generate_dummy_commands = True
 dummy_check_commandline = 'echo "ERROR - you did an active check on this service - please disable active checks" && exit 1'
 nagios_illegal_chars = "`;~!$%^&*|'\"<>?,="
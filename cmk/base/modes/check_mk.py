@@ -1018,6 +1018,40 @@ modes.register(
     )
 )
 
+
+def mode_check_piggyback_index(options: Mapping[str, object]) -> int:
+    omd_root = cmk.utils.paths.omd_root
+    if "rebuild" in options:
+        piggyback_backend.rebuild_piggyback_index(omd_root)
+        return 0
+
+    if not (problems := piggyback_backend.check_piggyback_index(omd_root)):
+        print_("The piggyback index is consistent.\n")
+        return 0
+    for problem in problems:
+        print_(f"{problem}\n")
+    print_(f"{len(problems)} inconsistencies found, use --rebuild to fix them.\n")
+    return 1
+
+
+modes.register(
+    Mode(
+        long_option="check-piggyback-index",
+        handler_function=mode_check_piggyback_index,
+        short_help="Check the piggyback index against the piggyback files",
+        long_help=[
+            "Lookups of piggyback data use an index of the stored piggyback files. "
+            "This mode compares the index with the files and reports the differences.",
+        ],
+        sub_options=[
+            Option(
+                long_option="rebuild",
+                short_help="Rebuild the index from the piggyback files",
+            ),
+        ],
+    )
+)
+
 # .
 #   .--snmptranslate-------------------------------------------------------.
 #   |                            _                       _       _         |
@@ -1554,13 +1588,19 @@ def _make_configured_bake_on_restart(
     )
 
 
-def mode_update() -> None:
-    from cmk.base.core_config import do_create_config
+def mode_update(options: Mapping[str, object]) -> None:
+    from cmk.base.core_config import clear_host_config_fragments, do_create_config
 
     edition = cmk_version.edition(cmk.utils.paths.omd_root)
     plugins = load_checks()
     loading_result = load_config(plugins)
 
+    if "precompute-rulesets" in options:
+        loading_result.config_cache.match_host_rulesets_in_bulk()
+
+    if "full-rebuild" in options:
+        clear_host_config_fragments()
+
     hosts_config = loading_result.config_cache.hosts_config
     ip_lookup_config = loading_result.config_cache.ip_lookup_config()
     ip_address_of = ip_lookup.ConfiguredIPLookup(
@@ -1625,6 +1665,19 @@ def mode_update() -> None:
     for warning in ip_address_of.error_handler.format_errors():
         console.warning(tty.format_warning(f"\n{warning}"))
 
+    if "precompute-rulesets" in options:
+        _show_host_ruleset_durations(loading_result.config_cache)
+
+
+def _show_host_ruleset_durations(config_cache: ConfigCache) -> None:
+    # Including the time needed by the worker processes
+    durations = config_cache.host_ruleset_durations()
+    console.verbose(
+        f"Computed {len(durations)} host rulesets in {sum(durations.values()):.2f} seconds"
+    )
+    for name, duration in sorted(durations.items(), key=lambda item: item[1], reverse=True)[:10]:
+        console.verbose(f"  {duration:8.3f} s  {name}")
+
 
 modes.register(
     Mode(
@@ -1640,6 +1693,22 @@ modes.register(
             "and the configuration for the Core helper processes is being created.",
             "The Agent Bakery is updating the agents.",
         ],
+        sub_options=[
+            Option(
+                long_option="precompute-rulesets",
+                short_help=(
+                    "Match each host ruleset for all hosts at once when creating the "
+                    "configuration. Use -v to see the most expensive rulesets."
+                ),
+            ),
+            Option(
+                long_option="full-rebuild",
+                short_help=(
+                    "Create the configuration of all hosts, instead of reusing the "
+                    "configuration of the hosts which did not change since the last update."
+                ),
+            ),
+        ],
     )
 )
 
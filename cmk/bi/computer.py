@@ -8,10 +8,19 @@ from collections.abc import Iterator
 from typing import NamedTuple
 
 from cmk.bi.data_fetcher import BIStatusFetcher
-from cmk.bi.lib import NodeResultBundle, RequiredBIElement
-from cmk.bi.trees import BICompiledAggregation, BICompiledRule
+from cmk.bi.lib import (
+    ABCBICompiledNode,
+    BIAggregationComputationOptions,
+    BIHostSpec,
+    BIStatusInfo,
+    NodeResultBundle,
+    RequiredBIElement,
+)
+from cmk.bi.trees import BICompiledAggregation, BICompiledLeaf, BICompiledRule
+from cmk.bi.type_defs import HostState
 from cmk.ccc.hostaddress import HostName
 from cmk.ccc.plugin_registry import Registry
+from cmk.checkengine.submitters import ServiceState  # pylint: disable=cmk-module-layer-violation
 from cmk.utils.servicename import ServiceName
 
 
@@ -112,10 +121,7 @@ class BIComputer:
     ) -> list[tuple[BICompiledAggregation, list[NodeResultBundle]]]:
         results = []
         for compiled_aggregation, branches in required_aggregations:
-            node_result_bundles = compiled_aggregation.compute_branches(
-                branches,
-                self._bi_status_fetcher,
-            )
+            node_result_bundles = self.compute_branches(compiled_aggregation, branches)
 
             # Postprocess results. Custom user plugins may add additional information for each node
             node_result_bundles = list(
@@ -128,6 +134,11 @@ class BIComputer:
             results.append((compiled_aggregation, node_result_bundles))
         return results
 
+    def compute_branches(
+        self, compiled_aggregation: BICompiledAggregation, branches: list[BICompiledRule]
+    ) -> list[NodeResultBundle]:
+        return compiled_aggregation.compute_branches(branches, self._bi_status_fetcher)
+
     def get_filtered_aggregation_branches(
         self,
         compiled_aggregation: BICompiledAggregation,
@@ -289,3 +300,138 @@ class BIComputer:
             legacy_branch = copy.deepcopy(self._legacy_branch_cache[title])
         legacy_branch["aggr_group"] = aggr_group
         return legacy_branch
+
+
+class _CachedNodeResult(NamedTuple):
+    use_assumed: bool
+    result: NodeResultBundle | None
+
+
+_UNKNOWN_ELEMENT_STATE = object()
+
+
+class BIIncrementalComputer(BIComputer):
+    """Keeps the results of the computed nodes and only recomputes the changed parts
+
+    Every computation compares the states of the required elements with those used by the
+    previous computation. The leaves of the changed elements and their ancestors are computed
+    again, all other nodes reuse their previous results. This pays off whenever the same
+    branches are computed over and over with only a few changed states, e.g. for the phases
+    of the BI availability.
+    """
+
+    def __init__(
+        self,
+        compiled_aggregations: dict[str, BICompiledAggregation],
+        bi_status_fetcher: BIStatusFetcher,
+    ) -> None:
+        super().__init__(compiled_aggregations, bi_status_fetcher)
+        self._node_results: dict[ABCBICompiledNode, _CachedNodeResult] = {}
+        self._parents: dict[ABCBICompiledNode, BICompiledRule] = {}
+        self._leaves_by_element: dict[RequiredBIElement, list[BICompiledLeaf]] = {}
+        self._element_states: dict[RequiredBIElement, object] = {}
+        self._indexed_branches: set[BICompiledRule] = set()
+
+    def compute_branches(
+        self, compiled_aggregation: BICompiledAggregation, branches: list[BICompiledRule]
+    ) -> list[NodeResultBundle]:
+        assumed_state_ids = self._bi_status_fetcher.assumed_states.keys()
+        aggregation_results = []
+        for bi_compiled_branch in branches:
+            self._index_branch(bi_compiled_branch)
+            required_elements = bi_compiled_branch.required_elements()
+            self._invalidate_changed_elements(required_elements)
+            result = self._compute_node(
+                bi_compiled_branch,
+                compiled_aggregation.computation_options,
+                not assumed_state_ids.isdisjoint(required_elements),
+            )
+            if result is not None:
+                aggregation_results.append(result)
+        return aggregation_results
+
+    def _index_branch(self, bi_compiled_branch: BICompiledRule) -> None:
+        if bi_compiled_branch in self._indexed_branches:
+            return
+        self._indexed_branches.add(bi_compiled_branch)
+
+        rules = [bi_compiled_branch]
+        while rules:
+            rule = rules.pop()
+            for node in rule.nodes:
+                self._parents[node] = rule
+                if isinstance(node, BICompiledRule):
+                    rules.append(node)
+                elif isinstance(node, BICompiledLeaf):
+                    self._leaves_by_element.setdefault(
+                        RequiredBIElement(node.site_id, node.host_name, node.service_description),
+                        [],
+                    ).append(node)
+
+    def _invalidate_changed_elements(self, required_elements: set[RequiredBIElement]) -> None:
+        states = self._bi_status_fetcher.states
+        assumed_states = self._bi_status_fetcher.assumed_states
+        for element in required_elements:
+            element_state = _get_element_state(element, states, assumed_states)
+            if self._element_states.get(element, _UNKNOWN_ELEMENT_STATE) == element_state:
+                continue
+            self._element_states[element] = element_state
+            for leaf in self._leaves_by_element.get(element, []):
+                # A node is only cached if all of its nodes are cached, so the ancestors of an
+                # uncached node have already been invalidated
+                node: ABCBICompiledNode | None = leaf
+                while node is not None and self._node_results.pop(node, None) is not None:
+                    node = self._parents.get(node)
+
+    def _compute_node(
+        self,
+        node: ABCBICompiledNode,
+        computation_options: BIAggregationComputationOptions,
+        use_assumed: bool,
+    ) -> NodeResultBundle | None:
+        if (cached := self._node_results.get(node)) is not None and (
+            cached.use_assumed == use_assumed
+        ):
+            return cached.result
+
+        if isinstance(node, BICompiledRule):
+            result = node.compute_from_nested_results(
+                [
+                    self._compute_node(nested_node, computation_options, use_assumed)
+                    for nested_node in node.nodes
+                ],
+                computation_options,
+                use_assumed,
+            )
+        else:
+            result = node.compute(computation_options, self._bi_status_fetcher, use_assumed)
+
+        self._node_results[node] = _CachedNodeResult(use_assumed, result)
+        return result
+
+
+def _get_element_state(
+    element: RequiredBIElement,
+    states: BIStatusInfo,
+    assumed_states: dict[RequiredBIElement, HostState | ServiceState],
+) -> object:
+    """Everything the result of the leaves of this element is computed from"""
+    assumed_state = assumed_states.get(element)
+    if (host_status := states.get(BIHostSpec(element.site_id, element.host_name))) is None:
+        return None, assumed_state
+    if element.service_description is None:
+        return (
+            host_status.state,
+            host_status.has_been_checked,
+            host_status.hard_state,
+            host_status.plugin_output,
+            host_status.scheduled_downtime_depth,
+            host_status.in_service_period,
+            host_status.acknowledged,
+            assumed_state,
+        )
+    return (
+        host_status.scheduled_downtime_depth,
+        host_status.services_with_fullstate.get(element.service_description),
+        assumed_state,
+    )
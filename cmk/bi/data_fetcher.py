@@ -3,8 +3,6 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
-import marshal
-import os
 import time
 from collections.abc import Mapping
 from pathlib import Path
@@ -17,12 +15,16 @@ from cmk.bi.lib import (
     BIHostData,
     BIHostSpec,
     BIHostStatusInfoRow,
-    BIServiceData,
     BIServiceWithFullState,
     BIStatusInfo,
     RequiredBIElement,
     SitesCallback,
 )
+from cmk.bi.structure_data import (
+    create_host_data,
+    load_site_structure_data,
+    save_site_structure_data,
+)
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule
 from cmk.ccc.hostaddress import HostName
 from cmk.ccc.site import SiteId
@@ -171,7 +173,7 @@ class BIStructureFetcher:
         for site_id, hosts in site_data.items():
             self.add_site_data(site_id, hosts)
             path = self._fs.cache.get_site_structure_data_path(site_id, only_sites[site_id])
-            self._marshal_save_data(path, hosts)
+            save_site_structure_data(path, hosts)
 
     def _read_cached_data(self, required_program_starts: set[SiteProgramStart]) -> None:
         required_sites = {x[0] for x in required_program_starts}
@@ -185,8 +187,8 @@ class BIStructureFetcher:
                 # The site probably got disabled in the distributed monitoring page
                 continue
 
-            site_data = self._marshal_load_data(path_object)
-            self.add_site_data(site_id, site_data)
+            self._hosts.update(load_site_structure_data(path_object))
+            self._have_sites.add(site_id)
 
     @classmethod
     def _host_structure_columns(cls) -> list[str]:
@@ -217,18 +219,7 @@ class BIStructureFetcher:
         # ("name", str),
 
         for host_name, values in hosts.items():
-            site_id, tags, labels, folder, services, children, parents, alias, name = values
-            self._hosts[host_name] = BIHostData(
-                site_id,
-                tags,
-                labels,
-                folder,
-                {x: BIServiceData(*y) for x, y in services.items()},
-                children,
-                parents,
-                alias,
-                name,
-            )
+            self._hosts[host_name] = create_host_data(values)
 
         self._have_sites.add(site_id)
 
@@ -263,15 +254,6 @@ class BIStructureFetcher:
             data_files.append((path_object, (SiteId(site_id), int(timestamp))))
         return data_files
 
-    def _marshal_save_data(self, filepath: Path, data: dict) -> None:
-        with open(filepath, "wb") as f:
-            marshal.dump(data, f)
-            os.fsync(f.fileno())
-
-    def _marshal_load_data(self, filepath: Path) -> dict:
-        with open(filepath, "rb") as f:
-            return marshal.load(f)  # nosec B302 # BNS:ccacbd
-
 
 #   .--BIState Fetcher-----------------------------------------------------.
 #   | ____ ___ ____  _        _         _____    _       _                 |
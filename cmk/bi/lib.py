@@ -106,7 +106,7 @@ class BIHostData(NamedTuple):
     tags: set[tuple[TagGroupID, TagID]]
     labels: MapGroup2Value
     folder: str
-    services: dict[str, BIServiceData]
+    services: Mapping[str, BIServiceData]
     children: tuple[HostName]
     parents: tuple[HostName]
     alias: str
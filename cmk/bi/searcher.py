@@ -4,13 +4,19 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 from collections.abc import Iterable, Mapping
-from typing import Any
+from typing import Any, cast
 
 from cmk.bi.lib import ABCBISearcher, BIHostData, BIHostSearchMatch, BIServiceSearchMatch
 from cmk.utils.labels import LabelGroups
 from cmk.utils.regex import regex
-from cmk.utils.rulesets.ruleset_matcher import matches_labels, matches_tag_condition, TagCondition
-from cmk.utils.tags import TagGroupID
+from cmk.utils.rulesets.ruleset_matcher import (
+    matches_labels,
+    matching_hosts_by_labels,
+    TagCondition,
+    TagConditionNE,
+    TagConditionOR,
+)
+from cmk.utils.tags import TagGroupID, TagID
 
 #   .--Defines-------------------------------------------------------------.
 #   |                  ____        __ _                                    |
@@ -23,6 +29,77 @@ from cmk.utils.tags import TagGroupID
 
 # Search data used by bi_searcher
 
+
+class _BIHostIndex:
+    """Lookups of the host attributes used by the search conditions"""
+
+    def __init__(self, hosts: Iterable[BIHostData]) -> None:
+        self.host_names: set[str] = set()
+        self.folders: set[str] = set()
+        self.hosts_by_tag: dict[tuple[TagGroupID, TagID | None], set[str]] = {}
+        self.hosts_by_label: dict[tuple[str, str], set[str]] = {}
+        # The same conditions are used for many searches, e.g. for each parent host
+        self._folder_matches: dict[str, set[str]] = {}
+        self._tag_matches: dict[str, set[str]] = {}
+        self._label_matches: dict[str, set[str]] = {}
+        for host in hosts:
+            self.host_names.add(host.name)
+            self.folders.add(host.folder)
+            for tag in host.tags:
+                self.hosts_by_tag.setdefault(tag, set()).add(host.name)
+            for label in host.labels.items():
+                self.hosts_by_label.setdefault(label, set()).add(host.name)
+
+    def match_folder(self, folder_path: str) -> set[str]:
+        if (matching := self._folder_matches.get(folder_path)) is None:
+            matching = self._folder_matches[folder_path] = {
+                folder for folder in self.folders if folder.startswith(folder_path)
+            }
+        return matching
+
+    def match_tags(self, tag_conditions: Mapping[TagGroupID, TagCondition]) -> set[str]:
+        """Same as matches_tag_condition for all hosts at once"""
+        if (matching := self._tag_matches.get(cache_id := repr(tag_conditions))) is None:
+            matching = self._tag_matches[cache_id] = self._compute_tag_matches(tag_conditions)
+        return matching
+
+    def _compute_tag_matches(self, tag_conditions: Mapping[TagGroupID, TagCondition]) -> set[str]:
+        matching = set(self.host_names)
+        for taggroup_id, tag_condition in tag_conditions.items():
+            if not isinstance(tag_condition, dict):
+                matching.intersection_update(self._hosts_with_tag(taggroup_id, tag_condition))
+            elif "$ne" in tag_condition:
+                matching.difference_update(
+                    self._hosts_with_tag(taggroup_id, cast(TagConditionNE, tag_condition)["$ne"])
+                )
+            elif "$or" in tag_condition:
+                matching.intersection_update(
+                    set().union(
+                        *(
+                            self._hosts_with_tag(taggroup_id, tag_id)
+                            for tag_id in cast(TagConditionOR, tag_condition)["$or"]
+                        )
+                    )
+                )
+            elif "$nor" in tag_condition:
+                for tag_id in tag_condition["$nor"]:
+                    matching.difference_update(self._hosts_with_tag(taggroup_id, tag_id))
+            else:
+                raise NotImplementedError()
+        return matching
+
+    def _hosts_with_tag(self, taggroup_id: TagGroupID, tag_id: TagID | None) -> set[str]:
+        return self.hosts_by_tag.get((taggroup_id, tag_id), set())
+
+    def match_labels(self, required_label_groups: LabelGroups) -> set[str]:
+        """Same as matches_labels for all hosts at once"""
+        if (matching := self._label_matches.get(cache_id := repr(required_label_groups))) is None:
+            matching = self._label_matches[cache_id] = matching_hosts_by_labels(
+                self.host_names, self.hosts_by_label, required_label_groups
+            )
+        return matching
+
+
 #   .--BISearcher----------------------------------------------------------.
 #   |         ____ ___ ____                      _                         |
 #   |        | __ )_ _/ ___|  ___  __ _ _ __ ___| |__   ___ _ __           |
@@ -34,6 +111,12 @@ from cmk.utils.tags import TagGroupID
 
 
 class BISearcher(ABCBISearcher):
+    def __init__(self) -> None:
+        super().__init__()
+        self._alias_regex_match_cache: dict[str, dict[str, tuple]] = {}
+        self._alias_regex_miss_cache: dict[str, set[str]] = {}
+        self._host_index: _BIHostIndex | None = None
+
     def set_hosts(self, hosts: dict[str, BIHostData]) -> None:
         self.cleanup()
         # The key may be a pattern / regex, so `str` is the correct type for the key.
@@ -45,6 +128,15 @@ class BISearcher(ABCBISearcher):
         self.hosts = {}
         self._host_regex_match_cache.clear()
         self._host_regex_miss_cache.clear()
+        self._alias_regex_match_cache.clear()
+        self._alias_regex_miss_cache.clear()
+        self._host_index = None
+
+    def _get_host_index(self) -> _BIHostIndex:
+        # The filters are only called with hosts of this searcher, so the index covers them
+        if self._host_index is None:
+            self._host_index = _BIHostIndex(self.hosts.values())
+        return self._host_index
 
     def search_hosts(self, conditions: dict) -> list[BIHostSearchMatch]:
         hosts, matched_re_groups = self.filter_host_choice(
@@ -127,17 +219,22 @@ class BISearcher(ABCBISearcher):
         if pattern == "(.*)":
             return hosts, self._host_match_groups(hosts, "alias")
 
-        # TODO: alias matches currently costs way more performance than the host matches
-        #       requires alias lookup cache to fix
         matched_hosts = []
         matched_re_groups = {}
         regex_pattern = regex(pattern)
+        pattern_match_cache = self._alias_regex_match_cache.setdefault(pattern, {})
+        pattern_miss_cache = self._alias_regex_miss_cache.setdefault(pattern, set())
         for host in hosts:
-            match = regex_pattern.match(host.alias)
-            if match is None:
+            if host.alias in pattern_miss_cache:
                 continue
+
+            if (cached_match := pattern_match_cache.get(host.alias)) is None:
+                if (match := regex_pattern.match(host.alias)) is None:
+                    pattern_miss_cache.add(host.alias)
+                    continue
+                cached_match = pattern_match_cache[host.alias] = tuple(match.groups())
             matched_hosts.append(host)
-            matched_re_groups[host.name] = tuple(match.groups())
+            matched_re_groups[host.name] = cached_match
         return matched_hosts, matched_re_groups
 
     def get_service_description_matches(
@@ -173,33 +270,26 @@ class BISearcher(ABCBISearcher):
         if not folder_path:
             return hosts
 
-        folder_path = f"{folder_path}/"
-        return (x for x in hosts if x.folder.startswith(folder_path))
+        folders = self._get_host_index().match_folder(f"{folder_path}/")
+        return (x for x in hosts if x.folder in folders)
 
     def filter_host_tags(
         self,
         hosts: Iterable[BIHostData],
         tag_conditions: Mapping[TagGroupID, TagCondition],
     ) -> Iterable[BIHostData]:
-        return (
-            host
-            for host in hosts  #
-            if all(
-                matches_tag_condition(
-                    taggroup_id,
-                    tag_condition,
-                    host.tags,
-                )
-                for taggroup_id, tag_condition in tag_conditions.items()
-            )
-        )
+        if not tag_conditions:
+            return hosts
+        matching = self._get_host_index().match_tags(tag_conditions)
+        return (host for host in hosts if host.name in matching)
 
     def filter_host_labels(
         self, hosts: Iterable[BIHostData], required_label_groups: LabelGroups
     ) -> Iterable[BIHostData]:
         if not required_label_groups:
             return hosts
-        return (x for x in hosts if matches_labels(x.labels, required_label_groups))
+        matching = self._get_host_index().match_labels(required_label_groups)
+        return (x for x in hosts if x.name in matching)
 
     def filter_service_labels(
         self, services: list[BIServiceSearchMatch], required_label_groups: Any
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Storage of the structure data of a site
+
+The structure data is written in a compact, columnar format: All strings are stored once in a
+string table and referenced by their index. The host attributes are stored column by column,
+the services of each host are stored in a separate record which is referenced by its offset.
+
+Reading the data maps the file into memory. All processes reading the same file share its
+pages and the services of a host are only decoded once they are accessed.
+"""
+
+import marshal
+import mmap
+import struct
+from collections.abc import Hashable, Iterator, Mapping, Sequence
+from functools import cached_property
+from pathlib import Path
+
+from cmk.bi.lib import BIHostData, BIServiceData
+from cmk.ccc import store
+from cmk.ccc.hostaddress import HostName
+
+_MAGIC = b"CMK_BI_STRUCTURE_1\n"
+_HEADER_LENGTH = struct.Struct("<Q")
+
+
+def create_host_data(values: tuple) -> BIHostData:
+    site_id, tags, labels, folder, services, children, parents, alias, name = values
+    return BIHostData(
+        site_id,
+        tags,
+        labels,
+        folder,
+        {x: BIServiceData(*y) for x, y in services.items()},
+        children,
+        parents,
+        alias,
+        name,
+    )
+
+
+class _Table[T: Hashable]:
+    def __init__(self) -> None:
+        self.values: list[T] = []
+        self._indexes: dict[T, int] = {}
+
+    def index(self, value: T) -> int:
+        if (idx := self._indexes.get(value)) is None:
+            idx = self._indexes[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+
+class _StringTable(_Table[str]):
+    def index(self, value: str) -> int:
+        # Host names may be given as HostName, which cannot be marshaled
+        return super().index(str(value))
+
+    def indexes(self, values: Sequence[str]) -> tuple[int, ...]:
+        return tuple(self.index(value) for value in values)
+
+    def pairs(self, pairs: Mapping[str, str]) -> tuple[int, ...]:
+        return tuple(self.index(item) for pair in pairs.items() for item in pair)
+
+
+def save_site_structure_data(path: Path, hosts: Mapping[HostName, tuple]) -> None:
+    """Save the structure data of a site as fetched by the BIStructureFetcher"""
+    strings = _StringTable()
+    tag_pairs = _Table[tuple[int, int]]()
+    columns: tuple[list, ...] = ([], [], [], [], [], [], [], [], [0])
+    names, sites, aliases, folders, tags, labels, children, parents, offsets = columns
+    records = []
+    for host_name, values in hosts.items():
+        site_id, host_tags, host_labels, folder, services, host_children, host_parents, alias, _ = (
+            values
+        )
+        names.append(strings.index(host_name))
+        sites.append(strings.index(site_id))
+        aliases.append(strings.index(alias))
+        folders.append(strings.index(folder))
+        tags.append(
+            tuple(
+                tag_pairs.index((strings.index(group), strings.index(tag)))
+                for group, tag in sorted(host_tags)
+            )
+        )
+        labels.append(strings.pairs(host_labels))
+        children.append(strings.indexes(host_children))
+        parents.append(strings.indexes(host_parents))
+        records.append(
+            marshal.dumps(
+                tuple(
+                    (
+                        strings.index(description),
+                        strings.indexes(sorted(service_tags)),
+                        strings.pairs(service_labels),
+                    )
+                    for description, (service_tags, service_labels) in services.items()
+                )
+            )
+        )
+        offsets.append(offsets[-1] + len(records[-1]))
+
+    header = marshal.dumps(
+        (tuple(strings.values), tuple(tag_pairs.values), tuple(map(tuple, columns)))
+    )
+    store.save_bytes_to_file(
+        path, b"".join([_MAGIC, _HEADER_LENGTH.pack(len(header)), header, *records])
+    )
+
+
+def load_site_structure_data(path: Path) -> dict[str, BIHostData]:
+    """Load the structure data of a site, the services of the hosts are decoded lazily"""
+    with path.open("rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if data[: len(_MAGIC)] != _MAGIC:
+        # Written by a previous version: One marshaled dictionary of all hosts
+        return {
+            host_name: create_host_data(values)
+            for host_name, values in marshal.loads(data).items()  # nosec B302 # BNS:ccacbd
+        }
+
+    header_start = len(_MAGIC) + _HEADER_LENGTH.size
+    (header_length,) = _HEADER_LENGTH.unpack_from(data, len(_MAGIC))
+    records_start = header_start + header_length
+    strings, raw_tag_pairs, columns = marshal.loads(  # nosec B302 # BNS:ccacbd
+        data[header_start:records_start]
+    )
+    names, sites, aliases, folders, tags, labels, children, parents, offsets = columns
+    tag_pairs = tuple((strings[group], strings[tag]) for group, tag in raw_tag_pairs)
+
+    return {
+        strings[name]: BIHostData(
+            strings[site_id],
+            {tag_pairs[idx] for idx in host_tags},
+            _make_dict(strings, host_labels),
+            strings[folder],
+            _MappedServices(data, records_start + start, records_start + end, strings),
+            tuple(strings[idx] for idx in host_children),
+            tuple(strings[idx] for idx in host_parents),
+            strings[alias],
+            strings[name],
+        )
+        for (
+            name,
+            site_id,
+            alias,
+            folder,
+            host_tags,
+            host_labels,
+            host_children,
+            host_parents,
+            start,
+            end,
+        ) in zip(
+            names,
+            sites,
+            aliases,
+            folders,
+            tags,
+            labels,
+            children,
+            parents,
+            offsets,
+            offsets[1:],
+        )
+    }
+
+
+def _make_dict(strings: Sequence[str], pairs: Sequence[int]) -> dict[str, str]:
+    return {strings[key]: strings[value] for key, value in zip(pairs[::2], pairs[1::2])}
+
+
+class _MappedServices(Mapping[str, BIServiceData]):
+    """The services of a host, decoded from the mapped structure data on first access"""
+
+    def __init__(self, data: mmap.mmap, start: int, end: int, strings: Sequence[str]) -> None:
+        self._data = data
+        self._start = start
+        self._end = end
+        self._strings = strings
+
+    @cached_property
+    def _services(self) -> dict[str, BIServiceData]:
+        strings = self._strings
+        return {
+            strings[description]: BIServiceData(
+                {strings[idx] for idx in tags}, _make_dict(strings, labels)
+            )
+            for description, tags, labels in marshal.loads(  # nosec B302 # BNS:ccacbd
+                self._data[self._start : self._end]
+            )
+        }
+
+    def __getitem__(self, key: str) -> BIServiceData:
+        return self._services[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._services)
+
+    def __len__(self) -> int:
+        return len(self._services)
+
+    def __repr__(self) -> str:
+        return repr(self._services)
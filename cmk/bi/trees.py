@@ -391,14 +391,23 @@ class BICompiledRule(ABCBICompiledNode):
         bi_status_fetcher: ABCBIStatusFetcher,
         use_assumed: bool = False,
     ) -> NodeResultBundle | None:
-        bundled_results = [
-            bundle
-            for bundle in [
+        return self.compute_from_nested_results(
+            [
                 node.compute(computation_options, bi_status_fetcher, use_assumed)
                 for node in self.nodes
-            ]
-            if bundle is not None
-        ]
+            ],
+            computation_options,
+            use_assumed,
+        )
+
+    def compute_from_nested_results(
+        self,
+        nested_results: Sequence[NodeResultBundle | None],
+        computation_options: BIAggregationComputationOptions,
+        use_assumed: bool = False,
+    ) -> NodeResultBundle | None:
+        """Compute the result of this rule from the already computed results of its nodes"""
+        bundled_results = [bundle for bundle in nested_results if bundle is not None]
         if not bundled_results:
             return None
         actual_result = self._process_node_compute_result(
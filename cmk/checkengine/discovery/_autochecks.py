@@ -5,11 +5,15 @@
 from __future__ import annotations
 
 import ast
+import marshal
+import os
 from collections import defaultdict
 from collections.abc import Callable, Iterable, Mapping, Sequence
-from typing import NamedTuple, Protocol
+from pathlib import Path
+from typing import Any, Final, NamedTuple, Protocol
 
 import cmk.utils.paths
+from cmk.ccc import store
 from cmk.ccc.exceptions import MKGeneralException
 from cmk.ccc.hostaddress import HostName
 from cmk.ccc.store import ObjectStore
@@ -48,32 +52,108 @@ class _AutochecksSerializer:
         return [AutocheckEntry.load(d) for d in ast.literal_eval(raw.decode("utf-8"))]
 
 
+# Marks the marshaled autochecks cache files
+_MARSHAL_HEADER: Final = b"\0autochecks marshal 1\n"
+
+
+def _autochecks_cache_dir() -> Path:
+    return cmk.utils.paths.tmp_dir / "autochecks_cache"
+
+
+def _marshalable(value: object) -> Any:
+    """Replace instances of subclasses of builtin types (e.g. HostName), marshal refuses them"""
+    match value:
+        case bool() | None:
+            return value
+        case str():
+            return str(value)
+        case int():
+            return int(value)
+        case float():
+            return float(value)
+        case tuple():
+            return tuple(_marshalable(v) for v in value)
+        case list():
+            return [_marshalable(v) for v in value]
+        case dict():
+            return {_marshalable(k): _marshalable(v) for k, v in value.items()}
+    return value
+
+
 class AutochecksStore:
+    """The autochecks of a host
+
+    The autochecks are stored as Python literals. Parsing them dominates reading the
+    autochecks of many hosts, so a marshaled copy of each file is cached in the tmpfs,
+    which is two orders of magnitude faster to read. The cache is only used as long as
+    the autochecks file is unchanged, if it can't be loaded it is rebuilt from the file.
+    """
+
     def __init__(self, host_name: HostName) -> None:
         self._host_name = host_name
         self._store = ObjectStore(
             cmk.utils.paths.autochecks_dir / f"{host_name}.mk",
             serializer=_AutochecksSerializer(),
         )
+        self._cache_path = _autochecks_cache_dir() / f"{host_name}.marshal"
 
     def read(self) -> Sequence[AutocheckEntry]:
         try:
-            return self._store.read_obj(default=[])
+            stat = self._store.path.stat()
+        except FileNotFoundError:
+            return []
+
+        if (cached := self._read_cache(stat)) is not None:
+            return cached
+
+        try:
+            entries = self._store.read_obj(default=[])
         except (ValueError, TypeError, KeyError, AttributeError, SyntaxError) as exc:
             raise MKGeneralException(
                 f"Unable to parse autochecks of host {self._host_name}"
             ) from exc
+        self._write_cache(stat, entries)
+        return entries
 
     def write(self, entries: Sequence[AutocheckEntry]) -> None:
-        self._store.write_obj(
-            sorted(entries, key=lambda e: (str(e.check_plugin_name), str(e.item)))
-        )
+        sorted_entries = sorted(entries, key=lambda e: (str(e.check_plugin_name), str(e.item)))
+        self._store.write_obj(sorted_entries)
+        self._write_cache(self._store.path.stat(), sorted_entries)
 
     def clear(self):
+        for path in (self._store.path, self._cache_path):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _cache_key(stat: os.stat_result) -> tuple[int, int, int]:
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read_cache(self, stat: os.stat_result) -> Sequence[AutocheckEntry] | None:
         try:
-            self._store.path.unlink()
-        except OSError:
-            pass
+            raw = self._cache_path.read_bytes()
+            if not raw.startswith(_MARSHAL_HEADER):
+                return None
+            key, raw_entries = marshal.loads(raw[len(_MARSHAL_HEADER) :])
+            if tuple(key) != self._cache_key(stat):
+                return None
+            return [AutocheckEntry.load(d) for d in raw_entries]
+        except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError):
+            # Missing or broken, the autochecks file is read instead
+            return None
+
+    def _write_cache(self, stat: os.stat_result, entries: Sequence[AutocheckEntry]) -> None:
+        try:
+            data = marshal.dumps((self._cache_key(stat), _marshalable([e.dump() for e in entries])))
+        except ValueError:
+            return  # Values of other types than the builtin ones are only in the autochecks file
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            store.save_bytes_to_file(self._cache_path, _MARSHAL_HEADER + data)
+        except (OSError, MKGeneralException):
+            pass  # The cache is optional
 
 
 def merge_cluster_autochecks(
@@ -119,15 +199,50 @@ class AutochecksMemoizer:
     def __init__(self) -> None:
         super().__init__()
         self._raw_autochecks_cache: dict[HostName, Sequence[AutocheckEntry]] = {}
+        # The hosts having autochecks, once we have read all of them
+        self._hosts_with_autochecks: set[HostName] | None = None
 
     def read(
         self,
         hostname: HostName,
     ) -> Sequence[AutocheckEntry]:
         if hostname not in self._raw_autochecks_cache:
-            self._raw_autochecks_cache[hostname] = AutochecksStore(hostname).read()
+            self._raw_autochecks_cache[hostname] = (
+                ()
+                if self._hosts_with_autochecks is not None
+                and hostname not in self._hosts_with_autochecks
+                else AutochecksStore(hostname).read()
+            )
         return self._raw_autochecks_cache[hostname]
 
+    def read_all(self) -> None:
+        """Read the autochecks of all hosts at once
+
+        Use this if the autochecks of (almost) all hosts are needed, as it saves
+        looking for the files of the hosts without autochecks.
+        """
+        self._hosts_with_autochecks = set()
+        try:
+            dir_entries = list(os.scandir(cmk.utils.paths.autochecks_dir))
+        except FileNotFoundError:
+            return
+
+        for dir_entry in dir_entries:
+            if not dir_entry.name.endswith(".mk") or dir_entry.name.startswith("."):
+                continue
+            try:
+                hostname = HostName(dir_entry.name[: -len(".mk")])
+            except ValueError:
+                continue
+            self._hosts_with_autochecks.add(hostname)
+            if hostname in self._raw_autochecks_cache:
+                continue
+            try:
+                self._raw_autochecks_cache[hostname] = AutochecksStore(hostname).read()
+            except MKGeneralException:
+                # The error is raised when the autochecks of the host are actually needed
+                continue
+
 
 def set_autochecks_of_real_hosts(
     hostname: HostName,
@@ -4,6 +4,9 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import json
+import marshal
+import os
+import struct
 from ast import literal_eval
 from collections.abc import (
     Callable,
@@ -12,7 +15,7 @@ from collections.abc import (
     MutableMapping,
 )
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Final
 
@@ -28,11 +31,75 @@ type ValueStoreKey = tuple[HostName, _PluginName, _Item]
 type _ServiceID = tuple[object, _Item]
 type _SerializedValueStore = Mapping[str, str]
 
+_MAGIC: Final = b"CMKVS1\n"
+_RECORD_HEADER: Final = struct.Struct("<I")
+# The file is compacted when it is larger than this factor times the size of the first record
+_COMPACTION_FACTOR: Final = 2
+
 
 @dataclass(frozen=True)
 class _LastState:
-    timestamp: float
+    inode: int
+    # Together with the inode and the size, tells whether the file was replaced or modified
+    mtime_ns: int
+    # The size of the file up to the end of the last valid record
+    size: int
     data: Mapping[ValueStoreKey, _SerializedValueStore]
+    # The first record contains all value stores at the time of the last compaction
+    snapshot_size: int = 0
+    # False for files in the old JSON format, they need to be rewritten.
+    binary: bool = True
+
+    @property
+    def needs_compaction(self) -> bool:
+        return not self.binary or self.size > _COMPACTION_FACTOR * (
+            len(_MAGIC) + self.snapshot_size
+        )
+
+
+def _encode_record(data: Mapping[ValueStoreKey, _SerializedValueStore]) -> bytes:
+    payload = marshal.dumps(
+        [
+            (
+                str(host_name),
+                str(plugin_name),
+                None if item is None else str(item),
+                {str(k): str(v) for k, v in values.items()},
+            )
+            for (host_name, plugin_name, item), values in data.items()
+        ]
+    )
+    return _RECORD_HEADER.pack(len(payload)) + payload
+
+
+def _decode_records(
+    raw: bytes, offset: int
+) -> tuple[dict[ValueStoreKey, _SerializedValueStore], int, int]:
+    """Decode the records starting at offset
+
+    Returns the values (later records win), the size of the first record and the end
+    offset of the last valid record. Decoding stops at an incomplete or broken record.
+    """
+    data: dict[ValueStoreKey, _SerializedValueStore] = {}
+    first_record_size = 0
+    host_names: dict[str, HostName] = {}
+    view = memoryview(raw)
+    while offset + _RECORD_HEADER.size <= len(raw):
+        (length,) = _RECORD_HEADER.unpack_from(raw, offset)
+        end = offset + _RECORD_HEADER.size + length
+        if end > len(raw):
+            break
+        try:
+            entries = marshal.loads(view[offset + _RECORD_HEADER.size : end])
+        except (EOFError, ValueError, TypeError):
+            break
+        for raw_host_name, plugin_name, item, values in entries:
+            if (host_name := host_names.get(raw_host_name)) is None:
+                host_name = host_names[raw_host_name] = HostName(raw_host_name)
+            data[(host_name, plugin_name, item)] = values
+        first_record_size = first_record_size or end - offset
+        offset = end
+    return data, first_record_size, offset
 
 
 class AllValueStoresStore:
@@ -40,6 +107,15 @@ class AllValueStoresStore:
 
     Make sure to only update the values we want to update,
     and not to overwrite the whole file.
+
+    The file is a log of binary records. A record is a marshalled list of
+    (host name, plugin name, item, values) tuples prefixed by its length, later records
+    replace the value stores of earlier ones. The first record contains all value stores,
+    every update appends a record containing the value stores which actually changed.
+    If the file gets too large compared to the first record, it is rewritten (compacted).
+
+    Files in the former JSON format are read transparently and replaced by the binary
+    format on the next update.
     """
 
     def __init__(
@@ -55,11 +131,7 @@ class AllValueStoresStore:
         self._last_known_state: None | _LastState = None
 
     @staticmethod
-    def _serialize(value: Mapping[ValueStoreKey, _SerializedValueStore]) -> str:
-        return json.dumps(list(value.items()))
-
-    @staticmethod
-    def _deserialize(raw: str) -> Mapping[ValueStoreKey, _SerializedValueStore]:
+    def _deserialize_json(raw: str) -> Mapping[ValueStoreKey, _SerializedValueStore]:
         return {
             (HostName(hn), str(cn), None if i is None else str(i)): v
             for (hn, cn, i), v in json.loads(raw)
@@ -68,22 +140,64 @@ class AllValueStoresStore:
     def load(self) -> Mapping[ValueStoreKey, _SerializedValueStore]:
         self._log_debug("loading from disk")
         try:
-            self._last_known_state = _LastState(
-                self.path.stat().st_mtime,
-                (
-                    data := (
-                        self._deserialize(content)
-                        if (content := store.load_text_from_file(self.path, lock=False).strip())
-                        else {}
-                    )
-                ),
-            )
+            with self.path.open("rb") as f:
+                stat = os.fstat(f.fileno())
+                raw = f.read()
         except FileNotFoundError:
             self._last_known_state = None
-            data = {}
+            return {}
 
+        if not raw.startswith(_MAGIC):
+            self._last_known_state = _LastState(
+                stat.st_ino,
+                stat.st_mtime_ns,
+                len(raw),
+                self._deserialize_json(content) if (content := raw.decode().strip()) else {},
+                binary=False,
+            )
+            return self._last_known_state.data
+
+        data, snapshot_size, size = _decode_records(raw, len(_MAGIC))
+        self._last_known_state = _LastState(
+            stat.st_ino, stat.st_mtime_ns, size, data, snapshot_size
+        )
         return data
 
+    def _load_current_state(self) -> _LastState | None:
+        """Bring the last known state up to date, only reading what has been appended"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+
+        last = self._last_known_state
+        if (
+            last is None
+            or not last.binary
+            or last.inode != stat.st_ino
+            or last.size > stat.st_size
+            or (last.size == stat.st_size and last.mtime_ns != stat.st_mtime_ns)
+        ):
+            self.load()
+            return self._last_known_state
+
+        if last.size == stat.st_size:
+            self._log_debug("already loaded")
+            return last
+
+        self._log_debug("loading appended records from disk")
+        with self.path.open("rb") as f:
+            f.seek(last.size)
+            raw = f.read()
+        data, _first_record_size, size = _decode_records(raw, 0)
+        return _LastState(
+            last.inode,
+            stat.st_mtime_ns,
+            last.size + size,
+            {**last.data, **data},
+            last.snapshot_size,
+        )
+
     def update(self, updated: Mapping[ValueStoreKey, _SerializedValueStore]) -> None:
         """Re-load and write the changes of the stored values
 
@@ -95,20 +209,42 @@ class AllValueStoresStore:
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
         with store.locked(self.path):
-            if (
-                self._last_known_state is not None
-                and self.path.stat().st_mtime == self._last_known_state.timestamp
-            ):
-                self._log_debug("already loaded")
-                data = self._last_known_state.data
-            else:
-                self._log_debug("loading from disk")
-                data = self.load()
-
-            self._log_debug("writing to disk")
-            new_data = {**data, **updated}
-            store.save_text_to_file(self.path, self._serialize(new_data))
-            self._last_known_state = _LastState(timestamp=self.path.stat().st_mtime, data=new_data)
+            state = self._load_current_state()
+            changed = {k: v for k, v in updated.items() if state is None or state.data.get(k) != v}
+
+            # We hold the lock, so any data behind the last valid record is garbage.
+            if state is not None and state.binary and state.size == self.path.stat().st_size:
+                if not changed:
+                    self._log_debug("nothing changed")
+                    self._last_known_state = state
+                    return
+                record = _encode_record(changed)
+                appended = _LastState(
+                    state.inode,
+                    state.mtime_ns,
+                    state.size + len(record),
+                    {**state.data, **changed},
+                    state.snapshot_size,
+                )
+                if not appended.needs_compaction:
+                    self._log_debug("appending to disk")
+                    with self.path.open("ab") as f:
+                        f.write(record)
+                    self._last_known_state = replace(
+                        appended, mtime_ns=self.path.stat().st_mtime_ns
+                    )
+                    return
+
+            self._write_compacted({**(state.data if state else {}), **changed})
+
+    def _write_compacted(self, data: Mapping[ValueStoreKey, _SerializedValueStore]) -> None:
+        self._log_debug("writing to disk")
+        record = _encode_record(data)
+        store.save_bytes_to_file(self.path, _MAGIC + record)
+        stat = self.path.stat()
+        self._last_known_state = _LastState(
+            stat.st_ino, stat.st_mtime_ns, len(_MAGIC) + len(record), data, len(record)
+        )
 
 
 class _ValueStore(MutableMapping[str, object]):
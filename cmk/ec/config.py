@@ -337,9 +337,13 @@ class ConfigFromWATO(TypedDict):
     rules: Collection[Rule]
     sqlite_housekeeping_interval: int
     sqlite_freelist_size: int
+    sqlite_history_flush_interval: int
+    sqlite_history_flush_size: int
     snmp_credentials: Collection[SNMPCredential]
     socket_queue_len: int
     statistics_interval: int
+    syslog_parser_processes: int
+    syslog_parser_queue_len: int
     translate_snmptraps: SNMPTrapTranslation
 
 
@@ -55,6 +55,8 @@ def default_config() -> ConfigFromWATO:
         housekeeping_interval=60,
         sqlite_housekeeping_interval=3600,  # seconds ValueSpec Age
         sqlite_freelist_size=50 * 1024 * 1024,  # bytes ValueSpec FIlesize
+        sqlite_history_flush_interval=1,  # seconds ValueSpec Age
+        sqlite_history_flush_size=1000,  # entries ValueSpec Integer
         statistics_interval=5,
         history_lifetime=365,  # days
         history_rotation="daily",
@@ -62,6 +64,8 @@ def default_config() -> ConfigFromWATO:
         remote_status=None,
         socket_queue_len=10,
         eventsocket_queue_len=10,
+        syslog_parser_processes=0,  # parse in the event server thread
+        syslog_parser_queue_len=1000,  # batches of messages
         hostname_translation=TranslationOptions(),
         archive_orphans=False,
         archive_mode="sqlite",
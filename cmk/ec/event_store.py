@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Indexed storage of the currently open events of the Event Console
+
+The store keeps the events in insertion order (which is the order of their
+creation, i.e. oldest first) and maintains secondary indexes by event ID,
+rule ID, (host, core_host) and lower-cased host name. All per-key indexes
+are insertion ordered, too, so "oldest event of X" is a O(1) lookup.
+
+The keys an event is indexed with are remembered at insertion time. If one
+of the indexed fields of an event is changed in place, reindex() has to be
+called, otherwise removal still works correctly via the remembered keys.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any, TypeVar
+
+from cmk.ccc.hostaddress import HostName
+
+from .event import Event
+
+_K = TypeVar("_K")
+
+HostKey = tuple[str, HostName | None]
+
+_IndexKeys = tuple[str | None, HostKey, str]
+
+
+class EventStore:
+    def __init__(self, events: Iterable[Event] = ()) -> None:
+        self._events: dict[int, Event] = {}
+        self._keys: dict[int, _IndexKeys] = {}
+        self._by_rule: dict[str | None, dict[int, Event]] = {}
+        self._by_host: dict[HostKey, dict[int, Event]] = {}
+        self._by_host_name: dict[str, dict[int, Event]] = {}
+        for event in events:
+            self.add(event)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self._events.values())
+
+    def __contains__(self, event_id: object) -> bool:
+        return event_id in self._events
+
+    def get(self, event_id: int) -> Event | None:
+        return self._events.get(event_id)
+
+    def add(self, event: Event) -> None:
+        event_id = event["id"]
+        if event_id in self._events:
+            self._unindex(event_id)
+        self._events[event_id] = event
+        self._index(event_id, event)
+
+    def remove(self, event: Event) -> bool:
+        """Remove the given event, returns False if it is not part of the store"""
+        event_id = event.get("id")
+        if event_id is None or (stored := self._events.get(event_id)) is None:
+            return False
+        if stored is not event and stored != event:
+            return False
+        self._unindex(event_id)
+        del self._events[event_id]
+        return True
+
+    def reindex(self, event: Event) -> None:
+        """Update the indexes after host, core_host or rule_id of a stored event changed"""
+        event_id = event["id"]
+        if self._events.get(event_id) is not event:
+            return
+        old_keys = self._keys[event_id]
+        new_keys = self._keys[event_id] = _index_keys(event)
+        # Only touch the buckets whose key actually changed and keep them ordered by age,
+        # the event has just been appended to them.
+        for index, old_key, new_key in zip(self._indexes(), old_keys, new_keys):
+            if old_key == new_key:
+                continue
+            _discard(index, old_key, event_id)
+            index.setdefault(new_key, {})[event_id] = event
+            _restore_order(index, new_key)
+
+    def oldest(self) -> Event | None:
+        return next(iter(self._events.values()), None)
+
+    def oldest_of_rule(self, rule_id: str | None) -> Event | None:
+        return next(iter(self._by_rule.get(rule_id, {}).values()), None)
+
+    def oldest_of_host(self, host_name: str) -> Event | None:
+        """Oldest event of the given host, regardless of its core_host"""
+        for event_id, event in self._by_host_name.get(str(host_name).lower(), {}).items():
+            if self._keys[event_id][1][0] == host_name:
+                return event
+        return None
+
+    def by_rule(self, rule_id: str | None) -> Iterable[Event]:
+        return self._by_rule.get(rule_id, {}).values()
+
+    def by_host(self, host_key: HostKey) -> Iterable[Event]:
+        return self._by_host.get(host_key, {}).values()
+
+    def by_host_names(self, host_names: Iterable[str]) -> list[Event]:
+        """All events of the given hosts (compared case-insensitively) in insertion order"""
+        found: dict[int, Event] = {}
+        for host_name in {h.lower() for h in host_names}:
+            found.update(self._by_host_name.get(host_name, {}))
+        return sorted(found.values(), key=_age)
+
+    def count_by_rule(self) -> Mapping[str | None, int]:
+        return {rule_id: len(events) for rule_id, events in self._by_rule.items()}
+
+    def count_by_host(self) -> Mapping[HostKey, int]:
+        return {host_key: len(events) for host_key, events in self._by_host.items()}
+
+    def num_events_of_rule(self, rule_id: str | None) -> int:
+        return len(self._by_rule.get(rule_id, ()))
+
+    def num_events_of_host(self, host_key: HostKey) -> int:
+        return len(self._by_host.get(host_key, ()))
+
+    def _indexes(self) -> tuple[dict[Any, dict[int, Event]], ...]:
+        return self._by_rule, self._by_host, self._by_host_name
+
+    def _index(self, event_id: int, event: Event) -> None:
+        keys = self._keys[event_id] = _index_keys(event)
+        for index, key in zip(self._indexes(), keys):
+            index.setdefault(key, {})[event_id] = event
+
+    def _unindex(self, event_id: int) -> None:
+        for index, key in zip(self._indexes(), self._keys.pop(event_id)):
+            _discard(index, key, event_id)
+
+
+def _index_keys(event: Event) -> _IndexKeys:
+    host = event.get("host", HostName(""))
+    return (
+        event.get("rule_id"),
+        (host, event.get("core_host")),
+        str(host).lower(),
+    )
+
+
+def _age(event: Event) -> int:
+    # Event IDs are handed out in ascending order, so they reflect the age of an event.
+    return event["id"]
+
+
+def _restore_order(index: dict[_K, dict[int, Event]], key: _K) -> None:
+    events = index[key]
+    if list(events) != sorted(events):
+        index[key] = dict(sorted(events.items()))
+
+
+def _discard(index: dict[_K, dict[int, Event]], key: _K, event_id: int) -> None:
+    if (events := index.get(key)) is None:
+        return
+    events.pop(event_id, None)
+    if not events:
+        del index[key]
@@ -10,7 +10,7 @@ from collections.abc import Iterable, Iterator, Sequence
 from contextlib import contextmanager
 from logging import getLogger, Logger
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, NamedTuple
 
 from .config import Config
 from .event import Event
@@ -35,6 +35,14 @@ HistoryWhat = Literal[
 ]
 
 
+class HistoryStatus(NamedTuple):
+    """Statistics of the history writer, reported in the status table"""
+
+    queue_depth: int = 0
+    flushes: int = 0
+    average_flush_time: float = 0.0
+
+
 class History(ABC):
     @abstractmethod
     def flush(self) -> None: ...
@@ -51,6 +59,13 @@ class History(ABC):
     @abstractmethod
     def close(self) -> None: ...
 
+    def start(self) -> None:
+        """Start the background work of the backend, e.g. after daemonizing"""
+
+    def status(self) -> HistoryStatus:
+        """Only backends which buffer their writes have something to report here"""
+        return HistoryStatus()
+
 
 class TimedHistory(History):
     """Decorate History methods with timing information."""
@@ -89,6 +104,12 @@ class TimedHistory(History):
         with self._timing("close"):
             return self._history.close()
 
+    def start(self) -> None:
+        self._history.start()
+
+    def status(self) -> HistoryStatus:
+        return self._history.status()
+
 
 def _log_event(
     config: Config, logger: Logger, event: Event, what: HistoryWhat, who: str, addinfo: str
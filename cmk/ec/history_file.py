@@ -4,8 +4,6 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import itertools
-import shlex
-import subprocess
 import threading
 import time
 from collections.abc import Callable, Iterable, Sequence
@@ -19,6 +17,13 @@ from cmk.utils.render import date_and_time
 from .config import Config
 from .event import Event, scrub_string
 from .history import _log_event, ActiveHistoryPeriod, get_logfile, History, HistoryWhat, quote_tab
+from .history_file_index import (
+    HistoryFileIndex,
+    index_path,
+    load_index,
+    postings_for_filters,
+    reversed_lines,
+)
 from .query import Columns, OperatorName, QueryFilter, QueryGET
 from .settings import Settings
 
@@ -39,9 +44,11 @@ class FileHistory(History):
         self._history_columns = history_columns
         self._lock = threading.Lock()
         self._active_history_period = ActiveHistoryPeriod()
+        self._indexes: dict[Path, HistoryFileIndex] = {}
 
     def flush(self) -> None:
         _expire_logfiles(self._settings, self._config, self._logger, self._lock, True)
+        self._indexes.clear()
 
     def add(self, event: Event, what: HistoryWhat, who: str = "", addinfo: str = "") -> None:
         """Make a new entry in the event history.
@@ -82,8 +89,6 @@ class FileHistory(History):
         limit = query.limit
         self._logger.debug("Limit: %r", limit)
 
-        grep_pipeline = _grep_pipeline(filters)
-
         time_filters = [
             (f.operator_name, f.argument) for f in filters if f.column_name.split("_")[-1] == "time"
         ]
@@ -92,6 +97,13 @@ class FileHistory(History):
             _least_upper_bound_for_filters(time_filters),
         )
         self._logger.debug("time range: %r", time_range)
+        history_time_filters = [
+            (f.operator_name, f.argument) for f in filters if f.column_name == "history_time"
+        ]
+        history_time_range = (
+            _greatest_lower_bound_for_filters(history_time_filters),
+            _least_upper_bound_for_filters(history_time_filters),
+        )
 
         # We do not want to open all files. So our strategy is:
         # look for "time" filters and first apply the filter to
@@ -101,30 +113,43 @@ class FileHistory(History):
         # Use the later logfiles first, to get the newer log entries
         # first. When a limit is reached, the newer entries should
         # be processed in most cases. We assume that now.
-        # To keep a consistent order of log entries, we should care
-        # about sorting the log lines in reverse, but that seems to
-        # already be done by the GUI, so we don't do that twice. Skipping
-        # this # will lead into some lines of a single file to be limited in
-        # wrong order. But this should be better than before.
+        # Within a file the lines are read backwards, using the sidecar
+        # index of the file to seek directly to the candidate lines.
         history_entries: list[Any] = []
-        for path in sorted(self._settings.paths.history_dir.value.glob("*.log"), reverse=True):
+        paths = sorted(self._settings.paths.history_dir.value.glob("*.log"), reverse=True)
+        self._forget_indexes(paths)
+        for path in paths:
             if limit is not None and limit <= 0:
                 self._logger.debug("query limit reached")
                 break
             if not _intersects(time_range, _get_logfile_timespan(path)):
                 self._logger.debug("skipping history file %s because of time filters", path)
                 continue
-            tac = f"nl -b a {shlex.quote(str(path))} | tac"  # Process younger lines first
-            cmd = " | ".join([tac] + grep_pipeline)
-            self._logger.debug("preprocessing history file with command [%s]", cmd)
-            new_entries = parse_history_file(
-                self._history_columns, path, query.filter_row, cmd, limit, self._logger
+            try:
+                index = self._indexes[path] = load_index(
+                    path, self._indexes.get(path), self._logger
+                )
+            except FileNotFoundError:
+                continue  # expired in the meantime
+            new_entries = read_history_file(
+                self._history_columns,
+                path,
+                index,
+                filters,
+                query.filter_row,
+                history_time_range,
+                limit,
+                self._logger,
             )
             history_entries += new_entries
             if limit is not None:
                 limit -= len(new_entries)
         return history_entries
 
+    def _forget_indexes(self, paths: Iterable[Path]) -> None:
+        for path in set(self._indexes) - set(paths):
+            del self._indexes[path]
+
     def housekeeping(self) -> None:
         _expire_logfiles(self._settings, self._config, self._logger, self._lock, False)
 
@@ -152,6 +177,7 @@ def _expire_logfiles(
                         "Deleting log file %s (age %s)", path, date_and_time(path.stat().st_mtime)
                     )
                     path.unlink()
+                    index_path(path).unlink(missing_ok=True)
         except Exception as e:
             if settings.options.debug:
                 raise
@@ -173,44 +199,6 @@ _GREPABLE_COLUMNS = {
 }
 
 
-def _grep_pipeline(filters: Iterable[QueryFilter]) -> list[str]:
-    """
-    Optimization: use grep in order to reduce amount of read lines based on some frequently used
-    filters. It's OK if the filters don't match 100% accurately on the right lines. If in doubt, you
-    can output more lines than necessary. This is only a kind of prefiltering.
-
-    >>> _grep_pipeline([])
-    []
-
-    >>> _grep_pipeline([QueryFilter("event_core_host", '=', lambda x: True, '|| ping')])
-    ["grep -F -e '|| ping'"]
-
-    """
-    return [
-        command
-        for f in filters
-        if f.column_name in _GREPABLE_COLUMNS
-        for command in [_grep_command(f.operator_name, str(f.argument))]
-        if command is not None
-    ]
-
-
-def _grep_command(operator_name: OperatorName, argument: str) -> str | None:
-    if operator_name == "=":
-        return f"grep -F {_grep_pattern(argument)}"
-    if operator_name == "=~":
-        return f"grep -F -i {_grep_pattern(argument)}"
-    if operator_name == "~":
-        return f"grep -E {_grep_pattern(argument)}"
-    if operator_name == "~~":
-        return f"grep -E -i {_grep_pattern(argument)}"
-    return None
-
-
-def _grep_pattern(argument: str) -> str:
-    return f"-e {shlex.quote(argument)}"
-
-
 def _greatest_lower_bound_for_filters(
     filters: Iterable[tuple[OperatorName, float]],
 ) -> float | None:
@@ -260,38 +248,80 @@ def _intersects(
     return (lo2 is None or hi1 is None or lo2 <= hi1) and (lo1 is None or hi2 is None or lo1 <= hi2)
 
 
-def parse_history_file(
+def read_history_file(
     history_columns: Sequence[tuple[str, Any]],
     path: Path,
+    index: HistoryFileIndex,
+    filters: Sequence[QueryFilter],
     filter_row: Callable[[Sequence[Any]], bool],
-    cmd: str,
+    time_range: tuple[float | None, float | None],
     limit: int | None,
     logger: Logger,
 ) -> list[Any]:
+    """Read the rows of a history file matching the filters, youngest lines first
+
+    Only the lines which are candidates according to the index of the file are read.
+    """
+    line_range = index.line_range(time_range)
+    postings = postings_for_filters(index, filters)
+    candidates: range | list[int] = (
+        line_range
+        if postings is None
+        else [n for n in postings if line_range.start <= n < line_range.stop]
+    )
+    prefilter = _raw_line_prefilter(filters)
+
     entries: list[Any] = []
-    with subprocess.Popen(
-        cmd,
-        shell=True,  # nosec B602 # BNS:67522a
-        close_fds=True,
-        stdout=subprocess.PIPE,
-    ) as grep:
-        if grep.stdout is None:
-            raise Exception("Huh? stdout vanished...")
-
-        for line in grep.stdout:
+    with path.open("rb") as f:
+        for line_index, line in reversed_lines(f, index, candidates):
             if limit is not None and len(entries) > limit:
                 break
+            if not prefilter(line):
+                continue
             try:
-                parts: list[Any] = line.decode("utf-8").rstrip("\n").split("\t")
+                parts: list[Any] = line.decode("utf-8").split("\t")
+                parts.insert(0, line_index + 1)  # history_line, counting from 1 like nl
                 convert_history_line(history_columns, parts)
                 if filter_row(parts):
                     entries.append(parts)
             except Exception:
-                logger.exception("Invalid line '%s' in history file %s", line, path)
+                logger.exception("Invalid line '%r' in history file %s", line, path)
 
     return entries
 
 
+def _raw_line_prefilter(filters: Iterable[QueryFilter]) -> Callable[[bytes], bool]:
+    """Cheap check of the raw lines for fixed strings of the filters
+
+    This is only a kind of prefiltering, it may let through lines which do not match, but it
+    never rejects a matching line.
+    """
+    needles: list[bytes] = []
+    needles_nocase: list[bytes] = []
+    for f in filters:
+        if f.column_name not in _GREPABLE_COLUMNS:
+            continue
+        argument = str(f.argument)
+        if f.operator_name == "=":
+            needles.append(argument.encode("utf-8"))
+        elif f.operator_name == "=~" and argument.isascii():
+            # bytes.lower() only handles ASCII, so don't risk rejecting matching lines
+            needles_nocase.append(argument.lower().encode("utf-8"))
+
+    if not needles and not needles_nocase:
+        return lambda line: True
+
+    def prefilter(line: bytes) -> bool:
+        if not all(needle in line for needle in needles):
+            return False
+        if needles_nocase:
+            line = line.lower()
+            return all(needle in line for needle in needles_nocase)
+        return True
+
+    return prefilter
+
+
 def parse_history_file_python(
     history_columns: Sequence[tuple[str, Any]],
     path: Path,
@@ -300,8 +330,8 @@ def parse_history_file_python(
     """Pure python reader for history files. Used for update config, where filtering is not needed.
 
     To avoid slurping the whole file in memory this generator yields chunks of entries.
-    This is not faster than the grep approach(parse_history_file()), but it's more memory efficient
-    and does not need to fork a subprocess and other cmk specific stuff.
+    This is not faster than read_history_file(), but it's more memory efficient and does not
+    need the index and other cmk specific stuff.
     """
     with open(path, "rb") as f:
         for chunk in itertools.batched(f, 100_000):
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Sidecar indexes for the EC history files
+
+Every history logfile "<period>.log" gets a sidecar "<period>.log.idx" containing
+the byte offset and time of each line plus postings lists of the lines per host
+name and per event ID. The index of the currently active logfile is extended
+incrementally as new lines are appended.
+
+This allows answering queries by reading only the relevant lines from the end
+of the file backwards (newest first): The postings lists are used when a host
+or event ID filter is given, the line times narrow down the line range when a
+time filter is given.
+"""
+
+from __future__ import annotations
+
+import bisect
+import marshal
+import os
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from logging import Logger
+from pathlib import Path
+from typing import Any, BinaryIO, Final
+
+from cmk.ccc import store
+
+from .query import QueryFilter
+
+_INDEX_VERSION: Final = 1
+# Positions within the raw (tab separated) history line
+_RAW_TIME: Final = 0
+_RAW_EVENT_ID: Final = 4
+_RAW_HOST: Final = 11
+# Number of lines read at once when scanning a line range backwards
+_CHUNK_LINES: Final = 4096
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+@dataclass
+class HistoryFileIndex:
+    inode: int = 0
+    # Start offsets of all lines plus the end offset of the last indexed line
+    offsets: array[int] = field(default_factory=lambda: array("q", [0]))
+    times: array[float] = field(default_factory=lambda: array("d"))
+    times_sorted: bool = True
+    hosts: dict[str, array[int]] = field(default_factory=dict)
+    event_ids: dict[int, array[int]] = field(default_factory=dict)
+
+    @property
+    def num_lines(self) -> int:
+        return len(self.times)
+
+    @property
+    def size(self) -> int:
+        return self.offsets[-1]
+
+    def serialize(self) -> bytes:
+        return marshal.dumps(
+            {
+                "version": _INDEX_VERSION,
+                "inode": self.inode,
+                "offsets": self.offsets.tobytes(),
+                "times": self.times.tobytes(),
+                "times_sorted": self.times_sorted,
+                "hosts": {host: lines.tobytes() for host, lines in self.hosts.items()},
+                "event_ids": {eid: lines.tobytes() for eid, lines in self.event_ids.items()},
+            }
+        )
+
+    @classmethod
+    def deserialize(cls, raw: bytes) -> HistoryFileIndex | None:
+        try:
+            data = marshal.loads(raw)
+            if data["version"] != _INDEX_VERSION:
+                return None
+            return cls(
+                inode=data["inode"],
+                offsets=_array("q", data["offsets"]),
+                times=_array("d", data["times"]),
+                times_sorted=data["times_sorted"],
+                hosts={host: _array("q", lines) for host, lines in data["hosts"].items()},
+                event_ids={eid: _array("q", lines) for eid, lines in data["event_ids"].items()},
+            )
+        except (EOFError, ValueError, TypeError, KeyError):
+            return None
+
+    def extend(self, f: BinaryIO, end: int) -> None:
+        """Index all complete lines between the already indexed part and end"""
+        f.seek(self.size)
+        offset = self.size
+        for line in iter(f.readline, b""):
+            if offset + len(line) > end or not line.endswith(b"\n"):
+                break  # incomplete line, currently being written
+            self._add_line(self.num_lines, line)
+            offset += len(line)
+            self.offsets.append(offset)
+
+    def _add_line(self, line_index: int, line: bytes) -> None:
+        parts = line.split(b"\t", _RAW_HOST + 1)
+        try:
+            line_time = float(parts[_RAW_TIME])
+        except ValueError:
+            # Broken line: Keep it in the time order of its neighbours, it will be
+            # reported when it is parsed.
+            line_time = self.times[-1] if self.times else 0.0
+        if self.times and line_time < self.times[-1]:
+            self.times_sorted = False
+        self.times.append(line_time)
+        if len(parts) <= _RAW_HOST:
+            return
+        self.hosts.setdefault(
+            parts[_RAW_HOST].decode("utf-8", errors="replace").lower(), array("q")
+        ).append(line_index)
+        try:
+            self.event_ids.setdefault(int(parts[_RAW_EVENT_ID]), array("q")).append(line_index)
+        except ValueError:
+            pass
+
+    def line_range(self, time_range: tuple[float | None, float | None]) -> range:
+        """The lines which can be within the given time range"""
+        if not self.times_sorted:
+            return range(self.num_lines)
+        lo, hi = time_range
+        start = 0 if lo is None else bisect.bisect_left(self.times, lo)
+        stop = self.num_lines if hi is None else bisect.bisect_right(self.times, hi)
+        return range(start, stop)
+
+    def timespan(self) -> tuple[float | None, float | None]:
+        if not self.times:
+            return None, None
+        if self.times_sorted:
+            return self.times[0], self.times[-1]
+        return min(self.times), max(self.times)
+
+
+def _array(typecode: str, raw: bytes) -> array[Any]:
+    result = array(typecode)
+    result.frombytes(raw)
+    return result
+
+
+def load_index(path: Path, cached: HistoryFileIndex | None, logger: Logger) -> HistoryFileIndex:
+    """Return an up-to-date index of the given history file
+
+    The cached index is reused (and extended) if the file has only been appended to.
+    Otherwise the sidecar file is used or the index is built from scratch. Changed
+    indexes are written back to the sidecar file.
+    """
+    stat = path.stat()
+    index = cached
+    if index is None or not _is_valid_for(index, stat):
+        index = HistoryFileIndex.deserialize(
+            store.load_bytes_from_file(index_path(path), default=b"")
+        )
+    if index is None or not _is_valid_for(index, stat):
+        logger.debug("building history index for %s", path)
+        index = HistoryFileIndex(inode=stat.st_ino)
+    if index.size < stat.st_size:
+        num_lines = index.num_lines
+        with path.open("rb") as f:
+            index.extend(f, stat.st_size)
+        if index.num_lines == num_lines:
+            return index
+        try:
+            store.save_bytes_to_file(index_path(path), index.serialize())
+        except OSError as e:
+            logger.warning("Cannot save history index of %s: %s", path, e)
+    return index
+
+
+def _is_valid_for(index: HistoryFileIndex, stat: os.stat_result) -> bool:
+    return index.inode == stat.st_ino and index.size <= stat.st_size
+
+
+def postings_for_filters(
+    index: HistoryFileIndex, filters: Iterable[QueryFilter]
+) -> list[int] | None:
+    """The lines matching the host/event ID filters, None if there are no such filters
+
+    The postings are only used to select candidate lines, the filters are applied to
+    the parsed rows afterwards as usual.
+    """
+    result: set[int] | None = None
+    for f in filters:
+        lines: set[int] | None = None
+        if f.column_name == "event_host" and f.operator_name in ("=", "=~", "in"):
+            hosts = f.argument if f.operator_name == "in" else [f.argument]
+            lines = {line for h in hosts for line in index.hosts.get(str(h).lower(), ())}
+        elif f.column_name == "event_id" and f.operator_name in ("=", "in"):
+            event_ids = f.argument if f.operator_name == "in" else [f.argument]
+            lines = {line for eid in event_ids for line in index.event_ids.get(eid, ())}
+        if lines is not None:
+            result = lines if result is None else result & lines
+    return None if result is None else sorted(result)
+
+
+def reversed_lines(
+    f: BinaryIO, index: HistoryFileIndex, line_numbers: range | Sequence[int]
+) -> Iterator[tuple[int, bytes]]:
+    """Yield (line index, line) pairs of the given lines, last one first"""
+    if isinstance(line_numbers, range):
+        # Contiguous lines: Read the lines in big chunks from the end.
+        stop = line_numbers.stop
+        while stop > line_numbers.start:
+            start = max(line_numbers.start, stop - _CHUNK_LINES)
+            f.seek(index.offsets[start])
+            lines = f.read(index.offsets[stop] - index.offsets[start]).split(b"\n")
+            for line_index in range(stop - 1, start - 1, -1):
+                yield line_index, lines[line_index - start]
+            stop = start
+        return
+    for line_index in reversed(line_numbers):
+        f.seek(index.offsets[line_index])
+        yield line_index, f.read(index.offsets[line_index + 1] - index.offsets[line_index] - 1)
@@ -7,6 +7,7 @@
 import itertools
 import json
 import sqlite3
+import threading
 import time
 from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
@@ -17,7 +18,7 @@ from typing import Final, Literal
 
 from .config import Config
 from .event import Event
-from .history import History, HistoryWhat
+from .history import History, HistoryStatus, HistoryWhat
 from .query import Columns, QueryFilter, QueryGET
 from .settings import Options, Paths, Settings
 
@@ -54,10 +55,12 @@ TABLE_COLUMNS: Final = (
     "match_groups_syslog_application",
 )
 
+# Keep this in sync with the columns filters_to_sqlite_query() is used with most frequently.
 INDEXED_COLUMNS: Final = (
     "time",
     "id",
     "host",
+    "what",
 )
 
 SQLITE_PRAGMAS = {
@@ -66,6 +69,13 @@ SQLITE_PRAGMAS = {
     "PRAGMA busy_timeout = 2000;": "2 seconds timeout for busy handler. Avoids database is locked errors",
 }
 
+_INSERT_STATEMENT: Final = f"""INSERT INTO
+    history ({", ".join(TABLE_COLUMNS[1:])})
+        VALUES ({", ".join(itertools.repeat("?", len(TABLE_COLUMNS[1:])))});"""  # nosec B608 # BNS:6b6392
+
+# Weight of the previous value when computing the average flush time
+_FLUSH_TIME_WEIGHT: Final = 0.95
+
 SQLITE_INDEXES = [
     f"CREATE INDEX IF NOT EXISTS idx_{column} ON history ({column});" for column in INDEXED_COLUMNS
 ]
@@ -144,6 +154,17 @@ class SQLiteSettings:
 
 
 class SQLiteHistory(History):
+    """History in a sqlite database
+
+    New entries are buffered and written by group commits: The buffer is written in one
+    transaction when it reaches sqlite_history_flush_size entries or at the latest after
+    sqlite_history_flush_interval seconds. Queries always see the buffered entries, since
+    the buffer is written before a query is executed.
+
+    The thread writing the buffer periodically is only started by start(), a thread does
+    not survive the fork when daemonizing.
+    """
+
     def __init__(
         self,
         settings: SQLiteSettings,
@@ -160,14 +181,22 @@ class SQLiteHistory(History):
         self._last_housekeeping = 0.0
         self._page_size = 4096
 
+        # Protects the connection and the buffer of entries not written yet
+        self._lock = threading.Lock()
+        self._pending: list[tuple[object, ...]] = []
+        self._num_flushes = 0
+        self._average_flush_time = 0.0
+        self._stop_flusher = threading.Event()
+        self._flusher: threading.Thread | None = None
+
         if isinstance(self._settings.database, Path):
             self._settings.database.parent.mkdir(parents=True, exist_ok=True)
             self._settings.database.touch(exist_ok=True)
 
         configure_sqlite_types()
 
-        # TODO lookup our ec backend thread safety.
-        # check_same_thread=False the connection may be accessed in multiple threads.
+        # check_same_thread=False the connection may be accessed in multiple threads, all
+        # accesses are serialized via self._lock.
         self.conn = sqlite3.connect(
             self._settings.database, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES
         )
@@ -220,9 +249,19 @@ class SQLiteHistory(History):
             for index_statement in SQLITE_INDEXES:
                 connection.execute(index_statement)
 
+    def start(self) -> None:
+        """Start writing the buffered entries periodically"""
+        if self._flusher is not None:
+            return
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, name="SQLiteHistoryFlusher", daemon=True
+        )
+        self._flusher.start()
+
     def flush(self) -> None:
         """Delete all entries the history table."""
-        with self.conn as connection:
+        with self._lock, self.conn as connection:
+            self._pending.clear()
             connection.execute("DELETE FROM history;")
 
     def add(self, event: Event, what: HistoryWhat, who: str = "", addinfo: str = "") -> None:
@@ -230,22 +269,19 @@ class SQLiteHistory(History):
 
         No need to include the line column, as it is autoincremented.
         """
-        with self.conn as connection:
-            cur = connection.cursor()
-            cur.execute(
-                f"""INSERT INTO
-                    history ({", ".join(TABLE_COLUMNS[1:])})
-                        VALUES ({", ".join(itertools.repeat("?", len(TABLE_COLUMNS[1:])))});""",  # nosec B608 # BNS:6b6392
-                tuple(
-                    itertools.chain(
-                        (time.time(), what, who, addinfo),
-                        [
-                            event.get(colname.removeprefix("event_"), defval)
-                            for colname, defval in self._event_columns
-                        ],
-                    )
-                ),
+        entry = tuple(
+            itertools.chain(
+                (time.time(), what, who, addinfo),
+                [
+                    event.get(colname.removeprefix("event_"), defval)
+                    for colname, defval in self._event_columns
+                ],
             )
+        )
+        with self._lock:
+            self._pending.append(entry)
+            if len(self._pending) >= self._config["sqlite_history_flush_size"]:
+                self._write_pending()
 
     def add_entries(self, entries: Sequence[Sequence[object]]) -> None:
         """Add multiple entries to the history table.
@@ -253,13 +289,45 @@ class SQLiteHistory(History):
         Used only by the cmk-update-config during EC history migration to sqlite.
         The first column is the line number, which is autoincremented, so ignored in TABLE_COLUMNS.
         """
-        with self.conn as connection:
+        with self._lock, self.conn as connection:
             cur = connection.cursor()
-            cur.executemany(
-                f"""INSERT INTO
-                    history ({", ".join(TABLE_COLUMNS[1:])})
-                        VALUES ({", ".join(itertools.repeat("?", len(TABLE_COLUMNS[1:])))});""",  # nosec B608 # BNS:6b6392
-                (entry[1:] for entry in entries),
+            cur.executemany(_INSERT_STATEMENT, (entry[1:] for entry in entries))
+
+    def commit(self) -> None:
+        """Write all buffered entries to the database"""
+        with self._lock:
+            self._write_pending()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop_flusher.wait(self._config["sqlite_history_flush_interval"]):
+            try:
+                self.commit()
+            except Exception:
+                self._logger.exception("Cannot write event history")
+
+    # protected by self._lock
+    def _write_pending(self) -> None:
+        """Write all buffered entries as one transaction"""
+        if not self._pending:
+            return
+        tic = time.time()
+        with self.conn as connection:
+            connection.executemany(_INSERT_STATEMENT, self._pending)
+        self._pending = []
+        duration = time.time() - tic
+        self._average_flush_time = (
+            duration
+            if self._num_flushes == 0
+            else _FLUSH_TIME_WEIGHT * self._average_flush_time + (1 - _FLUSH_TIME_WEIGHT) * duration
+        )
+        self._num_flushes += 1
+
+    def status(self) -> HistoryStatus:
+        with self._lock:
+            return HistoryStatus(
+                queue_depth=len(self._pending),
+                flushes=self._num_flushes,
+                average_flush_time=self._average_flush_time,
             )
 
     def get(self, query: QueryGET) -> Iterable[Sequence[object]]:
@@ -269,28 +337,34 @@ class SQLiteHistory(History):
         """
         sqlite_query, sqlite_arguments = filters_to_sqlite_query(query.filters)
         if query.limit:
-            sqlite_query += " LIMIT ?"
-            sqlite_arguments += f" {query.limit + 1}"
-        with self.conn as connection:
-            cur = connection.cursor()
-            cur.execute(sqlite_query, sqlite_arguments)
-            return cur.fetchall()
+            sqlite_query = sqlite_query.removesuffix(";") + " LIMIT ?;"
+            sqlite_arguments.append(query.limit + 1)
+        with self._lock:
+            self._write_pending()
+            with self.conn as connection:
+                cur = connection.cursor()
+                cur.execute(sqlite_query, sqlite_arguments)
+                return cur.fetchall()
 
     def housekeeping(self) -> None:
-        """Remove old entries from the history table.
+        """Write the buffered entries and remove old entries from the history table.
 
         And performs a vacuum to shrink the database file.
         """
+        with self._lock:
+            self._write_pending()
         now = time.time()
         if now - self._last_housekeeping > self._config["sqlite_housekeeping_interval"]:
             delta = now - timedelta(days=self._config["history_lifetime"]).total_seconds()
-            with self.conn as connection:
-                cur = connection.cursor()
-                cur.execute("DELETE FROM history WHERE time <= ?;", (delta,))
-            # should be executed outside of the transaction
-            self._vacuum()
+            with self._lock:
+                with self.conn as connection:
+                    cur = connection.cursor()
+                    cur.execute("DELETE FROM history WHERE time <= ?;", (delta,))
+                # should be executed outside of the transaction
+                self._vacuum()
             self._last_housekeeping = now
 
+    # protected by self._lock
     def _vacuum(self) -> None:
         """Run VACUUM command only if the free pages in DB are greater than 50 Mb."""
         with self.conn as connection:
@@ -306,5 +380,10 @@ class SQLiteHistory(History):
         Used during a new object instantiation,
         to avoid sqlite3.OperationalError: database is locked.
         """
-        self.conn.commit()
-        self.conn.close()
+        self._stop_flusher.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._write_pending()
+            self.conn.commit()
+            self.conn.close()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Pipelined ingestion of syslog messages
+
+Parsing syslog messages into events is done by a pool of worker processes,
+so it can use more than one CPU core. The rule matching and everything
+following it is still done by a single consumer thread, which gets the
+parsed events in the order the messages have been received.
+
+  reader (EventServer thread) --> worker processes --> bounded queue --> consumer thread
+
+The reader submits batches of raw messages to the worker pool and puts the
+resulting futures into the bounded queue. When the queue is full, the reader
+of stream sockets and of the event pipe waits for the consumer: The kernel
+buffers fill up and the senders are slowed down (backpressure). UDP datagrams
+are dropped instead, waiting would only make the kernel drop them anyway.
+"""
+
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import queue
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging import Logger
+from typing import Final
+
+from .event import create_event_from_syslog_message, Event
+from .perfcounters import Perfcounters
+
+# A raw syslog message together with the address of its sender
+RawMessage = tuple[bytes, tuple[str, int] | None]
+
+# Maximum number of messages parsed by a worker in one go
+_BATCH_SIZE: Final = 500
+
+# The events of a batch, together with the function called once they are processed
+_QueueItem = tuple["Future[list[Event]]", Callable[[], None] | None]
+
+
+def parse_syslog_messages(messages: Sequence[RawMessage]) -> list[Event]:
+    """Executed in the worker processes"""
+    return [
+        create_event_from_syslog_message(message, address, None) for message, address in messages
+    ]
+
+
+class SyslogPipeline:
+    def __init__(
+        self,
+        num_processes: int,
+        queue_len: int,
+        process_events: Callable[[Iterable[Event]], None],
+        perfcounters: Perfcounters,
+        logger: Logger,
+    ) -> None:
+        self._num_processes = num_processes
+        self._process_events = process_events
+        self._perfcounters = perfcounters
+        self._logger = logger
+        self._executor = self._create_executor()
+        # None tells the consumer to terminate
+        self._queue: queue.Queue[_QueueItem | None] = queue.Queue(maxsize=queue_len)
+        self._consumer = threading.Thread(target=self._consume, name="SyslogConsumer", daemon=True)
+        self._consumer.start()
+        self._logger.info(
+            "Parsing syslog messages in %d processes, queue length %d", num_processes, queue_len
+        )
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # Forking a process with running threads is unsafe, so the workers are forked by
+        # a separate (single-threaded) server process, which has the parser preloaded.
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return ProcessPoolExecutor(max_workers=self._num_processes, mp_context=context)
+
+    def submit_messages(
+        self,
+        messages: Iterable[RawMessage],
+        *,
+        may_drop: bool,
+        on_processed: Callable[[], None] | None = None,
+    ) -> None:
+        """Hand over raw messages to the worker processes
+
+        Blocks while the queue is full, unless dropping the messages is OK. on_processed is
+        called by the consumer thread, after all of the messages have been processed.
+        """
+        iterator = iter(messages)
+        while batch := list(itertools.islice(iterator, _BATCH_SIZE)):
+            if self._queue.full():
+                if may_drop:
+                    for _message in batch:
+                        self._perfcounters.count("ingest_drops")
+                    continue
+                self._perfcounters.count("ingest_stalls")
+            self._queue.put((self._submit(batch), None))
+        if on_processed is not None:
+            self._put_parsed([], on_processed)
+
+    def submit_events(self, events: Iterable[Event]) -> None:
+        """Hand over already parsed events, keeping their order relative to the messages"""
+        if event_list := list(events):
+            self._put_parsed(event_list, None)
+
+    def _put_parsed(self, events: list[Event], on_processed: Callable[[], None] | None) -> None:
+        future: Future[list[Event]] = Future()
+        future.set_result(events)
+        if self._queue.full():
+            self._perfcounters.count("ingest_stalls")
+        self._queue.put((future, on_processed))
+
+    def _submit(self, batch: Sequence[RawMessage]) -> Future[list[Event]]:
+        try:
+            return self._executor.submit(parse_syslog_messages, batch)
+        except BrokenProcessPool:
+            # A worker died unexpectedly (OOM killer, ...), the pool is unusable now.
+            self._logger.error("Syslog parser processes died, restarting them")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+            return self._executor.submit(parse_syslog_messages, batch)
+
+    def _consume(self) -> None:
+        while (item := self._queue.get()) is not None:
+            future, on_processed = item
+            try:
+                events = future.result()
+            except Exception:
+                self._logger.exception("Exception while parsing syslog messages")
+            else:
+                try:
+                    self._process_events(events)
+                except Exception:
+                    self._logger.exception("Exception while processing syslog messages")
+            if on_processed is not None:
+                try:
+                    on_processed()
+                except Exception:
+                    self._logger.exception("Exception after processing syslog messages")
+
+    def close(self) -> None:
+        """Process everything which is already queued, then stop the consumer and the workers"""
+        self._queue.put(None)
+        self._consumer.join()
+        self._executor.shutdown()
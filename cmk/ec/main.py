@@ -63,16 +63,17 @@ from .config import (
 from .core_queries import HostInfo, query_hosts_scheduled_downtime_depth
 from .crash_reporting import CrashReportStore, ECCrashReport
 from .event import create_events_from_syslog_messages, Event, scrub_string
+from .event_store import EventStore, HostKey
 from .helpers import ECLock, parse_bytes_into_syslog_messages
 from .history import ActiveHistoryPeriod, get_logfile, History, HistoryWhat, quote_tab, TimedHistory
 from .history_file import FileHistory
 from .history_mongo import MongoDBHistory
 from .history_sqlite import SQLiteHistory, SQLiteSettings
 from .host_config import HostConfig
+from .ingestion import RawMessage, SyslogPipeline
 from .perfcounters import Perfcounters
 from .query import (
     Columns,
-    filter_operator_in,
     MKClientError,
     Query,
     QueryCOMMAND,
@@ -80,6 +81,7 @@ from .query import (
     QueryREPLICATE,
     StatusTable,
 )
+from .rule_index import RuleDispatchIndex
 from .rule_matcher import compile_rule, match, MatchFailure, MatchResult, MatchSuccess, RuleMatcher
 from .rule_packs import load_active_config
 from .settings import create_settings, FileDescriptor, PortNumber, Settings
@@ -117,6 +119,9 @@ Response = Iterable[Sequence[object]] | Mapping[str, object] | None
 
 LimitKind = Literal["overall", "by_rule", "by_host"]
 
+# Upper limit for the UDP syslog datagrams handed over to the syslog pipeline in one go
+_MAX_DATAGRAMS_AT_ONCE = 500
+
 
 # .
 #   .--Helper functions----------------------------------------------------.
@@ -385,10 +390,15 @@ class EventServer(ECServerThread):
         self._syslog_udp: socket.socket | None = None
         self._syslog_tcp: socket.socket | None = None
         self._snmp_trap_socket: socket.socket | None = None
+        self._syslog_pipeline: SyslogPipeline | None = None
+        self._syslog_pipeline_config: tuple[int, int] | None = None  # processes, queue length
+        # Spool files handed over to the syslog pipeline, they are removed once processed
+        self._spool_files_in_progress: set[Path] = set()
 
         self._rules: list[Rule] = []
         self._rule_by_id: dict[str | None, Rule] = {}
         self._rule_hash: dict[int, dict[int, Any]] = {}
+        self._rule_index = RuleDispatchIndex([])
         self._hash_stats: list[list[int]] = []  # facility/priority
         for _unused_facility in range(32):
             self._hash_stats.append([0] * 8)
@@ -429,6 +439,7 @@ class EventServer(ECServerThread):
                 Perfcounters.status_columns(),
                 cls._replication_columns(),
                 cls._event_limit_columns(),
+                cls._history_columns(),
             )
         )
 
@@ -459,6 +470,14 @@ class EventServer(ECServerThread):
             ("status_event_limit_active_overall", False),
         ]
 
+    @classmethod
+    def _history_columns(cls) -> Columns:
+        return [
+            ("status_history_queue_depth", 0),
+            ("status_history_flushes", 0),
+            ("status_average_history_flush_time", 0.0),
+        ]
+
     def get_status(self) -> Iterable[Sequence[object]]:
         return [
             [
@@ -466,6 +485,7 @@ class EventServer(ECServerThread):
                 *self._perfcounters.get_status(),
                 *self._add_replication_status(),
                 *self._add_event_limit_status(),
+                *self._history.status(),
             ]
         ]
 
@@ -671,6 +691,7 @@ class EventServer(ECServerThread):
         select_timeout = 1
         unprocessed_pipe_data = b""
         while not self._terminate_event.is_set():
+            self._update_syslog_pipeline()
             try:
                 readable: list[FileDescr | socket.socket] = select.select(
                     pipe_and_datagram_sockets
@@ -740,26 +761,103 @@ class EventServer(ECServerThread):
             # Read events from builtin syslog server
             if self._syslog_udp is not None and self._syslog_udp in readable:
                 message, address = self._syslog_udp.recvfrom(4096)
-                self.process_syslog_messages(
-                    [message], parse_address("syslog socket (UDP)", address)
-                )
+                if self._syslog_pipeline is None:
+                    self.process_syslog_messages(
+                        [message], parse_address("syslog socket (UDP)", address)
+                    )
+                else:
+                    self._syslog_pipeline.submit_messages(
+                        self._receive_syslog_datagrams(self._syslog_udp, message, address),
+                        may_drop=True,
+                    )
 
             # Read events from builtin snmptrap server
             if self._snmp_trap_socket is not None and self._snmp_trap_socket in readable:
                 message, address = self._snmp_trap_socket.recvfrom(65535)
-                self.process_potential_event_instrumented(
+                self.process_events(
                     self.create_events_from_trap(message, parse_address("SNMP trap", address))
                 )
 
+            # Taken before looking for files, the pipeline removes them before forgetting them
+            spool_files_in_progress = set(self._spool_files_in_progress)
             if spool_files := sorted(
-                self.settings.paths.spool_dir.value.glob("[!.]*"), key=lambda x: x.stat().st_mtime
+                (
+                    path
+                    for path in self.settings.paths.spool_dir.value.glob("[!.]*")
+                    if path not in spool_files_in_progress
+                ),
+                key=lambda x: x.stat().st_mtime,
             ):
-                self.process_syslog_messages(spool_files[0].read_bytes().splitlines(), None)
-                spool_files[0].unlink()
+                self._process_spool_file(spool_files[0])
                 select_timeout = 0  # enable fast processing to process further files
             else:
                 select_timeout = 1  # restore default select timeout
 
+        self._stop_syslog_pipeline()
+
+    def _process_spool_file(self, path: Path) -> None:
+        """Process the messages of a spool file, it is removed once they are processed
+
+        So the messages are not lost when we are terminated in between. With the syslog
+        pipeline, this happens in the consumer thread, the file is in progress until then.
+        """
+        messages = path.read_bytes().splitlines()
+        if self._syslog_pipeline is None:
+            self.process_syslog_messages(messages, None)
+            path.unlink()
+            return
+
+        def remove_spool_file() -> None:
+            path.unlink(missing_ok=True)
+            self._spool_files_in_progress.discard(path)
+
+        self._spool_files_in_progress.add(path)
+        self._syslog_pipeline.submit_messages(
+            ((message, None) for message in messages),
+            may_drop=False,
+            on_processed=remove_spool_file,
+        )
+
+    def _update_syslog_pipeline(self) -> None:
+        """Start, restart or stop the syslog pipeline according to the current configuration"""
+        # Debugging the rules needs the parser output in our log, so parse in-process then.
+        pipeline_config = (
+            None
+            if self._config["syslog_parser_processes"] == 0 or self._config["debug_rules"]
+            else (self._config["syslog_parser_processes"], self._config["syslog_parser_queue_len"])
+        )
+        if pipeline_config == self._syslog_pipeline_config:
+            return
+        self._stop_syslog_pipeline()
+        if pipeline_config is not None:
+            self._syslog_pipeline = SyslogPipeline(
+                *pipeline_config,
+                process_events=self.process_potential_event_instrumented,
+                perfcounters=self._perfcounters,
+                logger=self._logger.getChild("syslog_pipeline"),
+            )
+            self._syslog_pipeline_config = pipeline_config
+
+    def _stop_syslog_pipeline(self) -> None:
+        if self._syslog_pipeline is None:
+            return
+        self._syslog_pipeline.close()
+        self._syslog_pipeline = None
+        self._syslog_pipeline_config = None
+
+    @staticmethod
+    def _receive_syslog_datagrams(
+        sock: socket.socket, message: bytes, address: object
+    ) -> Iterator[RawMessage]:
+        """The given datagram plus all further ones which can be received without blocking"""
+        yield message, parse_address("syslog socket (UDP)", address)
+        for _unused in range(_MAX_DATAGRAMS_AT_ONCE - 1):
+            try:
+                message, address = sock.recvfrom(4096, socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                return
+            yield message, parse_address("syslog socket (UDP)", address)
+
     def create_events_from_trap(self, data: bytes, address: tuple[str, int]) -> Iterator[Event]:
         try:
             if varbinds_and_ipaddress := self._snmp_trap_parser(data, address):
@@ -786,9 +884,25 @@ class EventServer(ECServerThread):
             elapsed = time.time() - before
             self._perfcounters.count_time("processing", elapsed)
 
+    def process_events(self, events: Iterable[Event]) -> None:
+        """Process the events directly or hand them over to the syslog pipeline, if enabled
+
+        Everything has to go through the pipeline when it is enabled, otherwise the order
+        of the events would be mixed up.
+        """
+        if self._syslog_pipeline is None:
+            self.process_potential_event_instrumented(events)
+        else:
+            self._syslog_pipeline.submit_events(events)
+
     def process_syslog_messages(
         self, messages: Iterable[bytes], address: tuple[str, int] | None
     ) -> None:
+        if self._syslog_pipeline is not None:
+            self._syslog_pipeline.submit_messages(
+                ((message, address) for message in messages), may_drop=False
+            )
+            return
         self.process_potential_event_instrumented(
             create_events_from_syslog_messages(
                 messages, address, self._logger if self._config["debug_rules"] else None
@@ -998,9 +1112,9 @@ class EventServer(ECServerThread):
                 # First look for case 1: rule that already have at least one hit
                 # and this events in the state "counting" exist.
                 events_to_delete: list[tuple[Event, HistoryWhat]] = []
-                events = self._event_status.events()
+                events = self._event_status.get_events_of_rule(rule["id"])
                 for event in events:
-                    if event["rule_id"] == rule["id"] and event["phase"] == "counting":
+                    if event["phase"] == "counting":
                         # time has elapsed. Now lets see if we have reached
                         # the necessary count:
                         if event["count"] < expect["count"]:  # no -> trigger alarm
@@ -1051,10 +1165,8 @@ class EventServer(ECServerThread):
             merge, reset_ack = merge  # type: ignore[unreachable]
 
         if merge != "never":
-            for event in self._event_status.events():
-                if event["rule_id"] == rule["id"] and (
-                    event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked")
-                ):
+            for event in self._event_status.get_events_of_rule(rule["id"]):
+                if event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked"):
                     merge_event = event
                     break
 
@@ -1073,6 +1185,7 @@ class EventServer(ECServerThread):
             # Better rewrite (again). Rule might have changed. Also we have changed
             # the text and the user might have his own text added via set_text.
             self.rewrite_event(rule, merge_event, MatchGroups(), set_first=False)
+            self._event_status.reindex_event(merge_event)
             self._history.add(merge_event, "COUNTFAILED")
         else:
             # Create artificial event from scratch. Make sure that all important
@@ -1198,6 +1311,15 @@ class EventServer(ECServerThread):
                     ]
                     self._logger.info(" %-12s: %s", SyslogFacility(facility), " ".join(stats))
 
+            self._rule_index = RuleDispatchIndex(self._rules)
+            self._logger.info(
+                "Rule dispatch index: %s",
+                ", ".join(
+                    f"{kind}: {num_rules} rules"
+                    for kind, num_rules in sorted(self._rule_index.rules_per_kind.items())
+                ),
+            )
+
     def hash_rule(self, rule: Rule) -> None:
         """Construct rule hash for faster execution."""
         facility = rule.get("match_facility")
@@ -1253,6 +1375,21 @@ class EventServer(ECServerThread):
                 (100.0 * count / float(total_count)),
             )
 
+        index = self._rule_index
+        self._logger.info(
+            "Rule dispatch index: %d lookups, %.2f candidate rules per event",
+            index.num_lookups,
+            index.num_candidates / index.num_lookups if index.num_lookups else 0.0,
+        )
+        for kind, num_keys in index.bucket_sizes().items():
+            self._logger.info(
+                "  %-12s - %d keys, %d rules, %d rule hits",
+                kind,
+                num_keys,
+                index.rules_per_kind[kind],
+                index.hits_per_kind[kind],
+            )
+
     def process_potential_event(self, event: Event) -> None:
         self.do_translate_hostname(event)
 
@@ -1263,7 +1400,9 @@ class EventServer(ECServerThread):
         # Rule optimizer
         if self._config["rule_optimizer"]:
             self._hash_stats[event["facility"]][event["priority"]] += 1
-            rule_candidates = self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
+            rule_candidates = self._rule_index.candidates(
+                event, self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
+            )
         else:
             rule_candidates = self._rules
 
@@ -1874,14 +2013,14 @@ class StatusTableEvents(StatusTable):
         self._columns_dict = dict(self.columns)
 
     def _enumerate(self, query: QueryGET) -> Iterable[Sequence[object]]:
-        for event in self._event_status.get_events():
-            # Optimize filters that are set by the check_mkevents active check. Since users
-            # may have a lot of those checks running, it is a good idea to optimize this.
-            if not query.only_host or filter_operator_in(event["host"], query.only_host):
-                yield [
-                    event.get(column_name[6:], default)
-                    for column_name, default in self._columns_dict.items()
-                ]
+        # Optimize filters that are set by the check_mkevents active check. Since users
+        # may have a lot of those checks running, it is a good idea to optimize this.
+        # The event store keeps an index by host name for exactly this purpose.
+        for event in self._event_status.get_events(query.only_host or None):
+            yield [
+                event.get(column_name[6:], default)
+                for column_name, default in self._columns_dict.items()
+            ]
 
 
 class StatusTableHistory(StatusTable):
@@ -2255,13 +2394,13 @@ class StatusServer(ECServerThread):
             raise MKClientError("Wrong number of arguments for DELETE")
         event_ids, user = arguments
         ids = {int(event_id) for event_id in event_ids.split(",")}
-        self._event_status.delete_events_by(lambda event: event["id"] in ids, user)
+        self._event_status.delete_events_by_ids(ids, user)
 
     def handle_command_delete_events_of_host(self, arguments: list[str]) -> None:
         if len(arguments) != 2:
             raise MKClientError("Wrong number of arguments for DELETE_EVENTS_OF_HOST")
         hostname, user = arguments
-        self._event_status.delete_events_by(lambda event: event["host"] == hostname, user)
+        self._event_status.delete_events_of_host(hostname, user)
 
     def handle_command_update(self, arguments: list[str]) -> None:
         event_ids, user, acknowledged, comment, contact = arguments
@@ -2439,6 +2578,7 @@ def run_eventd(
     reload_config_event: threading.Event,
 ) -> None:
     """Dispatching: starting and managing the two threads."""
+    history.start()
     status_server.start()
     event_server.start()
     now = time.time()
@@ -2532,6 +2672,9 @@ def run_eventd(
     event_server.join()
     status_server.join()
 
+    # Write the history still buffered
+    history.close()
+
 
 # .
 #   .--EventStatus---------------------------------------------------------.
@@ -2574,13 +2717,11 @@ class EventStatus:
         self._history = history
 
     def flush(self) -> None:
-        # TODO: Improve types!
-        self._events: list[Event] = []
+        self._events = EventStore()
         self._next_event_id = 1
         self._rule_stats: dict[str, int] = {}
         # needed for expecting rules
         self._interval_starts: dict[str, int] = {}
-        self._initialize_event_limit_status()
 
         # TODO: might introduce some performance counters, like:
         # - number of received messages
@@ -2588,14 +2729,15 @@ class EventStatus:
         # - number of rule misses
 
     def events(self) -> list[Event]:
-        # TODO: Improve type!
-        return self._events
+        """A snapshot of all events, oldest first. Callers may remove events while iterating."""
+        return list(self._events)
 
     def event(self, eid: int) -> Event | None:
-        for event in self._events:
-            if event["id"] == eid:
-                return event
-        return None
+        return self._events.get(eid)
+
+    def reindex_event(self, event: Event) -> None:
+        """Must be called after changing the host, core_host or rule_id of an existing event"""
+        self._events.reindex(event)
 
     def interval_start(self, rule_id: str, interval: ExpectInterval) -> int:
         """
@@ -2640,14 +2782,14 @@ class EventStatus:
     def pack_status(self) -> PackedEventStatus:
         return PackedEventStatus(
             next_event_id=self._next_event_id,
-            events=self._events,
+            events=list(self._events),
             rule_stats=self._rule_stats,
             interval_starts=self._interval_starts,
         )
 
     def unpack_status(self, status: PackedEventStatus) -> None:
         self._next_event_id = status["next_event_id"]
-        self._events = status["events"]
+        self._events = EventStore(status["events"])
         self._rule_stats = status["rule_stats"]
         self._interval_starts = status["interval_starts"]
 
@@ -2679,7 +2821,7 @@ class EventStatus:
             try:
                 status = ast.literal_eval(path.read_text(encoding="utf-8"))
                 self._next_event_id = status["next_event_id"]
-                self._events = status["events"]
+                events = status["events"]
                 self._rule_stats = status["rule_stats"]
                 self._interval_starts = status.get("interval_starts", {})
                 self._logger.info("Loaded event state from %s.", path)
@@ -2687,8 +2829,11 @@ class EventStatus:
                 self._logger.exception("Error loading event state from %s", path)
                 raise
 
+        else:
+            events = list(self._events)
+
         # Add new columns and fix broken events
-        for event in self._events:
+        for event in events:
             event.setdefault("ipaddress", "")
             event.setdefault("host", HostName(""))
             event.setdefault("application", "")
@@ -2698,48 +2843,28 @@ class EventStatus:
                 event_server.add_core_host_to_event(event)
                 event["host_in_downtime"] = False
 
-        # core_host is needed to initialize the status
-        self._initialize_event_limit_status()
-
-    def _initialize_event_limit_status(self) -> None:
-        """
-        Called on Event Console initialization from status file to initialize
-        the current event limit state -> Sets internal counters which are
-        updated during runtime.
-        """
-        self.num_existing_events = len(self._events)
+        # core_host is needed to index the events
+        self._events = EventStore(events)
 
-        self.num_existing_events_by_host: dict[tuple[str, HostName | None], int] = {}
-        self.num_existing_events_by_rule: dict[Any, int] = {}
-        for event in self._events:
-            self._count_event_add(event)
-
-    def _count_event_add(self, event: Event) -> None:
-        host_key = (event["host"], event["core_host"])
-        if host_key not in self.num_existing_events_by_host:
-            self.num_existing_events_by_host[host_key] = 1
-        else:
-            self.num_existing_events_by_host[host_key] += 1
-
-        if event["rule_id"] not in self.num_existing_events_by_rule:
-            self.num_existing_events_by_rule[event["rule_id"]] = 1
-        else:
-            self.num_existing_events_by_rule[event["rule_id"]] += 1
+    # The event limit counters are derived from the indexes of the event store, so they can
+    # never get out of sync with the events themselves.
+    @property
+    def num_existing_events(self) -> int:
+        return len(self._events)
 
-    def _count_event_remove(self, event: Event) -> None:
-        host_key = (event["host"], event["core_host"])
+    @property
+    def num_existing_events_by_host(self) -> Mapping[HostKey, int]:
+        return self._events.count_by_host()
 
-        self.num_existing_events -= 1
-        self.num_existing_events_by_host[host_key] -= 1
-        self.num_existing_events_by_rule[event["rule_id"]] -= 1
+    @property
+    def num_existing_events_by_rule(self) -> Mapping[str | None, int]:
+        return self._events.count_by_rule()
 
     def new_event(self, event: Event) -> None:
         self._perfcounters.count("events")
         event["id"] = self._next_event_id
         self._next_event_id += 1
-        self._events.append(event)
-        self.num_existing_events += 1
-        self._count_event_add(event)
+        self._events.add(event)
         self._history.add(event, "NEW")
 
     def archive_event(self, event: Event) -> None:
@@ -2750,19 +2875,17 @@ class EventStatus:
         self._history.add(event, "ARCHIVED")
 
     def remove_event(self, event: Event, delete_reason: HistoryWhat, user: str = "") -> None:
-        try:
-            self._events.remove(event)
-            self._history.add(event, delete_reason, user)
-            self._count_event_remove(event)
-        except ValueError:
-            self._logger.exception("Cannot remove event %d: not present", event["id"])
+        if not self._events.remove(event):
+            self._logger.error("Cannot remove event %d: not present", event["id"])
+            return
+        self._history.add(event, delete_reason, user)
 
     # protected by self.lock
     def remove_oldest_event(self, ty: LimitKind, event: Event) -> None:
         if ty == "overall":
             self._logger.log(VERBOSE, "  Removing oldest event")
-            oldest_event = self._events[0]
-            self.remove_event(oldest_event, "AUTODELETE")
+            if (oldest_event := self._events.oldest()) is not None:
+                self.remove_event(oldest_event, "AUTODELETE")
         elif ty == "by_rule" and event["rule_id"] is not None:
             self._logger.log(VERBOSE, '  Removing oldest event of rule "%s"', event["rule_id"])
             self._remove_oldest_event_of_rule(event["rule_id"])
@@ -2772,27 +2895,23 @@ class EventStatus:
 
     # protected by self.lock
     def _remove_oldest_event_of_rule(self, rule_id: str) -> None:
-        for event in self._events:
-            if event["rule_id"] == rule_id:
-                self.remove_event(event, "AUTODELETE")
-                return
+        if (event := self._events.oldest_of_rule(rule_id)) is not None:
+            self.remove_event(event, "AUTODELETE")
 
     # protected by self.lock
     def _remove_oldest_event_of_host(self, hostname: str) -> None:
-        for event in self._events:
-            if event["host"] == hostname:
-                self.remove_event(event, "AUTODELETE")
-                return
+        if (event := self._events.oldest_of_host(hostname)) is not None:
+            self.remove_event(event, "AUTODELETE")
 
     # protected by self.lock
     def get_num_existing_events_by(self, ty: LimitKind, event: Event) -> int:
         match ty:
             case "overall":
-                return self.num_existing_events
+                return len(self._events)
             case "by_rule":
-                return self.num_existing_events_by_rule.get(event["rule_id"], 0)
+                return self._events.num_events_of_rule(event["rule_id"])
             case "by_host":
-                return self.num_existing_events_by_host.get((event["host"], event["core_host"]), 0)
+                return self._events.num_events_of_host((event["host"], event["core_host"]))
             case _ as unreachable:
                 assert_never(unreachable)
 
@@ -2810,10 +2929,8 @@ class EventStatus:
         """
         with self.lock:
             to_delete = []
-            for event in self._events:
-                if event["rule_id"] == rule["id"] and self.cancelling_match(
-                    match_groups, new_event, event, rule
-                ):
+            for event in self._events.by_rule(rule["id"]):
+                if self.cancelling_match(match_groups, new_event, event, rule):
                     # Fill a few fields of the cancelled event with data from
                     # the cancelling event so that action scripts have useful
                     # values and the logfile entry if more relevant.
@@ -2985,10 +3102,11 @@ class EventStatus:
                 preserve["contact"] = found["contact"]
         found.update(event)
         found.update(preserve)
+        self._events.reindex(found)
 
     def count_expected_event(self, event_server: EventServer, event: Event) -> None:
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"] and ev["phase"] == "counting":
+        for ev in self._events.by_rule(event["rule_id"]):
+            if ev["phase"] == "counting":
                 self.count_event_up(ev, event)
                 return
 
@@ -3005,31 +3123,30 @@ class EventStatus:
         since the event has been created because the count was too
         low in the specified period of time.
         """
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"]:
-                if ev["phase"] == "ack" and not count["count_ack"]:
-                    continue  # skip acknowledged events
+        for ev in self._events.by_rule(event["rule_id"]):
+            if ev["phase"] == "ack" and not count["count_ack"]:
+                continue  # skip acknowledged events
 
-                if count["separate_host"] and ev["host"] != event["host"]:
-                    continue  # treat events with separated hosts separately
+            if count["separate_host"] and ev["host"] != event["host"]:
+                continue  # treat events with separated hosts separately
 
-                if count["separate_application"] and ev["application"] != event["application"]:
-                    continue  # same for application
+            if count["separate_application"] and ev["application"] != event["application"]:
+                continue  # same for application
 
-                if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
-                    continue
+            if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
+                continue
 
-                count_duration = count.get("count_duration")
-                if count_duration is not None and ev["first"] + count_duration < event["time"]:
-                    # Counting has been discontinued on this event after a certain time
-                    continue
+            count_duration = count.get("count_duration")
+            if count_duration is not None and ev["first"] + count_duration < event["time"]:
+                # Counting has been discontinued on this event after a certain time
+                continue
 
-                if ev["host_in_downtime"] != event["host_in_downtime"]:
-                    continue  # treat events with different downtime states separately
+            if ev["host_in_downtime"] != event["host_in_downtime"]:
+                continue  # treat events with different downtime states separately
 
-                found = ev
-                self.count_event_up(found, event)
-                break
+            found = ev
+            self.count_event_up(found, event)
+            break
         else:
             event["count"] = 1
             event["phase"] = "counting"
@@ -3042,16 +3159,31 @@ class EventStatus:
             return found  # do event action, return found copy of event
         return None  # do not do event action
 
-    def delete_events_by(self, predicate: Callable[[Event], bool], user: str) -> None:
-        for event in self._events[:]:
-            if predicate(event):
-                event["phase"] = "closed"
-                if user:
-                    event["owner"] = user
-                self.remove_event(event, "DELETE", user)
+    def delete_events_by_ids(self, event_ids: Iterable[int], user: str) -> None:
+        self._delete_events(
+            [event for event_id in event_ids if (event := self._events.get(event_id))], user
+        )
+
+    def delete_events_of_host(self, host_name: str, user: str) -> None:
+        self._delete_events(
+            [e for e in self._events.by_host_names([host_name]) if e["host"] == host_name], user
+        )
+
+    def _delete_events(self, events: Iterable[Event], user: str) -> None:
+        for event in events:
+            event["phase"] = "closed"
+            if user:
+                event["owner"] = user
+            self.remove_event(event, "DELETE", user)
+
+    def get_events(self, only_hosts: Iterable[str] | None = None) -> Iterable[Event]:
+        """All events or only the ones of the given hosts (compared case-insensitively)"""
+        if only_hosts is None:
+            return list(self._events)
+        return self._events.by_host_names(only_hosts)
 
-    def get_events(self) -> Iterable[Event]:
-        return self._events
+    def get_events_of_rule(self, rule_id: str | None) -> list[Event]:
+        return list(self._events.by_rule(rule_id))
 
     def get_rule_stats(self) -> Iterable[tuple[str, int]]:
         return sorted(self._rule_stats.items(), key=lambda x: x[0])
@@ -3377,6 +3509,7 @@ def reload_configuration(
         history = create_history(
             settings, config, logger, StatusTableEvents.columns, StatusTableHistory.columns
         )
+        history.start()
         event_server.reload_configuration(config, history)
 
     event_status.reload_configuration(config, history)
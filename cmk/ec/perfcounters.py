@@ -28,6 +28,8 @@ class Perfcounters:
         "overflows",
         "events",
         "connects",
+        "ingest_stalls",  # reader had to wait for the syslog pipeline (backpressure)
+        "ingest_drops",  # UDP messages dropped because the syslog pipeline was full
     ]
 
     # Average processing times
@@ -122,9 +122,9 @@ class Query:
 
 
 def filter_operator_in(a: str, b: Iterable[str]) -> bool:
-    """Implemented as a named function, as it is used in a second filter
-    cmk.ec.main: StatusTableEvents._enumerate
-    not implemented as regex/IGNORECASE due to performance.
+    """Implemented as a named function, the same semantics are used by the host index
+    of cmk.ec.event_store.EventStore for StatusTableEvents._enumerate.
+    Not implemented as regex/IGNORECASE due to performance.
     """
     return a.lower() in {e.lower() for e in b}
 
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Pre-filter index for the rule matching of the Event Console
+
+Before an event is run through the (expensive) RuleMatcher, the index
+determines the rules which can possibly match the event at all. For this
+every rule is analyzed for a condition which is necessary for a match and
+can be looked up cheaply:
+
+* an exact host name (match_host being a plain text)
+* a host name prefix (match_host being a regex like "^srv-.*")
+* literal substrings of the message text (match/match_ok)
+* literal substrings of the syslog application (match_application/cancel_application)
+
+Message and application substrings of all rules are searched in one pass
+with an Aho-Corasick automaton. Rules without such a condition (and all
+rules with inverted matching) are "unspecific" and are always candidates.
+
+The index only narrows down the candidates, the actual matching is still
+done by the RuleMatcher, in the original order of the rules.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, deque
+from collections.abc import Iterable, Sequence
+from typing import Final, Literal
+
+from .config import Rule, TextPattern
+from .event import Event
+
+DispatchKind = Literal["host_exact", "host_prefix", "message", "application", "unspecific"]
+
+_REGEX_META: Final = frozenset(".^$*+?{}[]\\|()")
+_QUANTIFIERS: Final = frozenset("*+?{")
+
+
+class AhoCorasick:
+    """Finds all occurrences of a fixed set of keywords in a text in one pass"""
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[frozenset[str]] = [frozenset()]
+        outputs: list[set[str]] = [set()]
+        for keyword in keywords:
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                if (next_state := self._goto[state].get(char)) is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(keyword)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                outputs[next_state] |= outputs[self._fail[next_state]]
+        self._output = [frozenset(o) for o in outputs]
+
+    def search(self, text: str) -> set[str]:
+        found: set[str] = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+def analyze_regex(pattern: str) -> tuple[str | None, list[str]] | None:
+    """Extract the literal parts of a simple regex
+
+    Returns the prefix every match has to start with (only for "^"-anchored regexes)
+    and the lower-cased literal fragments every match has to contain. Returns None if
+    the regex is too complex to analyze, e.g. if it contains alternatives, groups or
+    character classes.
+
+    >>> analyze_regex("^srv-.*-DB$")
+    ('srv-', ['srv-', '-db'])
+    >>> analyze_regex("Link (up|down)") is None
+    True
+    """
+    anchored = pattern.startswith("^")
+    pos = 1 if anchored else 0
+    prefix: str | None = None
+    fragments: list[str] = []
+    current = ""
+    while pos < len(pattern):
+        char = pattern[pos]
+        if char == "$" and pos == len(pattern) - 1:
+            break
+        if char == ".":
+            if anchored and prefix is None:
+                prefix = current
+            fragments.append(current)
+            current = ""
+            pos += 1
+            if pos < len(pattern) and pattern[pos] in "*+?":
+                pos += 1
+                if pos < len(pattern) and pattern[pos] == "?":
+                    pos += 1  # non-greedy
+            continue
+        if char == "\\":
+            pos += 1
+            if pos >= len(pattern) or pattern[pos].isalnum():
+                return None  # character classes, back references, ...
+            char = pattern[pos]
+        elif char in _REGEX_META:
+            return None
+        if pos + 1 < len(pattern) and pattern[pos + 1] in _QUANTIFIERS:
+            return None  # the character is optional or repeated
+        if not char.isascii():
+            return None  # IGNORECASE semantics differ from str.lower() here
+        current += char.lower()
+        pos += 1
+    if anchored and prefix is None:
+        prefix = current
+    fragments.append(current)
+    return prefix or None, [f for f in fragments if f]
+
+
+def _substring_keys(patterns: Sequence[TextPattern | None]) -> list[str] | None:
+    """Necessary substrings, one of which has to be found for any of the patterns to match"""
+    keys = []
+    for pattern in patterns:
+        if pattern is None:
+            return None  # A missing pattern always matches
+        if isinstance(pattern, str):
+            keys.append(pattern)
+            continue
+        if (analyzed := analyze_regex(pattern.pattern)) is None or not analyzed[1]:
+            return None
+        keys.append(max(analyzed[1], key=len))
+    return keys or None
+
+
+def _dispatch_keys(rule: Rule) -> tuple[DispatchKind, list[str]]:
+    if rule.get("invert_matching"):
+        return "unspecific", []
+
+    if (host_pattern := rule.get("match_host")) is not None:
+        if isinstance(host_pattern, str):
+            return "host_exact", [host_pattern]
+        if (analyzed := analyze_regex(host_pattern.pattern)) and analyzed[0]:
+            return "host_prefix", [analyzed[0]]
+
+    message_patterns = [rule.get("match")]
+    if "match_ok" in rule:
+        message_patterns.append(rule["match_ok"])
+    if message_keys := _substring_keys(message_patterns):
+        return "message", message_keys
+
+    application_patterns: list[TextPattern | None] = []
+    if "match_application" in rule:
+        application_patterns.append(rule["match_application"])
+    if "cancel_application" in rule:
+        application_patterns.append(rule["cancel_application"])
+    if application_keys := _substring_keys(application_patterns):
+        return "application", application_keys
+
+    return "unspecific", []
+
+
+class RuleDispatchIndex:
+    """Maps events to the (ordered) subset of rules which can possibly match them"""
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self._rules = rules
+        self._positions = {id(rule): pos for pos, rule in enumerate(rules)}
+        self._host_exact: dict[str, set[int]] = {}
+        self._host_prefix: dict[str, set[int]] = {}
+        self._message: dict[str, set[int]] = {}
+        self._application: dict[str, set[int]] = {}
+        self._unspecific: set[int] = set()
+        self._subset_positions: dict[int, frozenset[int]] = {}
+        self.rules_per_kind: Counter[DispatchKind] = Counter()
+        self.hits_per_kind: Counter[DispatchKind] = Counter()
+        self.num_lookups = 0
+        self.num_candidates = 0
+
+        for pos, rule in enumerate(rules):
+            kind, keys = _dispatch_keys(rule)
+            self.rules_per_kind[kind] += 1
+            if kind == "unspecific":
+                self._unspecific.add(pos)
+                continue
+            index = {
+                "host_exact": self._host_exact,
+                "host_prefix": self._host_prefix,
+                "message": self._message,
+                "application": self._application,
+            }[kind]
+            for key in keys:
+                index.setdefault(key, set()).add(pos)
+
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._host_prefix})
+        self._message_automaton = AhoCorasick(self._message)
+        self._application_automaton = AhoCorasick(self._application)
+
+    def candidates(self, event: Event, rules: Sequence[Rule]) -> list[Rule]:
+        """Filter the given rules (a subset of the indexed ones) down to the possible matches
+
+        The subsets are typically the buckets of the facility/priority hash, which live as
+        long as the index itself, so their positions are computed only once.
+        """
+        if not rules:
+            return []
+        if (subset := self._subset_positions.get(id(rules))) is None:
+            subset = self._subset_positions[id(rules)] = frozenset(
+                pos for rule in rules if (pos := self._positions.get(id(rule))) is not None
+            )
+        positions = sorted(subset & self._possible_positions(event))
+        self.num_lookups += 1
+        self.num_candidates += len(positions)
+        return [self._rules[pos] for pos in positions]
+
+    def _possible_positions(self, event: Event) -> set[int]:
+        possible = set(self._unspecific)
+        self.hits_per_kind["unspecific"] += len(self._unspecific)
+
+        host = str(event.get("host", "")).lower()
+        self._add_hits(possible, "host_exact", [self._host_exact.get(host, set())])
+        self._add_hits(
+            possible,
+            "host_prefix",
+            [self._host_prefix.get(host[:length], set()) for length in self._prefix_lengths],
+        )
+        if self._message:
+            text = event.get("text", "").lower()
+            self._add_hits(
+                possible,
+                "message",
+                [self._message[key] for key in self._message_automaton.search(text)],
+            )
+        if self._application:
+            application = event.get("application", "").lower()
+            self._add_hits(
+                possible,
+                "application",
+                [self._application[key] for key in self._application_automaton.search(application)],
+            )
+        return possible
+
+    def _add_hits(self, possible: set[int], kind: DispatchKind, hits: Iterable[set[int]]) -> None:
+        for positions in hits:
+            self.hits_per_kind[kind] += len(positions)
+            possible |= positions
+
+    def bucket_sizes(self) -> dict[DispatchKind, int]:
+        return {
+            "host_exact": len(self._host_exact),
+            "host_prefix": len(self._host_prefix),
+            "message": len(self._message),
+            "application": len(self._application),
+            "unspecific": len(self._unspecific),
+        }
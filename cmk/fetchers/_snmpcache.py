@@ -11,6 +11,8 @@ from cmk.ccc import store
 from cmk.ccc.hostaddress import HostAddress, HostName
 from cmk.snmplib import OID, SNMPDecodedString
 
+from ._snmpcodec import deserialize_single_oid_cache, serialize_single_oid_cache
+
 # TODO: Replace this by generic caching
 _g_single_oid_hostname: HostName | None = None
 _g_single_oid_ipaddress: HostAddress | None = None
@@ -42,14 +44,16 @@ def write_single_oid_cache(
         return
     cache_dir.mkdir(parents=True, exist_ok=True)
     cache_path = cache_dir / f"{host_name}.{ipaddress}"
-    store.save_object_to_file(cache_path, _g_single_oid_cache, pprint_value=False)
+    store.save_bytes_to_file(cache_path, serialize_single_oid_cache(_g_single_oid_cache))
 
 
 def _load_single_oid_cache(
     host_name: HostName, ipaddress: HostAddress | None, cache_dir: Path
 ) -> dict[OID, SNMPDecodedString | None]:
     cache_path = cache_dir / f"{host_name}.{ipaddress}"
-    return store.load_object_from_file(cache_path, default={})
+    if not (raw := store.load_bytes_from_file(cache_path, default=b"")).strip():
+        return {}
+    return deserialize_single_oid_cache(raw)
 
 
 def single_oid_cache() -> dict[OID, SNMPDecodedString | None]:
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Binary serialization of the SNMP caches
+
+The SNMP caches used to be written with repr() and read with ast.literal_eval(),
+which is very slow and memory hungry for the big walks of e.g. large switches.
+
+The binary format is a header followed by a list of named, length prefixed blobs:
+
+    header:  magic (8 bytes), version (u32), number of blobs (u32)
+    blob:    length of name (u16), name (UTF-8), length of payload (u32), payload
+
+The payloads are marshal'ed Python objects. They are decoded directly from a
+memoryview of the file content, so no copies of the payloads are made.
+
+Files not starting with the magic bytes are in the legacy (repr) format.
+"""
+
+import ast
+import marshal
+import struct
+from collections.abc import Mapping
+from typing import Any, Final
+
+from cmk.snmplib import OID, SNMPDecodedString, SNMPRawData, SNMPRawDataElem
+from cmk.utils.sectionname import SectionName
+
+__all__ = [
+    "deserialize_raw_data",
+    "deserialize_single_oid_cache",
+    "serialize_raw_data",
+    "serialize_single_oid_cache",
+]
+
+# Starts with a byte which can never start a legacy file
+_MAGIC: Final = b"\x00CMKSNMP"
+_VERSION: Final = 1
+_HEADER: Final = struct.Struct("<8sII")
+_NAME_LENGTH: Final = struct.Struct("<H")
+_PAYLOAD_LENGTH: Final = struct.Struct("<I")
+
+_SINGLE_OID_CACHE_BLOB: Final = "oids"
+
+
+def _encode_blobs(blobs: Mapping[str, bytes]) -> bytes:
+    chunks = [_HEADER.pack(_MAGIC, _VERSION, len(blobs))]
+    for name, payload in blobs.items():
+        raw_name = name.encode("utf-8")
+        chunks.append(_NAME_LENGTH.pack(len(raw_name)))
+        chunks.append(raw_name)
+        chunks.append(_PAYLOAD_LENGTH.pack(len(payload)))
+        chunks.append(payload)
+    return b"".join(chunks)
+
+
+def _decode_blobs(raw: bytes) -> dict[str, memoryview] | None:
+    """The named payloads, None if the data is in the legacy format"""
+    if not raw.startswith(_MAGIC):
+        return None
+    view = memoryview(raw)
+    if len(view) < _HEADER.size:
+        raise ValueError("Truncated SNMP cache")
+    _magic, version, count = _HEADER.unpack_from(view)
+    if version != _VERSION:
+        raise ValueError(f"Unsupported SNMP cache version: {version}")
+    offset = _HEADER.size
+    blobs = {}
+    try:
+        for _index in range(count):
+            (name_length,) = _NAME_LENGTH.unpack_from(view, offset)
+            offset += _NAME_LENGTH.size
+            name = str(view[offset : offset + name_length], "utf-8")
+            offset += name_length
+            (payload_length,) = _PAYLOAD_LENGTH.unpack_from(view, offset)
+            offset += _PAYLOAD_LENGTH.size
+            if offset + payload_length > len(view):
+                raise ValueError("Truncated SNMP cache")
+            blobs[name] = view[offset : offset + payload_length]
+            offset += payload_length
+    except struct.error as e:
+        raise ValueError("Truncated SNMP cache") from e
+    return blobs
+
+
+def _load_legacy(raw: bytes) -> Any:
+    try:
+        return ast.literal_eval(raw.decode("utf-8"))
+    except SyntaxError as e:
+        # Also the binary files truncated within the magic bytes end up here
+        raise ValueError("Corrupt SNMP cache") from e
+
+
+def serialize_raw_data(raw_data: SNMPRawData) -> bytes:
+    return _encode_blobs(
+        # The tables are nested lists of str and int, marshal handles them just fine
+        {str(name): marshal.dumps(elem) for name, elem in raw_data.items()}  # type: ignore[arg-type]
+    )
+
+
+def deserialize_raw_data(raw: bytes) -> SNMPRawData:
+    if (blobs := _decode_blobs(raw)) is None:
+        return {SectionName(k): v for k, v in _load_legacy(raw).items()}
+    return {SectionName(name): _load_raw_data_elem(payload) for name, payload in blobs.items()}
+
+
+def _load_raw_data_elem(payload: memoryview) -> SNMPRawDataElem:
+    elem: SNMPRawDataElem = marshal.loads(payload)
+    return elem
+
+
+def serialize_single_oid_cache(cache: Mapping[OID, SNMPDecodedString | None]) -> bytes:
+    return _encode_blobs({_SINGLE_OID_CACHE_BLOB: marshal.dumps(dict(cache))})
+
+
+def deserialize_single_oid_cache(raw: bytes) -> dict[OID, SNMPDecodedString | None]:
+    if (blobs := _decode_blobs(raw)) is None:
+        cache: dict[OID, SNMPDecodedString | None] = _load_legacy(raw)
+        return cache
+    cache = marshal.loads(blobs[_SINGLE_OID_CACHE_BLOB])
+    return cache
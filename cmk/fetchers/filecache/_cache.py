@@ -227,8 +227,14 @@ class FileCache(Generic[_TRawData], abc.ABC):
             self._logger.debug("Not using cache (Empty)")
             return None
 
+        try:
+            raw_data = self._from_cache_file(cache_file)
+        except ValueError as e:
+            self._logger.debug("Not using cache (Corrupt: %s)", e)
+            return None
+
         self._logger.debug("Using data from cache file %s", path)
-        return self._from_cache_file(cache_file)
+        return raw_data
 
     def write(self, raw_data: _TRawData, mode: Mode) -> None:
         if FileCacheMode.WRITE not in self.file_cache_mode or not self._do_cache(mode):
@@ -5,11 +5,9 @@
 
 from __future__ import annotations
 
-import ast
-
 from cmk.snmplib import SNMPRawData
-from cmk.utils.sectionname import SectionName
 
+from .._snmpcodec import deserialize_raw_data, serialize_raw_data
 from ._cache import FileCache
 
 __all__ = ["SNMPFileCache"]
@@ -18,8 +16,8 @@ __all__ = ["SNMPFileCache"]
 class SNMPFileCache(FileCache[SNMPRawData]):
     @staticmethod
     def _from_cache_file(raw_data: bytes) -> SNMPRawData:
-        return {SectionName(k): v for k, v in ast.literal_eval(raw_data.decode("utf-8")).items()}
+        return deserialize_raw_data(raw_data)
 
     @staticmethod
     def _to_cache_file(raw_data: SNMPRawData) -> bytes:
-        return (repr({str(k): v for k, v in raw_data.items()}) + "\n").encode("utf-8")
+        return serialize_raw_data(raw_data)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Sorted index of a stored SNMP walk
+
+The index of the walk file "<host>" is stored in the hidden file ".<host>.idx"
+next to it (host names never start with a dot) and memory mapped when used:
+
+    header:   magic (8 bytes), mtime_ns, size and inode of the walk file, number of entries
+    entries:  offset and length of the key, offsets and lengths of OID and value in the walk
+    keys:     the OIDs packed as big endian u32 components
+
+The entries are sorted by their keys. Comparing packed keys byte wise is the
+same as comparing the OIDs component wise, so every lookup is a binary search
+plus a scan over the matching entries. OIDs and values are not copied into the
+index, they are sliced out of the content of the walk file.
+
+Only the index is memory mapped, as it is always replaced atomically. Walk files
+may be rewritten in place (e.g. by "cmk --snmpwalk"), and accessing a mapping of a
+truncated file crashes the process with SIGBUS, so walk files are read as a whole.
+
+An index is rebuilt whenever mtime, size or inode of the walk file do not match.
+"""
+
+import bisect
+import logging
+import mmap
+import os
+import re
+import struct
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Final, Self
+
+from cmk.ccc import store
+from cmk.ccc.exceptions import MKConfigLockTimeout
+
+__all__ = ["StoredWalkIndex", "index_path", "pack_oid", "walk_signature"]
+
+_MAGIC: Final = b"CMKWALK1"
+_HEADER: Final = struct.Struct("<8sqqqI")
+_ENTRY: Final = struct.Struct("<QHQHQI")
+# The records of a walk start at every line beginning with a dot. Lines not starting
+# with a dot are continuations of the value of the previous record (newlines in values).
+_RECORD_START: Final = re.compile(rb"^\.(\S*)", re.MULTILINE)
+# Modifications of the walk within this time may not change the mtime (coarse kernel
+# timestamps), so an index of a walk modified more recently is not stored.
+_RACY_INTERVAL: Final = 2.0
+
+type _Buffer = bytes | mmap.mmap
+
+
+def index_path(walk_path: Path) -> Path:
+    return walk_path.with_name(f".{walk_path.name}.idx")
+
+
+def walk_signature(stat: os.stat_result) -> tuple[int, int, int]:
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def pack_oid(oid: str) -> bytes:
+    """Raises ValueError or struct.error for invalid OIDs"""
+    components = [int(c) for c in oid.split(".")]
+    return struct.pack(f">{len(components)}I", *components)
+
+
+class _Keys:
+    """Sequence-like view on the keys, used for bisecting"""
+
+    def __init__(self, index: "StoredWalkIndex") -> None:
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._index.num_entries
+
+    def __getitem__(self, entry: int) -> bytes:
+        return self._index.key(entry)
+
+
+class StoredWalkIndex:
+    def __init__(self, signature: tuple[int, int, int], index: _Buffer, walk: _Buffer) -> None:
+        self.signature: Final = signature
+        self._index: Final = index
+        self._walk: Final = walk
+        _magic, _mtime, _size, _inode, self.num_entries = _HEADER.unpack_from(index)
+        self._entries_offset: Final = _HEADER.size
+
+    @classmethod
+    def load(cls, walk_path: Path, logger: logging.Logger) -> Self:
+        """Use the stored index or build (and store) a new one"""
+        with walk_path.open("rb") as walk_file:
+            stat = os.fstat(walk_file.fileno())
+            signature = walk_signature(stat)
+            walk = walk_file.read()
+
+        if (index := _load_index(index_path(walk_path), signature)) is not None:
+            return cls(signature, index, walk)
+
+        logger.debug(f"  Building index of {walk_path}")
+        raw_index = _build_index(walk, signature)
+        if time.time() - stat.st_mtime > _RACY_INTERVAL:
+            try:
+                store.save_bytes_to_file(index_path(walk_path), raw_index)
+            except (OSError, MKConfigLockTimeout) as e:
+                logger.debug(f"  Cannot store index of {walk_path}: {e}")
+        return cls(signature, raw_index, walk)
+
+    def key(self, entry: int) -> bytes:
+        key_offset, key_length = struct.unpack_from(
+            "<QH", self._index, self._entries_offset + entry * _ENTRY.size
+        )
+        return self._index[key_offset : key_offset + key_length]
+
+    def find(self, oid_prefix: bytes) -> Iterator[tuple[str, str]]:
+        """Yield (OID, raw value) of all entries with the given (packed) OID prefix"""
+        entry = bisect.bisect_left(_Keys(self), oid_prefix)
+        while entry < self.num_entries:
+            key_offset, key_length, oid_offset, oid_length, value_offset, value_length = (
+                _ENTRY.unpack_from(self._index, self._entries_offset + entry * _ENTRY.size)
+            )
+            if not self._index[key_offset : key_offset + key_length].startswith(oid_prefix):
+                return
+            yield (
+                self._walk[oid_offset : oid_offset + oid_length].decode(),
+                self._walk[value_offset : value_offset + value_length].decode(),
+            )
+            entry += 1
+
+
+def _map(fileno: int, size: int) -> _Buffer:
+    # Empty files can not be mapped
+    return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) if size else b""
+
+
+def _load_index(path: Path, signature: tuple[int, int, int]) -> _Buffer | None:
+    try:
+        with path.open("rb") as index_file:
+            index = _map(index_file.fileno(), os.fstat(index_file.fileno()).st_size)
+    except OSError:
+        return None
+    if len(index) < _HEADER.size:
+        return None
+    magic, mtime_ns, size, inode, num_entries = _HEADER.unpack_from(index)
+    if (
+        magic != _MAGIC
+        or (mtime_ns, size, inode) != signature
+        or len(index) < _HEADER.size + num_entries * _ENTRY.size
+    ):
+        return None
+    return index
+
+
+def _build_index(walk: _Buffer, signature: tuple[int, int, int]) -> bytes:
+    matches = list(_RECORD_START.finditer(walk))
+    entries = []
+    for match, next_match in zip(matches, [*matches[1:], None]):
+        try:
+            key = pack_oid(match.group(1).decode())
+        except (ValueError, struct.error):
+            continue  # not an OID, can never be requested
+        record_end = len(walk) if next_match is None else next_match.start()
+        entries.append((key, match.start(1), match.end(1), record_end))
+    entries.sort(key=lambda e: e[0])
+
+    keys_offset = _HEADER.size + len(entries) * _ENTRY.size
+    chunks = [_HEADER.pack(_MAGIC, *signature, len(entries))]
+    for key, oid_start, oid_end, record_end in entries:
+        chunks.append(
+            _ENTRY.pack(
+                keys_offset,
+                len(key),
+                oid_start,
+                oid_end - oid_start,
+                oid_end,
+                record_end - oid_end,
+            )
+        )
+        keys_offset += len(key)
+    chunks.extend(key for key, *_rest in entries)
+    return b"".join(chunks)
@@ -9,11 +9,12 @@ from collections.abc import Sequence
 from pathlib import Path
 from typing import Final
 
-from cmk.ccc.exceptions import MKException, MKGeneralException, MKSNMPError
+from cmk.ccc.exceptions import MKGeneralException, MKSNMPError
 from cmk.snmplib import OID, SNMPBackend, SNMPContext, SNMPHostConfig, SNMPRawValue, SNMPRowInfo
 from cmk.utils.sectionname import SectionName
 
 from ._utils import strip_snmp_value
+from ._walk_index import pack_oid, StoredWalkIndex, walk_signature
 
 __all__ = ["StoredWalkSNMPBackend"]
 
@@ -24,6 +25,7 @@ class StoredWalkSNMPBackend(SNMPBackend):
         self.path: Final = path
         if not self.path.exists():
             raise MKSNMPError(f"No snmpwalk file {self.path}")
+        self._index: StoredWalkIndex | None = None
 
     def get(self, /, oid: OID, *, context: SNMPContext) -> SNMPRawValue | None:
         walk = self.walk(oid, context=context)
@@ -55,34 +57,23 @@ class StoredWalkSNMPBackend(SNMPBackend):
             dot_star = False
 
         self._logger.debug(f"  Loading {oid}")
-        lines = self.read_walk_data()
-
-        begin = 0
-        end = len(lines)
-        hit = None
-        while end - begin > 0:
-            current = (begin + end) // 2
-            parts = lines[current].split(None, 1)
-            comp = parts[0]
-            hit = StoredWalkSNMPBackend._compare_oids(oid_prefix, comp)
-            if hit == 0:
-                break
-            if hit == 1:  # we are too low
-                begin = current + 1
-            else:
-                end = current
-
-        if hit != 0:
-            return []  # not found
-
-        rowinfo = StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current, -1)
-        rowinfo.reverse()
-        rowinfo += StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current + 1, 1)
-
+        rows = (
+            ("." + o, strip_snmp_value(value))
+            for o, value in self._load_index().find(
+                StoredWalkSNMPBackend._to_bin_string(oid_prefix)
+            )
+        )
         if dot_star:
-            return [rowinfo[0]]
+            return [row] if (row := next(rows, None)) is not None else []
+        return list(rows)
 
-        return rowinfo
+    def _load_index(self) -> StoredWalkIndex:
+        try:
+            if self._index is None or self._index.signature != walk_signature(self.path.stat()):
+                self._index = StoredWalkIndex.load(self.path, self._logger)
+        except OSError:
+            raise MKSNMPError(f"No snmpwalk file {self.path}")
+        return self._index
 
     @staticmethod
     def read_walk_from_path(path: Path, logger: logging.Logger) -> Sequence[str]:
@@ -98,57 +89,9 @@ class StoredWalkSNMPBackend(SNMPBackend):
                     lines[-1] += line
         return lines
 
-    def read_walk_data(self) -> Sequence[str]:
-        try:
-            return self.read_walk_from_path(self.path, self._logger)
-        except OSError:
-            raise MKSNMPError(f"No snmpwalk file {self.path}")
-
-    @staticmethod
-    def _compare_oids(a: OID, b: OID) -> int:
-        aa = StoredWalkSNMPBackend._to_bin_string(a)
-        bb = StoredWalkSNMPBackend._to_bin_string(b)
-        if len(aa) <= len(bb) and bb[: len(aa)] == aa:
-            result = 0
-        else:
-            result = (aa > bb) - (aa < bb)
-        return result
-
     @staticmethod
-    def _to_bin_string(oid: OID) -> tuple[int, ...]:
+    def _to_bin_string(oid: OID) -> bytes:
         try:
-            return tuple(map(int, oid.strip(".").split(".")))
-        except MKException:
-            raise
+            return pack_oid(oid.strip("."))
         except Exception:
             raise MKGeneralException(f"Invalid OID {oid}")
-
-    @staticmethod
-    def _collect_until(
-        oid: OID, oid_prefix: OID, lines: Sequence[str], index: int, direction: int
-    ) -> SNMPRowInfo:
-        rows = []
-        # Handle case, where we run after the end of the lines list
-        if index >= len(lines):
-            if direction > 0:
-                return []
-            index -= 1
-        while True:
-            line = lines[index]
-            parts = line.split(None, 1)
-            o = parts[0]
-            if o.startswith("."):
-                o = o[1:]
-            if o == oid or o.startswith(oid_prefix + "."):
-                if len(parts) > 1:
-                    value = parts[1]
-                else:
-                    value = ""
-                # Fix for missing starting oids
-                rows.append(("." + o, strip_snmp_value(value)))
-                index += direction
-                if index < 0 or index >= len(lines):
-                    break
-            else:
-                break
-        return rows
@@ -22,6 +22,7 @@ from livestatus import (
 
 import cmk.ccc.version as cmk_version
 import cmk.utils.paths
+from cmk.bi.computer import BIComputer, BIIncrementalComputer
 from cmk.bi.lib import (
     BIHostSpec,
     BIHostStatusInfoRow,
@@ -2648,6 +2649,10 @@ def compute_bi_timelines(
             )
 
     bi_manager = BIManager()
+    # The states of the timeline containers only change by a few elements from phase to phase
+    bi_computer = BIIncrementalComputer(
+        bi_manager.compiler.compiled_aggregations, bi_manager.status_fetcher
+    )
 
     logger.warning(
         "Computing timelines for range %r. %d phases and %d timeline containers",
@@ -2665,7 +2670,7 @@ def compute_bi_timelines(
                 continue
 
             update_states(timeline_container.states, changed_elements, phase_hst_svc)
-            result_bundle = _compute_node_result_bundle(timeline_container, bi_manager)
+            result_bundle = _compute_node_result_bundle(timeline_container, bi_manager, bi_computer)
             computed_aggregations += 1
             next_node_compute_result = result_bundle.actual_result
 
@@ -2765,7 +2770,9 @@ def create_bi_timeline_entry(
 
 
 def _compute_node_result_bundle(
-    timeline_container: TimelineContainer, bi_manager: BIManager
+    timeline_container: TimelineContainer,
+    bi_manager: BIManager,
+    bi_computer: BIComputer,
 ) -> NodeResultBundle:
     # Convert our status format into that needed by BI
     status = timeline_container.states
@@ -2800,7 +2807,7 @@ def _compute_node_result_bundle(
     bi_manager.status_fetcher.states = _compute_status_info(hosts, services_by_host)
     compiled_aggregation = timeline_container.aggr_compiled_aggregation
     branch = timeline_container.aggr_compiled_branch
-    results = compiled_aggregation.compute_branches([branch], bi_manager.status_fetcher)
+    results = bi_computer.compute_branches(compiled_aggregation, [branch])
 
     if not results:
         # The aggregation did not find any hosts or services. Return "Not yet monitored"
@@ -41,6 +41,7 @@ from cmk.inventory.config import (
 )
 from cmk.inventory.paths import Paths as InventoryPaths
 from cmk.inventory.paths import TreePath, TreePathGz
+from cmk.utils.structured_data import HistoryDeltaLog, HistoryDeltaLogPath
 
 
 def _vs_file_age(title: str, default_value: int) -> Age:
@@ -189,6 +190,12 @@ class _File:
     timestamp: int
 
 
+@dataclass(frozen=True, kw_only=True)
+class _DeltaLogRecord:
+    path: Path
+    timestamp: int
+
+
 @dataclass(frozen=True, kw_only=True)
 class _ArchiveBundle:
     previous: Path
@@ -205,8 +212,8 @@ class _ParamsFileAge:
         return now - self.file_age >= timestamp
 
     def compute_removable_bundles(
-        self, now: int, bundles: Sequence[_File | _ArchiveBundle]
-    ) -> Sequence[_File | _ArchiveBundle]:
+        self, now: int, bundles: Sequence[_File | _DeltaLogRecord | _ArchiveBundle]
+    ) -> Sequence[_File | _DeltaLogRecord | _ArchiveBundle]:
         return [b for b in bundles if self.file_is_too_old(now, b.timestamp)]
 
 
@@ -218,8 +225,8 @@ class _ParamsNumberHistoryEntries:
         return False
 
     def compute_removable_bundles(
-        self, now: int, bundles: Sequence[_File | _ArchiveBundle]
-    ) -> Sequence[_File | _ArchiveBundle]:
+        self, now: int, bundles: Sequence[_File | _DeltaLogRecord | _ArchiveBundle]
+    ) -> Sequence[_File | _DeltaLogRecord | _ArchiveBundle]:
         return sorted(bundles, key=lambda b: b.timestamp, reverse=True)[
             self.number_of_history_entries :
         ]
@@ -235,8 +242,8 @@ class _ParamFileAgeNumberHistoryEntries:
         return self.param_file_age.file_is_too_old(now, timestamp)
 
     def compute_removable_bundles(
-        self, now: int, bundles: Sequence[_File | _ArchiveBundle]
-    ) -> Sequence[_File | _ArchiveBundle]:
+        self, now: int, bundles: Sequence[_File | _DeltaLogRecord | _ArchiveBundle]
+    ) -> Sequence[_File | _DeltaLogRecord | _ArchiveBundle]:
         too_old_bundles = self.param_file_age.compute_removable_bundles(now, bundles)
         cut_off_bundles = self.param_number_of_history_entries.compute_removable_bundles(
             now, bundles
@@ -296,6 +303,7 @@ class _FilePathsOfHost:
     status_data_tree: TreePath
     archive_file_paths: Sequence[Path]
     delta_cache_file_paths: Sequence[Path]
+    delta_log: Path
 
 
 def _collect_files_from_directory(directory: Path) -> Sequence[Path]:
@@ -367,6 +375,7 @@ def _compute_classified_file_paths(
             delta_cache_file_paths=_collect_files_from_directory(
                 inventory_paths.delta_cache_host(h)
             ),
+            delta_log=inventory_paths.delta_log(h),
         )
         for h in host_names
     }
@@ -429,6 +438,12 @@ def _compute_classified_file_paths(
         if (timestamp := _compute_timestamp_from_file_path(file_path)) is not None:
             abandoned_files.append(_File(path=file_path, timestamp=timestamp))
 
+    for file_path in set(inventory_paths.delta_log_dir.glob("*")).difference(
+        fps.delta_log for fps in file_paths_by_host.values()
+    ):
+        if (timestamp := _compute_timestamp_from_file_path(file_path)) is not None:
+            abandoned_files.append(_File(path=file_path, timestamp=timestamp))
+
     return _ClassifiedFilePaths(
         by_host=file_paths_by_host,
         abandoned_files=abandoned_files,
@@ -452,7 +467,7 @@ def _compute_timestamp_from_tree_path(tree_path: TreePath) -> int | None:
 @dataclass(frozen=True, kw_only=True)
 class _ClassifiedHistoryFiles:
     delta_cache_from_inventory_tree: Path | None
-    bundles: Sequence[_File | _ArchiveBundle]
+    bundles: Sequence[_File | _DeltaLogRecord | _ArchiveBundle]
     single_archive_files: Sequence[_File]
 
 
@@ -461,6 +476,7 @@ def _compute_classified_history_files(
     inventory_tree: TreePath,
     archive_file_paths: Sequence[Path],
     delta_cache_file_paths: Sequence[Path],
+    delta_log_paths: Sequence[HistoryDeltaLogPath] = (),
 ) -> _ClassifiedHistoryFiles:
     inventory_tree_ts = _compute_timestamp_from_tree_path(inventory_tree)
     archive_file_paths_by_ts = {
@@ -484,7 +500,7 @@ def _compute_classified_history_files(
             )
 
     sorted_archive_ts = sorted(archive_file_paths_by_ts)
-    bundles: dict[tuple[int, int], _File | _ArchiveBundle] = {
+    bundles: dict[tuple[int, int], _File | _DeltaLogRecord | _ArchiveBundle] = {
         (previous_timestamp, current_timestamp): _ArchiveBundle(
             previous=archive_file_paths_by_ts[previous_timestamp],
             current=archive_file_paths_by_ts[current_timestamp],
@@ -494,6 +510,13 @@ def _compute_classified_history_files(
         for previous_timestamp, current_timestamp in zip(sorted_archive_ts, sorted_archive_ts[1:])
     }
     bundles.update({k: f for k, f in delta_cache_files_by_ts.items() if k not in bundles})
+    bundles.update(
+        {
+            k: _DeltaLogRecord(path=p.file_path, timestamp=p.current_timestamp)
+            for p in delta_log_paths
+            if (k := (p.previous_timestamp, p.current_timestamp)) not in bundles
+        }
+    )
 
     handled_ts = set(ts for p_ts, c_ts in bundles for ts in (p_ts, c_ts))
     return _ClassifiedHistoryFiles(
@@ -507,11 +530,14 @@ def _compute_classified_history_files(
     )
 
 
-def _cleanup_bundle(bundle: _File | _ArchiveBundle) -> None:
+def _cleanup_bundle(bundle: _File | _DeltaLogRecord | _ArchiveBundle) -> None:
     match bundle:
         case _File():
             logger.warning("Remove inventory history entry %r", bundle.path)
             bundle.path.unlink(missing_ok=True)
+        case _DeltaLogRecord():
+            # The record is removed when compacting the delta log
+            logger.warning("Remove inventory history entry %r of %r", bundle.timestamp, bundle.path)
         case _ArchiveBundle():
             logger.warning("Remove inventory history entry %r", bundle.previous)
             # We never remove the current path because it may belong to the previous bundle
@@ -521,6 +547,15 @@ def _cleanup_bundle(bundle: _File | _ArchiveBundle) -> None:
                 bundle.delta_cache.path.unlink(missing_ok=True)
 
 
+def _needs_compaction(
+    delta_log_paths: Sequence[HistoryDeltaLogPath], removed_timestamps: set[int]
+) -> bool:
+    timestamps = [(p.previous_timestamp, p.current_timestamp) for p in delta_log_paths]
+    return len(timestamps) != len(set(timestamps)) or any(
+        current in removed_timestamps for _previous, current in timestamps
+    )
+
+
 def _cleanup_abandoned_files_of_host(abandoned_files_of_host: _AbandonedFilesOfHost) -> None:
     for folder, files in abandoned_files_of_host.folders_and_files.items():
         for file in files:
@@ -553,17 +588,25 @@ class InventoryHousekeeping:
             if (params := _compute_host_params(hosts_params, default_params, host_name)) is None:
                 continue
 
+            delta_log = HistoryDeltaLog(file_paths.delta_log)
+            delta_log_paths = list(delta_log.collect_paths())
             classified_history_files = _compute_classified_history_files(
                 inventory_tree=file_paths.inventory_tree,
                 archive_file_paths=file_paths.archive_file_paths,
                 delta_cache_file_paths=file_paths.delta_cache_file_paths,
+                delta_log_paths=delta_log_paths,
             )
 
             if classified_history_files.delta_cache_from_inventory_tree is not None:
                 classified_history_files.delta_cache_from_inventory_tree.unlink(missing_ok=True)
 
+            removed_timestamps = set()
             for bundle in params.compute_removable_bundles(now, classified_history_files.bundles):
                 _cleanup_bundle(bundle)
+                removed_timestamps.add(bundle.timestamp)
+
+            if _needs_compaction(delta_log_paths, removed_timestamps):
+                delta_log.compact(keep=lambda previous, current: current not in removed_timestamps)
 
             for archive_file in classified_history_files.single_archive_files:
                 if params.file_is_too_old(now, archive_file.timestamp):
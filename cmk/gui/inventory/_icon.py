@@ -68,7 +68,7 @@ def _has_inventory_history(host_name: HostName) -> bool:
             has_history_entries = False
         if has_history_entries:
             return True
-    return False
+    return inv_paths.delta_log(host_name).exists()
 
 
 def _render_inventory_history_icon(
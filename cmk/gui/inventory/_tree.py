@@ -27,12 +27,14 @@ from cmk.gui.watolib.groups_io import PermittedPath
 from cmk.inventory.paths import Paths as InventoryPaths
 from cmk.utils.structured_data import (
     HistoryArchivePath,
+    HistoryDeltaLogPath,
     HistoryDeltaPath,
     HistoryEntry,
     HistoryStore,
     ImmutableDeltaTree,
     ImmutableTree,
     InventoryStore,
+    iter_history,
     load_history,
     parse_from_raw_status_data_tree,
     parse_visible_raw_path,
@@ -301,13 +303,16 @@ def load_latest_delta_tree(history_store: HistoryStore, hostname: HostName) -> I
         if isinstance(permitted_paths := _get_permitted_inventory_paths(), list)
         else None
     )
-    history = load_history(
-        history_store,
-        hostname,
-        filter_history_paths=lambda paths: [paths[-1]] if paths else [],
-        filter_delta_tree=filter_delta_tree,
+    return next(
+        (
+            entry_result.ok.delta_tree
+            for entry_result in iter_history(
+                history_store, hostname, latest=1, filter_delta_tree=filter_delta_tree
+            )
+            if entry_result.is_ok()
+        ),
+        ImmutableDeltaTree(),
     )
-    return history.entries[0].delta_tree if history.entries else ImmutableDeltaTree()
 
 
 def _sort_corrupted_history_files(
@@ -328,8 +333,9 @@ def load_delta_tree(
     # computation.
 
     def _search_timestamps(
-        paths: Sequence[HistoryDeltaPath | HistoryArchivePath], timestamp: int
-    ) -> Sequence[HistoryDeltaPath | HistoryArchivePath]:
+        paths: Sequence[HistoryDeltaPath | HistoryDeltaLogPath | HistoryArchivePath],
+        timestamp: int,
+    ) -> Sequence[HistoryDeltaPath | HistoryDeltaLogPath | HistoryArchivePath]:
         for path in paths:
             if path.current_timestamp == timestamp:
                 return [path]
@@ -255,6 +255,8 @@ def register(
     config_var_registry.register(ConfigVariableEventConsoleHistoryLifetime)
     config_var_registry.register(ConfigVariableEventConsoleSocketQueueLength)
     config_var_registry.register(ConfigVariableEventConsoleEventSocketQueueLength)
+    config_var_registry.register(ConfigVariableEventConsoleSyslogParserProcesses)
+    config_var_registry.register(ConfigVariableEventConsoleSyslogParserQueueLength)
     config_var_registry.register(ConfigVariableEventConsoleTranslateSNMPTraps)
     config_var_registry.register(ConfigVariableEventConsoleSNMPCredentials)
     config_var_registry.register(ConfigVariableEventConsoleDebugRules)
@@ -268,6 +270,8 @@ def register(
     config_var_registry.register(ConfigVariableEventConsoleServiceLevels)
     config_var_registry.register(ConfigVariableEventConsoleSqliteHousekeepingInterval)
     config_var_registry.register(ConfigVariableEventConsoleSqliteFreelistSize)
+    config_var_registry.register(ConfigVariableEventConsoleSqliteHistoryFlushInterval)
+    config_var_registry.register(ConfigVariableEventConsoleSqliteHistoryFlushSize)
 
     rulespec_group_registry.register(RulespecGroupEventConsole)
     rulespec_registry.register(ECEventLimitRulespec)
@@ -4165,6 +4169,37 @@ ConfigVariableEventConsoleSqliteFreelistSize = ConfigVariable(
     ),
 )
 
+ConfigVariableEventConsoleSqliteHistoryFlushInterval = ConfigVariable(
+    group=ConfigVariableGroupEventConsoleGeneric,
+    domain=ConfigDomainEventConsole,
+    ident="sqlite_history_flush_interval",
+    valuespec=lambda: Age(
+        title=_("Event Console history write interval"),
+        help=_(
+            "New entries of the Event Console history are collected in memory and "
+            "written to the history database together. Here you can specify the maximum "
+            "time an entry is kept in memory before it is written."
+        ),
+        minvalue=1,
+        maxvalue=60,
+    ),
+)
+
+ConfigVariableEventConsoleSqliteHistoryFlushSize = ConfigVariable(
+    group=ConfigVariableGroupEventConsoleGeneric,
+    domain=ConfigDomainEventConsole,
+    ident="sqlite_history_flush_size",
+    valuespec=lambda: Integer(
+        title=_("Event Console history write batch size"),
+        help=_(
+            "New entries of the Event Console history are written to the history "
+            "database as soon as this number of entries has been collected in memory."
+        ),
+        minvalue=1,
+        unit=_("entries"),
+    ),
+)
+
 ConfigVariableEventConsoleStatisticsInterval = ConfigVariable(
     group=ConfigVariableGroupEventConsoleGeneric,
     domain=ConfigDomainEventConsole,
@@ -4555,6 +4590,46 @@ ConfigVariableEventConsoleEventSocketQueueLength = ConfigVariable(
     ),
 )
 
+ConfigVariableEventConsoleSyslogParserProcesses = ConfigVariable(
+    group=ConfigVariableGroupEventConsoleGeneric,
+    domain=ConfigDomainEventConsole,
+    ident="syslog_parser_processes",
+    valuespec=lambda: Integer(
+        title=_("Number of syslog parser processes"),
+        help=_(
+            "With a high rate of incoming syslog messages, parsing the messages can be "
+            "the limiting factor of the Event Console. With this setting the messages are "
+            "parsed by the given number of additional processes, which can run on different "
+            "CPU cores, while the rules are still evaluated in the order the messages have "
+            "been received. Set this to 0 to parse the messages in the event daemon itself. "
+            "Note: When debugging of rules is enabled, the messages are always parsed by "
+            "the event daemon itself."
+        ),
+        minvalue=0,
+        maxvalue=64,
+        unit=_("processes"),
+    ),
+)
+
+ConfigVariableEventConsoleSyslogParserQueueLength = ConfigVariable(
+    group=ConfigVariableGroupEventConsoleGeneric,
+    domain=ConfigDomainEventConsole,
+    ident="syslog_parser_queue_len",
+    valuespec=lambda: Integer(
+        title=_("Max. number of pending syslog message batches"),
+        help=_(
+            "When syslog parser processes are used, the parsed messages are queued until "
+            "the rules have been evaluated for them. When the queue is full, messages received "
+            "via TCP, the event pipe or the spool directory are not read until there is space "
+            "in the queue again, while messages received via UDP are dropped. The number of "
+            "dropped messages is shown in the Event Console performance statistics."
+        ),
+        minvalue=1,
+        label="max.",
+        unit=_("batches"),
+    ),
+)
+
 ConfigVariableEventConsoleTranslateSNMPTraps = ConfigVariable(
     group=ConfigVariableGroupEventConsoleSNMP,
     domain=ConfigDomainEventConsole,
@@ -253,6 +253,9 @@ class CREConfig:
 
     debug_livestatus_queries: bool = False
 
+    # Lifetime of the results of livestatus queries in the query cache, 0 disables the cache
+    livestatus_query_cache_ttl: int = 0
+
     # Show livestatus errors in multi site setup if some sites are
     # not reachable.
     show_livestatus_errors: bool = True
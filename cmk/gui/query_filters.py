@@ -56,6 +56,8 @@ class Query:
         self.request_vars = request_vars
         self.livestatus_query = livestatus_query or (lambda x: "")
         self.rows_filter = rows_filter or (lambda _ctx, rows: rows)
+        # Subclasses overriding filter_table set whether it may remove rows
+        self._filters_rows = rows_filter is not None
 
     def filter(self, value: FilterHTTPVariables) -> FilterHeader:
         return self.livestatus_query(value)
@@ -63,6 +65,10 @@ class Query:
     def filter_table(self, context: VisualContext, rows: Rows) -> Rows:
         return self.rows_filter(context, rows)
 
+    def need_filter_table(self) -> bool:
+        """Whether filter_table may remove rows fetched from livestatus"""
+        return self._filters_rows
+
 
 class MultipleOptionsQuery(Query):
     def __init__(
@@ -128,6 +134,7 @@ class SingleOptionQuery(Query):
         self.options = options
         self.filter_code = filter_code
         self.filter_row = filter_row or (lambda _selection, _row: True)
+        self._filters_rows = filter_row is not None
         self.ignore = self.options[-1][0]
 
     def selection_value(self, value: FilterHTTPVariables) -> str:
@@ -166,7 +173,7 @@ class TristateQuery(SingleOptionQuery):
             ident=ident,
             filter_code=lambda pick: filter_code(pick == "1"),
             filter_row=(
-                lambda pick, row: (filter_row(pick == "1", row) if filter_row is not None else True)
+                None if filter_row is None else lambda pick, row: filter_row(pick == "1", row)
             ),
             options=options or default_tri_state_options(),
         )
@@ -292,6 +299,7 @@ class NumberRangeQuery(Query):
         self.column = column or ident
         self.filter_livestatus = filter_livestatus
         self.filter_row = filter_row
+        self._filters_rows = filter_row is not None
         self.request_var_suffix = request_var_suffix
         self.bound_rescaling = bound_rescaling
 
@@ -485,6 +493,7 @@ class TableTextQuery(TextQuery):
         super().__init__(ident=ident, op="=")
         self.link_columns = []
         self.row_filter = row_filter
+        self._filters_rows = True
 
     @override
     def filter(self, value: FilterHTTPVariables) -> FilterHeader:
@@ -5,23 +5,32 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterator
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator
 from contextlib import contextmanager
-from typing import cast, Literal, NamedTuple, NewType, TypedDict
+from pathlib import Path
+from typing import cast, Literal, NamedTuple, NewType, override, TypedDict
 
 from livestatus import (
     ConnectedSite,
+    LivestatusResponse,
+    LivestatusRow,
     lqencode,
     MKLivestatusQueryError,
     MultiSiteConnection,
     NetworkSocketDetails,
     NetworkSocketInfo,
+    Query,
+    QueryTypes,
     sanitize_site_configuration,
     SiteConfiguration,
     SiteConfigurations,
     UnixSocketInfo,
 )
 
+from cmk.ccc import store
 from cmk.ccc.site import omd_site, SiteId
 from cmk.ccc.user import UserId
 from cmk.ccc.version import __version__, Edition, edition, Version, VersionsIncompatible
@@ -118,6 +127,28 @@ def disconnect() -> None:
     g.pop("site_status", None)
 
 
+@contextmanager
+def bypass_query_cache() -> Iterator[None]:
+    """Send the queries to the sites, even if their results are cached"""
+    previous = g.get("bypass_query_cache", False)
+    g.bypass_query_cache = True
+    try:
+        yield
+    finally:
+        g.bypass_query_cache = previous
+
+
+class QueryCacheStatistics(NamedTuple):
+    hits: int
+    misses: int
+    entries: int
+
+
+def query_cache_statistics() -> QueryCacheStatistics:
+    """Statistics about the livestatus query cache of this process"""
+    return _query_cache.statistics()
+
+
 # TODO: This should live somewhere else, it's just a random helper...
 def all_groups(group_type: GroupType) -> list[tuple[str, str]]:
     """Returns a list of host/service/contact groups (pairs of name/alias)
@@ -205,6 +236,142 @@ def _ensure_connected(user: LoggedInUser | None, force_authuser: UserId | None)
     )
 
 
+class _QueryCache:
+    """Keeps the results of livestatus queries for a short time
+
+    The cache is shared by all requests of the process, so the queries of the dashlets and
+    snap-ins of a page are only sent once within the lifetime of an entry. The least recently
+    used entries are evicted once the cache is full.
+
+    Clearing the cache also replaces the generation file, if given. All processes using the same
+    file drop their entries once they notice the file has been replaced.
+    """
+
+    def __init__(
+        self, max_entries: int, max_rows: int, generation_file: Path | None = None
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_rows = max_rows
+        self._generation_file = generation_file
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, LivestatusResponse]] = OrderedDict()
+        self._generation = self._current_generation()
+        self._hits = 0
+        self._misses = 0
+
+    def _current_generation(self) -> tuple[int, int] | None:
+        if self._generation_file is None:
+            return None
+        try:
+            stat = self._generation_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _drop_outdated_generation(self) -> None:
+        if (generation := self._current_generation()) != self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, key: Hashable, ttl: float) -> LivestatusResponse | None:
+        with self._lock:
+            self._drop_outdated_generation()
+            if (entry := self._entries.get(key)) is None or entry[0] + ttl < time.time():
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return _copy_response(entry[1])
+
+    def put(self, key: Hashable, response: LivestatusResponse) -> None:
+        if len(response) > self._max_rows:
+            return  # Not worth the memory: Large results are not requested repeatedly
+        with self._lock:
+            self._drop_outdated_generation()
+            self._entries[key] = (time.time(), _copy_response(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._generation_file is not None:
+                # Written to a new file which is renamed, so the inode changes every time
+                store.save_text_to_file(self._generation_file, str(time.time_ns()))
+            self._generation = self._current_generation()
+
+    def statistics(self) -> QueryCacheStatistics:
+        with self._lock:
+            return QueryCacheStatistics(self._hits, self._misses, len(self._entries))
+
+
+def _copy_response(response: LivestatusResponse) -> LivestatusResponse:
+    # The callers are free to modify the rows, e.g. by inserting the site
+    return LivestatusResponse([LivestatusRow(list(row)) for row in response])
+
+
+_query_cache = _QueryCache(
+    max_entries=1000,
+    max_rows=10000,
+    generation_file=paths.tmp_dir / "gui_livestatus_query_cache.generation",
+)
+
+
+class _CachingMultiSiteConnection(MultiSiteConnection):
+    """Answers queries from the query cache, if enabled by the global setting
+
+    Queries with the "Cache: reload" header are always sent to the sites, as are the queries
+    within bypass_query_cache().
+
+    The entries are keyed by the AuthUser: header of each site. Users seeing all objects send
+    none and share the entries, the entries of all other users are their own. Results of queries
+    during which a site died are not cached, otherwise the site would look alive on a hit.
+    """
+
+    @override
+    def query(self, query: QueryTypes, add_headers: str = "") -> LivestatusResponse:
+        if (ttl := active_config.livestatus_query_cache_ttl) <= 0 or g.get(
+            "bypass_query_cache", False
+        ):
+            return super().query(query, add_headers)
+
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+        if "Cache: reload" in (query_text := str(normalized_query)) + add_headers:
+            return super().query(normalized_query, add_headers)
+
+        # The results depend on the auth user and the sites that are queried. Keying on the
+        # contact groups of the user instead would not be enough, livestatus also grants access
+        # to objects the user is a contact of.
+        key = (
+            query_text,
+            add_headers,
+            tuple(self.only_sites) if self.only_sites is not None else None,
+            self.prepend_site,
+            self.limit,
+            self.get_output_format(),
+            tuple(
+                (connected_site.id, connected_site.connection.auth_header)
+                for connected_site in self.connections
+            ),
+        )
+        if (response := _query_cache.get(key, ttl)) is not None:
+            return response
+
+        deadsites = dict(self.deadsites)
+        response = super().query(normalized_query, add_headers)
+        if self.deadsites == deadsites:
+            _query_cache.put(key, response)
+        return response
+
+    @override
+    def command(self, command: str, sitename: SiteId | None = SiteId("local")) -> None:
+        # The command changes the state of the objects, don't show the previous one. This also
+        # clears the caches of the other processes.
+        _query_cache.clear()
+        super().command(command, sitename)
+
+
 def _redacted_site_states_for_logging() -> dict[SiteId, dict[str, object]]:
     return {
         site_id: {
@@ -288,11 +455,12 @@ def _connect_multiple_sites(user: LoggedInUser) -> None:
     enabled_sites, disabled_sites = _get_enabled_and_disabled_sites(user)
     _set_initial_site_states(enabled_sites, disabled_sites)
 
-    g.live = MultiSiteConnection(
+    g.live = _CachingMultiSiteConnection(
         sites=enabled_sites,
         disabled_sites=disabled_sites,
         only_sites_postprocess=current_app().features.livestatus_only_sites_postprocess,
     )
+    g.live.set_response_timeout(_response_timeout(enabled_sites))
 
     # Fetch status of sites by querying the version of Nagios and livestatus
     # This may be cached by a proxy for up to the next configuration reload.
@@ -368,6 +536,18 @@ def _connect_multiple_sites(user: LoggedInUser) -> None:
     update_site_states_from_dead_sites()
 
 
+def _response_timeout(sites: SiteConfigurations) -> float | None:
+    """Wait for the sites to answer as long as the largest response timeout configured for them
+
+    Sites not answering within this time are considered dead, the rows of the others are shown.
+    There is no limit in case one of the sites has none.
+    """
+    timeouts = [site.get("response_timeout") for site in sites.values()]
+    if not timeouts or None in timeouts:
+        return None
+    return max(t for t in timeouts if t is not None)
+
+
 def _get_enabled_and_disabled_sites(
     user: LoggedInUser,
 ) -> tuple[SiteConfigurations, SiteConfigurations]:
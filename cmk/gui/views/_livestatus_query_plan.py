@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Let livestatus do as much of the work of a view as possible
+
+The filters of a view are always translated to livestatus headers as far as possible, the
+remaining filtering, the sorting and limiting is done in python after fetching the rows. Based
+on the view, the functions here decide which of these parts can be done by livestatus as well.
+"""
+
+from cmk.gui.data_source import ABCDataSource, query_livestatus, RowTableLivestatus
+from cmk.gui.view import View
+from cmk.gui.visuals.filter import Filter
+
+# Livestatus stops reading the history once the limit is reached, sorting or counting the rows
+# would need to read all of it.
+_HISTORY_TABLES = {"log"}
+
+
+def order_by_header(view: View, headers: str) -> str:
+    """Let livestatus sort the rows by the most significant sorter of the view
+
+    Only the row limit of the view is fetched from each site. Without sorting, these are
+    arbitrary rows of the site and not necessarily the first ones shown by the view. With the
+    rows sorted by livestatus, each site sends its first rows and sorting the rows of all sites
+    in python merges them, before the rows exceeding the limit are dropped.
+
+    Livestatus supports only one OrderBy: header. In case rows of a site have the same value in
+    its column, it is still undefined which of them are cut off at the limit."""
+    datasource = view.datasource
+    if view.row_limit is None or datasource.ignore_limit:
+        return ""  # All rows are fetched anyway
+
+    if not view.sorters or not _is_plain_livestatus_table(datasource, headers):
+        return ""
+
+    entry = view.sorters[0]
+    if entry.join_key or (order_by := entry.sorter.order_by) is None:
+        return ""
+
+    return "OrderBy: %s %s\n" % (
+        order_by.column,
+        "desc" if order_by.descending != entry.negate else "asc",
+    )
+
+
+def count_rows(view: View, all_active_filters: list[Filter], headers: str) -> int | None:
+    """Count the rows of a view with a livestatus Stats: query
+
+    This is only possible if livestatus does all the filtering. None is returned in case rows
+    would be filtered after fetching them."""
+    datasource = view.datasource
+    if (
+        not _is_plain_livestatus_table(datasource, headers)
+        or type(datasource).post_process is not ABCDataSource.post_process
+        or any(filter_.need_filter_table() for filter_ in all_active_filters)
+    ):
+        return None
+
+    assert isinstance(table := datasource.table, RowTableLivestatus)
+    # Counts all rows matching the filters
+    query = table.create_livestatus_query([], headers + datasource.add_headers + "StatsAnd: 0\n")
+    return sum(
+        count
+        for _site, count in query_livestatus(query, view.only_sites, None, datasource.auth_domain)
+    )
+
+
+def _is_plain_livestatus_table(datasource: ABCDataSource, headers: str) -> bool:
+    # Other tables, e.g. the ones of the event console, process the rows after fetching them and
+    # are not answered by the core itself. Merged rows and statistics are no table rows at all.
+    return (
+        type(table := datasource.table) is RowTableLivestatus
+        and table.table_name not in _HISTORY_TABLES
+        and datasource.merge_by is None
+        and "Stats:" not in headers + datasource.add_headers
+    )
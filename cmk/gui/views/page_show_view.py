@@ -9,8 +9,8 @@ from __future__ import annotations
 
 import functools
 import json
-from collections.abc import Callable, Iterable, Mapping, Sequence
-from itertools import chain
+from collections.abc import Callable, Iterable, Sequence
+from itertools import chain, groupby
 from typing import Any
 from urllib.parse import quote_plus
 
@@ -27,7 +27,7 @@ from cmk.gui.display_options import display_options
 from cmk.gui.exceptions import MKMissingDataError, MKUserError
 from cmk.gui.exporter import exporter_registry
 from cmk.gui.htmllib.html import html
-from cmk.gui.http import Request, request
+from cmk.gui.http import request
 from cmk.gui.i18n import _
 from cmk.gui.logged_in import user
 from cmk.gui.page_menu import make_external_link, PageMenuDropdown, PageMenuEntry, PageMenuTopic
@@ -54,8 +54,9 @@ from cmk.gui.visuals.filter import Filter
 from cmk.utils.livestatus_helpers.queries import Query
 
 from . import availability
+from ._livestatus_query_plan import count_rows, order_by_header
 from .row_post_processing import post_process_rows
-from .sorter import SorterEntry, SorterProtocol
+from .sorter import SorterEntry
 from .store import get_all_views, get_permitted_views
 
 
@@ -302,7 +303,6 @@ def _process_availability_view(view_renderer: ABCViewRenderer, *, debug: bool) -
     view.process_tracking.duration_view_render = view_render_tracker.duration
 
 
-# TODO: Use livestatus Stats: instead of fetching rows?
 def get_row_count(view: View) -> int:
     """Returns the number of rows shown by a view"""
 
@@ -318,6 +318,11 @@ def get_row_count(view: View) -> int:
             % (", ".join(view.missing_single_infos)),
         )
 
+    if (
+        count := count_rows(view, all_active_filters, _livestatus_headers(view, all_active_filters))
+    ) is not None:
+        return count
+
     _unfiltered_amount_of_rows, rows = _get_view_rows(view, all_active_filters, only_count=True)
     return len(rows)
 
@@ -340,7 +345,8 @@ def _get_view_rows(
         post_process_rows(view, all_active_filters, rows)
 
     # Sorting - use view sorters and URL supplied sorters
-    _sort_data(rows, view.sorters)
+    if not only_count:
+        _sort_data(rows, view.sorters)
 
     with CPUTracker(log.logger.debug) as filter_rows_tracker:
         # Apply non-Livestatus filters
@@ -363,6 +369,7 @@ def _fetch_rows_from_livestatus(view: View, all_active_filters: list[Filter]) ->
 
     Besides gathering the information from livestatus it performs livestatus table joining
     (e.g. Adding service row info to host rows (For join painters))"""
+    headers = _livestatus_headers(view, all_active_filters)
     # We test for limit here and not inside view.row_limit, because view.row_limit is used
     # for rendering limits.
     row_data: Rows | tuple[Rows, int] = view.datasource.table.query(
@@ -373,10 +380,7 @@ def _fetch_rows_from_livestatus(view: View, all_active_filters: list[Filter]) ->
             view,
         ),
         view.context,
-        (
-            "".join(get_livestatus_filter_headers(view.context, all_active_filters))
-            + view.spec.get("add_headers", "")
-        ),
+        headers + order_by_header(view, headers),
         view.only_sites,
         None if view.datasource.ignore_limit else view.row_limit,
         all_active_filters,
@@ -391,6 +395,12 @@ def _fetch_rows_from_livestatus(view: View, all_active_filters: list[Filter]) ->
     return rows, unfiltered_amount_of_rows
 
 
+def _livestatus_headers(view: View, all_active_filters: list[Filter]) -> str:
+    return "".join(get_livestatus_filter_headers(view.context, all_active_filters)) + view.spec.get(
+        "add_headers", ""
+    )
+
+
 def _show_view(
     view_renderer: ABCViewRenderer, unfiltered_amount_of_rows: int, rows: Rows, *, debug: bool
 ) -> None:
@@ -637,57 +647,53 @@ def _link_to_folder_by_path(path: str) -> str:
 
 
 def _sort_data(data: Rows, sorters: list[SorterEntry]) -> None:
-    """Sort data according to list of sorters."""
+    """Sort data according to list of sorters.
+
+    The rows are sorted by the keys of the sorters. Consecutive sorters sorting in the same
+    direction are combined into one sort pass. The passes are done from the least to the most
+    significant sorters, which results in the same order as a lexicographic comparison because
+    the sort is stable."""
     if not sorters:
         return
 
-    # Handle case where join columns are not present for all rows
-    def safe_compare(
-        compfunc: SorterProtocol,
-        row1: Row,
-        row2: Row,
-        parameters: Mapping[str, Any] | None,
-        config: Config,
-        req: Request,
-    ) -> int:
-        if row1 is None and row2 is None:
-            return 0
-        if row1 is None:
-            return -1
-        if row2 is None:
-            return 1
-        return compfunc(
-            row1,
-            row2,
-            parameters=parameters,
-            config=config,
-            request=req,
+    runs = [list(entries) for _negate, entries in groupby(sorters, key=lambda e: e.negate)]
+    for entries in reversed(runs):
+        key_functions = [_sort_key_function(entry) for entry in entries]
+        if len(key_functions) == 1:
+            data.sort(key=key_functions[0], reverse=entries[0].negate)
+        else:
+            data.sort(
+                key=lambda row: tuple(key_function(row) for key_function in key_functions),
+                reverse=entries[0].negate,
+            )
+
+
+def _sort_key_function(entry: SorterEntry) -> Callable[[Row], Any]:
+    sorter = entry.sorter
+    key_function: Callable[[Row], Any]
+    if sorter.key is not None:
+        sort_key = sorter.key
+        key_function = functools.partial(
+            sort_key, parameters=entry.parameters, config=active_config, request=request
+        )
+    else:
+        # Sorters without a key function are compared pairwise
+        compare = sorter.cmp
+        key_function = functools.cmp_to_key(
+            lambda r1, r2: compare(
+                r1, r2, parameters=entry.parameters, config=active_config, request=request
+            )
         )
 
-    def multisort(e1: Row, e2: Row) -> int:
-        for entry in sorters:
-            neg = -1 if entry.negate else 1
-
-            if entry.join_key:  # Sorter for join column, use JOIN info
-                c = neg * safe_compare(
-                    entry.sorter.cmp,
-                    e1["JOIN"].get(entry.join_key),
-                    e2["JOIN"].get(entry.join_key),
-                    entry.parameters,
-                    active_config,
-                    request,
-                )
-            else:
-                c = neg * entry.sorter.cmp(
-                    e1,
-                    e2,
-                    parameters=entry.parameters,
-                    config=active_config,
-                    request=request,
-                )
-
-            if c != 0:
-                return c
-        return 0  # equal
-
-    data.sort(key=functools.cmp_to_key(multisort))
+    if not entry.join_key:
+        return key_function
+
+    # Handle case where join columns are not present for all rows: They are sorted first
+    join_key = entry.join_key
+
+    def join_key_function(row: Row) -> tuple[int] | tuple[int, Any]:
+        if (joined_row := row["JOIN"].get(join_key)) is None:
+            return (0,)
+        return (1, key_function(joined_row))
+
+    return join_key_function
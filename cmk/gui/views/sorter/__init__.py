@@ -4,7 +4,14 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 
-from .base import ParameterizedSorter, Sorter, SorterEntry, SorterProtocol
+from .base import (
+    LivestatusOrderBy,
+    ParameterizedSorter,
+    Sorter,
+    SorterEntry,
+    SorterKeyProtocol,
+    SorterProtocol,
+)
 from .helpers import (
     cmp_custom_variable,
     cmp_insensitive_string,
@@ -26,8 +33,10 @@ from .registry import (
 from .sorters import register_sorters
 
 __all__ = [
+    "LivestatusOrderBy",
     "Sorter",
     "SorterProtocol",
+    "SorterKeyProtocol",
     "ParameterizedSorter",
     "SorterEntry",
     "SorterRegistry",
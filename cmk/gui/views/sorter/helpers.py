@@ -3,10 +3,13 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
-from typing import Literal
+from typing import Any, Literal
 
 from cmk.gui.num_split import cmp_num_split as _cmp_num_split
-from cmk.gui.type_defs import ColumnName, Row, SorterFunction
+from cmk.gui.num_split import key_num_split as _key_num_split
+from cmk.gui.type_defs import ColumnName, Row, SorterFunction, SorterKeyFunction
+
+from .base import LivestatusOrderBy
 
 
 def cmp_simple_number(column: ColumnName, r1: Row, r2: Row) -> int:
@@ -50,22 +53,84 @@ def cmp_ip_address(column: ColumnName, r1: Row, r2: Row) -> int:
 
 
 def compare_ips(ip1: str, ip2: str, ipv: Literal["ipv4", "ipv6"] = "ipv4") -> int:
-    def split_ip(ip: str) -> tuple:
-        if ipv == "ipv4":
-            try:
-                return tuple(int(part) for part in ip.split("."))
-            except ValueError:
-                # Make hostnames comparable with IPv4 address representations
-                return (255, 255, 255, 255, ip)
-
-        # ipv == "ipv6"
-        if not ip:
-            return ("ffff",) * 8
-        return tuple(part for part in ip.split(":"))
-
-    v1, v2 = split_ip(ip1), split_ip(ip2)
+    v1, v2 = key_ip(ip1, ipv), key_ip(ip2, ipv)
     return (v1 > v2) - (v1 < v2)
 
 
+def key_ip(ip: str, ipv: Literal["ipv4", "ipv6"] = "ipv4") -> tuple:
+    if ipv == "ipv4":
+        try:
+            return tuple(int(part) for part in ip.split("."))
+        except ValueError:
+            # Make hostnames comparable with IPv4 address representations
+            return (255, 255, 255, 255, ip)
+
+    # ipv == "ipv6"
+    if not ip:
+        return ("ffff",) * 8
+    return tuple(part for part in ip.split(":"))
+
+
+# The key functions sort the rows in the same order as the cmp functions above
+
+
+def key_simple_number(column: ColumnName, row: Row) -> Any:
+    return row[column]
+
+
+def key_reverse_simple_number(column: ColumnName, row: Row) -> Any:
+    return -row[column]
+
+
+def key_num_split(column: ColumnName, row: Row) -> tuple[int | str, ...]:
+    return _key_num_split(row[column].lower())
+
+
+def key_simple_string(column: ColumnName, row: Row) -> tuple[str, str]:
+    return key_insensitive_string(row.get(column, ""))
+
+
+def key_insensitive_string(v: str) -> tuple[str, str]:
+    # The case sensitive value forces a strict order, see cmp_insensitive_string
+    return v.lower(), v
+
+
+def key_string_list(column: ColumnName, row: Row) -> tuple[str, str]:
+    return key_insensitive_string("".join(row.get(column, [])))
+
+
+def key_ip_address(column: ColumnName, row: Row) -> tuple:
+    return key_ip(row.get(column, ""))
+
+
+# Key functions of the cmp functions, also for sorting in reverse order (if possible)
+_KEY_FUNCTIONS: dict[SorterFunction, tuple[SorterKeyFunction, SorterKeyFunction | None]] = {
+    cmp_simple_number: (key_simple_number, key_reverse_simple_number),
+    cmp_num_split: (key_num_split, None),
+    cmp_simple_string: (key_simple_string, None),
+    cmp_string_list: (key_string_list, None),
+    cmp_ip_address: (key_ip_address, None),
+}
+
+
+def key_function_of(func: SorterFunction, reverse: bool = False) -> SorterKeyFunction | None:
+    """Return the key function sorting like the cmp function func, if there is one"""
+    if (key_functions := _KEY_FUNCTIONS.get(func)) is None:
+        return None
+    return key_functions[1] if reverse else key_functions[0]
+
+
+def livestatus_order_by_of(
+    func: SorterFunction, column: ColumnName, reverse: bool = False
+) -> LivestatusOrderBy | None:
+    """Return the livestatus sort order of the cmp function func, if livestatus sorts the same
+
+    Livestatus compares the values of numeric columns numerically and the values of string
+    columns byte wise, which is the same order as the code points of the UTF-8 encoded strings."""
+    if func is not cmp_simple_number:
+        return None
+    return LivestatusOrderBy(column, descending=reverse)
+
+
 def _get_custom_var(row: Row, key: str) -> str:
     return row["custom_variables"].get(key, "")
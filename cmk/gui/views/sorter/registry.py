@@ -15,9 +15,10 @@ from cmk.gui.painter.v0.helpers import RenderLink
 from cmk.gui.painter.v0.host_tag_painters import HashableTagGroups
 from cmk.gui.painter_options import PainterOptions
 from cmk.gui.theme.current_theme import theme
-from cmk.gui.type_defs import ColumnName, PainterName, SorterFunction
+from cmk.gui.type_defs import ColumnName, PainterName, SorterFunction, SorterKeyFunction
 
-from .base import Sorter
+from .base import Sorter, SorterKeyProtocol
+from .helpers import key_function_of, livestatus_order_by_of
 from .host_tag_sorters import host_tag_config_based_sorters
 
 
@@ -48,17 +49,36 @@ def register_sorter(ident: str, spec: dict[str, Any]) -> None:
     )
 
 
-def declare_simple_sorter(name: str, title: str, column: ColumnName, func: SorterFunction) -> None:
+def declare_simple_sorter(
+    name: str,
+    title: str,
+    column: ColumnName,
+    func: SorterFunction,
+    key_func: SorterKeyFunction | None = None,
+) -> None:
+    """Declare a sorter for one column
+
+    The key function is optional for the cmp functions of the helpers module."""
     sorter_registry.register(
         Sorter(
             ident=name,
             title=title,
             columns=[column],
             sort_function=lambda r1, r2, **_kwargs: func(column, r1, r2),
+            sort_key=_column_sort_key(column, key_func or key_function_of(func)),
+            order_by=livestatus_order_by_of(func, column),
         )
     )
 
 
+def _column_sort_key(
+    column: ColumnName, key_func: SorterKeyFunction | None
+) -> SorterKeyProtocol | None:
+    if key_func is None:
+        return None
+    return lambda row, **_kwargs: key_func(column, row)
+
+
 def declare_1to1_sorter(
     painter_name: PainterName, func: SorterFunction, col_num: int = 0, reverse: bool = False
 ) -> PainterName:
@@ -80,6 +100,8 @@ def declare_1to1_sorter(
                 if reverse
                 else lambda r1, r2, **_kwargs: func(painter.columns[col_num], r1, r2)
             ),
+            sort_key=_column_sort_key(painter.columns[col_num], key_function_of(func, reverse)),
+            order_by=livestatus_order_by_of(func, painter.columns[col_num], reverse),
         )
     )
 
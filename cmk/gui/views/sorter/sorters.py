@@ -28,6 +28,8 @@ from .helpers import (
     cmp_simple_string,
     cmp_string_list,
     compare_ips,
+    key_insensitive_string,
+    key_num_split,
 )
 from .registry import declare_1to1_sorter, declare_simple_sorter, SorterRegistry
 
@@ -59,7 +61,9 @@ def register_sorters(registry: SorterRegistry) -> None:
     registry.register(SorterNumProblems)
     registry.register(SorterHostDockerNode)
 
-    declare_simple_sorter("svcdescr", _("Service name"), "service_description", cmp_service_name)
+    declare_simple_sorter(
+        "svcdescr", _("Service name"), "service_description", cmp_service_name, key_service_name
+    )
     declare_simple_sorter(
         "svcdispname",
         _("Service alternative display name"),
@@ -286,11 +290,22 @@ def _sort_service_state(
     return (cmp_state_equiv(r1) > cmp_state_equiv(r2)) - (cmp_state_equiv(r1) < cmp_state_equiv(r2))
 
 
+def _key_service_state(
+    row: Row,
+    *,
+    parameters: Mapping[str, Any] | None,
+    config: Config,
+    request: Request,
+) -> int:
+    return cmp_state_equiv(row)
+
+
 SorterSvcstate = Sorter(
     ident="svcstate",
     title=_l("Service state"),
     columns=["service_state", "service_has_been_checked"],
     sort_function=_sort_service_state,
+    sort_key=_key_service_state,
 )
 
 
@@ -307,11 +322,22 @@ def _sort_host_state(
     )
 
 
+def _key_host_state(
+    row: Row,
+    *,
+    parameters: Mapping[str, Any] | None,
+    config: Config,
+    request: Request,
+) -> int:
+    return cmp_host_state_equiv(row)
+
+
 SorterHoststate = Sorter(
     ident="hoststate",
     title=_l("Host state"),
     columns=["host_state", "host_has_been_checked"],
     sort_function=_sort_host_state,
+    sort_key=_key_host_state,
 )
 
 
@@ -328,11 +354,22 @@ def _sort_site_host(
     )
 
 
+def _key_site_host(
+    row: Row,
+    *,
+    parameters: Mapping[str, Any] | None,
+    config: Config,
+    request: Request,
+) -> tuple[str, tuple[int | str, ...]]:
+    return row["site"], key_num_split("host_name", row)
+
+
 SorterSiteHost = Sorter(
     ident="site_host",
     title=_l("Host site and name"),
     columns=["site", "host_name"],
     sort_function=_sort_site_host,
+    sort_key=_key_site_host,
 )
 
 
@@ -347,11 +384,22 @@ def _sort_host_name(
     return cmp_num_split("host_name", r1, r2)
 
 
+def _key_host_name(
+    row: Row,
+    *,
+    parameters: Mapping[str, Any] | None,
+    config: Config,
+    request: Request,
+) -> tuple[int | str, ...]:
+    return key_num_split("host_name", row)
+
+
 SorterHostName = Sorter(
     ident="host_name",
     title=_l("Host name"),
     columns=["host_name"],
     sort_function=_sort_host_name,
+    sort_key=_key_host_name,
 )
 
 
@@ -368,11 +416,22 @@ def _sort_site_alias(
     )
 
 
+def _key_site_alias(
+    row: Row,
+    *,
+    parameters: Mapping[str, Any] | None,
+    config: Config,
+    request: Request,
+) -> str:
+    return config.sites[row["site"]]["alias"]
+
+
 SorterSitealias = Sorter(
     ident="sitealias",
     title=_l("Site Alias"),
     columns=["site"],
     sort_function=_sort_site_alias,
+    sort_key=_key_site_alias,
 )
 
 
@@ -390,11 +449,23 @@ def _sort_tags(
     return (tag_groups_1 > tag_groups_2) - (tag_groups_1 < tag_groups_2)
 
 
+def _key_tags(
+    row: Row,
+    *,
+    parameters: Mapping[str, Any] | None,
+    config: Config,
+    request: Request,
+    object_type: str,
+) -> list[tuple[str, str]]:
+    return sorted(get_tag_groups(row, object_type).items())
+
+
 SorterHostTags = Sorter(
     ident="host",
     title=_l("Host Tags"),
     columns=["host_tags"],
     sort_function=partial(_sort_tags, object_type="host"),
+    sort_key=partial(_key_tags, object_type="host"),
 )
 
 SorterServiceTags = Sorter(
@@ -402,6 +473,7 @@ SorterServiceTags = Sorter(
     title=_l("Service Tags"),
     columns=["service_tags"],
     sort_function=partial(_sort_tags, object_type="service"),
+    sort_key=partial(_key_tags, object_type="service"),
 )
 
 
@@ -419,11 +491,23 @@ def _sort_labels(
     return (labels_1 > labels_2) - (labels_1 < labels_2)
 
 
+def _key_labels(
+    row: Row,
+    *,
+    parameters: Mapping[str, Any] | None,
+    config: Config,
+    request: Request,
+    object_type: str,
+) -> list[tuple[str, str]]:
+    return sorted(get_labels(row, object_type).items())
+
+
 SorterHostLabels = Sorter(
     ident="host_labels",
     title=_l("Host labels"),
     columns=["host_labels"],
     sort_function=partial(_sort_labels, object_type="host"),
+    sort_key=partial(_key_labels, object_type="host"),
 )
 
 
@@ -432,6 +516,7 @@ SorterServiceLabels = Sorter(
     title=_l("Service labels"),
     columns=["service_labels"],
     sort_function=partial(_sort_labels, object_type="service"),
+    sort_key=partial(_key_labels, object_type="service"),
 )
 
 
@@ -441,6 +526,10 @@ def cmp_service_name(column, r1, r2):
     ) or cmp_num_split(column, r1, r2)
 
 
+def key_service_name(column: str, row: Row) -> tuple[int, tuple[int | str, ...]]:
+    return utils.cmp_service_name_equiv(row[column]), key_num_split(column, row)
+
+
 def _sort_service_perf_val(
     r1: Row,
     r2: Row,
@@ -455,11 +544,23 @@ def _sort_service_perf_val(
     return (v1 > v2) - (v1 < v2)
 
 
+def _key_service_perf_val(
+    row: Row,
+    *,
+    parameters: Mapping[str, Any] | None,
+    config: Config,
+    request: Request,
+    num: int,
+) -> float:
+    return utils.savefloat(get_perfdata_nth_value(row, num - 1, True))
+
+
 SorterSvcPerfVal01 = Sorter(
     ident="svc_perf_val01",
     title=_("Service performance data - value number 01"),
     columns=["service_perf_data"],
     sort_function=partial(_sort_service_perf_val, num=1),
+    sort_key=partial(_key_service_perf_val, num=1),
 )
 
 SorterSvcPerfVal02 = Sorter(
@@ -467,6 +568,7 @@ SorterSvcPerfVal02 = Sorter(
     title=_("Service performance data - value number 02"),
     columns=["service_perf_data"],
     sort_function=partial(_sort_service_perf_val, num=2),
+    sort_key=partial(_key_service_perf_val, num=2),
 )
 
 SorterSvcPerfVal03 = Sorter(
@@ -474,6 +576,7 @@ SorterSvcPerfVal03 = Sorter(
     title=_("Service performance data - value number 03"),
     columns=["service_perf_data"],
     sort_function=partial(_sort_service_perf_val, num=3),
+    sort_key=partial(_key_service_perf_val, num=3),
 )
 
 
@@ -482,6 +585,7 @@ SorterSvcPerfVal04 = Sorter(
     title=_("Service performance data - value number 04"),
     columns=["service_perf_data"],
     sort_function=partial(_sort_service_perf_val, num=4),
+    sort_key=partial(_key_service_perf_val, num=4),
 )
 
 SorterSvcPerfVal05 = Sorter(
@@ -489,6 +593,7 @@ SorterSvcPerfVal05 = Sorter(
     title=_("Service performance data - value number 05"),
     columns=["service_perf_data"],
     sort_function=partial(_sort_service_perf_val, num=5),
+    sort_key=partial(_key_service_perf_val, num=5),
 )
 
 
@@ -497,6 +602,7 @@ SorterSvcPerfVal06 = Sorter(
     title=_("Service performance data - value number 06"),
     columns=["service_perf_data"],
     sort_function=partial(_sort_service_perf_val, num=6),
+    sort_key=partial(_key_service_perf_val, num=6),
 )
 
 SorterSvcPerfVal07 = Sorter(
@@ -504,6 +610,7 @@ SorterSvcPerfVal07 = Sorter(
     title=_("Service performance data - value number 07"),
     columns=["service_perf_data"],
     sort_function=partial(_sort_service_perf_val, num=7),
+    sort_key=partial(_key_service_perf_val, num=7),
 )
 
 SorterSvcPerfVal08 = Sorter(
@@ -511,6 +618,7 @@ SorterSvcPerfVal08 = Sorter(
     title=_("Service performance data - value number 08"),
     columns=["service_perf_data"],
     sort_function=partial(_sort_service_perf_val, num=8),
+    sort_key=partial(_key_service_perf_val, num=8),
 )
 
 SorterSvcPerfVal09 = Sorter(
@@ -518,6 +626,7 @@ SorterSvcPerfVal09 = Sorter(
     title=_("Service performance data - value number 09"),
     columns=["service_perf_data"],
     sort_function=partial(_sort_service_perf_val, num=9),
+    sort_key=partial(_key_service_perf_val, num=9),
 )
 
 SorterSvcPerfVal10 = Sorter(
@@ -525,6 +634,7 @@ SorterSvcPerfVal10 = Sorter(
     title=_("Service performance data - value number 10"),
     columns=["service_perf_data"],
     sort_function=partial(_sort_service_perf_val, num=10),
+    sort_key=partial(_key_service_perf_val, num=10),
 )
 
 
@@ -538,15 +648,28 @@ def _sort_host_custom_variable(
 ) -> int:
     assert parameters is not None
     variable_name = parameters["ident"].upper()
+    return cmp_insensitive_string(
+        _get_host_custom_variable(r1, variable_name), _get_host_custom_variable(r2, variable_name)
+    )
+
+
+def _key_host_custom_variable(
+    row: Row,
+    *,
+    parameters: Mapping[str, Any] | None,
+    config: Config,
+    request: Request,
+) -> tuple[str, str]:
+    assert parameters is not None
+    return key_insensitive_string(_get_host_custom_variable(row, parameters["ident"].upper()))
 
-    def _get_value(row: Row) -> str:
-        try:
-            index = row["host_custom_variable_names"].index(variable_name)
-        except ValueError:
-            return ""
-        return row["host_custom_variable_values"][index]
 
-    return cmp_insensitive_string(_get_value(r1), _get_value(r2))
+def _get_host_custom_variable(row: Row, variable_name: str) -> str:
+    try:
+        index = row["host_custom_variable_names"].index(variable_name)
+    except ValueError:
+        return ""
+    return row["host_custom_variable_values"][index]
 
 
 def _sort_host_custom_variable_parameter_valuespec(
@@ -577,6 +700,7 @@ SorterCustomHostVariable = ParameterizedSorter(
     columns=["host_custom_variable_names", "host_custom_variable_values"],
     sort_function=_sort_host_custom_variable,
     parameter_valuespec=_sort_host_custom_variable_parameter_valuespec,
+    sort_key=_key_host_custom_variable,
 )
 
 
@@ -644,11 +768,22 @@ def _sort_num_problems(
     )
 
 
+def _key_num_problems(
+    row: Row,
+    *,
+    parameters: Mapping[str, Any] | None,
+    config: Config,
+    request: Request,
+) -> int:
+    return row["host_num_services"] - row["host_num_services_ok"] - row["host_num_services_pending"]
+
+
 SorterNumProblems = Sorter(
     ident="num_problems",
     title=_l("Number of problems"),
     columns=["host_num_services", "host_num_services_ok", "host_num_services_pending"],
     sort_function=_sort_num_problems,
+    sort_key=_key_num_problems,
 )
 
 
@@ -29,6 +29,8 @@ from .components import Checkbox, DynamicDropdown, FilterComponent, HorizontalGr
 class AjaxDropdownFilter(Filter):
     "Select from dropdown with dynamic option query"
 
+    applies_query_filter_table = True
+
     def __init__(
         self,
         *,
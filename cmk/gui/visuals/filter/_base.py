@@ -6,7 +6,7 @@
 import abc
 import re
 from collections.abc import Callable, Iterable
-from typing import Literal
+from typing import ClassVar, Literal
 
 from cmk.gui import query_filters
 from cmk.gui.htmllib.html import html
@@ -39,6 +39,9 @@ from .components import (
 class Filter(abc.ABC):
     """Base class for all filters"""
 
+    # Set by the filters whose filter_table only applies the filter_table of their query filter
+    applies_query_filter_table: ClassVar[bool] = False
+
     def __init__(
         self,
         *,
@@ -123,6 +126,21 @@ class Filter(abc.ABC):
         """post-Livestatus filtering (e.g. for BI aggregations)"""
         return rows
 
+    def need_filter_table(self) -> bool:
+        """Whether filter_table may remove rows fetched from livestatus
+
+        This is the case if the filter overrides filter_table. The filters which only apply the
+        filter_table of their query filter tell so by applies_query_filter_table in the class
+        defining filter_table, they need it if the query filter does."""
+        owner = next(cls for cls in type(self).__mro__ if "filter_table" in vars(cls))
+        if owner is Filter:
+            return False
+        if vars(owner).get("applies_query_filter_table", False) and isinstance(
+            query_filter := getattr(self, "query_filter", None), query_filters.Query
+        ):
+            return query_filter.need_filter_table()
+        return True
+
     def request_vars_from_row(self, row: Row) -> FilterHTTPVariables:
         """return filter request variables built from the given row"""
         return {}
@@ -143,6 +161,8 @@ class Filter(abc.ABC):
 
 
 class FilterOption(Filter):
+    applies_query_filter_table = True
+
     def __init__(
         self,
         *,
@@ -195,6 +215,8 @@ def recover_pre_2_1_range_filter_request_vars(
 
 
 class FilterNumberRange(Filter):  # type is int
+    applies_query_filter_table = True
+
     def __init__(
         self,
         *,
@@ -265,6 +287,8 @@ class FilterNumberRange(Filter):  # type is int
 class FilterTime(Filter):
     """Filter for setting time ranges, e.g. on last_state_change and last_check"""
 
+    applies_query_filter_table = True
+
     def __init__(
         self,
         *,
@@ -342,6 +366,8 @@ def checkbox_component(htmlvar: str, value: FilterHTTPVariables, label: str) ->
 
 
 class InputTextFilter(Filter):
+    applies_query_filter_table = True
+
     def __init__(
         self,
         *,
@@ -398,6 +424,8 @@ class InputTextFilter(Filter):
 
 
 class CheckboxRowFilter(Filter):
+    applies_query_filter_table = True
+
     def __init__(
         self,
         *,
@@ -133,6 +133,7 @@ def register(
     config_variable_registry.register(ConfigVariableDebug)
     config_variable_registry.register(ConfigVariableGUIProfile)
     config_variable_registry.register(ConfigVariableDebugLivestatusQueries)
+    config_variable_registry.register(ConfigVariableLivestatusQueryCacheTTL)
     config_variable_registry.register(ConfigVariableSelectionLivetime)
     config_variable_registry.register(ConfigVariableShowLivestatusErrors)
     config_variable_registry.register(ConfigVariableEnableSounds)
@@ -559,6 +560,27 @@ ConfigVariableDebugLivestatusQueries = ConfigVariable(
     ),
 )
 
+ConfigVariableLivestatusQueryCacheTTL = ConfigVariable(
+    group=ConfigVariableGroupUserInterface,
+    domain=ConfigDomainGUI,
+    ident="livestatus_query_cache_ttl",
+    valuespec=lambda: Age(
+        title=_("Livestatus query cache"),
+        help=_(
+            "Dashboards and snap-ins often send the same livestatus queries several times "
+            "within a short time. With this option the results of these queries are kept "
+            "for the configured time and reused for identical queries. The results are kept per "
+            "user, only users with the permission to see all objects share them. Results are "
+            "not kept for longer than that, so the pages might show a state that is outdated by "
+            "up to this time. Sending a command clears the cache of all GUI processes. Set this "
+            "to zero to disable the cache."
+        ),
+        minvalue=0,
+        maxvalue=300,
+        display=["minutes", "seconds"],
+    ),
+)
+
 ConfigVariableSelectionLivetime = ConfigVariable(
     group=ConfigVariableGroupUserInterface,
     domain=ConfigDomainGUI,
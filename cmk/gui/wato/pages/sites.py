@@ -86,6 +86,7 @@ from cmk.gui.valuespec import (
     Integer,
     MonitoredHostname,
     NetworkPort,
+    Optional,
     TextInput,
     Tuple,
     ValueSpec,
@@ -437,6 +438,28 @@ class ModeEditSite(WatoMode):
                     ),
                 ),
             ),
+            (
+                "response_timeout",
+                Optional(
+                    Integer(
+                        size=2,
+                        unit=_("Seconds"),
+                        minvalue=1,
+                        default_value=60,
+                    ),
+                    title=_("Response timeout"),
+                    label=_("Limit the time to wait for the response"),
+                    none_label=_("No limit"),
+                    help=_(
+                        "This sets the time that the GUI waits for the site to answer a "
+                        "query once the query has been sent. Sites not answering within "
+                        "this time are considered to be unreachable and the data of the other "
+                        "sites is shown. Choose a value larger than the time your slowest "
+                        "queries take, otherwise their results are missing. By default the GUI "
+                        "waits without a limit."
+                    ),
+                ),
+            ),
             (
                 "persist",
                 Checkbox(
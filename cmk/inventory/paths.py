@@ -89,6 +89,7 @@ class Paths:
         self.status_data_dir = omd_root / "tmp/check_mk/status_data"
         self.archive_dir = omd_root / "var/check_mk/inventory_archive"
         self.delta_cache_dir = omd_root / "var/check_mk/inventory_delta_cache"
+        self.delta_log_dir = omd_root / "var/check_mk/inventory_delta_log"
         self.auto_dir = omd_root / "var/check_mk/autoinventory"
 
     @property
@@ -137,3 +138,6 @@ class Paths:
             path=self.delta_cache_host(host_name) / f"{previous_name}_{current}.json",
             legacy=self.delta_cache_host(host_name) / f"{previous_name}_{current}",
         )
+
+    def delta_log(self, host_name: HostName) -> Path:
+        return self.delta_log_dir / f"{host_name}.log"
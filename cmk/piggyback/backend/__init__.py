@@ -8,6 +8,8 @@ from ._config import (
     parse_flattened_piggyback_time_settings as parse_flattened_piggyback_time_settings,
 )
 from ._config import PiggybackTimeSettings as PiggybackTimeSettings
+from ._index import check_piggyback_index as check_piggyback_index
+from ._index import rebuild_piggyback_index as rebuild_piggyback_index
 from ._storage import cleanup_piggyback_files as cleanup_piggyback_files
 from ._storage import get_messages_for as get_messages_for
 from ._storage import get_piggybacked_host_with_sources as get_piggybacked_host_with_sources
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Index of the stored piggyback payloads
+
+Answering "which payloads are there for this host / from this source" by listing
+the payload directories and stat'ing every file is expensive for tens of thousands
+of piggybacked hosts. Instead, every source host has an index file
+
+    tmp/check_mk/piggyback_index/SOURCE
+
+mapping its piggybacked hosts to mtime and size of their payload files. The index
+files are maintained incrementally by the functions storing and removing payloads
+(under the lock of the index file) and replaced atomically. Readers keep the
+parsed index files in memory and reload only the ones that have been replaced.
+
+Looking up the payloads of one piggybacked host should not touch the index files
+of all sources, so every piggybacked host has a file
+
+    tmp/check_mk/piggyback_index/.hosts/PIGGYBACKED
+
+listing the sources which have a payload for it. It only changes when a source
+starts or stops sending data for the host. Sources are added to it before they are
+added to the index of the source and removed after they have been removed from it,
+so it may list too many sources for a moment, but never too few.
+
+If the index directory does not exist (e.g. after an update or a restore of the
+tmpfs), it is built from the payload files.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
+
+from cmk.ccc import store
+from cmk.ccc.hostaddress import HostName
+
+from ._paths import index_dir, payload_dir
+
+logger = logging.getLogger(__name__)
+
+
+class PayloadInfo(NamedTuple):
+    mtime: int
+    size: int
+
+
+type SourceIndex = Mapping[HostName, PayloadInfo]
+
+_HOSTS_DIR = ".hosts"
+
+# Parsed index files by source, together with the stat data they have been parsed from.
+# Entries of index files which have been removed are dropped when noticed.
+_cache: dict[Path, tuple[tuple[int, int, int], SourceIndex]] = {}
+
+
+def _index_file_path(source: HostName, omd_root: Path) -> Path:
+    return index_dir(omd_root) / str(source)
+
+
+def _hosts_file_path(piggybacked: HostName, omd_root: Path) -> Path:
+    return index_dir(omd_root) / _HOSTS_DIR / str(piggybacked)
+
+
+def _serialize(source_index: SourceIndex) -> str:
+    return json.dumps({str(h): list(info) for h, info in source_index.items()})
+
+
+def _deserialize(raw: str) -> SourceIndex:
+    try:
+        return {HostName(h): PayloadInfo(*info) for h, info in json.loads(raw).items()}
+    except ValueError:
+        # An empty file is created when an index file is locked before it is written
+        return {}
+
+
+def _serialize_sources(sources: Iterable[HostName]) -> str:
+    return json.dumps(sorted(str(s) for s in sources))
+
+
+def _deserialize_sources(raw: str) -> set[HostName]:
+    try:
+        return {HostName(s) for s in json.loads(raw)}
+    except ValueError:
+        return set()
+
+
+def load_index(omd_root: Path) -> Mapping[HostName, SourceIndex]:
+    """The piggybacked hosts and their payloads by source host"""
+    ensure_index(omd_root)
+    paths = _index_files(omd_root)
+    # Forget about the sources which are gone
+    for path in _cache.keys() - set(paths):
+        if path.parent == index_dir(omd_root):
+            del _cache[path]
+    return {
+        HostName(path.name): source_index
+        for path in paths
+        if (source_index := _load_source_index_file(path))
+    }
+
+
+def load_source_index(omd_root: Path, source: HostName) -> SourceIndex:
+    """The piggybacked hosts and their payloads of one source host"""
+    ensure_index(omd_root)
+    return _load_source_index_file(_index_file_path(source, omd_root))
+
+
+def load_piggybacked_index(omd_root: Path, piggybacked: HostName) -> Mapping[HostName, PayloadInfo]:
+    """The payloads of one piggybacked host by source host
+
+    Only the index files of the sources listed for the host are read."""
+    ensure_index(omd_root)
+    try:
+        sources = _deserialize_sources(_hosts_file_path(piggybacked, omd_root).read_text())
+    except FileNotFoundError:
+        return {}
+    return {
+        source: payload_info
+        for source in sorted(sources)
+        if (
+            payload_info := _load_source_index_file(_index_file_path(source, omd_root)).get(
+                piggybacked
+            )
+        )
+        is not None
+    }
+
+
+def _load_source_index_file(path: Path) -> SourceIndex:
+    try:
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+        if (cached := _cache.get(path)) is None or cached[0] != signature:
+            cached = _cache[path] = (signature, _deserialize(path.read_text()))
+    except FileNotFoundError:
+        _cache.pop(path, None)
+        return {}
+    return cached[1]
+
+
+def _index_files(omd_root: Path) -> Sequence[Path]:
+    try:
+        return sorted(f for f in index_dir(omd_root).iterdir() if not f.name.startswith("."))
+    except FileNotFoundError:
+        return []
+
+
+@contextmanager
+def locked_source_index(omd_root: Path, source: HostName) -> Iterator[dict[HostName, PayloadInfo]]:
+    """Lock the index of the source, changes to the yielded index are saved"""
+    ensure_index(omd_root)
+    path = _index_file_path(source, omd_root)
+    with store.locked(path):
+        old_hosts = set(old_index := _deserialize(store.load_text_from_file(path)))
+        source_index = dict(old_index)
+        yield source_index
+        for piggybacked in source_index.keys() - old_hosts:
+            _update_hosts_file(omd_root, piggybacked, add=source)
+        _save_source_index(path, source_index)
+        for piggybacked in old_hosts - source_index.keys():
+            _update_hosts_file(omd_root, piggybacked, remove=source)
+
+
+def _update_hosts_file(
+    omd_root: Path,
+    piggybacked: HostName,
+    *,
+    add: HostName | None = None,
+    remove: HostName | None = None,
+) -> None:
+    path = _hosts_file_path(piggybacked, omd_root)
+    path.parent.mkdir(mode=0o770, exist_ok=True)
+    with store.locked(path):
+        sources = _deserialize_sources(store.load_text_from_file(path))
+        if add is not None:
+            sources.add(add)
+        if remove is not None:
+            sources.discard(remove)
+        if sources:
+            store.save_text_to_file(path, _serialize_sources(sources))
+        else:
+            path.unlink(missing_ok=True)
+
+
+def update_index(
+    omd_root: Path,
+    source: HostName,
+    *,
+    stored: Mapping[HostName, PayloadInfo] | None = None,
+    removed: Mapping[HostName, int] | None = None,
+) -> None:
+    """Record stored payloads and removed payloads (given by their mtime) of a source
+
+    A payload is only removed from the index if it has not been updated meanwhile.
+    """
+    with locked_source_index(omd_root, source) as source_index:
+        source_index.update(stored or {})
+        for piggybacked, mtime in (removed or {}).items():
+            if (info := source_index.get(piggybacked)) is not None and info.mtime <= mtime:
+                del source_index[piggybacked]
+
+
+def _save_source_index(path: Path, source_index: SourceIndex) -> None:
+    if source_index:
+        store.save_text_to_file(path, _serialize(source_index))
+    else:
+        path.unlink(missing_ok=True)
+
+
+def ensure_index(omd_root: Path) -> None:
+    if not index_dir(omd_root).exists():
+        _build_index_dir(omd_root)
+
+
+def rebuild_piggyback_index(omd_root: Path) -> None:
+    """Build the index from scratch from the payload files"""
+    shutil.rmtree(index_dir(omd_root), ignore_errors=True)
+    _build_index_dir(omd_root)
+
+
+def _build_index_dir(omd_root: Path) -> None:
+    """Build the index in a temporary directory and move it into place"""
+    logger.debug("Building the piggyback index")
+    index_dir(omd_root).parent.mkdir(mode=0o770, parents=True, exist_ok=True)
+    tmp_dir = Path(
+        tempfile.mkdtemp(dir=index_dir(omd_root).parent, prefix=f".{index_dir(omd_root).name}")
+    )
+    try:
+        sources_by_host: dict[HostName, list[HostName]] = {}
+        for source, source_index in _scan_payloads(omd_root).items():
+            (tmp_dir / str(source)).write_text(_serialize(source_index))
+            for piggybacked in source_index:
+                sources_by_host.setdefault(piggybacked, []).append(source)
+        (tmp_dir / _HOSTS_DIR).mkdir(mode=0o770)
+        for piggybacked, sources in sources_by_host.items():
+            (tmp_dir / _HOSTS_DIR / str(piggybacked)).write_text(_serialize_sources(sources))
+        tmp_dir.chmod(0o770)
+        os.rename(tmp_dir, index_dir(omd_root))
+    except OSError:
+        # Built by someone else meanwhile
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not index_dir(omd_root).exists():
+            raise
+
+
+def _scan_payloads(omd_root: Path) -> Mapping[HostName, SourceIndex]:
+    scanned: dict[HostName, dict[HostName, PayloadInfo]] = {}
+    for piggybacked_host_folder in _visible_entries(payload_dir(omd_root)):
+        for payload_file in _visible_entries(piggybacked_host_folder):
+            try:
+                stat = payload_file.stat()
+            except FileNotFoundError:
+                continue
+            scanned.setdefault(HostName(payload_file.name), {})[
+                HostName(piggybacked_host_folder.name)
+            ] = PayloadInfo(int(stat.st_mtime), stat.st_size)
+    return scanned
+
+
+def _visible_entries(path: Path) -> Iterable[Path]:
+    try:
+        return [f for f in path.iterdir() if not f.name.startswith(".")]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def check_piggyback_index(omd_root: Path) -> Sequence[str]:
+    """Compare the index with the payload files, return the differences found"""
+    index = load_index(omd_root)
+    scanned = _scan_payloads(omd_root)
+    problems = []
+    for source in sorted({*index, *scanned}):
+        indexed_payloads = index.get(source, {})
+        scanned_payloads = scanned.get(source, {})
+        for piggybacked in sorted({*indexed_payloads, *scanned_payloads}):
+            if (indexed := indexed_payloads.get(piggybacked)) is None:
+                problems.append(f"{piggybacked}/{source}: Not in the index")
+            elif (payload := scanned_payloads.get(piggybacked)) is None:
+                problems.append(f"{piggybacked}/{source}: No payload")
+            elif indexed != payload:
+                problems.append(
+                    f"{piggybacked}/{source}: Index has mtime {indexed.mtime}, size"
+                    f" {indexed.size}, payload has mtime {payload.mtime}, size {payload.size}"
+                )
+
+    for piggybacked in sorted({h for source_index in index.values() for h in source_index}):
+        if set(load_piggybacked_index(omd_root, piggybacked)) != {
+            source for source, source_index in index.items() if piggybacked in source_index
+        }:
+            problems.append(f"{piggybacked}: Sources of the host are not indexed")
+    return problems
@@ -18,8 +18,16 @@ from typing import Self
 
 from cmk.ccc.hostaddress import HostAddress, HostName
 
+from ._index import (
+    load_index,
+    load_piggybacked_index,
+    load_source_index,
+    locked_source_index,
+    PayloadInfo,
+    update_index,
+)
 from ._inotify import Event, INotify, Masks
-from ._paths import payload_dir, source_status_dir
+from ._paths import payload_dir, payload_tmp_dir, source_status_dir
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +75,9 @@ class PiggybackMessage:
 # "source_hostname":
 # - Path(tmp/check_mk/piggyback/HOST/SOURCE).name
 # - Path(tmp/check_mk/piggyback_sources/SOURCE).name
+#
+# "source_index_file":
+# - tmp/check_mk/piggyback_index/SOURCE (see _index.py)
 
 
 def watch_new_messages(omd_root: Path) -> Iterator[PiggybackMessage]:
@@ -83,8 +94,11 @@ def watch_new_messages(omd_root: Path) -> Iterator[PiggybackMessage]:
         if event.watchee == watch_for_new_piggybacked_hosts:
             if event.type & Masks.CREATE:
                 inotify.add_watch(event.watchee.path / event.name, Masks.MOVED_TO)
-                # Handle all files already in the folder (we rather have duplicates than missing files)
-                yield from get_messages_for(HostAddress(event.name), omd_root)
+                # Handle all files already in the folder (we rather have duplicates than missing files).
+                # They may not be indexed yet, so look at the folder itself.
+                for payload_file in _files_in(event.watchee.path / event.name):
+                    if message := _make_message_from_file(payload_file, omd_root):
+                        yield message
             continue
         if event.watchee == watch_for_deleted_status_files:
             if event.type & Masks.DELETE:
@@ -106,10 +120,13 @@ def watch_new_messages(omd_root: Path) -> Iterator[PiggybackMessage]:
 
 
 def _make_message_from_event(event: Event, omd_root: Path) -> PiggybackMessage | None:
-    source = HostAddress(event.name)
-    piggybacked = HostName(event.watchee.path.name)
+    return _make_message_from_file(event.watchee.path / event.name, omd_root)
+
+
+def _make_message_from_file(payload_file_path: Path, omd_root: Path) -> PiggybackMessage | None:
+    source = HostAddress(payload_file_path.name)
+    piggybacked = HostName(payload_file_path.parent.name)
     status_file_path = _get_source_status_file_path(source, omd_root)
-    payload_file_path = event.watchee.path / event.name
 
     if (mtime := _get_mtime(payload_file_path)) is None:
         return None
@@ -129,49 +146,64 @@ def get_messages_for(
     piggybacked_hostname: HostAddress, omd_root: Path
 ) -> Sequence[PiggybackMessage]:
     """Returns piggyback messages for the given host"""
-    piggyback_meta_data = _get_payload_meta_data(piggybacked_hostname, omd_root)
-    logger.debug("%s piggyback files for '%s'.", len(piggyback_meta_data), piggybacked_hostname)
-
+    status_mtimes: dict[HostName, int | None] = {}
     piggyback_data = []
-    for meta_data in piggyback_meta_data:
-        content_path = _get_piggybacked_file_path(meta_data.source, meta_data.piggybacked, omd_root)
-        try:
-            # Raw data is always stored as bytes. Later the content is
-            # converted to unicode in abstact.py:_parse_info which respects
-            # 'encoding' in section options.
-            raw_data = content_path.read_bytes()
-
-        except FileNotFoundError:
-            # race condition: file was removed between listing and reading
+    for source, payload_info in load_piggybacked_index(omd_root, piggybacked_hostname).items():
+        # Raw data is always stored as bytes. Later the content is
+        # converted to unicode in abstact.py:_parse_info which respects
+        # 'encoding' in section options.
+        content_path = _get_piggybacked_file_path(source, piggybacked_hostname, omd_root)
+        if (raw_data := _read_payload_file(content_path)) is None:
+            # race condition: payload was removed after it has been indexed
             continue
 
-        logger.debug("Read piggyback file '%s'", content_path)
-        piggyback_data.append(PiggybackMessage(meta_data, raw_data))
+        logger.debug("Read piggyback data from '%s'", content_path)
+        piggyback_data.append(
+            PiggybackMessage(
+                _make_meta_data(
+                    source, piggybacked_hostname, payload_info, omd_root, status_mtimes
+                ),
+                raw_data,
+            )
+        )
 
+    logger.debug("%s piggyback payloads for '%s'.", len(piggyback_data), piggybacked_hostname)
     return piggyback_data
 
 
+def _read_payload_file(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
 def get_piggybacked_host_with_sources(
     omd_root: Path, piggybacked_hostname: HostName | None = None
 ) -> Mapping[HostAddress, Sequence[PiggybackMetaData]]:
     """Generates all piggyback pig/piggybacked host pairs"""
+    if piggybacked_hostname:
+        return {
+            piggybacked_hostname: meta_data
+            for meta_data in [_get_payload_meta_data(piggybacked_hostname, omd_root)]
+            if meta_data
+        }
+
+    status_mtimes: dict[HostName, int | None] = {}
+    meta_data_by_host: dict[HostAddress, list[PiggybackMetaData]] = {}
+    for source, source_index in load_index(omd_root).items():
+        for piggybacked, payload_info in source_index.items():
+            meta_data_by_host.setdefault(piggybacked, []).append(
+                _make_meta_data(source, piggybacked, payload_info, omd_root, status_mtimes)
+            )
     return {
-        piggybacked_host: _get_payload_meta_data(piggybacked_host, omd_root)
-        for piggybacked_host_folder in (
-            [d for d in [payload_dir(omd_root) / piggybacked_hostname] if d.exists()]
-            if piggybacked_hostname
-            else _get_piggybacked_host_folders(omd_root)
-        )
-        if (piggybacked_host := HostAddress(piggybacked_host_folder.name))
+        piggybacked: sorted(meta_data, key=lambda m: m.source)
+        for piggybacked, meta_data in sorted(meta_data_by_host.items())
     }
 
 
 def _get_piggybacked_hosts_for_source(omd_root: Path, source: HostName) -> Sequence[HostName]:
-    return [
-        HostName(piggybacked_host.name)
-        for piggybacked_host in _get_piggybacked_host_folders(omd_root)
-        if (piggybacked_host / source).exists()
-    ]
+    return sorted(load_source_index(omd_root, source))
 
 
 def _remove_piggyback_file(piggyback_file_path: Path) -> bool:
@@ -196,6 +228,11 @@ def store_piggyback_raw_data(
     contact_timestamp: float | None,
     omd_root: Path,
 ) -> None:
+    """Store the piggybacked payloads received from a source host
+
+    The payloads are written as one file per piggybacked host, which is what the
+    piggyback hub watches for.
+    """
     if contact_timestamp is None:
         # Cleanup the status file when no piggyback data was sent this turn.
         logger.debug("Received no piggyback data")
@@ -211,16 +248,65 @@ def store_piggyback_raw_data(
     # work as if on the source system
     _write_file_with_mtime(file_path=status_file_path, content=b"", mtime=contact_timestamp)
 
-    for piggybacked_hostname, lines in piggybacked_raw_data.items():
+    if not piggybacked_raw_data:
+        return
+
+    # Raw data is always stored as bytes. Later the content is
+    # converted to unicode in abstact.py:_parse_info which respects
+    # 'encoding' in section options.
+    contents = {
+        piggybacked_hostname: b"%s\n" % b"\n".join(lines)
+        for piggybacked_hostname, lines in piggybacked_raw_data.items()
+    }
+    _write_payload_files(source_hostname, contents, message_timestamp, omd_root)
+    update_index(
+        omd_root,
+        source_hostname,
+        stored={
+            piggybacked_hostname: PayloadInfo(int(message_timestamp), len(content))
+            for piggybacked_hostname, content in contents.items()
+        },
+    )
+
+
+def _write_payload_files(
+    source_hostname: HostName,
+    contents: Mapping[HostName, bytes],
+    mtime: float,
+    omd_root: Path,
+) -> None:
+    """Write the payload files of one source in one pass
+
+    All temporary files are created in one directory outside of the payload folders, so
+    the watchers of the payload folders only see the final rename. The folders of the
+    piggybacked hosts already known from the index are not created again.
+    """
+    known_hosts = load_source_index(omd_root, source_hostname)
+    tmp_dir = payload_tmp_dir(omd_root)
+    tmp_dir.mkdir(mode=0o770, parents=True, exist_ok=True)
+    mtime_ns = int(mtime * 1_000_000_000)
+
+    for piggybacked_hostname, content in contents.items():
         logger.debug("Storing piggyback data for: %r", piggybacked_hostname)
-        # Raw data is always stored as bytes. Later the content is
-        # converted to unicode in abstact.py:_parse_info which respects
-        # 'encoding' in section options.
-        _write_file_with_mtime(
-            file_path=_get_piggybacked_file_path(source_hostname, piggybacked_hostname, omd_root),
-            content=b"%s\n" % b"\n".join(lines),
-            mtime=message_timestamp,
-        )
+        file_path = _get_piggybacked_file_path(source_hostname, piggybacked_hostname, omd_root)
+        if piggybacked_hostname not in known_hosts:
+            file_path.parent.mkdir(mode=0o770, exist_ok=True, parents=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix=f"{piggybacked_hostname}.")
+        try:
+            with open(fd, "wb") as tmp:
+                tmp.write(content)
+                tmp.flush()
+                os.utime(tmp.fileno(), ns=(mtime_ns, mtime_ns))
+            try:
+                os.rename(tmp_path, file_path)
+            except FileNotFoundError:
+                # The folder has been removed by the cleanup in the meantime
+                file_path.parent.mkdir(mode=0o770, exist_ok=True, parents=True)
+                os.rename(tmp_path, file_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
 
 
 def _write_file_with_mtime(
@@ -261,24 +347,28 @@ def _get_payload_meta_data(
     store_piggyback_raw_data() or cleanup_piggyback_files() functions.
     All these functions need to deal with suddenly vanishing or updated files/directories.
     """
-    piggybacked_host_folder = payload_dir(omd_root) / Path(piggybacked_hostname)
-    meta_data = []
-    for payload_file in _files_in(piggybacked_host_folder):
-        source = HostAddress(payload_file.name)
-        status_file_path = _get_source_status_file_path(source, omd_root)
+    status_mtimes: dict[HostName, int | None] = {}
+    return [
+        _make_meta_data(source, piggybacked_hostname, payload_info, omd_root, status_mtimes)
+        for source, payload_info in load_piggybacked_index(omd_root, piggybacked_hostname).items()
+    ]
 
-        if (mtime := _get_mtime(payload_file)) is None:
-            continue
 
-        meta_data.append(
-            PiggybackMetaData(
-                source=source,
-                piggybacked=piggybacked_hostname,
-                last_update=mtime,
-                last_contact=_get_mtime(status_file_path),
-            )
-        )
-    return meta_data
+def _make_meta_data(
+    source: HostName,
+    piggybacked: HostName,
+    payload_info: PayloadInfo,
+    omd_root: Path,
+    status_mtimes: dict[HostName, int | None],
+) -> PiggybackMetaData:
+    if source not in status_mtimes:
+        status_mtimes[source] = _get_mtime(_get_source_status_file_path(source, omd_root))
+    return PiggybackMetaData(
+        source=source,
+        piggybacked=piggybacked,
+        last_update=payload_info.mtime,
+        last_contact=status_mtimes[source],
+    )
 
 
 def _get_piggybacked_host_folders(omd_root: Path) -> Sequence[Path]:
@@ -343,7 +433,11 @@ def cleanup_piggyback_files(cut_off_timestamp: float, omd_root: Path) -> None:
     ]
 
     _cleanup_old_source_status_files(_get_source_state_files(omd_root), cut_off_timestamp)
-    _cleanup_old_piggybacked_files(piggybacked_hosts_settings, cut_off_timestamp)
+    for source, removed in _cleanup_old_piggybacked_files(
+        piggybacked_hosts_settings, cut_off_timestamp
+    ).items():
+        update_index(omd_root, source, removed=removed)
+    _cleanup_old_temporary_files(omd_root, cut_off_timestamp)
 
 
 def _cleanup_old_source_status_files(
@@ -366,9 +460,11 @@ def _cleanup_old_source_status_files(
 
 def _cleanup_old_piggybacked_files(
     piggybacked_hosts_settings: Iterable[tuple[Path, Iterable[Path]]], cut_off_timestamp: float
-) -> None:
-    """Remove piggybacked data files which exceed provided maximum age."""
+) -> Mapping[HostName, Mapping[HostName, int]]:
+    """Remove piggybacked data files which exceed provided maximum age.
 
+    Returns the mtimes of the removed files by source and piggybacked host."""
+    removed: dict[HostName, dict[HostName, int]] = {}
     for piggybacked_host_folder, source_hosts in piggybacked_hosts_settings:
         for piggybacked_host_source in source_hosts:
             if (mtime := _get_mtime(piggybacked_host_source)) is None:
@@ -380,7 +476,10 @@ def _cleanup_old_piggybacked_files(
                     piggybacked_host_source,
                     _render_datetime(mtime),
                 )
-                _remove_piggyback_file(piggybacked_host_source)
+                if _remove_piggyback_file(piggybacked_host_source):
+                    removed.setdefault(HostName(piggybacked_host_source.name), {})[
+                        HostName(piggybacked_host_folder.name)
+                    ] = mtime
 
         # Remove empty backed host directory
         try:
@@ -393,6 +492,14 @@ def _cleanup_old_piggybacked_files(
             "Piggyback folder '%s' was empty. Removed it.",
             piggybacked_host_folder,
         )
+    return removed
+
+
+def _cleanup_old_temporary_files(omd_root: Path, cut_off_timestamp: float) -> None:
+    """Remove temporary files left behind by crashed writers."""
+    for path in _files_in(payload_tmp_dir(omd_root)):
+        if (mtime := _get_mtime(path)) is not None and mtime < cut_off_timestamp:
+            _remove_piggyback_file(path)
 
 
 def _get_mtime(path: Path) -> int | None:
@@ -437,7 +544,20 @@ def move_for_host_rename(omd_root: Path, old_host: str, new_host: str) -> tuple[
         old_path.rename(new_path)
         yield "piggyback-pig"
 
-    return tuple(
+    actions = (
         *_rename_piggybacked_dir(old_host, new_host),
         *_rename_payload_file(piggyback_dir, old_host, new_host),
     )
+    _rename_piggybacked_in_index(omd_root, HostName(old_host), HostName(new_host))
+    return actions
+
+
+def _rename_piggybacked_in_index(omd_root: Path, old_name: HostName, new_name: HostName) -> None:
+    """Move the payloads of a renamed piggybacked host to its new name"""
+    old_index = load_piggybacked_index(omd_root, old_name)
+    new_index = load_piggybacked_index(omd_root, new_name)
+    for source in sorted({*old_index, *new_index}):
+        with locked_source_index(omd_root, source) as locked_index:
+            locked_index.pop(new_name, None)
+            if (info := locked_index.pop(old_name, None)) is not None:
+                locked_index[new_name] = info
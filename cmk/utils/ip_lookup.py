@@ -551,3 +551,13 @@ class CollectFailedHosts:
             )
             for host, exc in self.failed_ip_lookups.items()
         ]
+
+
+def failed_ip_lookups(ip_address_of: IPLookup) -> Mapping[HostName, Exception]:
+    """The failed lookups collected so far, if the lookup collects them at all"""
+    return (
+        ip_address_of.error_handler.failed_ip_lookups
+        if isinstance(ip_address_of, ConfiguredIPLookup)
+        and isinstance(ip_address_of.error_handler, CollectFailedHosts)
+        else {}
+    )
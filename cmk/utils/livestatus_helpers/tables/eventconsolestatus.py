@@ -31,6 +31,27 @@ class Eventconsolestatus(Table):
     )
     """The average event rate"""
 
+    status_average_history_flush_time = Column(
+        'status_average_history_flush_time',
+        col_type='float',
+        description='The average history write time',
+    )
+    """The average history write time"""
+
+    status_average_ingest_drop_rate = Column(
+        'status_average_ingest_drop_rate',
+        col_type='float',
+        description='The average ingestion drop rate',
+    )
+    """The average ingestion drop rate"""
+
+    status_average_ingest_stall_rate = Column(
+        'status_average_ingest_stall_rate',
+        col_type='float',
+        description='The average ingestion stall rate',
+    )
+    """The average ingestion stall rate"""
+
     status_average_message_rate = Column(
         'status_average_message_rate',
         col_type='float',
@@ -171,6 +192,48 @@ class Eventconsolestatus(Table):
     )
     """The number of events received since startup of the Event Console"""
 
+    status_history_flushes = Column(
+        'status_history_flushes',
+        col_type='int',
+        description='The number of history writes since startup of the Event Console',
+    )
+    """The number of history writes since startup of the Event Console"""
+
+    status_history_queue_depth = Column(
+        'status_history_queue_depth',
+        col_type='int',
+        description='The number of history entries waiting to be written',
+    )
+    """The number of history entries waiting to be written"""
+
+    status_ingest_drop_rate = Column(
+        'status_ingest_drop_rate',
+        col_type='float',
+        description='The ingestion drop rate',
+    )
+    """The ingestion drop rate"""
+
+    status_ingest_drops = Column(
+        'status_ingest_drops',
+        col_type='int',
+        description='The number of UDP messages dropped because the syslog parser processes were overloaded',
+    )
+    """The number of UDP messages dropped because the syslog parser processes were overloaded"""
+
+    status_ingest_stall_rate = Column(
+        'status_ingest_stall_rate',
+        col_type='float',
+        description='The ingestion stall rate',
+    )
+    """The ingestion stall rate"""
+
+    status_ingest_stalls = Column(
+        'status_ingest_stalls',
+        col_type='int',
+        description='The number of times reading messages had to wait for the syslog parser processes',
+    )
+    """The number of times reading messages had to wait for the syslog parser processes"""
+
     status_message_rate = Column(
         'status_message_rate',
         col_type='float',
@@ -945,6 +945,11 @@ def evaluate_stats(query: str, columns: list[ColumnName], result: ResultList) ->
             ...                [{'state': 1}, {'state': 2}, {'state': 1}])
             [{'stat_1': 3}, {'stat_2': 1}]
 
+        An empty conjunction is true for every row, so it counts all of them
+
+            >>> evaluate_stats("StatsAnd: 0", [], [{'state': 1}, {'state': 2}])
+            [{'stat_1': 2}]
+
         Combinations of counting directives are not yet implemented
 
             >>> evaluate_stats("Stats: state > 0\\nStats: state != 2\\nStatsAnd: 2", [],
@@ -982,6 +987,8 @@ def evaluate_stats(query: str, columns: list[ColumnName], result: ResultList) ->
     for line in query.splitlines():
         if line.startswith("Stats: "):
             reducers.append(make_reducer_func(line))
+        elif line == "StatsAnd: 0":
+            reducers.append(len)
         elif line.startswith(("StatsAnd: ", "StatsOr: ", "StatsNegate: ")):
             raise LivestatusTestingError("Stats combinators are not yet implemented!")
 
@@ -14,7 +14,7 @@ from pathlib import Path
 from cmk.ccc.exceptions import MKGeneralException
 from cmk.ccc.hostaddress import HostName
 from cmk.ccc.i18n import _
-from cmk.ccc.store import load_object_from_file, save_object_to_file
+from cmk.ccc.store import load_object_from_file
 from cmk.utils.config_path import VersionedConfigPath
 from cmk.utils.labels import Labels
 from cmk.utils.notify_types import NotificationContext as NotificationContext
@@ -89,18 +89,18 @@ def write_notify_host_file(
     config_per_host: Mapping[HostName, NotificationHostConfig],
 ) -> None:
     notify_config_path: Path = _get_host_file_path(config_path)
+    # The files are written to a new config path, which is not used before it is complete.
+    # There is no need to lock and replace them (which is slow for many hosts).
+    notify_config_path.mkdir(parents=True, exist_ok=True)
     for host, labels in config_per_host.items():
-        host_path = notify_config_path / host
-        save_object_to_file(
-            host_path,
-            dataclasses.asdict(
-                NotificationHostConfig(
-                    host_labels=labels.host_labels,
-                    service_labels={k: v for k, v in labels.service_labels.items() if v.values()},
-                    tags=labels.tags,
-                )
-            ),
+        host_config = dataclasses.asdict(
+            NotificationHostConfig(
+                host_labels=labels.host_labels,
+                service_labels={k: v for k, v in labels.service_labels.items() if v.values()},
+                tags=labels.tags,
+            )
         )
+        (notify_config_path / host).write_text(f"{host_config!r}\n")
 
 
 def read_notify_host_file(
@@ -5,6 +5,7 @@
 """This module provides generic Check_MK ruleset processing functionality"""
 
 import contextlib
+import time
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass
 from re import Pattern
@@ -40,6 +41,13 @@ RulesetName = str  # Could move to a less cluttered module as it is often used o
 TRuleValue = TypeVar("TRuleValue")
 TDefaultValue = TypeVar("TDefaultValue")
 TRuleValueMapping = TypeVar("TRuleValueMapping", bound=Mapping[str, object])
+THostName = TypeVar("THostName", bound=str)
+
+# Maximum number of different combinations of matching rules the hosts are grouped by
+# when computing a host ruleset in bulk, see RulesetOptimizer._match_host_groups
+_MAX_HOST_GROUPS = 64
+# Grouping the hosts only pays off for many hosts
+_MIN_HOSTS_FOR_BULK_MATCHING = 100
 
 # The Tag* types below are *not* used in `cmk.utils.tags`
 # but they are used here.  Therefore, they do *not* belong
@@ -230,6 +238,30 @@ class RulesetMatcher:
 
         return self.ruleset_optimizer.get_host_ruleset(hostname, ruleset, labels_of_host)
 
+    def match_host_rulesets_in_bulk(
+        self, rulesets: Mapping[RulesetName, Sequence[RuleSpec[Any]]]
+    ) -> None:
+        """Match the host rulesets for all hosts at once, see RulesetOptimizer"""
+        self.ruleset_optimizer.match_host_rulesets_in_bulk(rulesets)
+
+    def host_ruleset_durations(self) -> Mapping[RulesetName, float]:
+        return self.ruleset_optimizer.host_ruleset_durations()
+
+    def add_host_ruleset_durations(self, durations: Mapping[RulesetName, float]) -> None:
+        self.ruleset_optimizer.add_host_ruleset_durations(durations)
+
+    def get_matching_hosts(
+        self,
+        condition: RuleConditionsSpec,
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> set[HostName]:
+        """The processed hosts matching the host conditions of a rule
+
+        The service conditions of service rules are ignored. Don't modify the result,
+        it is cached.
+        """
+        return self.ruleset_optimizer.get_matching_hosts(condition, False, labels_of_host)
+
     def get_service_bool_value(
         self,
         hostname: HostName,
@@ -409,6 +441,10 @@ class RulesetOptimizer:
             tuple[int, bool], Sequence[_PreprocessedServiceRule[Any]]
         ] = {}
         self.__host_ruleset_cache: dict[tuple[int, bool], Mapping[HostAddress, Sequence[Any]]] = {}
+        # Names of the host rulesets by their id, if they are matched in bulk
+        self._bulk_rulesets: Mapping[RulesetName, Sequence[RuleSpec[Any]]] = {}
+        self._bulk_ruleset_names: Mapping[int, RulesetName] | None = None
+        self._host_ruleset_durations: dict[RulesetName, float] = {}
         self._all_matching_hosts_match_cache: dict[
             tuple[_ConditionCacheID, bool], set[HostName]
         ] = {}
@@ -421,6 +457,11 @@ class RulesetOptimizer:
         # Reference hostname -> tag group reference
         self._host_grouped_ref: dict[HostName, tuple[tuple[TagGroupID, TagID], ...]] = {}
 
+        # Reference host label (key, value) -> hosts having this label. The labels are only
+        # computed for the hosts in question, so hosts are added to the index when needed.
+        self._hosts_by_label: dict[tuple[str, str], set[HostName]] = {}
+        self._label_indexed_hosts: set[HostName] = set()
+
         # TODO: Clean this one up?
         self._initialize_host_lookup()
 
@@ -431,6 +472,8 @@ class RulesetOptimizer:
     def clear_caches(self) -> None:
         self.__host_ruleset_cache.clear()
         self._all_matching_hosts_match_cache.clear()
+        self._hosts_by_label.clear()
+        self._label_indexed_hosts.clear()
 
     def set_all_processed_hosts(self, all_processed_hosts: set[HostName]) -> None:
         involved_clusters: set[HostName] = set()
@@ -473,21 +516,6 @@ class RulesetOptimizer:
         ruleset: Sequence[RuleSpec[TRuleValue]],
         labels_of_host: Callable[[HostName], Labels],
     ) -> Sequence[TRuleValue]:
-        def _impl(
-            ruleset: Iterable[RuleSpec[TRuleValue]], with_foreign_hosts: bool
-        ) -> Mapping[HostAddress, Sequence[TRuleValue]]:
-            host_values: dict[HostAddress, list[TRuleValue]] = {}
-            for rule in ruleset:
-                if is_disabled(rule):
-                    continue
-
-                for hostname in self._all_matching_hosts(
-                    rule["condition"], with_foreign_hosts, labels_of_host
-                ):
-                    host_values.setdefault(hostname, []).append(rule["value"])
-
-            return host_values
-
         # When the requested host is part of the local sites configuration,
         # then use only the sites hosts for processing the rules
         with_foreign_hosts = host_name not in self._all_processed_hosts
@@ -497,9 +525,147 @@ class RulesetOptimizer:
             optimized_ruleset = self.__host_ruleset_cache[cache_id]
         except KeyError:
             optimized_ruleset = self.__host_ruleset_cache.setdefault(
-                cache_id, _impl(ruleset, with_foreign_hosts)
+                cache_id, self._compute_host_ruleset(ruleset, with_foreign_hosts, labels_of_host)
             )
-        return optimized_ruleset.get(host_name, [])
+        # The values may be shared by the hosts, hand out a copy
+        return list(optimized_ruleset.get(host_name, ()))
+
+    def match_host_rulesets_in_bulk(
+        self, rulesets: Mapping[RulesetName, Sequence[RuleSpec[Any]]]
+    ) -> None:
+        """Match each host ruleset for all processed hosts with set operations
+
+        This pays off if the host rulesets are looked up for most of the hosts, like when
+        creating the configuration of the core. The rulesets are still matched on their first
+        lookup, so only the ones actually used are matched. The time it took is recorded by
+        the name of the ruleset in rulesets, see host_ruleset_durations().
+        """
+        # Keep the rulesets, so their ids are not reused
+        self._bulk_rulesets = rulesets
+        self._bulk_ruleset_names = {id(ruleset): name for name, ruleset in rulesets.items()}
+
+    def host_ruleset_durations(self) -> Mapping[RulesetName, float]:
+        """The time in seconds it took to match the host rulesets in bulk"""
+        return self._host_ruleset_durations
+
+    def add_host_ruleset_durations(self, durations: Mapping[RulesetName, float]) -> None:
+        """Add the time it took other processes, e.g. forked workers, to match host rulesets"""
+        for name, duration in durations.items():
+            self._host_ruleset_durations[name] = (
+                self._host_ruleset_durations.get(name, 0.0) + duration
+            )
+
+    def get_matching_hosts(
+        self,
+        condition: RuleConditionsSpec,
+        with_foreign_hosts: bool,
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> set[HostName]:
+        """The hosts matching the host conditions of a rule
+
+        Don't modify the result, it is cached."""
+        return self._all_matching_hosts(condition, with_foreign_hosts, labels_of_host)
+
+    def _compute_host_ruleset(
+        self,
+        ruleset: Sequence[RuleSpec[TRuleValue]],
+        with_foreign_hosts: bool,
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> Mapping[HostAddress, Sequence[TRuleValue]]:
+        if (
+            self._bulk_ruleset_names is None
+            or with_foreign_hosts
+            or len(self._all_processed_hosts) < _MIN_HOSTS_FOR_BULK_MATCHING
+        ):
+            return self._match_host_by_host(ruleset, with_foreign_hosts, labels_of_host)
+
+        start = time.perf_counter()
+        host_values = self._match_host_groups(ruleset, labels_of_host)
+        name = self._bulk_ruleset_names.get(id(ruleset), "unnamed rulesets")
+        self._host_ruleset_durations[name] = (
+            self._host_ruleset_durations.get(name, 0.0) + time.perf_counter() - start
+        )
+        return host_values
+
+    def _match_host_by_host(
+        self,
+        ruleset: Sequence[RuleSpec[TRuleValue]],
+        with_foreign_hosts: bool,
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> Mapping[HostAddress, Sequence[TRuleValue]]:
+        host_values: dict[HostAddress, list[TRuleValue]] = {}
+        for rule in ruleset:
+            if is_disabled(rule):
+                continue
+
+            for hostname in self._all_matching_hosts(
+                rule["condition"], with_foreign_hosts, labels_of_host
+            ):
+                host_values.setdefault(hostname, []).append(rule["value"])
+
+        return host_values
+
+    def _match_host_groups(
+        self,
+        ruleset: Sequence[RuleSpec[TRuleValue]],
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> Mapping[HostAddress, Sequence[TRuleValue]]:
+        """The values of the matching rules of all processed hosts
+
+        Usually most of the hosts match one of few combinations of rules. The hosts are
+        grouped by the rules they match using set operations, and the hosts of a group
+        share one tuple of values. This keeps the tables of large configurations small.
+        Only if there are too many different combinations, the hosts are handled one
+        by one.
+        """
+        hosts_by_rules: dict[tuple[int, ...], set[HostAddress]] = {}
+        rules_of_host: dict[HostAddress, list[int]] | None = None
+        for rule_index, rule in enumerate(ruleset):
+            if is_disabled(rule):
+                continue
+
+            matching = self._all_matching_hosts(rule["condition"], False, labels_of_host)
+            if rules_of_host is not None:
+                for hostname in matching:
+                    rules_of_host.setdefault(hostname, []).append(rule_index)
+                continue
+
+            if not matching:
+                continue
+
+            unassigned = set(matching)
+            refined: dict[tuple[int, ...], set[HostAddress]] = {}
+            for rule_indices, hosts in hosts_by_rules.items():
+                if matched := hosts & matching:
+                    refined[(*rule_indices, rule_index)] = matched
+                    unassigned -= matched
+                    if len(matched) < len(hosts):
+                        refined[rule_indices] = hosts - matched
+                else:
+                    refined[rule_indices] = hosts
+            if unassigned:
+                refined[(rule_index,)] = unassigned
+            hosts_by_rules = refined
+
+            if len(hosts_by_rules) > _MAX_HOST_GROUPS:
+                rules_of_host = {
+                    hostname: list(rule_indices)
+                    for rule_indices, hosts in hosts_by_rules.items()
+                    for hostname in hosts
+                }
+
+        if rules_of_host is not None:
+            hosts_by_rules = {}
+            for hostname, indices in rules_of_host.items():
+                hosts_by_rules.setdefault(tuple(indices), set()).add(hostname)
+
+        # The hosts of a group share the values, immutable to not modify them by accident
+        host_values: dict[HostAddress, Sequence[TRuleValue]] = {}
+        for rule_indices, hosts in hosts_by_rules.items():
+            host_values.update(
+                dict.fromkeys(hosts, tuple(ruleset[i]["value"] for i in rule_indices))
+            )
+        return host_values
 
     def get_service_ruleset(
         self,
@@ -622,8 +788,17 @@ class RulesetOptimizer:
         label_conditions: LabelGroups,
         labels_of_host: Callable[[HostName], Labels],
     ) -> set[HostName]:
-        if tag_conditions and host_conditions is None and not label_conditions:
-            # TODO: Labels could also be optimized like the tags
+        if label_conditions:
+            # Only compute the labels of the hosts matching the other conditions
+            return self._match_hosts_by_labels(
+                self._all_matching_hosts_computation(
+                    hosts_in_rule_scope, host_conditions, tag_conditions, [], labels_of_host
+                ),
+                label_conditions,
+                labels_of_host,
+            )
+
+        if tag_conditions and host_conditions is None:
             matched_by_tags = self._match_hosts_by_tags(hosts_in_rule_scope, tag_conditions)
             if matched_by_tags is not None:
                 return matched_by_tags
@@ -637,16 +812,11 @@ class RulesetOptimizer:
         if host_conditions == []:
             return set()  # Empty host list -> Nothing matches
 
-        if not tag_conditions and not label_conditions and not host_conditions:
+        if not tag_conditions and not host_conditions:
             # If no tags are specified and the hostlist only include @all (all hosts)
             return hosts_in_rule_scope
 
-        if (
-            not tag_conditions
-            and not label_conditions
-            and only_specific_hosts
-            and host_conditions is not None
-        ):
+        if not tag_conditions and only_specific_hosts and host_conditions is not None:
             # If no tags are specified and there are only specific hosts we already have the matches
             return hosts_in_rule_scope.intersection(host_conditions)
 
@@ -666,11 +836,6 @@ class RulesetOptimizer:
             ):
                 continue
 
-            if label_conditions:
-                host_labels = labels_of_host(hostname)
-                if not matches_labels(host_labels, label_conditions):
-                    continue
-
             if not matches_host_name(host_conditions, hostname):
                 continue
 
@@ -771,6 +936,20 @@ class RulesetOptimizer:
 
         return matching
 
+    def _match_hosts_by_labels(
+        self,
+        valid_hosts: set[HostName],
+        label_groups: LabelGroups,
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> set[HostName]:
+        """Same as matches_labels for every host, but using set operations on the label index"""
+        for hostname in valid_hosts - self._label_indexed_hosts:
+            for key_value in labels_of_host(hostname).items():
+                self._hosts_by_label.setdefault(key_value, set()).add(hostname)
+            self._label_indexed_hosts.add(hostname)
+
+        return matching_hosts_by_labels(valid_hosts, self._hosts_by_label, label_groups)
+
     def _filter_hosts_with_same_tags_as_host(
         self,
         hostname: HostName,
@@ -886,10 +1065,7 @@ def matches_labels(object_labels: Labels, required_label_groups: LabelGroups) ->
                     break
                 continue
 
-            try:
-                key, value = label.split(":")
-            except Exception:
-                raise NotImplementedError(f"HALLO DORT: wird hier zu wenig entpackt?  --  {label}")
+            key, value = _parse_label(label)
             label_match: bool = value == object_labels.get(key)
             group_match = _and_or_not_group_match(group_match, label_match, label_operator)
 
@@ -898,6 +1074,56 @@ def matches_labels(object_labels: Labels, required_label_groups: LabelGroups) ->
     return overall_match
 
 
+def matching_hosts_by_labels(
+    hosts: set[THostName],
+    hosts_by_label: Mapping[tuple[str, str], set[THostName]],
+    required_label_groups: LabelGroups,
+) -> set[THostName]:
+    """Same as matches_labels for all the given hosts at once
+
+    hosts_by_label maps each label (as key and value) to the hosts having it. It has
+    to cover the labels of all the given hosts.
+    """
+    matching = set(hosts)
+    for group_operator, label_group in required_label_groups:
+        group_matching = set(hosts)
+        for label_operator, label in label_group:
+            if not label:
+                continue
+            _and_or_not_set_match(
+                group_matching,
+                hosts_by_label.get(_parse_label(label), set()),
+                label_operator,
+                hosts,
+            )
+        _and_or_not_set_match(matching, group_matching, group_operator, hosts)
+    return matching
+
+
+def _parse_label(label: str) -> tuple[str, str]:
+    try:
+        key, value = label.split(":")
+    except Exception:
+        raise NotImplementedError(f"HALLO DORT: wird hier zu wenig entpackt?  --  {label}")
+    return key, value
+
+
+def _and_or_not_set_match(
+    given_group_matching: set[THostName],
+    new_single_matching: set[THostName],
+    operator: AndOrNotLiteral,
+    valid_hosts: set[THostName],
+) -> None:
+    """Same as _and_or_not_group_match for sets of hosts, updates given_group_matching"""
+    match operator:
+        case "and":
+            given_group_matching.intersection_update(new_single_matching)
+        case "or":
+            given_group_matching.update(new_single_matching.intersection(valid_hosts))
+        case "not":
+            given_group_matching.difference_update(new_single_matching)
+
+
 def _and_or_not_group_match(
     given_group_match: bool, new_single_match: bool, operator: AndOrNotLiteral
 ) -> bool:
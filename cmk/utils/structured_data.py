@@ -10,16 +10,20 @@ structured monitoring data of Check_MK.
 from __future__ import annotations
 
 import ast
+import enum
 import gzip
 import io
+import itertools
 import json
+import operator
 import os
 import pprint
+import sys
 from collections import Counter
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Generic, Literal, NewType, Self, TypedDict, TypeVar
+from typing import Final, Generic, Literal, NewType, Self, TypedDict, TypeVar
 
 from cmk.ccc import store
 from cmk.ccc.exceptions import MKGeneralException
@@ -223,6 +227,163 @@ class _DictKeys(Generic[_T]):
         )
 
 
+class _Missing(enum.Enum):
+    """Marks the keys a row has no value for"""
+
+    MISSING = enum.auto()
+
+
+_MISSING: Final = _Missing.MISSING
+
+
+class _ColumnarRows(Mapping[SDRowIdent, Mapping[SDKey, SDValue]]):
+    """The rows of a table, stored column by column
+
+    Big tables (e.g. the software packages of a host) consist of many rows with the same
+    keys. Instead of one dictionary per row, the values are stored in one list per key.
+    The rows are addressed by their index into these lists, the mapping itself creates
+    the rows on access.
+    """
+
+    __slots__ = ("_index", "_columns")
+
+    def __init__(
+        self,
+        index: Mapping[SDRowIdent, int],
+        columns: Mapping[SDKey, Sequence[SDValue | _Missing]],
+    ) -> None:
+        # The indices are in the order of the row identifiers: 0, 1, 2, ...
+        self._index: Final = index
+        self._columns: Final = columns
+
+    @classmethod
+    def from_rows_by_ident(
+        cls, rows_by_ident: Iterable[tuple[SDRowIdent, Mapping[SDKey, SDValue]]]
+    ) -> _ColumnarRows:
+        """Rows with the same identifier are merged, the values of later rows win"""
+        index: dict[SDRowIdent, int] = {}
+        columns: dict[SDKey, list[SDValue | _Missing]] = {}
+        for ident, row in rows_by_ident:
+            if (idx := index.get(ident)) is None:
+                idx = index[ident] = len(index)
+                for existing in columns.values():
+                    existing.append(_MISSING)
+            for key, value in row.items():
+                if (column := columns.get(key)) is None:
+                    column = columns[SDKey(sys.intern(key))] = [_MISSING] * len(index)
+                column[idx] = value
+        return cls(index, columns)
+
+    @classmethod
+    def from_rows(
+        cls, key_columns: Sequence[SDKey], rows: Iterable[Mapping[SDKey, SDValue]]
+    ) -> _ColumnarRows:
+        return cls.from_rows_by_ident((_make_row_ident(key_columns, row), row) for row in rows)
+
+    @classmethod
+    def make(cls, rows_by_ident: Mapping[SDRowIdent, Mapping[SDKey, SDValue]]) -> _ColumnarRows:
+        return (
+            rows_by_ident
+            if isinstance(rows_by_ident, _ColumnarRows)
+            else cls.from_rows_by_ident(rows_by_ident.items())
+        )
+
+    def __getitem__(self, ident: SDRowIdent) -> Mapping[SDKey, SDValue]:
+        idx = self._index[ident]
+        return {
+            key: value
+            for key, column in self._columns.items()
+            if (value := column[idx]) is not _MISSING
+        }
+
+    def __contains__(self, ident: object) -> bool:
+        return ident in self._index
+
+    def __iter__(self) -> Iterator[SDRowIdent]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+    def count_values(self) -> int:
+        return sum(len(column) - column.count(_MISSING) for column in self._columns.values())
+
+    def filter_keys(self, filter_func: Callable[[SDKey], bool]) -> _ColumnarRows:
+        """Keep the values of the matching keys, rows without any values are removed"""
+        columns = {key: column for key, column in self._columns.items() if filter_func(key)}
+        keep = [
+            any(column[idx] is not _MISSING for column in columns.values())
+            for idx in range(len(self._index))
+        ]
+        if all(keep):
+            return _ColumnarRows(self._index, columns)
+        return _ColumnarRows(
+            {ident: idx for idx, ident in enumerate(itertools.compress(self._index, keep))},
+            {key: list(itertools.compress(column, keep)) for key, column in columns.items()},
+        )
+
+    def merge(self, other: _ColumnarRows) -> _ColumnarRows:
+        """Merge the rows with the same identifiers, the values of the other rows win"""
+        index = dict(self._index)
+        for ident in other._index:
+            index.setdefault(ident, len(index))
+        num_added = len(index) - len(self._index)
+
+        columns = {
+            key: [*column, *itertools.repeat(_MISSING, num_added)]
+            for key, column in self._columns.items()
+        }
+        other_indices = [index[ident] for ident in other._index]
+        for key, other_column in other._columns.items():
+            if (column := columns.get(key)) is None:
+                column = columns[key] = [_MISSING] * len(index)
+            for idx, value in zip(other_indices, other_column):
+                if value is not _MISSING:
+                    column[idx] = value
+        return _ColumnarRows(index, columns)
+
+    def _compare_values(
+        self, other: _ColumnarRows, idents: Sequence[SDRowIdent]
+    ) -> Iterator[Iterator[bool]]:
+        """Compare the values of the rows key by key: Do the values of the rows differ?"""
+        indices = [self._index[i] for i in idents]
+        other_indices = [other._index[i] for i in idents]
+
+        def values(
+            columns: Mapping[SDKey, Sequence[SDValue | _Missing]],
+            key: SDKey,
+            indices: Sequence[int],
+        ) -> Iterator[SDValue | _Missing]:
+            return (
+                itertools.repeat(_MISSING, len(indices))
+                if (column := columns.get(key)) is None
+                else map(column.__getitem__, indices)
+            )
+
+        for key in self._columns.keys() | other._columns.keys():
+            yield map(
+                operator.ne,
+                values(self._columns, key, indices),
+                values(other._columns, key, other_indices),
+            )
+
+    def differing_idents(
+        self, other: _ColumnarRows, idents: Iterable[SDRowIdent]
+    ) -> set[SDRowIdent]:
+        """Find the rows which differ from the rows of the other table with the same identifiers"""
+        idents = list(idents)
+        differing: set[int] = set()
+        for differs in self._compare_values(other, idents):
+            differing.update(itertools.compress(itertools.count(), differs))
+        return {idents[n] for n in differing}
+
+    def has_equal_rows(self, other: _ColumnarRows, idents: Iterable[SDRowIdent]) -> bool:
+        return not any(map(any, self._compare_values(other, list(idents))))
+
+
 # .
 #   .--filters-------------------------------------------------------------.
 #   |                       __ _ _ _                                       |
@@ -333,6 +494,13 @@ class _FilterTree:
             else row
         )
 
+    def filter_rows(self, rows: _ColumnarRows) -> _ColumnarRows:
+        return rows.filter_keys(
+            _consolidate_filter_funcs(self._filter_choices_columns)
+            if self._filter_choices_columns
+            else lambda k: True
+        )
+
     def filter_node_names(self, node_names: set[SDNodeName]) -> set[SDNodeName]:
         filter_nodes = _consolidate_filter_funcs(self._filter_choices_nodes)
         return {n for n in node_names if filter_nodes(n)}.union(self.filters_by_name)
@@ -433,11 +601,10 @@ def _deserialize_legacy_attributes(raw_pairs: Mapping[SDKey, SDValue]) -> Immuta
 
 def _deserialize_legacy_table(raw_rows: Sequence[Mapping[SDKey, SDValue]]) -> ImmutableTable:
     key_columns = sorted({k for r in raw_rows for k in r})
-    rows_by_ident: dict[SDRowIdent, dict[SDKey, SDValue]] = {}
-    for row in raw_rows:
-        rows_by_ident.setdefault(_make_row_ident(key_columns, row), {}).update(row)
-
-    return ImmutableTable(key_columns=key_columns, rows_by_ident=rows_by_ident)
+    return ImmutableTable(
+        key_columns=key_columns,
+        rows_by_ident=_ColumnarRows.from_rows(key_columns, raw_rows),
+    )
 
 
 def _deserialize_legacy_tree(
@@ -535,16 +702,10 @@ def _deserialize_attributes(raw_attributes: SDRawAttributes) -> ImmutableAttribu
 
 
 def _deserialize_table(raw_table: SDRawTable) -> ImmutableTable:
-    rows = raw_table.get("Rows", [])
     key_columns = raw_table.get("KeyColumns", [])
-
-    rows_by_ident: dict[SDRowIdent, dict[SDKey, SDValue]] = {}
-    for row in rows:
-        rows_by_ident.setdefault(_make_row_ident(key_columns, row), {}).update(row)
-
     return ImmutableTable(
         key_columns=key_columns,
-        rows_by_ident=rows_by_ident,
+        rows_by_ident=_ColumnarRows.from_rows(key_columns, raw_table.get("Rows", [])),
         retentions={
             ident: {
                 key: _deserialize_retention_interval(raw_retention_interval)
@@ -854,7 +1015,8 @@ class _MutableTable:
 
             if previous_row:
                 # Update row with key column entries
-                previous_row |= {k: previous.rows_by_ident[ident][k] for k in previous.key_columns}
+                previous_row_by_ident = previous.rows_by_ident[ident]
+                previous_row |= {k: previous_row_by_ident[k] for k in previous.key_columns}
                 self._add_row(ident, previous_row)
                 update_results.append(
                     UpdateResultTable(
@@ -871,8 +1033,9 @@ class _MutableTable:
                 right=set(current_filtered_rows[ident]),
             )
             row: dict[SDKey, SDValue] = {}
+            previous_row_by_ident = previous.rows_by_ident[ident]
             for key in compared_keys.only_left:
-                row.setdefault(key, previous.rows_by_ident[ident][key])
+                row.setdefault(key, previous_row_by_ident[key])
                 retentions.setdefault(ident, {})[key] = RetentionInterval.from_previous(
                     previous.retentions[ident][key]
                 )
@@ -884,7 +1047,7 @@ class _MutableTable:
                 # Update row with key column entries
                 row.update(
                     {
-                        **{k: previous.rows_by_ident[ident][k] for k in previous.key_columns},
+                        **{k: previous_row_by_ident[k] for k in previous.key_columns},
                         **{k: self.rows_by_ident[ident][k] for k in self.key_columns},
                     }
                 )
@@ -1068,11 +1231,7 @@ def _filter_attributes(
 def _filter_table(table: ImmutableTable, filter_tree: _FilterTree) -> ImmutableTable:
     return ImmutableTable(
         key_columns=table.key_columns,
-        rows_by_ident={
-            ident: filtered_row
-            for ident, row in table.rows_by_ident.items()
-            if (filtered_row := filter_tree.filter_row(row))
-        },
+        rows_by_ident=filter_tree.filter_rows(_ColumnarRows.make(table.rows_by_ident)),
         retentions=table.retentions,
     )
 
@@ -1105,30 +1264,11 @@ def _merge_attributes(left: ImmutableAttributes, right: ImmutableAttributes) ->
 def _merge_tables_by_same_or_empty_key_columns(
     key_columns: Sequence[SDKey], left: ImmutableTable, right: ImmutableTable
 ) -> ImmutableTable:
-    compared_row_idents = _DictKeys.compare(
-        left=set(left.rows_by_ident),
-        right=set(right.rows_by_ident),
-    )
-
-    rows_by_ident: dict[SDRowIdent, Mapping[SDKey, SDValue]] = {}
-    for ident in compared_row_idents.only_left:
-        rows_by_ident.setdefault(ident, left.rows_by_ident[ident])
-
-    for ident in compared_row_idents.both:
-        rows_by_ident.setdefault(
-            ident,
-            {
-                **left.rows_by_ident[ident],
-                **right.rows_by_ident[ident],
-            },
-        )
-
-    for ident in compared_row_idents.only_right:
-        rows_by_ident.setdefault(ident, right.rows_by_ident[ident])
-
     return ImmutableTable(
         key_columns=key_columns,
-        rows_by_ident=rows_by_ident,
+        rows_by_ident=_ColumnarRows.make(left.rows_by_ident).merge(
+            _ColumnarRows.make(right.rows_by_ident)
+        ),
         retentions={**left.retentions, **right.retentions},
     )
 
@@ -1145,13 +1285,12 @@ def _merge_tables(left: ImmutableTable, right: ImmutableTable) -> ImmutableTable
 
     # Re-calculate row identifiers for legacy tables or inventory and status tables
     key_columns = sorted(set(left.key_columns).intersection(right.key_columns))
-    rows_by_ident: dict[SDRowIdent, dict[SDKey, SDValue]] = {}
-    for row in list(left.rows_by_ident.values()) + list(right.rows_by_ident.values()):
-        rows_by_ident.setdefault(_make_row_ident(key_columns, row), {}).update(row)
-
     return ImmutableTable(
         key_columns=key_columns,
-        rows_by_ident=rows_by_ident,
+        rows_by_ident=_ColumnarRows.from_rows(
+            key_columns,
+            itertools.chain(left.rows_by_ident.values(), right.rows_by_ident.values()),
+        ),
         retentions={**left.retentions, **right.retentions},
     )
 
@@ -1255,7 +1394,12 @@ def _compare_tables(left: ImmutableTable, right: ImmutableTable) -> ImmutableDel
     for ident in compared_row_idents.only_left:
         rows.append({k: _encode_as_new(v) for k, v in left.rows_by_ident[ident].items()})
 
-    for ident in compared_row_idents.both:
+    for ident in (
+        left.rows_by_ident.differing_idents(right.rows_by_ident, compared_row_idents.both)
+        if isinstance(left.rows_by_ident, _ColumnarRows)
+        and isinstance(right.rows_by_ident, _ColumnarRows)
+        else compared_row_idents.both
+    ):
         # Note: Rows which have at least one change also provide all table fields.
         # Example:
         # If the version of a package (below "Software > Packages") has changed from 1.0 to 2.0
@@ -1348,6 +1492,8 @@ class ImmutableTable:
     def __len__(self) -> int:
         # The attribute 'rows' is decisive. Other attributes like 'key_columns' or 'retentions'
         # have no impact if there are no rows.
+        if isinstance(self.rows_by_ident, _ColumnarRows):
+            return self.rows_by_ident.count_values()
         return sum(map(len, self.rows_by_ident.values()))
 
     def __eq__(self, other: object) -> bool:
@@ -1365,6 +1511,11 @@ class ImmutableTable:
         if compared_row_idents.only_right:
             return False
 
+        if isinstance(self.rows_by_ident, _ColumnarRows) and isinstance(
+            other.rows_by_ident, _ColumnarRows
+        ):
+            return self.rows_by_ident.has_equal_rows(other.rows_by_ident, compared_row_idents.both)
+
         return all(
             self.rows_by_ident[i] == other.rows_by_ident[i] for i in compared_row_idents.both
         )
@@ -1887,6 +2038,15 @@ class HistoryDeltaPath:
     current_timestamp: int
 
 
+@dataclass(frozen=True, kw_only=True)
+class HistoryDeltaLogPath:
+    file_path: Path
+    offset: int
+    length: int
+    previous_timestamp: int
+    current_timestamp: int
+
+
 @dataclass(frozen=True)
 class HistoryPath:
     tree_path: TreePath
@@ -2019,6 +2179,115 @@ class InventoryStore:
         _archive_inventory_tree(self.inv_paths, host_name)
 
 
+def _make_delta_log_line(history_entry: HistoryEntry) -> bytes:
+    raw = json.dumps(
+        (
+            history_entry.new,
+            history_entry.changed,
+            history_entry.removed,
+            serialize_delta_tree(history_entry.delta_tree),
+        )
+    )
+    return f"{history_entry.previous_timestamp} {history_entry.current_timestamp} {raw}\n".encode()
+
+
+def _parse_delta_log_timestamps(line: bytes) -> tuple[int, int, bytes] | None:
+    # Lines without a line break are the leftovers of an interrupted append
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        previous_name, current_name, raw = line.split(b" ", 2)
+        return int(previous_name), int(current_name), raw
+    except ValueError:
+        return None
+
+
+class HistoryDeltaLog:
+    """Append-only log of the history entries of one host
+
+    Every line is of the form '<PREVIOUS TS> <CURRENT TS> <JSON>' where the JSON part has the
+    same content as the files of the delta cache. The paths of the entries are collected from
+    the timestamps only, the delta trees are decoded when an entry is loaded. Later lines win
+    over earlier ones with the same timestamps, broken lines are skipped."""
+
+    def __init__(self, file_path: Path) -> None:
+        self.file_path = file_path
+
+    def collect_paths(self) -> Iterator[HistoryDeltaLogPath]:
+        try:
+            with self.file_path.open("rb") as f:
+                offset = 0
+                for line in f:
+                    if (parsed := _parse_delta_log_timestamps(line)) is not None:
+                        yield HistoryDeltaLogPath(
+                            file_path=self.file_path,
+                            offset=offset,
+                            length=len(line),
+                            previous_timestamp=parsed[0],
+                            current_timestamp=parsed[1],
+                        )
+                    offset += len(line)
+        except FileNotFoundError:
+            return
+
+    def load_raw(self, path: HistoryDeltaLogPath) -> tuple[int, int, int, SDRawDeltaTree] | None:
+        try:
+            with self.file_path.open("rb") as f:
+                f.seek(path.offset)
+                line = f.read(path.length)
+        except FileNotFoundError:
+            return None
+
+        # The log may have been compacted in the meantime
+        if (parsed := _parse_delta_log_timestamps(line)) is None or parsed[:2] != (
+            path.previous_timestamp,
+            path.current_timestamp,
+        ):
+            return None
+
+        try:
+            return json.loads(parsed[2])
+        except ValueError:
+            return None
+
+    def append(self, history_entries: Sequence[HistoryEntry]) -> None:
+        if not history_entries:
+            return
+
+        data = b"".join(_make_delta_log_line(e) for e in history_entries)
+        with store.locked(self.file_path), self.file_path.open("a+b") as f:
+            if size := f.seek(0, os.SEEK_END):
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+
+    def compact(self, *, keep: Callable[[int, int], bool] = lambda previous, current: True) -> None:
+        """Rewrite the log without superseded, broken and not to be kept entries"""
+        with store.locked(self.file_path):
+            try:
+                with self.file_path.open("rb") as f:
+                    lines = f.readlines()
+            except FileNotFoundError:
+                return
+
+            lines_by_timestamps: dict[tuple[int, int], bytes] = {}
+            for line in lines:
+                if (parsed := _parse_delta_log_timestamps(line)) is not None and keep(*parsed[:2]):
+                    lines_by_timestamps[parsed[:2]] = line
+
+            if not lines_by_timestamps:
+                self.file_path.unlink(missing_ok=True)
+                return
+
+            store.save_bytes_to_file(
+                self.file_path,
+                b"".join(
+                    lines_by_timestamps[k] for k in sorted(lines_by_timestamps, key=lambda k: k[-1])
+                ),
+            )
+
+
 class HistoryStore:
     def __init__(self, omd_root: Path) -> None:
         self.inv_paths = InventoryPaths(omd_root)
@@ -2090,18 +2359,29 @@ class HistoryStore:
                 pass
 
     def collect_history_paths(
-        self, *, host_name: HostName
-    ) -> Iterator[Result[HistoryDeltaPath | HistoryArchivePath, Path]]:
-        known_paths: dict[tuple[HostName, int, int], HistoryDeltaPath | HistoryArchivePath] = {}
+        self, *, host_name: HostName, since: int | None = None, until: int | None = None
+    ) -> Iterator[Result[HistoryDeltaPath | HistoryDeltaLogPath | HistoryArchivePath, Path]]:
+        """Collect the paths of the history entries whose current timestamp is within the range
+
+        Entries from the delta log win over entries from the delta cache which win over entries
+        computed from the archive."""
+        known_paths: dict[
+            tuple[HostName, int, int],
+            HistoryDeltaPath | HistoryDeltaLogPath | HistoryArchivePath,
+        ] = {
+            (host_name, p.previous_timestamp, p.current_timestamp): p
+            for p in HistoryDeltaLog(self.inv_paths.delta_log(host_name)).collect_paths()
+        }
         for result_from_delta_cache in self._collect_paths_from_delta_cache(host_name):
             if result_from_delta_cache.is_ok():
-                known_paths[
+                known_paths.setdefault(
                     (
                         host_name,
                         result_from_delta_cache.ok.previous_timestamp,
                         result_from_delta_cache.ok.current_timestamp,
-                    )
-                ] = result_from_delta_cache.ok
+                    ),
+                    result_from_delta_cache.ok,
+                )
             else:
                 yield result_from_delta_cache
 
@@ -2114,7 +2394,8 @@ class HistoryStore:
                 known_paths[key] = HistoryArchivePath(previous=previous, current=current)
 
         for key in sorted(known_paths, key=lambda k: k[-1]):
-            yield OK(known_paths[key])
+            if (since is None or key[-1] >= since) and (until is None or key[-1] <= until):
+                yield OK(known_paths[key])
 
         for result_from_archive in results_from_archive:
             if result_from_archive.is_error():
@@ -2131,9 +2412,24 @@ class HistoryStore:
         return self._lookup.setdefault(key, _load_tree_from_tree_path(tree_path))
 
     def load_history_entry(
-        self, *, host_name: HostName, path: HistoryDeltaPath | HistoryArchivePath
+        self,
+        *,
+        host_name: HostName,
+        path: HistoryDeltaPath | HistoryDeltaLogPath | HistoryArchivePath,
     ) -> Result[HistoryEntry, Sequence[Path]]:
         match path:
+            case HistoryDeltaLogPath():
+                if (raw := HistoryDeltaLog(path.file_path).load_raw(path)) is None:
+                    return Error([path.file_path])
+
+                return OK(
+                    HistoryEntry.from_raw(
+                        previous_timestamp=path.previous_timestamp,
+                        current_timestamp=path.current_timestamp,
+                        raw=raw,
+                    )
+                )
+
             case HistoryDeltaPath():
                 try:
                     raw = (
@@ -2179,24 +2475,7 @@ class HistoryStore:
                 )
 
     def save_history_entry(self, *, host_name: HostName, history_entry: HistoryEntry) -> None:
-        delta_cache_tree = self.inv_paths.delta_cache_tree(
-            host_name,
-            history_entry.previous_timestamp,
-            history_entry.current_timestamp,
-        )
-        delta_cache_tree.parent.mkdir(parents=True, exist_ok=True)
-        store.save_text_to_file(
-            delta_cache_tree.path,
-            json.dumps(
-                (
-                    history_entry.new,
-                    history_entry.changed,
-                    history_entry.removed,
-                    serialize_delta_tree(history_entry.delta_tree),
-                )
-            ),
-        )
-        delta_cache_tree.legacy.unlink(missing_ok=True)
+        HistoryDeltaLog(self.inv_paths.delta_log(host_name)).append([history_entry])
 
 
 @dataclass(frozen=True)
@@ -2205,13 +2484,27 @@ class History:
     corrupted: Sequence[Path]
 
 
+def _filter_history_entry(
+    entry: HistoryEntry, filter_delta_tree: Sequence[SDFilterChoice] | None
+) -> HistoryEntry | None:
+    if filter_delta_tree is None:
+        return entry
+    if delta_tree := entry.delta_tree.filter(filter_delta_tree):
+        return HistoryEntry.from_delta_tree(
+            previous_timestamp=entry.previous_timestamp,
+            current_timestamp=entry.current_timestamp,
+            delta_tree=delta_tree,
+        )
+    return None
+
+
 def load_history(
     history_store: HistoryStore,
     host_name: HostName,
     *,
     filter_history_paths: Callable[
-        [Sequence[HistoryDeltaPath | HistoryArchivePath]],
-        Sequence[HistoryDeltaPath | HistoryArchivePath],
+        [Sequence[HistoryDeltaPath | HistoryDeltaLogPath | HistoryArchivePath]],
+        Sequence[HistoryDeltaPath | HistoryDeltaLogPath | HistoryArchivePath],
     ],
     filter_delta_tree: Sequence[SDFilterChoice] | None,
 ) -> History:
@@ -2232,18 +2525,43 @@ def load_history(
         else:
             corrupted.update(entry_result.error)
 
-    if filter_delta_tree is None:
-        return History(entries=entries, corrupted=list(corrupted))
-
     return History(
         entries=[
-            HistoryEntry.from_delta_tree(
-                previous_timestamp=e.previous_timestamp,
-                current_timestamp=e.current_timestamp,
-                delta_tree=d,
-            )
-            for e in entries
-            if (d := e.delta_tree.filter(filter_delta_tree))
+            f for e in entries if (f := _filter_history_entry(e, filter_delta_tree)) is not None
         ],
         corrupted=list(corrupted),
     )
+
+
+def iter_history(
+    history_store: HistoryStore,
+    host_name: HostName,
+    *,
+    since: int | None = None,
+    until: int | None = None,
+    latest: int | None = None,
+    filter_delta_tree: Sequence[SDFilterChoice] | None,
+) -> Iterator[Result[HistoryEntry, Sequence[Path]]]:
+    """Yield the history entries from the latest to the oldest one
+
+    Only the entries within the time range and of the latest paths are considered. Each entry is
+    loaded (and computed from the archive if not cached yet) when the caller asks for it."""
+    paths = []
+    for path_result in history_store.collect_history_paths(
+        host_name=host_name, since=since, until=until
+    ):
+        if path_result.is_ok():
+            paths.append(path_result.ok)
+        else:
+            yield Error([path_result.error])
+
+    if latest is not None:
+        paths = paths[max(len(paths) - latest, 0) :]
+
+    for path in reversed(paths):
+        if (
+            entry_result := history_store.load_history_entry(host_name=host_name, path=path)
+        ).is_error():
+            yield Error(entry_result.error)
+        elif (entry := _filter_history_entry(entry_result.ok, filter_delta_tree)) is not None:
+            yield OK(entry)
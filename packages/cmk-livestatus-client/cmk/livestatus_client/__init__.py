@@ -7,22 +7,23 @@
 from __future__ import annotations
 
 import ast
+import codecs
 import contextlib
 import json
 import os
 import re
 import select
+import selectors
 import socket
 import ssl
 import threading
 import time
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Iterator, Sequence
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from functools import cache
-from io import BytesIO
 from typing import Any, Literal, NamedTuple, NewType, NotRequired, override, TypedDict
 
 from cmk import trace
@@ -95,6 +96,7 @@ class SiteConfiguration(TypedDict):
     secret: NotRequired[str]  # Set when doing the site login
     status_host: tuple[SiteId, str] | None
     timeout: int
+    response_timeout: NotRequired[int | None]
     url_prefix: str
     user_login: bool
     user_sync: Literal["all"] | tuple[Literal["list"], list[str]] | None
@@ -177,6 +179,9 @@ remove_cache_regex = re.compile("\nCache:[^\n]*")
 # Pattern for allowed UserId values
 validate_user_id_regex = re.compile(r"^[\w$][-@.+\w$]*$", re.UNICODE)
 
+# Maximum number of bytes read from a livestatus socket at once
+_RECEIVE_CHUNK_SIZE = 256 * 1024
+
 
 class MKLivestatusException(Exception):
     pass
@@ -706,29 +711,37 @@ class SingleSiteConnection(Helpers):
                 pass
 
     def receive_data(self, size: int, timeout: float | None = None) -> bytes:
+        return b"".join(self.receive_data_chunks(size, timeout))
+
+    def receive_data_chunks(self, size: int, timeout: float | None = None) -> Iterator[bytes]:
+        """Receive size bytes from the socket and yield them as they arrive
+
+        The time the caller needs to process a chunk does not count towards the timeout.
+        """
         if self.socket is None:
             raise MKLivestatusSocketError("Socket to '%s' is not connected" % self.socketurl)
 
-        data = BytesIO()
         self.socket.settimeout(timeout)
         receive_start = time.time()
-        while size > 0:
+        remaining = size
+        while remaining > 0:
             if is_socket_readable(self.socket, 0.1):
-                packet = self.socket.recv(size)
+                # Limit the size of the chunks: recv() allocates the full buffer upfront
+                packet = self.socket.recv(min(remaining, _RECEIVE_CHUNK_SIZE))
                 if not packet:
                     raise MKLivestatusSocketClosed(
                         "Read zero data from socket, remote peer closed connection."
                     )
-                size -= len(packet)
-                data.write(packet)
+                remaining -= len(packet)
+                yield_start = time.time()
+                yield packet
+                receive_start += time.time() - yield_start
             if timeout is not None and (time.time() - receive_start) > timeout:
                 raise MKLivestatusSocketError(
                     f"{timeout}s while reading data from socket. "
-                    "Received data: {data.getbuffer().nbytes}/{size} bytes"
+                    f"Received data: {size - remaining}/{size} bytes"
                 )
 
-        return data.getvalue()
-
     def do_query(self, query: Query, add_headers: str = "") -> LivestatusResponse:
         with (
             tracer.span(
@@ -803,6 +816,33 @@ class SingleSiteConnection(Helpers):
         suppress_exceptions: tuple[type[Exception], ...],
         timeout_at: float | None = None,
     ) -> bytes:
+        return self._receive_response(
+            query, suppress_exceptions, timeout_at, lambda length: self.receive_data(length, 30)
+        )
+
+    def receive_response_chunks(
+        self, query: str, suppress_exceptions: tuple[type[Exception], ...]
+    ) -> Iterator[bytes]:
+        """Same as receive_raw_response, but yields the data as it arrives
+
+        Errors while receiving the header are handled as by receive_raw_response. Once data has
+        been yielded the query is not sent again, a connection error is raised instead.
+        """
+        length = self._receive_response(query, suppress_exceptions, None, lambda length: length)
+        try:
+            # See receive_raw_response for the timeout
+            yield from self.receive_data_chunks(length, 30)
+        except (MKLivestatusSocketClosed, OSError) as e:
+            self.disconnect()
+            raise MKLivestatusSocketError(str(e))
+
+    def _receive_response[T](
+        self,
+        query: str,
+        suppress_exceptions: tuple[type[Exception], ...],
+        timeout_at: float | None,
+        receive_content: Callable[[int], T],
+    ) -> T:
         try:
             # Headers are always ASCII encoded
             resp = self.receive_data(16)
@@ -816,16 +856,14 @@ class SingleSiteConnection(Helpers):
                     "unreachable or wrong encryption settings are used."
                 )
 
-            # Apply a lower timeout for the content because the data is already available
-            # in the socket. The liveproxyd (same system) has the complete data available
-            # while the data from a standard connection can still take some time.
-            # 30 seconds should be more than enough for the maximum telegram size of 100MB
-            data = self.receive_data(length, 30)
-
             if code == "200":
-                return data
+                # Apply a lower timeout for the content because the data is already available
+                # in the socket. The liveproxyd (same system) has the complete data available
+                # while the data from a standard connection can still take some time.
+                # 30 seconds should be more than enough for the maximum telegram size of 100MB
+                return receive_content(length)
 
-            error_info = data.decode("utf-8")
+            error_info = self.receive_data(length, 30).decode("utf-8")
             if code == "404":
                 raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
 
@@ -865,7 +903,9 @@ class SingleSiteConnection(Helpers):
                 self.connect()
                 self.send_query(query)
                 # do not send query again -> danger of infinite loop
-                return self.receive_raw_response(query, suppress_exceptions, timeout_at)
+                return self._receive_response(
+                    query, suppress_exceptions, timeout_at, receive_content
+                )
             raise MKLivestatusSocketError(str(e))
 
         except suppress_exceptions:
@@ -895,6 +935,34 @@ class SingleSiteConnection(Helpers):
         except (ValueError, SyntaxError):
             raise MKLivestatusQueryError("Malformed raw response output")
 
+    def parse_response_chunks(
+        self, chunks: Iterable[bytes], query: Query
+    ) -> Iterator[LivestatusRow]:
+        """Same as parse_raw_response, but yields the rows as soon as they are complete
+
+        Only JSON responses can be parsed incrementally. Responses in the python format are
+        parsed once they have been received completely.
+        """
+        if not query.supports_json_format():
+            yield from self.parse_raw_response(b"".join(chunks), query)
+            return
+
+        parser = _JSONRowsParser()
+        for chunk in chunks:
+            yield from parser.feed(chunk)
+        yield from parser.close()
+
+    def iter_response_rows(self, query: str, query_obj: Query) -> Iterator[LivestatusRow]:
+        """Receive the response to an already sent query and yield its rows as they arrive"""
+        try:
+            yield from self.parse_response_chunks(
+                self.receive_response_chunks(query, query_obj.suppress_exceptions), query_obj
+            )
+        except (GeneratorExit, MKLivestatusQueryError):
+            # The rest of the response has not been read, the connection can not be used anymore
+            self.disconnect()
+            raise
+
     def set_prepend_site(self, p: bool) -> None:
         self.prepend_site = p
 
@@ -912,22 +980,47 @@ class SingleSiteConnection(Helpers):
 
     @override
     def query(self, query: QueryTypes, add_headers: str = "") -> LivestatusResponse:
-        # Normalize argument types
-        normalized_add_headers = add_headers
-        normalized_query = Query(query) if not isinstance(query, Query) else query
-
-        if self.limit is not None:
-            normalized_query = Query(
-                "%sLimit: %d\n" % (normalized_query, self.limit),
-                normalized_query.suppress_exceptions,
-            )
-
-        response = self.do_query(normalized_query, normalized_add_headers)
+        response = self.do_query(self._normalize_query(query), add_headers)
         if self.prepend_site:
             for row in response:
                 row.insert(0, b"")
         return response
 
+    def iter_query(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Same as query, but yields the rows while the response is received
+
+        The connection must not be used for other queries until the iteration is finished. If it
+        is stopped early, the connection is closed.
+        """
+        normalized_query = self._normalize_query(query)
+        with (
+            tracer.span(
+                "iter_query",
+                kind=trace.SpanKind.CLIENT,
+                attributes={
+                    "cmk.livestatus.target_site_id": str(self.site_name),
+                },
+            ) as span,
+            _livestatus_output_format_switcher(normalized_query, self),
+        ):
+            str_query = self.build_query(normalized_query, add_headers)
+            span.set_attribute("cmk.livestatus.query", str_query)
+            self.send_query(str_query)
+
+        for row in self.iter_response_rows(str_query, normalized_query):
+            if self.prepend_site:
+                row.insert(0, b"")
+            yield row
+
+    def _normalize_query(self, query: QueryTypes) -> Query:
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+        if self.limit is None:
+            return normalized_query
+        return Query(
+            "%sLimit: %d\n" % (normalized_query, self.limit),
+            normalized_query.suppress_exceptions,
+        )
+
     def command(
         self,
         command: str,
@@ -1036,6 +1129,7 @@ class MultiSiteConnection(Helpers):
         self.only_sites: OnlySites = None
         self.limit: int | None = None
         self.parallelize = True
+        self.response_timeout: float | None = None
         self._only_sites_postprocess = only_sites_postprocess
 
         # Status host: A status host helps to prevent trying to connect
@@ -1208,6 +1302,15 @@ class MultiSiteConnection(Helpers):
         """Impose Limit on number of returned datasets (distributed among sites)"""
         self.limit = limit
 
+    def set_response_timeout(self, timeout: float | None = None) -> None:
+        """Limit the time to wait for the response of each site in parallel queries
+
+        Sites not starting to answer within timeout seconds after the query has been sent to all
+        sites are considered dead. The rows of the other sites are returned. In case None is
+        given, the limitation is removed.
+        """
+        self.response_timeout = timeout
+
     def dead_sites(self) -> dict[SiteId, DeadSite]:
         return self.deadsites
 
@@ -1288,13 +1391,7 @@ class MultiSiteConnection(Helpers):
         Limit: is simply applied to all sites - resulting in possibly more results then Limit
         requests.
         """
-        stillalive = []
-        if self.only_sites is not None:
-            connect_to_sites = [c for c in self.connections if c[0] in self.only_sites]
-            # Unused sites are assumed to be alive
-            stillalive.extend([c for c in self.connections if c[0] not in self.only_sites])
-        else:
-            connect_to_sites = self.connections
+        connect_to_sites, stillalive = self._split_sites_to_query()
 
         with tracer.span("query_parallel", attributes={"cmk.livestatus.query": str(query)}):
             # First send all queries
@@ -1314,6 +1411,69 @@ class MultiSiteConnection(Helpers):
         self.connections = stillalive
         return LivestatusResponse(result)
 
+    def iter_query(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Same as query_parallel, but yields the rows while the responses are received
+
+        The query is sent to all sites first, then the responses are read site by site in the
+        order they arrive. The rows of each site are yielded as soon as they are complete, so the
+        caller can process them before the slower sites answered.
+
+        The connections must not be used for other queries until the iteration is finished. If it
+        is stopped early, the connections of the sites not read completely are closed.
+        """
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+        connect_to_sites, stillalive = self._split_sites_to_query()
+
+        with _livestatus_output_format_switcher(normalized_query, self):
+            retrieve_responses = self._send_queries(
+                normalized_query,
+                add_headers,
+                connect_to_sites,
+                limit_header="Limit: %d\n" % self.limit if self.limit is not None else "",
+            )
+
+        unread = {
+            connected_site.id: connected_site for _q, _s, connected_site in retrieve_responses
+        }
+        try:
+            for str_query, _span, connected_site in self._wait_for_responses(retrieve_responses):
+                try:
+                    for row in connected_site.connection.iter_response_rows(
+                        str_query, normalized_query
+                    ):
+                        if self.prepend_site:
+                            row.insert(0, connected_site.id)
+                        yield row
+                    stillalive.append(connected_site)
+                except normalized_query.suppress_exceptions:
+                    stillalive.append(connected_site)
+                except LivestatusTestingError:
+                    raise
+                except Exception as e:
+                    connected_site.connection.disconnect()
+                    self.deadsites[connected_site.id] = {
+                        "exception": e,
+                        "site": connected_site.config,
+                    }
+                del unread[connected_site.id]
+        finally:
+            for site_id, connected_site in unread.items():
+                if site_id in self.deadsites:
+                    continue  # Did not answer in time
+                # The responses have not been read, the connections can not be used anymore
+                connected_site.connection.disconnect()
+                stillalive.append(connected_site)
+            self.connections = stillalive
+
+    def _split_sites_to_query(self) -> tuple[ConnectedSites, ConnectedSites]:
+        if self.only_sites is None:
+            return self.connections, []
+        # Unused sites are assumed to be alive
+        return (
+            [c for c in self.connections if c[0] in self.only_sites],
+            [c for c in self.connections if c[0] not in self.only_sites],
+        )
+
     def _send_queries(
         self, query: Query, add_headers: str, connect_to_sites: ConnectedSites, limit_header: str
     ) -> list[tuple[str, trace.Span, ConnectedSite]]:
@@ -1348,8 +1508,10 @@ class MultiSiteConnection(Helpers):
         retrieve_responses: list[tuple[str, trace.Span, ConnectedSite]],
         stillalive: ConnectedSites,
     ) -> list[tuple[ConnectedSite, bytes]]:
+        """Read the responses in the order they arrive, return them in the order of the sites"""
         site_responses: list[tuple[ConnectedSite, bytes]] = []
-        for str_query, request_span, connected_site in retrieve_responses:
+        suppressed: list[ConnectedSite] = []
+        for str_query, request_span, connected_site in self._wait_for_responses(retrieve_responses):
             with tracer.span(
                 f"receive_from_site[{connected_site.id}]",
                 kind=trace.SpanKind.CONSUMER,
@@ -1370,7 +1532,7 @@ class MultiSiteConnection(Helpers):
                     )
                 except query.suppress_exceptions:
                     # Mostly handles exception types MKLivestatusTableNotFoundError
-                    stillalive.append(connected_site)
+                    suppressed.append(connected_site)
                     continue
                 except LivestatusTestingError:
                     raise
@@ -1380,7 +1542,53 @@ class MultiSiteConnection(Helpers):
                         "exception": e,
                         "site": connected_site.config,
                     }
-        return site_responses
+
+        site_order = {
+            connected_site.id: index
+            for index, (_str_query, _span, connected_site) in enumerate(retrieve_responses)
+        }
+        stillalive.extend(sorted(suppressed, key=lambda c: site_order[c.id]))
+        return sorted(site_responses, key=lambda r: site_order[r[0].id])
+
+    def _wait_for_responses(
+        self, retrieve_responses: list[tuple[str, trace.Span, ConnectedSite]]
+    ) -> Iterator[tuple[str, trace.Span, ConnectedSite]]:
+        """Yield the sites in the order their responses arrive
+
+        Livestatus sends the response after it has been computed completely, so it can be read
+        right away once the socket is readable. Sites not answering within the response timeout
+        are disconnected and considered dead.
+        """
+        deadline = None if self.response_timeout is None else time.time() + self.response_timeout
+        with selectors.DefaultSelector() as selector:
+            for entry in retrieve_responses:
+                site_socket = entry[2].connection.socket
+                if site_socket is None or (
+                    isinstance(site_socket, ssl.SSLSocket) and site_socket.pending()
+                ):
+                    # Nothing to wait for: Either an error is raised while receiving or the data
+                    # is already buffered by the SSL layer
+                    yield entry
+                    continue
+                selector.register(site_socket, selectors.EVENT_READ, entry)
+
+            while selector.get_map():
+                timeout = None if deadline is None else max(0.0, deadline - time.time())
+                if not (ready := selector.select(timeout)) and timeout == 0.0:
+                    break
+                for key, _events in ready:
+                    selector.unregister(key.fileobj)
+                    yield key.data
+
+            for key in list(selector.get_map().values()):
+                _str_query, _request_span, connected_site = key.data
+                connected_site.connection.disconnect()
+                self.deadsites[connected_site.id] = {
+                    "exception": MKLivestatusSocketError(
+                        f"No response within {self.response_timeout}s"
+                    ),
+                    "site": connected_site.config,
+                }
 
     def _parse_responses(
         self,
@@ -1555,6 +1763,106 @@ def is_socket_readable(sock: socket.socket, select_timeout: float = 1.0) -> bool
     return sock in fd_sets[0]
 
 
+_JSON_NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+
+
+class _JSONRowsParser:
+    """Parses the rows of a JSON response while it is received
+
+    Livestatus writes every row of the response on a separate line. The received data is only
+    decoded up to the last complete line, so the rows are parsed one by one without creating
+    a copy of the complete response.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._pending: list[str] = []
+        self._started = False
+        self._expect_separator = False
+        self._expect_row = False
+        self._finished = False
+
+    def feed(self, data: bytes) -> list[LivestatusRow]:
+        text = self._decoder.decode(data)
+        if (end := text.rfind("\n")) == -1:
+            self._pending.append(text)
+            return []
+        self._pending.append(text[: end + 1])
+        rows, rest = self._parse("".join(self._pending))
+        self._pending = [rest, text[end + 1 :]]
+        return rows
+
+    def close(self) -> list[LivestatusRow]:
+        self._pending.append(self._decoder.decode(b"", final=True))
+        rows, rest = self._parse("".join(self._pending))
+        self._pending = []
+        if rest or not self._finished:
+            raise MKLivestatusQueryError("Malformed raw response output")
+        return rows
+
+    def _parse(self, text: str) -> tuple[list[LivestatusRow], str]:
+        """Parse the complete rows in text and return them together with the unparsed rest"""
+        rows: list[LivestatusRow] = []
+        pos = 0
+        while (match := _JSON_NON_WHITESPACE.search(text, pos)) is not None:
+            pos = match.start()
+            if not self._started:
+                if text[pos] != "[":
+                    raise MKLivestatusQueryError("Malformed raw response output")
+                self._started = True
+                pos += 1
+            elif self._finished:
+                raise MKLivestatusQueryError("Malformed raw response output")
+            elif text[pos] == "]" and not self._expect_row:
+                self._finished = True
+                pos += 1
+            elif self._expect_separator:
+                if text[pos] != ",":
+                    raise MKLivestatusQueryError("Malformed raw response output")
+                self._expect_separator = False
+                self._expect_row = True
+                pos += 1
+            elif (batch := self._parse_complete_rows(text[pos:].rstrip())) is not None:
+                rows.extend(batch)
+                return rows, ""
+            else:
+                try:
+                    row, pos = self._json_decoder.raw_decode(text, pos)
+                except ValueError:
+                    # The row is not complete yet, or malformed. Both is detected on close.
+                    return rows, text[pos:]
+                rows.append(row)
+                self._expect_separator = True
+                self._expect_row = False
+        return rows, ""
+
+    def _parse_complete_rows(self, text: str) -> list[LivestatusRow] | None:
+        """Parse all rows at once in case text ends at the end of a row
+
+        This is the case for the lines written by livestatus and saves decoding the rows one by
+        one. The brackets have to be balanced for the rows to be parsed, so a row can not be
+        split up by mistake.
+        """
+        try:
+            if text.endswith(","):
+                rows = json.loads(f"[{text[:-1]}]")
+                finished = False
+            elif text.endswith("]"):
+                rows = json.loads(f"[{text}")
+                finished = True
+            else:
+                return None
+        except ValueError:
+            return None
+        if not rows:
+            return None  # A row was expected
+        self._expect_separator = False
+        self._expect_row = not finished
+        self._finished = finished
+        return rows
+
+
 @dataclass(frozen=True)
 class RRDResponse:
     window: range
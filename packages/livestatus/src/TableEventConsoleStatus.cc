@@ -42,6 +42,24 @@ TableEventConsoleStatus::TableEventConsoleStatus() {
                                       offsets));
     addColumn(ECRow::makeDoubleColumn("status_average_connect_rate",
                                       "The average connect rate", offsets));
+    addColumn(ECRow::makeIntColumn(
+        "status_ingest_stalls",
+        "The number of times reading messages had to wait for the syslog parser processes",
+        offsets));
+    addColumn(ECRow::makeDoubleColumn("status_ingest_stall_rate",
+                                      "The ingestion stall rate", offsets));
+    addColumn(ECRow::makeDoubleColumn("status_average_ingest_stall_rate",
+                                      "The average ingestion stall rate",
+                                      offsets));
+    addColumn(ECRow::makeIntColumn(
+        "status_ingest_drops",
+        "The number of UDP messages dropped because the syslog parser processes were overloaded",
+        offsets));
+    addColumn(ECRow::makeDoubleColumn("status_ingest_drop_rate",
+                                      "The ingestion drop rate", offsets));
+    addColumn(ECRow::makeDoubleColumn("status_average_ingest_drop_rate",
+                                      "The average ingestion drop rate",
+                                      offsets));
     addColumn(ECRow::makeIntColumn("status_rule_tries",
                                    "The number of rule tries", offsets));
     addColumn(ECRow::makeDoubleColumn("status_rule_trie_rate",
@@ -118,6 +136,17 @@ TableEventConsoleStatus::TableEventConsoleStatus() {
     addColumn(ECRow::makeIntColumn(
         "status_event_limit_active_overall",
         "Whether or not the overall event limit is in effect (0/1)", offsets));
+
+    addColumn(ECRow::makeIntColumn(
+        "status_history_queue_depth",
+        "The number of history entries waiting to be written", offsets));
+    addColumn(ECRow::makeIntColumn(
+        "status_history_flushes",
+        "The number of history writes since startup of the Event Console",
+        offsets));
+    addColumn(ECRow::makeDoubleColumn("status_average_history_flush_time",
+                                      "The average history write time",
+                                      offsets));
 }
 
 std::string TableEventConsoleStatus::name() const {
@@ -634,6 +634,9 @@ ColumnDefinitions event_console_status_columns() {
         {"status_average_connect_rate", ColumnType::double_},
         {"status_average_drop_rate", ColumnType::double_},
         {"status_average_event_rate", ColumnType::double_},
+        {"status_average_history_flush_time", ColumnType::double_},
+        {"status_average_ingest_drop_rate", ColumnType::double_},
+        {"status_average_ingest_stall_rate", ColumnType::double_},
         {"status_average_message_rate", ColumnType::double_},
         {"status_average_overflow_rate", ColumnType::double_},
         {"status_average_processing_time", ColumnType::double_},
@@ -654,6 +657,12 @@ ColumnDefinitions event_console_status_columns() {
         {"status_event_limit_rule", ColumnType::int_},
         {"status_event_rate", ColumnType::double_},
         {"status_events", ColumnType::int_},
+        {"status_history_flushes", ColumnType::int_},
+        {"status_history_queue_depth", ColumnType::int_},
+        {"status_ingest_drop_rate", ColumnType::double_},
+        {"status_ingest_drops", ColumnType::int_},
+        {"status_ingest_stall_rate", ColumnType::double_},
+        {"status_ingest_stalls", ColumnType::int_},
         {"status_message_rate", ColumnType::double_},
         {"status_messages", ColumnType::int_},
         {"status_num_open_events", ColumnType::int_},
@@ -46,6 +46,12 @@ def test_status_table_via_core(site: Site) -> None:
         "status_connects",
         "status_connect_rate",
         "status_average_connect_rate",
+        "status_ingest_stalls",
+        "status_ingest_stall_rate",
+        "status_average_ingest_stall_rate",
+        "status_ingest_drops",
+        "status_ingest_drop_rate",
+        "status_average_ingest_drop_rate",
         "status_rule_tries",
         "status_rule_trie_rate",
         "status_average_rule_trie_rate",
@@ -67,6 +73,9 @@ def test_status_table_via_core(site: Site) -> None:
         "status_event_limit_host",
         "status_event_limit_rule",
         "status_event_limit_overall",
+        "status_history_queue_depth",
+        "status_history_flushes",
+        "status_average_history_flush_time",
     ]:
         assert column_name in status
 
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Query many sites in parallel, some of them answering slowly
+
+This does not need a site, run it with:
+
+$ pytest tests/performance/test_livestatus_multisite.py --benchmark-group-by=func
+
+The sites are simulated by a thread serving one unix socket per site. Every site answers
+with a delay, the first sites being the slowest, so reading the responses in the order the
+queries were sent has to wait for them before any other response is processed.
+"""
+
+import heapq
+import itertools
+import json
+import selectors
+import socket
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture  # type: ignore[import-untyped]
+
+from cmk.ccc.site import SiteId
+from cmk.livestatus_client import (
+    MultiSiteConnection,
+    Query,
+    QuerySpecification,
+    SiteConfiguration,
+    SiteConfigurations,
+)
+
+_NUM_SITES = 100
+_NUM_ROWS = 1000
+_MAX_DELAY = 0.05
+_HANGING_DELAY = 3600.0
+
+_QUERY = Query(QuerySpecification(table="services", columns=["host_name", "state"]))
+
+
+@dataclass
+class _Peer:
+    socket: socket.socket
+    delay: float
+    listening: bool
+    buffer: bytes = b""
+
+
+class _SimulatedSites:
+    def __init__(self, directory: Path, delays: Sequence[float]) -> None:
+        self.socket_paths = [directory / f"site{idx}" for idx in range(len(delays))]
+        # As written by livestatus: Every row on a separate line
+        body = (
+            "["
+            + ",\n".join(json.dumps([f"host{idx}", idx % 4]) for idx in range(_NUM_ROWS))
+            + "]\n"
+        ).encode("utf-8")
+        self._response = b"%-3d %11d\n" % (200, len(body)) + body
+        self._selector = selectors.DefaultSelector()
+        for path, delay in zip(self.socket_paths, delays):
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(str(path))
+            server.listen()
+            self._selector.register(server, selectors.EVENT_READ, _Peer(server, delay, True))
+        self._scheduled: list[tuple[float, int, socket.socket]] = []
+        self._counter = itertools.count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def __enter__(self) -> "_SimulatedSites":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join()
+        for key in list(self._selector.get_map().values()):
+            key.data.socket.close()
+        self._selector.close()
+
+    def _serve(self) -> None:
+        while not self._stop.is_set():
+            timeout = 0.1
+            if self._scheduled:
+                timeout = min(timeout, max(0.0, self._scheduled[0][0] - time.time()))
+            for key, _events in self._selector.select(timeout):
+                self._handle(key.data)
+            while self._scheduled and self._scheduled[0][0] <= time.time():
+                _at, _count, connection = heapq.heappop(self._scheduled)
+                try:
+                    connection.sendall(self._response)
+                except OSError:
+                    pass  # Closed by the client
+
+    def _handle(self, peer: _Peer) -> None:
+        if peer.listening:
+            connection, _address = peer.socket.accept()
+            self._selector.register(
+                connection, selectors.EVENT_READ, _Peer(connection, peer.delay, False)
+            )
+            return
+
+        if not (data := peer.socket.recv(65536)):
+            self._selector.unregister(peer.socket)
+            peer.socket.close()
+            return
+
+        peer.buffer += data
+        while b"\n\n" in peer.buffer:
+            _query, peer.buffer = peer.buffer.split(b"\n\n", 1)
+            heapq.heappush(
+                self._scheduled, (time.time() + peer.delay, next(self._counter), peer.socket)
+            )
+
+
+def _site_configuration(site_id: SiteId, socket_path: Path) -> SiteConfiguration:
+    return SiteConfiguration(
+        alias=site_id,
+        disable_wato=True,
+        disabled=False,
+        id=site_id,
+        insecure=False,
+        multisiteurl="",
+        persist=False,
+        proxy=None,
+        replicate_ec=False,
+        replicate_mkps=False,
+        replication=None,
+        message_broker_port=5672,
+        status_host=None,
+        timeout=5,
+        url_prefix="",
+        user_login=True,
+        user_sync=None,
+        socket=f"unix:{socket_path}",
+    )
+
+
+def _connect(sites: _SimulatedSites) -> MultiSiteConnection:
+    return MultiSiteConnection(
+        SiteConfigurations(
+            {
+                (site_id := SiteId(f"site{idx}")): _site_configuration(site_id, path)
+                for idx, path in enumerate(sites.socket_paths)
+            }
+        )
+    )
+
+
+def _delays(num_hanging: int) -> list[float]:
+    return [_HANGING_DELAY] * num_hanging + [
+        _MAX_DELAY * (1 - idx / _NUM_SITES) for idx in range(num_hanging, _NUM_SITES)
+    ]
+
+
+@pytest.fixture(name="sites", scope="module")
+def fixture_sites(tmp_path_factory: pytest.TempPathFactory) -> Iterator[_SimulatedSites]:
+    with _SimulatedSites(tmp_path_factory.mktemp("sites"), _delays(0)) as sites:
+        yield sites
+
+
+@pytest.fixture(name="hanging_sites", scope="module")
+def fixture_hanging_sites(tmp_path_factory: pytest.TempPathFactory) -> Iterator[_SimulatedSites]:
+    with _SimulatedSites(tmp_path_factory.mktemp("hanging_sites"), _delays(1)) as sites:
+        yield sites
+
+
+def test_query(benchmark: BenchmarkFixture, sites: _SimulatedSites) -> None:
+    connection = _connect(sites)
+    rows = benchmark.pedantic(connection.query, args=(_QUERY,), rounds=10)
+    assert len(rows) == _NUM_SITES * _NUM_ROWS
+    assert not connection.dead_sites()
+
+
+def test_iter_query(benchmark: BenchmarkFixture, sites: _SimulatedSites) -> None:
+    connection = _connect(sites)
+    num_rows = benchmark.pedantic(
+        lambda: sum(1 for _row in connection.iter_query(_QUERY)), rounds=10
+    )
+    assert num_rows == _NUM_SITES * _NUM_ROWS
+    assert not connection.dead_sites()
+
+
+def test_query_with_hanging_site(
+    benchmark: BenchmarkFixture, hanging_sites: _SimulatedSites
+) -> None:
+    def query() -> tuple[int, list[SiteId]]:
+        connection = _connect(hanging_sites)
+        connection.set_response_timeout(0.5)
+        return len(connection.query(_QUERY)), list(connection.dead_sites())
+
+    num_rows, dead_sites = benchmark.pedantic(query, rounds=3)
+    assert num_rows == (_NUM_SITES - 1) * _NUM_ROWS
+    assert dead_sites == [SiteId("site0")]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Store and read the piggyback data of a source host with many VMs
+
+This does not need a site, run it with:
+
+$ pytest tests/performance/test_piggyback_store.py
+"""
+
+import itertools
+from pathlib import Path
+
+from pytest_benchmark.fixture import BenchmarkFixture  # type: ignore[import-untyped]
+
+from cmk.ccc.hostaddress import HostName
+from cmk.piggyback import backend
+
+_SOURCE = HostName("vcenter")
+_PIGGYBACKED_HOSTS = [HostName(f"vm{i:04}") for i in range(3000)]
+_PAYLOAD = [b"<<<esx_vsphere_vm>>>", *(b"config.hardware.numCPU 4" for _ in range(40))]
+
+
+def test_piggyback_store(tmp_path: Path, benchmark: BenchmarkFixture) -> None:
+    timestamps = itertools.count(1700000000, 60)
+
+    def store() -> None:
+        timestamp = next(timestamps)
+        backend.store_piggyback_raw_data(
+            _SOURCE,
+            {host: _PAYLOAD for host in _PIGGYBACKED_HOSTS},
+            message_timestamp=timestamp,
+            contact_timestamp=timestamp,
+            omd_root=tmp_path,
+        )
+
+    store()
+    benchmark.pedantic(store, rounds=10)
+
+
+def test_piggyback_get_messages(tmp_path: Path, benchmark: BenchmarkFixture) -> None:
+    backend.store_piggyback_raw_data(
+        _SOURCE,
+        {host: _PAYLOAD for host in _PIGGYBACKED_HOSTS},
+        message_timestamp=1700000000,
+        contact_timestamp=1700000000,
+        omd_root=tmp_path,
+    )
+
+    def get_messages() -> None:
+        for host in _PIGGYBACKED_HOSTS[:100]:
+            backend.get_messages_for(host, tmp_path)
+
+    benchmark.pedantic(get_messages, rounds=10)
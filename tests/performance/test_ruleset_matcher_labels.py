@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Match host label conditions of rulesets against a big configuration
+
+This does not need a site, run it with:
+
+$ pytest tests/performance/test_ruleset_matcher_labels.py
+
+Every round computes the matching hosts of a host ruleset with label conditions
+from scratch, like it is done once per ruleset during the config generation.
+"""
+
+from collections.abc import Mapping, Sequence
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture  # type: ignore[import-untyped]
+
+from cmk.ccc.hostaddress import HostName
+from cmk.utils.rulesets.ruleset_matcher import RulesetMatcher, RuleSpec
+
+_NUM_HOSTS = 50000
+
+_HOSTS = [HostName(f"host{i:05d}") for i in range(_NUM_HOSTS)]
+
+_LABELS: Mapping[HostName, Mapping[str, str]] = {
+    host_name: {
+        "cmk/os_family": ("linux", "windows", "aix")[i % 3],
+        "cmk/site": f"site{i % 20}",
+        "env": ("prod", "test")[i % 2],
+        "team": f"team{i % 50}",
+    }
+    for i, host_name in enumerate(_HOSTS)
+}
+
+_RULESET: Sequence[RuleSpec[str]] = [
+    *(
+        RuleSpec(
+            id=f"site{i}",
+            value=f"site{i}",
+            condition={"host_label_groups": [("and", [("and", f"cmk/site:site{i}")])]},
+        )
+        for i in range(20)
+    ),
+    *(
+        RuleSpec(
+            id=f"team{i}",
+            value=f"team{i}",
+            condition={
+                "host_label_groups": [
+                    ("and", [("and", f"team:team{i}"), ("not", "env:test")]),
+                    ("or", [("and", "cmk/os_family:aix"), ("and", f"cmk/site:site{i % 20}")]),
+                ]
+            },
+        )
+        for i in range(50)
+    ),
+]
+
+
+def _compute_ruleset(matcher: RulesetMatcher) -> None:
+    matcher.clear_caches()
+    matcher.get_host_values_all(_HOSTS[0], _RULESET, _LABELS.__getitem__)
+
+
+@pytest.mark.benchmark(group="label conditions")
+def test_ruleset_matcher_label_conditions(benchmark: BenchmarkFixture) -> None:
+    matcher = RulesetMatcher(
+        host_tags={host_name: {} for host_name in _HOSTS},
+        host_paths={},
+        all_configured_hosts=frozenset(_HOSTS),
+        clusters_of={},
+        nodes_of={},
+    )
+    benchmark.pedantic(_compute_ruleset, args=(matcher,), rounds=5)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Compare the SNMP cache file formats for switches with many interfaces
+
+This does not need a site, run it with:
+
+$ pytest tests/performance/test_snmp_cache.py --benchmark-group-by=param:num_interfaces
+"""
+
+import ast
+from collections.abc import Callable, Sequence
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture  # type: ignore[import-untyped]
+
+from cmk.fetchers._snmpcodec import deserialize_raw_data, serialize_raw_data
+from cmk.snmplib import SNMPRawData, SNMPTable
+from cmk.utils.sectionname import SectionName
+
+
+def _raw_data(num_interfaces: int) -> SNMPRawData:
+    rows: Sequence[SNMPTable] = [
+        [
+            str(index),
+            f"Ethernet1/{index}",
+            "6",
+            "10000000000",
+            "1",
+            str(123456789 * index),
+            str(987654321 * index),
+            [0, 0x1B, 0x21, index % 256, 0x42, 0x17],
+        ]
+        for index in range(num_interfaces)
+    ]
+    return {SectionName("if64"): [rows]}
+
+
+def _legacy_roundtrip(raw_data: SNMPRawData) -> SNMPRawData:
+    """The former implementation"""
+    raw = (repr({str(k): v for k, v in raw_data.items()}) + "\n").encode("utf-8")
+    return {SectionName(k): v for k, v in ast.literal_eval(raw.decode("utf-8")).items()}
+
+
+def _binary_roundtrip(raw_data: SNMPRawData) -> SNMPRawData:
+    return deserialize_raw_data(serialize_raw_data(raw_data))
+
+
+@pytest.mark.parametrize("num_interfaces", [1000, 10000, 100000])
+@pytest.mark.parametrize(
+    "roundtrip", [_legacy_roundtrip, _binary_roundtrip], ids=["legacy", "binary"]
+)
+def test_snmp_cache_roundtrip(
+    benchmark: BenchmarkFixture,
+    roundtrip: Callable[[SNMPRawData], SNMPRawData],
+    num_interfaces: int,
+) -> None:
+    raw_data = _raw_data(num_interfaces)
+    assert benchmark.pedantic(roundtrip, args=(raw_data,), rounds=5) == raw_data
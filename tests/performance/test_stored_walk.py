@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Fetch the tables of a few sections from a stored walk of a big switch
+
+This does not need a site, run it with:
+
+$ pytest tests/performance/test_stored_walk.py
+"""
+
+import logging
+import os
+from pathlib import Path
+
+from pytest_benchmark.fixture import BenchmarkFixture  # type: ignore[import-untyped]
+
+from cmk.ccc.hostaddress import HostAddress, HostName
+from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend
+from cmk.snmplib import SNMPBackendEnum, SNMPHostConfig, SNMPVersion
+
+_NUM_INTERFACES = 10000
+_COLUMNS = range(1, 23)
+
+_SNMP_CONFIG = SNMPHostConfig(
+    is_ipv6_primary=False,
+    hostname=HostName("switch"),
+    ipaddress=HostAddress("1.2.3.4"),
+    credentials="public",
+    port=161,
+    bulkwalk_enabled=True,
+    snmp_version=SNMPVersion.V2C,
+    bulk_walk_size_of=10,
+    timing={},
+    oid_range_limits={},
+    snmpv3_contexts=[],
+    character_encoding=None,
+    snmp_backend=SNMPBackendEnum.STORED_WALK,
+)
+
+
+def _fetch(path: Path) -> None:
+    backend = StoredWalkSNMPBackend(_SNMP_CONFIG, logging.getLogger("test"), path)
+    backend.get(".1.3.6.1.2.1.1.2.0", context="")
+    for column in (2, 8, 10, 16):
+        backend.walk(f".1.3.6.1.2.1.2.2.1.{column}", context="")
+
+
+def test_stored_walk_fetch(tmp_path: Path, benchmark: BenchmarkFixture) -> None:
+    path = tmp_path / "switch"
+    with path.open("w") as f:
+        f.write('.1.3.6.1.2.1.1.2.0 ".1.3.6.1.4.1.9.1.1208"\n')
+        for column in _COLUMNS:
+            for index in range(1, _NUM_INTERFACES + 1):
+                f.write(f".1.3.6.1.2.1.2.2.1.{column}.{index} {column * index}\n")
+    # Make the walk old enough for its index to be stored
+    os.utime(path, (1700000000, 1700000000))
+
+    benchmark.pedantic(_fetch, args=(path,), rounds=10)
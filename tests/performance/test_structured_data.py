@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Compare the storage of the rows of inventory tables for a host with many packages
+
+This does not need a site, run it with:
+
+$ pytest tests/performance/test_structured_data.py --benchmark-group-by=func
+
+The rows of the tables are either stored as one dictionary per row or column by column
+(as created when loading the trees).
+"""
+
+import tracemalloc
+from collections.abc import Callable
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture  # type: ignore[import-untyped]
+
+from cmk.utils.structured_data import (
+    deserialize_tree,
+    ImmutableTable,
+    ImmutableTree,
+    SDFilterChoice,
+    SDKey,
+    SDNodeName,
+    SDRawTree,
+)
+
+_NUM_PACKAGES = 50000
+_PACKAGES_PATH = (SDNodeName("software"), SDNodeName("packages"))
+
+
+def _raw_tree(version: int) -> SDRawTree:
+    packages: SDRawTree = {
+        "Attributes": {},
+        "Table": {
+            "KeyColumns": [SDKey("name")],
+            "Rows": [
+                {
+                    SDKey("name"): f"package-{idx}",
+                    # Every hundredth package is updated
+                    SDKey("version"): f"1.{version if idx % 100 == 0 else 0}",
+                    SDKey("vendor"): "The Vendor",
+                    SDKey("arch"): "amd64",
+                    SDKey("package_type"): "deb",
+                    SDKey("summary"): f"The package number {idx}",
+                }
+                for idx in range(_NUM_PACKAGES)
+            ],
+        },
+        "Nodes": {},
+    }
+    software: SDRawTree = {
+        "Attributes": {},
+        "Table": {},
+        "Nodes": {SDNodeName("packages"): packages},
+    }
+    return {"Attributes": {}, "Table": {}, "Nodes": {SDNodeName("software"): software}}
+
+
+def _with_dict_rows(tree: ImmutableTree) -> ImmutableTree:
+    """The former representation of the rows"""
+    return ImmutableTree(
+        path=tree.path,
+        attributes=tree.attributes,
+        table=ImmutableTable(
+            key_columns=tree.table.key_columns,
+            rows_by_ident=dict(tree.table.rows_by_ident.items()),
+            retentions=tree.table.retentions,
+        ),
+        nodes_by_name={name: _with_dict_rows(node) for name, node in tree.nodes_by_name.items()},
+    )
+
+
+_REPRESENTATIONS: dict[str, Callable[[ImmutableTree], ImmutableTree]] = {
+    "dict": _with_dict_rows,
+    "columnar": lambda tree: tree,
+}
+
+
+@pytest.fixture(name="trees", params=list(_REPRESENTATIONS), scope="module")
+def fixture_trees(request: pytest.FixtureRequest) -> tuple[ImmutableTree, ImmutableTree]:
+    make = _REPRESENTATIONS[request.param]
+    return make(deserialize_tree(_raw_tree(1))), make(deserialize_tree(_raw_tree(2)))
+
+
+def test_difference(
+    benchmark: BenchmarkFixture, trees: tuple[ImmutableTree, ImmutableTree]
+) -> None:
+    delta_tree = benchmark.pedantic(trees[1].difference, args=(trees[0],), rounds=5)
+    assert len(delta_tree.get_tree(_PACKAGES_PATH).table.rows) == _NUM_PACKAGES // 100
+
+
+def test_merge(benchmark: BenchmarkFixture, trees: tuple[ImmutableTree, ImmutableTree]) -> None:
+    merged = benchmark.pedantic(trees[1].merge, args=(trees[0],), rounds=5)
+    assert len(merged.get_rows(_PACKAGES_PATH)) == _NUM_PACKAGES
+
+
+def test_filter(benchmark: BenchmarkFixture, trees: tuple[ImmutableTree, ImmutableTree]) -> None:
+    filters = [
+        SDFilterChoice(
+            path=_PACKAGES_PATH,
+            pairs="all",
+            columns=[SDKey("name"), SDKey("version")],
+            nodes="all",
+        )
+    ]
+    filtered = benchmark.pedantic(trees[1].filter, args=(filters,), rounds=5)
+    assert len(filtered.get_tree(_PACKAGES_PATH).table) == 2 * _NUM_PACKAGES
+
+
+@pytest.mark.parametrize("representation", list(_REPRESENTATIONS))
+def test_memory(benchmark: BenchmarkFixture, representation: str) -> None:
+    raw_tree = _raw_tree(1)
+
+    def load() -> ImmutableTree:
+        return _REPRESENTATIONS[representation](deserialize_tree(raw_tree))
+
+    tracemalloc.start()
+    try:
+        tree = load()
+        benchmark.extra_info["allocated_bytes"] = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert tree
+
+    benchmark.pedantic(load, rounds=5)
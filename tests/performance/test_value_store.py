@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Compare the value store file formats for a host with many interfaces
+
+This does not need a site, run it with:
+
+$ pytest tests/performance/test_value_store.py --benchmark-group-by=param:changed_share
+
+Every round simulates one check cycle: Load the value stores of the host, change the
+counters of some of the services and write the changes.
+"""
+
+import json
+from collections.abc import Callable, Mapping
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture  # type: ignore[import-untyped]
+
+from cmk.ccc import store
+from cmk.ccc.hostaddress import HostName
+from cmk.checkengine.value_store import AllValueStoresStore, ValueStoreKey
+
+_HOST = HostName("switch")
+_NUM_INTERFACES = 5000
+
+type _Data = Mapping[ValueStoreKey, Mapping[str, str]]
+
+
+def _interface_counters(item: int, cycle: int) -> Mapping[str, str]:
+    return {
+        f"{counter}.{item}": repr((1700000000.0 + 60 * cycle, 123456789 * cycle + item))
+        for counter in ("in", "inmcast", "inbcast", "inucast", "inerr", "indisc", "out", "outerr")
+    }
+
+
+def _changes(cycle: int, changed_share: float) -> _Data:
+    return {
+        (_HOST, "if64", str(item)): _interface_counters(item, cycle)
+        for item in range(int(_NUM_INTERFACES * changed_share))
+    }
+
+
+def _json_cycle(path: Path, changes: _Data) -> None:
+    """The former implementation: Load the whole JSON file and rewrite it"""
+    data = {(HostName(h), p, i): v for (h, p, i), v in json.loads(path.read_text())}
+    with store.locked(path):
+        store.save_text_to_file(path, json.dumps(list({**data, **changes}.items())))
+
+
+def _binary_cycle(path: Path, changes: _Data) -> None:
+    avss = AllValueStoresStore(path, log_debug=lambda x: None)
+    avss.load()
+    avss.update(changes)
+
+
+@pytest.mark.parametrize("changed_share", [0.1, 1.0])
+@pytest.mark.parametrize("cycle_function", [_json_cycle, _binary_cycle], ids=["json", "binary"])
+def test_value_store_check_cycle(
+    tmp_path: Path,
+    benchmark: BenchmarkFixture,
+    cycle_function: Callable[[Path, _Data], None],
+    changed_share: float,
+) -> None:
+    path = tmp_path / str(_HOST)
+    path.write_text(json.dumps(list(_changes(0, 1.0).items())))
+    # Migrates the file to the binary format for the binary cycles
+    cycle_function(path, _changes(0, 1.0))
+
+    cycles = iter(range(1, 1000000))
+    benchmark.pedantic(
+        cycle_function,
+        setup=lambda: ((path, _changes(next(cycles), changed_share)), {}),
+        rounds=20,
+    )
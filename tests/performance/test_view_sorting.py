@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Sort the rows of a large service view by multiple sorters
+
+This does not need a site, run it with:
+
+$ pytest tests/performance/test_view_sorting.py --benchmark-group-by=param:num_rows
+
+The sorters without key functions are sorted by comparing the rows pairwise, as all sorters
+were before.
+"""
+
+import random
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture  # type: ignore[import-untyped]
+
+from cmk.gui.type_defs import Rows
+from cmk.gui.views.page_show_view import _sort_data
+from cmk.gui.views.sorter import Sorter, SorterEntry
+from cmk.gui.views.sorter.sorters import (
+    cmp_service_name,
+    key_service_name,
+    SorterSiteHost,
+    SorterSvcstate,
+)
+
+_SERVICES = ["Check_MK", "CPU load", "Memory", "Uptime"] + [
+    f"Interface {idx}" for idx in range(1, 47)
+]
+
+SorterSvcdescr = Sorter(
+    ident="svcdescr",
+    title="Service name",
+    columns=["service_description"],
+    sort_function=lambda r1, r2, **_kwargs: cmp_service_name("service_description", r1, r2),
+    sort_key=lambda row, **_kwargs: key_service_name("service_description", row),
+)
+
+
+def _rows(num_rows: int) -> Rows:
+    rng = random.Random(42)
+    return [
+        {
+            "site": f"site{rng.randrange(5)}",
+            "host_name": f"host{idx // len(_SERVICES)}",
+            "service_description": _SERVICES[idx % len(_SERVICES)],
+            "service_state": rng.choice([0, 0, 0, 0, 1, 2, 3]),
+            "service_has_been_checked": 1,
+        }
+        for idx in range(num_rows)
+    ]
+
+
+def _without_key(sorter: Sorter) -> Sorter:
+    return Sorter(sorter.ident, sorter.title, sorter.columns, sorter.cmp)
+
+
+@pytest.mark.parametrize("num_rows", [5000, 50000])
+@pytest.mark.parametrize("by", ["key", "cmp"])
+def test_sort_data(benchmark: BenchmarkFixture, num_rows: int, by: str) -> None:
+    rows = _rows(num_rows)
+    sorters = [
+        SorterEntry(sorter if by == "key" else _without_key(sorter), negate, None, None)
+        for sorter, negate in [
+            (SorterSvcstate, True),
+            (SorterSiteHost, False),
+            (SorterSvcdescr, False),
+        ]
+    ]
+
+    def sort() -> Rows:
+        _sort_data(data := rows.copy(), sorters)
+        return data
+
+    assert len(benchmark.pedantic(sort, rounds=5)) == num_rows
@@ -1396,6 +1396,28 @@ def test_hostgroups(monkeypatch: MonkeyPatch, hostname: HostName, result: list[s
     assert ts.apply(monkeypatch).hostgroups(hostname) == result
 
 
+def test_match_host_rulesets_in_bulk(monkeypatch: MonkeyPatch) -> None:
+    ts = Scenario()
+    for i in range(100):
+        ts.add_host(HostName(f"testhost{i}"))
+    ts.set_ruleset(
+        "host_groups",
+        [
+            {
+                "id": "01",
+                "condition": {"host_name": [HostName("testhost2")]},
+                "value": "dingdong",
+            },
+        ],
+    )
+    config_cache = ts.apply(monkeypatch)
+    config_cache.match_host_rulesets_in_bulk()
+
+    assert config_cache.hostgroups(HostName("testhost1")) == ["check_mk"]
+    assert config_cache.hostgroups(HostName("testhost2")) == ["dingdong"]
+    assert "host_groups" in config_cache.host_ruleset_durations()
+
+
 @pytest.mark.parametrize(
     "hostname, result",
     [
@@ -22,6 +22,7 @@ from cmk.base.core_factory import create_core
 from cmk.ccc.hostaddress import HostAddress, HostName
 from cmk.checkengine.parameters import TimespecificParameters
 from cmk.checkengine.plugins import AgentBasedPlugins, CheckPluginName, ConfiguredService
+from cmk.discover_plugins import PluginLocation
 from cmk.fetchers.snmp import SNMPPluginStore
 from cmk.utils import ip_lookup, password_store
 from cmk.utils.config_path import VersionedConfigPath
@@ -393,3 +394,92 @@ def test_get_tags_with_groups_from_attributes(
     attributes: dict[str, str], expected: dict[TagGroupID, TagID]
 ) -> None:
     assert get_tags_with_groups_from_attributes(list(attributes.items())) == expected
+
+
+def test_compute_host_config_fingerprints(monkeypatch: MonkeyPatch) -> None:
+    hostnames = [HostName("host1"), HostName("host2")]
+
+    def compute(group: str, *, hostconf: bool) -> core_config.HostConfigFingerprints:
+        ts = Scenario()
+        for hostname in hostnames:
+            ts.add_host(hostname)
+        ts.set_ruleset(
+            "host_groups",
+            [{"id": "01", "condition": {"host_name": ["host1"]}, "value": group}],
+        )
+        ts.set_option("generate_hostconf", hostconf)
+        return core_config.compute_host_config_fingerprints(
+            ts.apply(monkeypatch),
+            hostnames,
+            {},
+            {},
+            {},
+            lambda *a: HostAddress("127.0.0.1"),
+        )
+
+    fingerprints = compute("group", hostconf=True)
+    assert compute("group", hostconf=True) == fingerprints
+
+    changed_rule = compute("other", hostconf=True)
+    assert changed_rule.config == fingerprints.config
+    assert changed_rule.hosts[HostName("host1")] != fingerprints.hosts[HostName("host1")]
+    assert changed_rule.hosts[HostName("host2")] == fingerprints.hosts[HostName("host2")]
+
+    assert compute("group", hostconf=False).config != fingerprints.config
+
+
+def test_compute_host_config_fingerprints_of_parents(monkeypatch: MonkeyPatch) -> None:
+    hostnames = [HostName("parent"), HostName("child")]
+
+    def compute(group: str, *, parents: str) -> core_config.HostConfigFingerprints:
+        ts = Scenario()
+        for hostname in hostnames:
+            ts.add_host(hostname)
+        ts.set_ruleset(
+            "host_groups",
+            [{"id": "01", "condition": {"host_name": ["parent"]}, "value": group}],
+        )
+        ts.set_ruleset(
+            "parents",
+            [{"id": "02", "condition": {"host_name": ["child"]}, "value": parents}],
+        )
+        return core_config.compute_host_config_fingerprints(
+            ts.apply(monkeypatch),
+            hostnames,
+            {},
+            {},
+            {},
+            lambda *a: HostAddress("127.0.0.1"),
+        )
+
+    fingerprints = compute("group", parents="parent")
+    assert (
+        compute("other", parents="parent").hosts[HostName("child")]
+        != fingerprints.hosts[HostName("child")]
+    )
+    assert (
+        compute("group", parents="unknown").hosts[HostName("child")]
+        != fingerprints.hosts[HostName("child")]
+    )
+
+
+def test_compute_host_config_fingerprints_of_server_side_calls(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    def compute() -> core_config.HostConfigFingerprints:
+        return core_config.compute_host_config_fingerprints(
+            Scenario().apply(monkeypatch),
+            [],
+            {},
+            {},
+            {},
+            lambda *a: HostAddress("127.0.0.1"),
+        )
+
+    fingerprints = compute()
+    monkeypatch.setattr(
+        core_config,
+        "load_active_checks",
+        lambda **kw: {PluginLocation("cmk.plugins.my_check", "active_check_my_check"): None},
+    )
+    assert compute().config != fingerprints.config
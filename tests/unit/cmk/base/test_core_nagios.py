@@ -10,7 +10,7 @@ import itertools
 import os
 import socket
 from collections import Counter
-from collections.abc import Callable, Mapping, Sequence
+from collections.abc import Callable, Iterator, Mapping, Sequence
 from pathlib import Path
 from typing import Any, Literal
 
@@ -19,9 +19,13 @@ from pytest import MonkeyPatch
 
 import cmk.ccc.debug
 import cmk.ccc.version as cmk_version
-from cmk.base import config
+from cmk.base import config, core_config
+from cmk.base.core_factory import get_licensing_handler_type
+from cmk.base.core_nagios import _create_config, _precompile_host_checks, _workers
 from cmk.base.core_nagios._create_config import (
     _format_nagios_object,
+    _HostsFragment,
+    create_config,
     create_nagios_config_commands,
     create_nagios_host_spec,
     create_nagios_servicedefs,
@@ -30,8 +34,10 @@ from cmk.base.core_nagios._create_config import (
 from cmk.base.core_nagios._precompile_host_checks import (
     dump_precompiled_hostcheck,
     HostCheckStore,
+    precompile_hostchecks,
     PrecompileMode,
 )
+from cmk.ccc.exceptions import MKIPAddressLookupError
 from cmk.ccc.hostaddress import HostAddress, HostName
 from cmk.checkengine.plugins import AgentBasedPlugins, AutocheckEntry, CheckPlugin, CheckPluginName
 from cmk.discover_plugins import PluginLocation
@@ -442,6 +448,163 @@ def _make_plugins_for_test() -> AgentBasedPlugins:
     )
 
 
+def test_create_config_in_workers(monkeypatch: MonkeyPatch, config_path: Path) -> None:
+    hostnames = [HostName(f"host{i}") for i in range(10)]
+    ts = Scenario()
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    ts.set_ruleset(
+        "host_check_commands",
+        [{"id": "01", "condition": {"host_name": ["host1", "host2", "host7"]}, "value": "agent"}],
+    )
+    ts.set_ruleset(
+        "host_groups",
+        [{"id": "02", "condition": {"host_name": ["host3", "host8"]}, "value": "group"}],
+    )
+    config_cache = ts.apply(monkeypatch)
+    monkeypatch.setattr(config, "get_resource_macros", lambda: {})
+
+    def create(workers: int) -> str:
+        outfile = io.StringIO()
+        create_config(
+            outfile,
+            config_path,
+            config_cache,
+            config_cache.make_passive_service_name_config(),
+            lambda hn: {},
+            {},
+            hostnames=hostnames,
+            licensing_handler=get_licensing_handler_type().make(),
+            passwords={},
+            get_ip_stack_config=lambda *a: ip_lookup.IPStackConfig.IPv4,
+            default_address_family=lambda *a: socket.AddressFamily.AF_INET,
+            ip_address_of=ip_address_of_return_local,
+            service_depends_on=lambda *a: (),
+            workers=workers,
+        )
+        return outfile.getvalue()
+
+    serial_config = create(1)
+    assert "check-mk-host-custom-3" in serial_config
+
+    def fail(*args: object) -> Iterator[_HostsFragment]:
+        raise AssertionError("Workers started for a handful of hosts")
+
+    with monkeypatch.context() as m:
+        m.setattr(_create_config, "process_in_workers", fail)
+        assert create(3) == serial_config
+
+    monkeypatch.setattr(_create_config, "_MIN_HOSTS_PER_WORKER", 1)
+    assert create(3) == serial_config
+
+
+def test_process_in_workers(monkeypatch: MonkeyPatch) -> None:
+    hostnames = [HostName(f"host{i}") for i in range(10)]
+    ts = Scenario()
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    config_cache = ts.apply(monkeypatch)
+
+    processed_by = list(
+        _workers.process_in_workers(
+            config_cache, hostnames, 3, lambda chunk: [(hn, os.getpid()) for hn in chunk]
+        )
+    )
+
+    assert [hn for hn, _pid in processed_by] == hostnames
+    # The first host is processed before forking the workers
+    assert processed_by[0][1] == os.getpid()
+    assert all(pid != os.getpid() for _hn, pid in processed_by[1:])
+
+
+def test_process_in_workers_adds_host_ruleset_durations(monkeypatch: MonkeyPatch) -> None:
+    # Enough hosts to match the host rulesets in bulk
+    hostnames = [HostName(f"host{i}") for i in range(100)]
+    ts = Scenario()
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    ts.set_ruleset(
+        "host_groups",
+        [{"id": "01", "condition": {"host_name": ["host3"]}, "value": "group"}],
+    )
+    config_cache = ts.apply(monkeypatch)
+    config_cache.match_host_rulesets_in_bulk()
+
+    def process_chunk(chunk: Sequence[HostName]) -> Sequence[Sequence[str]]:
+        # Not looked up for the first host, so the workers match the ruleset
+        return [config_cache.hostgroups(hn) for hn in chunk if hn != hostnames[0]]
+
+    assert list(_workers.process_in_workers(config_cache, hostnames, 2, process_chunk))[2] == [
+        "group"
+    ]
+    assert "host_groups" in config_cache.host_ruleset_durations()
+
+
+def test_create_config_with_host_config_fragments(
+    monkeypatch: MonkeyPatch, config_path: Path
+) -> None:
+    hostnames = [HostName(f"host{i}") for i in range(3)]
+
+    def create(group: str, *, incremental: bool) -> tuple[str, int]:
+        ts = Scenario()
+        for hostname in hostnames:
+            ts.add_host(hostname)
+        ts.set_ruleset(
+            "host_check_commands",
+            [{"id": "01", "condition": {"host_name": ["host0", "host2"]}, "value": "agent"}],
+        )
+        ts.set_ruleset(
+            "host_groups",
+            [{"id": "02", "condition": {"host_name": ["host1"]}, "value": group}],
+        )
+        config_cache = ts.apply(monkeypatch)
+        monkeypatch.setattr(config, "get_resource_macros", lambda: {})
+
+        host_config_fragments = (
+            core_config.HostConfigFragments[_HostsFragment](
+                "nagios",
+                core_config.compute_host_config_fingerprints(
+                    config_cache,
+                    hostnames,
+                    {},
+                    {},
+                    {},
+                    ip_address_of_return_local,
+                ),
+            )
+            if incremental
+            else None
+        )
+        outfile = io.StringIO()
+        create_config(
+            outfile,
+            config_path,
+            config_cache,
+            config_cache.make_passive_service_name_config(),
+            lambda hn: {},
+            {},
+            hostnames=hostnames,
+            licensing_handler=get_licensing_handler_type().make(),
+            passwords={},
+            get_ip_stack_config=lambda *a: ip_lookup.IPStackConfig.IPv4,
+            default_address_family=lambda *a: socket.AddressFamily.AF_INET,
+            ip_address_of=ip_address_of_return_local,
+            service_depends_on=lambda *a: (),
+            host_config_fragments=host_config_fragments,
+        )
+        if host_config_fragments is None:
+            return outfile.getvalue(), 0
+        host_config_fragments.save()
+        return outfile.getvalue(), host_config_fragments.num_reused
+
+    core_config.clear_host_config_fragments()
+    full_config, _reused = create("group", incremental=False)
+    assert "check-mk-host-custom-2" in full_config
+    assert create("group", incremental=True) == (full_config, 0)
+    assert create("group", incremental=True) == (full_config, 3)
+    assert create("other", incremental=True) == (create("other", incremental=False)[0], 2)
+
+
 def test_dump_precompiled_hostcheck(monkeypatch: MonkeyPatch, config_path: Path) -> None:
     hostname = HostName("localhost")
     ts = Scenario()
@@ -472,6 +635,92 @@ def test_dump_precompiled_hostcheck(monkeypatch: MonkeyPatch, config_path: Path)
         assert False, f"Execution failed with error: {e}"
 
 
+def test_precompile_hostchecks_in_workers(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(_precompile_host_checks, "_MIN_HOSTS_PER_WORKER", 1)
+    hostnames = [HostName(f"host{i}") for i in range(5)]
+    ts = Scenario()
+    for hostname in hostnames:
+        ts.add_host(hostname)
+        ts.set_autochecks(hostname, [AutocheckEntry(CheckPluginName("uptime"), None, {}, {})])
+    config_cache = ts.apply(monkeypatch)
+    plugins = _make_plugins_for_test()
+
+    def precompile(config_path: Path, workers: int) -> Mapping[HostName, str]:
+        precompile_hostchecks(
+            config_path,
+            config_cache,
+            config_cache.make_passive_service_name_config(),
+            lambda hn: {},
+            plugins,
+            {},
+            lambda *a: ip_lookup.IPStackConfig.IPv4,
+            lambda *a: HostAddress("1.2.3.4"),
+            precompile_mode=PrecompileMode.INSTANT,
+            workers=workers,
+        )
+        assert all(
+            HostCheckStore.host_check_file_path(config_path, hn).exists() for hn in hostnames
+        )
+        return {
+            hn: HostCheckStore.host_check_source_file_path(config_path, hn)
+            .read_text()
+            .replace(str(config_path), "<config_path>")
+            for hn in hostnames
+        }
+
+    assert precompile(tmp_path / "serial", 1) == precompile(tmp_path / "parallel", 2)
+
+
+def test_precompile_hostchecks_in_workers_collects_failed_ip_lookups(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(_precompile_host_checks, "_MIN_HOSTS_PER_WORKER", 1)
+    hostnames = [HostName(f"host{i}") for i in range(5)]
+    ts = Scenario()
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    config_cache = ts.apply(monkeypatch)
+
+    def lookup(host_name: HostName, family: socket.AddressFamily) -> HostAddress:
+        if host_name == "host3":
+            raise MKIPAddressLookupError("Failed to lookup")
+        return HostAddress("1.2.3.4")
+
+    ip_address_of = ip_lookup.ConfiguredIPLookup(
+        lookup, allow_empty=(), error_handler=ip_lookup.CollectFailedHosts()
+    )
+    precompile_hostchecks(
+        tmp_path,
+        config_cache,
+        config_cache.make_passive_service_name_config(),
+        lambda hn: {},
+        _make_plugins_for_test(),
+        {},
+        lambda *a: ip_lookup.IPStackConfig.IPv4,
+        ip_address_of,
+        precompile_mode=PrecompileMode.INSTANT,
+        workers=2,
+    )
+
+    assert list(ip_address_of.error_handler.failed_ip_lookups) == [HostName("host3")]
+
+
+def test_plugin_locations_resolver(monkeypatch: MonkeyPatch) -> None:
+    ts = Scenario()
+    ts.add_host(HostName("a"))
+    ts.add_host(HostName("b"))
+    config_cache = ts.apply(monkeypatch)
+    plugins = _make_plugins_for_test()
+    resolve = _precompile_host_checks._PluginLocationsResolver(config_cache, plugins)
+
+    needed_plugins = list(plugins.check_plugins.values())
+    locations = resolve(HostName("a"), needed_plugins)
+    assert locations == ([PluginLocation("some.test.module.name", "uptime")], [])
+    assert resolve(HostName("b"), needed_plugins) is locations
+    assert resolve(HostName("b"), []) == ([], [])
+    assert resolve.num_resolved == 2
+
+
 MOCK_PLUGIN = ActiveCheckConfig(
     name="my_active_check",
     parameter_parser=lambda x: x,
@@ -3,15 +3,20 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from collections.abc import Sequence
+
 import pytest
 
 from livestatus import LivestatusResponse
 
 from cmk.bi.actions import BICallARuleAction
 from cmk.bi.aggregation import BIAggregation
+from cmk.bi.computer import BIIncrementalComputer
 from cmk.bi.data_fetcher import BIStatusFetcher, BIStructureFetcher
+from cmk.bi.lib import RequiredBIElement
 from cmk.bi.packs import BIAggregationPacks
 from cmk.bi.searcher import BISearcher
+from cmk.ccc.hostaddress import HostName
 from cmk.ccc.site import SiteId
 
 from .bi_test_data import sample_config
@@ -84,3 +89,55 @@ def test_compute_aggregation(
     assert actual_result.acknowledged == expected_acknowledgment
     assert actual_result.in_downtime == expected_in_downtime
     assert actual_result.in_service_period == expected_service_period
+
+
+@pytest.mark.parametrize(
+    "status_data_sequence",
+    [
+        [
+            sample_config.bi_status_rows,
+            sample_config.bi_acknowledgment_status_rows,
+            sample_config.bi_downtime_status_rows,
+            sample_config.bi_status_rows,
+            sample_config.bi_service_period_status_rows,
+        ],
+    ],
+)
+def test_compute_aggregation_incrementally(
+    bi_packs_sample_config: BIAggregationPacks,
+    bi_structure_fetcher: BIStructureFetcher,
+    bi_searcher: BISearcher,
+    bi_status_fetcher: BIStatusFetcher,
+    status_data_sequence: Sequence[LivestatusResponse],
+) -> None:
+    bi_structure_fetcher.add_site_data(SiteId("heute"), sample_config.bi_structure_states)
+    bi_searcher.set_hosts(bi_structure_fetcher.hosts)
+    bi_aggregation = bi_packs_sample_config.get_aggregation("default_aggregation")
+    assert bi_aggregation is not None
+    compiled_aggregation = bi_aggregation.compile(bi_searcher)
+    bi_computer = BIIncrementalComputer(
+        {compiled_aggregation.id: compiled_aggregation}, bi_status_fetcher
+    )
+
+    for status_data in status_data_sequence:
+        bi_status_fetcher.states = bi_status_fetcher.create_bi_status_data(status_data)
+        assert bi_computer.compute_branches(
+            compiled_aggregation, compiled_aggregation.branches
+        ) == compiled_aggregation.compute_branches(compiled_aggregation.branches, bi_status_fetcher)
+
+    # Nothing changed: The results of the previous computation are reused
+    previous_results = bi_computer.compute_branches(
+        compiled_aggregation, compiled_aggregation.branches
+    )
+    results = bi_computer.compute_branches(compiled_aggregation, compiled_aggregation.branches)
+    assert all(r is p for r, p in zip(results, previous_results))
+
+    bi_status_fetcher.assumed_states = {
+        RequiredBIElement(SiteId("heute"), HostName("heute"), "Check_MK Discovery"): 2
+    }
+    results = bi_computer.compute_branches(compiled_aggregation, compiled_aggregation.branches)
+    assert results == compiled_aggregation.compute_branches(
+        compiled_aggregation.branches, bi_status_fetcher
+    )
+    assert results[0].assumed_result is not None
+    assert results[0].assumed_result.state == 2
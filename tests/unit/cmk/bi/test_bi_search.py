@@ -3,10 +3,15 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from collections.abc import Mapping
+
 import pytest
 
 from cmk.bi.search import BIEmptySearch, BIFixedArgumentsSearch, BIHostSearch, BIServiceSearch
 from cmk.bi.searcher import BISearcher
+from cmk.utils.labels import LabelGroups
+from cmk.utils.rulesets.ruleset_matcher import matches_labels, matches_tag_condition, TagCondition
+from cmk.utils.tags import TagGroupID
 
 
 def test_empty_search(bi_searcher: BISearcher) -> None:
@@ -189,3 +194,47 @@ def test_service_search(
     search = BIServiceSearch(schema_config)
     results = search.execute({}, bi_searcher_with_sample_config)
     assert len(results) == expected_matches
+
+
+@pytest.mark.parametrize(
+    "tag_conditions",
+    [
+        {},
+        {"clone-tag": "clone-tag"},
+        {"criticality": {"$ne": "prod"}},
+        {"criticality": {"$or": ["prod", "test"]}, "agent": "cmk-agent"},
+        {"criticality": {"$nor": ["prod"]}},
+        {"criticality": None},
+    ],
+)
+def test_filter_host_tags(
+    bi_searcher_with_sample_config: BISearcher, tag_conditions: Mapping[TagGroupID, TagCondition]
+) -> None:
+    hosts = list(bi_searcher_with_sample_config.hosts.values())
+    assert list(bi_searcher_with_sample_config.filter_host_tags(hosts, tag_conditions)) == [
+        host
+        for host in hosts
+        if all(
+            matches_tag_condition(taggroup_id, tag_condition, host.tags)
+            for taggroup_id, tag_condition in tag_conditions.items()
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "label_groups",
+    [
+        [("and", [("and", "cmk/check_mk_server:yes")])],
+        [("and", [("not", "cmk/check_mk_server:yes")])],
+        [("not", [("and", "cmk/check_mk_server:yes")])],
+        [("and", [("and", "cmk/check_mk_server:no"), ("or", "cmk/check_mk_server:yes")])],
+        [("and", [("and", "cmk/check_mk_server:no")]), ("or", [("and", "")])],
+    ],
+)
+def test_filter_host_labels(
+    bi_searcher_with_sample_config: BISearcher, label_groups: LabelGroups
+) -> None:
+    hosts = list(bi_searcher_with_sample_config.hosts.values())
+    assert list(bi_searcher_with_sample_config.filter_host_labels(hosts, label_groups)) == [
+        host for host in hosts if matches_labels(host.labels, label_groups)
+    ]
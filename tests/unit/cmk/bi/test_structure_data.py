@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import marshal
+from pathlib import Path
+
+from cmk.bi.structure_data import (
+    create_host_data,
+    load_site_structure_data,
+    save_site_structure_data,
+)
+from cmk.ccc.hostaddress import HostName
+
+_SITE_DATA = {
+    HostName("heute"): (
+        "heute",
+        {("agent", "cmk-agent"), ("criticality", "prod")},
+        {"cmk/check_mk_server": "yes"},
+        "",
+        {
+            "Check_MK Discovery": (set(), {"cmk_is_discoverylabel": "yes"}),
+            "Interface 2": ({"custom"}, {}),
+        },
+        ("heute_clone",),
+        (),
+        "heute_alias",
+        "heute",
+    ),
+    HostName("heute_clone"): (
+        "heute",
+        {("agent", "cmk-agent"), ("criticality", "test")},
+        {},
+        "/subfolder",
+        {},
+        (),
+        ("heute",),
+        "heute_clone",
+        "heute_clone",
+    ),
+}
+
+# The same as kept by the BIStructureFetcher after fetching the data
+_EXPECTED_HOSTS = {
+    str(host_name): create_host_data(values) for host_name, values in _SITE_DATA.items()
+}
+
+
+def test_save_and_load_site_structure_data(tmp_path: Path) -> None:
+    save_site_structure_data(path := tmp_path / "bi_site_cache.heute.1", _SITE_DATA)
+    hosts = load_site_structure_data(path)
+    assert hosts == _EXPECTED_HOSTS
+    # Strings are stored only once
+    assert hosts["heute"].site_id is hosts["heute_clone"].site_id
+    assert hosts["heute"].children[0] is hosts["heute_clone"].name
+
+
+def test_load_site_structure_data_of_previous_version(tmp_path: Path) -> None:
+    (path := tmp_path / "bi_site_cache.heute.1").write_bytes(
+        marshal.dumps({str(host_name): values for host_name, values in _SITE_DATA.items()})
+    )
+    assert load_site_structure_data(path) == _EXPECTED_HOSTS
+
+
+def test_load_empty_site_structure_data(tmp_path: Path) -> None:
+    save_site_structure_data(path := tmp_path / "bi_site_cache.heute.1", {})
+    assert not load_site_structure_data(path)
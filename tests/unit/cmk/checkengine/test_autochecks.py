@@ -10,8 +10,13 @@ from pathlib import Path
 import pytest
 
 import cmk.utils.paths
+from cmk.ccc.exceptions import MKGeneralException
 from cmk.ccc.hostaddress import HostName
-from cmk.checkengine.discovery import AutocheckServiceWithNodes, AutochecksStore
+from cmk.checkengine.discovery import (
+    AutocheckServiceWithNodes,
+    AutochecksMemoizer,
+    AutochecksStore,
+)
 from cmk.checkengine.discovery._autochecks import _AutochecksSerializer as AutochecksSerializer
 from cmk.checkengine.discovery._autochecks import _consolidate_autochecks_of_real_hosts
 from cmk.checkengine.discovery._utils import DiscoveredItem
@@ -22,6 +27,7 @@ from tests.testlib.unit.base_configuration_scenario import Scenario
 @pytest.fixture(autouse=True)
 def autochecks_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     monkeypatch.setattr(cmk.utils.paths, "autochecks_dir", tmp_path)
+    monkeypatch.setattr(cmk.utils.paths, "tmp_dir", tmp_path / "tmp")
 
 
 class TestAutochecksSerializer:
@@ -67,6 +73,36 @@ class TestAutochecksStore:
         store.write(_entries())
         assert store.read() == _entries()
 
+    def test_read_cached(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        entries = [AutocheckEntry(CheckPluginName("norris"), None, {"host": HostName("abc")}, {})]
+        store = AutochecksStore(HostName("herbert"))
+        store.write(entries)
+        _forbid_parsing(monkeypatch)
+        assert store.read() == entries
+
+    def test_changed_file_is_read(self) -> None:
+        store = AutochecksStore(HostName("herbert"))
+        store.write(_entries())
+        (cmk.utils.paths.autochecks_dir / "herbert.mk").write_text("[\n]\n")
+        assert not store.read()
+
+    def test_broken_cache_is_rebuilt(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        store = AutochecksStore(HostName("herbert"))
+        store.write(_entries())
+        cache_path = cmk.utils.paths.tmp_dir / "autochecks_cache" / "herbert.marshal"
+        cache_path.write_bytes(cache_path.read_bytes()[:-3])
+        assert store.read() == _entries()
+
+        _forbid_parsing(monkeypatch)
+        assert store.read() == _entries()
+
+
+def _forbid_parsing(monkeypatch: pytest.MonkeyPatch) -> None:
+    def deserialize(raw: bytes) -> Sequence[AutocheckEntry]:
+        raise AssertionError("Autochecks file parsed")
+
+    monkeypatch.setattr(AutochecksSerializer, "deserialize", deserialize)
+
 
 @pytest.mark.usefixtures("agent_based_plugins")
 @pytest.mark.parametrize(
@@ -106,6 +142,21 @@ def test_memoizer_get_autochecks_of(
     assert result == expected_result
 
 
+def test_memoizer_read_all() -> None:
+    AutochecksStore(HostName("herbert")).write(_entries())
+    (cmk.utils.paths.autochecks_dir / "broken.mk").write_text("[")
+    memoizer = AutochecksMemoizer()
+
+    memoizer.read_all()
+    AutochecksStore(HostName("herbert")).clear()
+    AutochecksStore(HostName("new")).write(_entries())
+
+    assert memoizer.read(HostName("herbert")) == _entries()
+    assert not memoizer.read(HostName("new"))
+    with pytest.raises(MKGeneralException):
+        memoizer.read(HostName("broken"))
+
+
 def _entry(name: str, params: dict[str, str] | None = None) -> AutocheckEntry:
     return AutocheckEntry(CheckPluginName(name), None, params or {}, {})
 
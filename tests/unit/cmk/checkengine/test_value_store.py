@@ -3,6 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import os
 from collections.abc import Mapping
 from pathlib import Path
 
@@ -70,6 +71,72 @@ class TestAllValueStoresStore:
             (HostName("host1"), "service2", None): {"key": "new_value2"},
         }
 
+    def test_update_migrates_json(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        self._get_avss(file).update({})
+
+        assert not file.read_bytes().startswith(b"[")
+        assert value_store.AllValueStoresStore(file, log_debug=lambda x: None).load() == {
+            (HostName("host1"), "service1", "item"): {"key": "value1"},
+            (HostName("host1"), "service2", None): {"key": "value2"},
+        }
+
+    def test_update_appends_changes_only(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        avss = self._get_avss(file)
+        avss.update({})
+        size = file.stat().st_size
+
+        avss.update({(HostName("host1"), "service1", "item"): {"key": "value1"}})
+        assert file.stat().st_size == size
+
+        avss.update({(HostName("host1"), "service1", "item"): {"key": "new_value1"}})
+        assert size < file.stat().st_size < 2 * size
+
+    def test_update_reloads_rewritten_file_of_same_size(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        avss = self._get_avss(file)
+        avss.update({})
+
+        # Same inode and size, only the modification time tells the content has changed
+        stat = file.stat()
+        file.write_bytes(file.read_bytes().replace(b"value1", b"value9"))
+        os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert file.stat().st_ino == stat.st_ino
+        assert file.stat().st_size == stat.st_size
+
+        # Only a change with respect to the rewritten content is written
+        avss.update({(HostName("host1"), "service1", "item"): {"key": "value1"}})
+        assert value_store.AllValueStoresStore(file, log_debug=lambda x: None).load()[
+            (HostName("host1"), "service1", "item")
+        ] == {"key": "value1"}
+
+    def test_update_compacts(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        avss = self._get_avss(file)
+        avss.update({})
+        size = file.stat().st_size
+
+        for n in range(10):
+            avss.update({(HostName("host1"), "service1", "item"): {"key": f"value{n}"}})
+
+        assert file.stat().st_size <= 2 * size
+        assert value_store.AllValueStoresStore(file, log_debug=lambda x: None).load()[
+            (HostName("host1"), "service1", "item")
+        ] == {"key": "value9"}
+
+    def test_load_ignores_incomplete_record(self, tmp_path: Path) -> None:
+        file = tmp_path / "file"
+        self._get_avss(file).update({})
+        with file.open("ab") as f:
+            f.write(b"\x10\x00\x00\x00incomplete")
+
+        avss = value_store.AllValueStoresStore(file, log_debug=lambda x: None)
+        assert len(avss.load()) == 2
+
+        avss.update({(HostName("host1"), "service3", None): {"key": "value3"}})
+        assert len(value_store.AllValueStoresStore(file, log_debug=lambda x: None).load()) == 3
+
 
 class _BrokenRepr(str):
     def __repr__(self) -> str:
@@ -107,6 +107,7 @@ def fixture_history_sqlite(settings: ec.Settings, config: Config) -> Iterator[SQ
     yield history
 
     history.flush()
+    history.close()
 
 
 @pytest.fixture(name="perfcounters")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from cmk.ccc.hostaddress import HostName
+from cmk.ec.event import Event
+from cmk.ec.event_store import EventStore
+from cmk.ec.main import EventStatus
+from tests.unit.cmk.ec.helpers import new_event
+
+
+def _event(event_id: int, rule_id: str, host: str) -> Event:
+    return new_event(
+        {"id": event_id, "rule_id": rule_id, "host": HostName(host), "core_host": HostName(host)}
+    )
+
+
+def test_lookups() -> None:
+    events = [_event(1, "r1", "h1"), _event(2, "r2", "h1"), _event(3, "r1", "H2")]
+    store = EventStore(events)
+
+    assert list(store) == events
+    assert store.get(2) is events[1]
+    assert store.get(4) is None
+    assert list(store.by_rule("r1")) == [events[0], events[2]]
+    assert list(store.by_host((HostName("h1"), HostName("h1")))) == events[:2]
+    assert store.by_host_names(["h2", "H1"]) == events
+    assert store.count_by_rule() == {"r1": 2, "r2": 1}
+    assert store.num_events_of_host((HostName("H2"), HostName("H2"))) == 1
+
+
+def test_oldest_eviction() -> None:
+    events = [_event(1, "r1", "h1"), _event(2, "r2", "h2"), _event(3, "r2", "h1")]
+    store = EventStore(events)
+
+    assert store.oldest() is events[0]
+    assert store.oldest_of_rule("r2") is events[1]
+    assert store.oldest_of_host("h1") is events[0]
+
+    assert store.remove(events[0])
+    assert not store.remove(events[0])
+    assert store.oldest() is events[1]
+    assert store.oldest_of_host("h1") is events[2]
+    assert store.oldest_of_rule("r1") is None
+    assert "r1" not in store.count_by_rule()
+
+
+def test_reindex_keeps_age_order() -> None:
+    events = [_event(1, "r1", "h1"), _event(2, "r1", "h2"), _event(3, "r1", "h2")]
+    store = EventStore(events)
+
+    events[0]["host"] = HostName("h2")
+    events[0]["core_host"] = HostName("h2")
+    store.reindex(events[0])
+
+    assert store.num_events_of_host((HostName("h1"), HostName("h1"))) == 0
+    assert list(store.by_host((HostName("h2"), HostName("h2")))) == events
+    assert store.oldest_of_host("h2") is events[0]
+
+
+def test_event_status_limits_follow_store(event_status: EventStatus) -> None:
+    for num in range(3):
+        event_status.new_event(
+            new_event({"host": HostName(f"host-{num % 2}"), "core_host": HostName("core")})
+        )
+
+    assert event_status.num_existing_events == 3
+    assert event_status.num_existing_events_by_host == {
+        (HostName("host-0"), HostName("core")): 2,
+        (HostName("host-1"), HostName("core")): 1,
+    }
+
+    event_status.remove_oldest_event("by_host", new_event({"host": HostName("host-0")}))
+
+    assert [event["id"] for event in event_status.events()] == [2, 3]
+    assert event_status.num_existing_events_by_rule == {"815": 2}
+
+
+def test_pack_unpack_status(event_status: EventStatus) -> None:
+    event_status.new_event(new_event({"core_host": HostName("core")}))
+    packed = event_status.pack_status()
+
+    event_status.flush()
+    assert event_status.events() == []
+
+    event_status.unpack_status(packed)
+    assert event_status.events() == packed["events"]
+    assert event_status.event(1) is packed["events"][0]
@@ -6,7 +6,6 @@
 
 import datetime
 import logging
-import shlex
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
@@ -16,14 +15,10 @@ import cmk.ec.export as ec
 from cmk.ccc.hostaddress import HostName
 from cmk.ec.config import Config
 from cmk.ec.history import _current_history_period
-from cmk.ec.history_file import (
-    _grep_pipeline,
-    convert_history_line,
-    FileHistory,
-    parse_history_file,
-)
+from cmk.ec.history_file import convert_history_line, FileHistory, read_history_file
+from cmk.ec.history_file_index import index_path, load_index
 from cmk.ec.main import StatusTableHistory
-from cmk.ec.query import QueryFilter, QueryGET, StatusTable
+from cmk.ec.query import OperatorName, QueryFilter, QueryGET, StatusTable
 
 
 def test_file_add_get(history: FileHistory) -> None:
@@ -88,23 +83,94 @@ def test_history_parse(tmp_path: Path) -> None:
     """
     path = tmp_path / "history_test.log"
     path.write_text(values)
-    filter_ = QueryFilter(
-        column_name="event_id",
-        operator_name="=",
-        predicate=lambda x: True,
-        argument="1",
-    )
-    tac = f"nl -b a {shlex.quote(str(path))} | tac"
-    cmd = " | ".join([tac] + _grep_pipeline([filter_]))
+    logger = logging.getLogger("cmk.mkeventd")
 
-    new_entries = parse_history_file(
+    new_entries = read_history_file(
         StatusTableHistory.columns,
         path,
+        load_index(path, None, logger),
+        [],
         lambda x: True,
-        cmd,
+        (None, None),
         None,
-        logging.getLogger("cmk.mkeventd"),
+        logger,
     )
 
     assert len(new_entries) == 4
+    assert new_entries[0][0] == 4
     assert new_entries[0][1] == 1666942292.3000507
+
+
+def _write_history_lines(path: Path, num_lines: int) -> None:
+    with path.open("a") as f:
+        for n in range(num_lines):
+            f.write(
+                f"{1666942200.0 + n}\tNEW\t\t\t{n + 1}\t1\ttext {n}\t1666942205.0\t"
+                f"1666942205.0\t\t0\thost-{n % 3}\t\tOMD\t0\t6\t9\tasdf\t0\topen"
+                "\t\t\t\t\t\thost\theute\t0\t\n"
+            )
+
+
+def _filter(column_name: str, operator_name: OperatorName, argument: object) -> QueryFilter:
+    return QueryFilter(column_name, operator_name, lambda x: True, argument)
+
+
+def test_read_history_file_of_host(tmp_path: Path) -> None:
+    path = tmp_path / "1666915200.log"
+    _write_history_lines(path, 10)
+    logger = logging.getLogger("cmk.mkeventd")
+
+    rows = read_history_file(
+        StatusTableHistory.columns,
+        path,
+        load_index(path, None, logger),
+        [_filter("event_host", "=", "host-1")],
+        lambda row: row[12] == "host-1",
+        (None, None),
+        None,
+        logger,
+    )
+
+    assert [row[0] for row in rows] == [8, 5, 2]
+    assert {row[12] for row in rows} == {"host-1"}
+
+
+def test_read_history_file_time_range_and_limit(tmp_path: Path) -> None:
+    path = tmp_path / "1666915200.log"
+    _write_history_lines(path, 10)
+    logger = logging.getLogger("cmk.mkeventd")
+
+    rows = read_history_file(
+        StatusTableHistory.columns,
+        path,
+        load_index(path, None, logger),
+        [],
+        lambda row: True,
+        (1666942202.0, 1666942206.0),
+        2,
+        logger,
+    )
+
+    # The limit check is done before reading the next line
+    assert [row[5] for row in rows] == [7, 6, 5]
+
+
+def test_history_index_is_extended(tmp_path: Path) -> None:
+    path = tmp_path / "1666915200.log"
+    logger = logging.getLogger("cmk.mkeventd")
+    _write_history_lines(path, 3)
+    index = load_index(path, None, logger)
+    assert index.num_lines == 3
+    assert index_path(path).exists()
+
+    with path.open("a") as f:
+        f.write("1666942300.0\tNEW\tincomplete")
+    assert load_index(path, index, logger).num_lines == 3
+
+    with path.open("a") as f:
+        f.write("\n")
+    index = load_index(path, None, logger)
+    assert index.num_lines == 4
+    assert index.timespan() == (1666942200.0, 1666942300.0)
+    assert list(index.event_ids[2]) == [1]
+    assert list(index.hosts["host-0"]) == [0]
@@ -6,14 +6,18 @@
 
 import logging
 import sqlite3
+import time
 from collections.abc import Iterator
+from unittest.mock import ANY
 
 import pytest
 
 import cmk.ec.export as ec
 from cmk.ccc.hostaddress import HostName
-from cmk.ec.history_sqlite import filters_to_sqlite_query, SQLiteHistory
-from cmk.ec.main import StatusTableHistory
+from cmk.ec.config import Config
+from cmk.ec.history import HistoryStatus
+from cmk.ec.history_sqlite import filters_to_sqlite_query, SQLiteHistory, SQLiteSettings
+from cmk.ec.main import StatusTableEvents, StatusTableHistory
 from cmk.ec.query import QueryFilter, QueryGET, StatusTable
 
 
@@ -207,6 +211,7 @@ def test_housekeeping(history_sqlite: SQLiteHistory) -> None:
     event2 = ec.Event(host=HostName("ABC2"), text="Event2 text", core_host=HostName("ABC"))
     history_sqlite.add(event=event1, what="NEW")
     history_sqlite.add(event=event2, what="NEW")
+    history_sqlite.commit()
 
     with history_sqlite.conn as connection:
         cur = connection.cursor()
@@ -217,3 +222,56 @@ def test_housekeeping(history_sqlite: SQLiteHistory) -> None:
         history_sqlite.housekeeping()
         cur.execute("SELECT count(*) FROM history;")
         assert cur.fetchone()["count(*)"] == 1
+
+
+def test_add_is_buffered(history_sqlite: SQLiteHistory) -> None:
+    """Entries are written in one transaction, but are visible to queries immediately."""
+
+    for num in range(3):
+        history_sqlite.add(event=ec.Event(host=HostName(f"ABC{num}"), id=num), what="NEW")
+
+    assert history_sqlite.status() == HistoryStatus(queue_depth=3)
+
+    logger = logging.getLogger("cmk.mkeventd")
+    query = QueryGET(
+        lambda name: StatusTableHistory(logger, history_sqlite),
+        ["GET history", "Columns: event_host", "Filter: history_what = NEW", "Limit: 1"],
+        logger,
+    )
+
+    assert len(list(history_sqlite.get(query))) == 2  # one more than the limit
+    status = history_sqlite.status()
+    assert status.queue_depth == 0
+    assert status.flushes == 1
+
+
+def test_housekeeping_writes_buffer(history_sqlite: SQLiteHistory) -> None:
+    """The buffer is written on every housekeeping, not only when old entries are removed."""
+    history_sqlite.housekeeping()
+
+    history_sqlite.add(event=ec.Event(host=HostName("ABC1")), what="NEW")
+    history_sqlite.housekeeping()
+
+    assert history_sqlite.status().queue_depth == 0
+    with history_sqlite.conn as connection:
+        assert connection.execute("SELECT count(*) FROM history;").fetchone()[0] == 1
+
+
+def test_buffer_written_periodically_after_start(settings: ec.Settings, config: Config) -> None:
+    history = SQLiteHistory(
+        SQLiteSettings.from_settings(settings, database=":memory:"),
+        config | {"archive_mode": "sqlite", "sqlite_history_flush_interval": 1},
+        logging.getLogger("cmk.mkeventd"),
+        StatusTableEvents.columns,
+        StatusTableHistory.columns,
+    )
+    history.add(event=ec.Event(host=HostName("ABC1")), what="NEW")
+    time.sleep(1.5)
+    assert history.status().queue_depth == 1  # Nothing is written before start()
+
+    history.start()
+    deadline = time.time() + 10
+    while history.status().queue_depth and time.time() < deadline:
+        time.sleep(0.01)
+    assert history.status() == HistoryStatus(flushes=1, average_flush_time=ANY)
+    history.close()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import logging
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+
+from cmk.ec.event import Event
+from cmk.ec.ingestion import parse_syslog_messages, SyslogPipeline
+from cmk.ec.main import EventServer
+from cmk.ec.perfcounters import Perfcounters
+
+
+def test_parse_syslog_messages() -> None:
+    (event,) = parse_syslog_messages(
+        [(b"<78>May 26 13:45:01 Klapprechner CRON[8046]: message", ("1.2.3.4", 514))]
+    )
+    assert event["host"] == "Klapprechner"
+    assert event["application"] == "CRON"
+    assert event["text"] == "message"
+    assert event["ipaddress"] == "1.2.3.4"
+
+
+def test_pipeline_keeps_order_and_drops_when_full(perfcounters: Perfcounters) -> None:
+    processed: list[str] = []
+    consumer_may_continue = threading.Event()
+
+    def process_events(events: Iterable[Event]) -> None:
+        consumer_may_continue.wait()
+        processed.extend(event["text"] for event in events)
+
+    pipeline = SyslogPipeline(
+        num_processes=2,
+        queue_len=1,
+        process_events=process_events,
+        perfcounters=perfcounters,
+        logger=logging.getLogger("cmk.mkeventd"),
+    )
+    pipeline.submit_messages([(b"first", None)], may_drop=False)
+    # Waits until the consumer has taken the first batch, it is blocked then.
+    pipeline.submit_messages([(b"second", None)], may_drop=False)
+    pipeline.submit_messages([(b"dropped", None)], may_drop=True)
+    consumer_may_continue.set()
+    pipeline.submit_events([Event(text="trap")])
+    pipeline.close()
+
+    assert processed == ["first", "second", "trap"]
+    assert _status(perfcounters)["status_ingest_drops"] == 1
+
+
+def _status(perfcounters: Perfcounters) -> Mapping[str, float]:
+    return dict(
+        zip(
+            (column for column, _default in perfcounters.status_columns()),
+            perfcounters.get_status(),
+        )
+    )
+
+
+def _pipeline(
+    process_events: Callable[[Iterable[Event]], None], perfcounters: Perfcounters
+) -> SyslogPipeline:
+    return SyslogPipeline(
+        num_processes=1,
+        queue_len=10,
+        process_events=process_events,
+        perfcounters=perfcounters,
+        logger=logging.getLogger("cmk.mkeventd"),
+    )
+
+
+def test_pipeline_calls_on_processed_after_processing(perfcounters: Perfcounters) -> None:
+    calls: list[str] = []
+    pipeline = _pipeline(lambda events: calls.extend(e["text"] for e in events), perfcounters)
+    pipeline.submit_messages(
+        [(b"first", None), (b"second", None)],
+        may_drop=False,
+        on_processed=lambda: calls.append("processed"),
+    )
+    pipeline.submit_messages([], may_drop=False, on_processed=lambda: calls.append("empty"))
+    pipeline.close()
+
+    assert calls == ["first", "second", "processed", "empty"]
+
+
+def test_spool_file_removed_after_processing(
+    event_server: EventServer, perfcounters: Perfcounters, tmp_path: Path
+) -> None:
+    consumer_may_continue = threading.Event()
+    processed: list[str] = []
+
+    def process_events(events: Iterable[Event]) -> None:
+        consumer_may_continue.wait()
+        processed.extend(event["text"] for event in events)
+
+    spool_file = tmp_path / "spool_file"
+    spool_file.write_bytes(b"first\nsecond\n")
+    event_server._syslog_pipeline = pipeline = _pipeline(process_events, perfcounters)
+
+    event_server._process_spool_file(spool_file)
+    assert spool_file.exists()
+
+    consumer_may_continue.set()
+    pipeline.close()
+    assert processed == ["first", "second"]
+    assert not spool_file.exists()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import pytest
+
+from cmk.ccc.hostaddress import HostName
+from cmk.ec.config import Rule
+from cmk.ec.event import Event
+from cmk.ec.rule_index import AhoCorasick, analyze_regex, RuleDispatchIndex
+from cmk.ec.rule_matcher import compile_rule
+
+
+def test_aho_corasick() -> None:
+    automaton = AhoCorasick(["he", "she", "his", "hers", ""])
+    assert automaton.search("ushers") == {"she", "he", "hers"}
+    assert automaton.search("nothing") == set()
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("^srv-.*-DB$", ("srv-", ["srv-", "-db"])),
+        ("link down", (None, ["link down"])),
+        (r"disk \(sda\) full", (None, ["disk (sda) full"])),
+        ("^.*foo", (None, ["foo"])),
+        ("error.+timeout", (None, ["error", "timeout"])),
+        ("Link (up|down)", None),
+        (r"code \d+", None),
+        ("colou?r", None),
+        ("[abc]", None),
+    ],
+)
+def test_analyze_regex(pattern: str, expected: tuple[str | None, list[str]] | None) -> None:
+    assert analyze_regex(pattern) == expected
+
+
+def _rule(rule_id: str, **conditions: object) -> Rule:
+    rule = Rule(id=rule_id, pack="pack")
+    rule.update(conditions)  # type: ignore[typeddict-item]
+    compile_rule(rule)
+    return rule
+
+
+def _event(host: str = "host", text: str = "", application: str = "") -> Event:
+    return Event(host=HostName(host), text=text, application=application)
+
+
+@pytest.fixture(name="rules")
+def fixture_rules() -> list[Rule]:
+    return [
+        _rule("unspecific"),
+        _rule("host_exact", match_host="DB01"),
+        _rule("host_prefix", match_host="^web.*"),
+        _rule("message", match="Link down", match_ok="Link up"),
+        _rule("message_regex", match="^Disk .* full$"),
+        _rule("application", match_application="sshd"),
+        _rule("complex", match="(foo|bar)"),
+        _rule("inverted", match="foo", invert_matching=True),
+    ]
+
+
+@pytest.mark.parametrize(
+    "event, expected",
+    [
+        (_event(), ["unspecific", "complex", "inverted"]),
+        (_event(host="db01"), ["unspecific", "host_exact", "complex", "inverted"]),
+        (_event(host="Web-3"), ["unspecific", "host_prefix", "complex", "inverted"]),
+        (_event(text="eth0: LINK UP"), ["unspecific", "message", "complex", "inverted"]),
+        (_event(text="Disk /var full"), ["unspecific", "message_regex", "complex", "inverted"]),
+        (_event(application="sshd[123]"), ["unspecific", "application", "complex", "inverted"]),
+    ],
+)
+def test_candidates(rules: list[Rule], event: Event, expected: list[str]) -> None:
+    index = RuleDispatchIndex(rules)
+    assert [rule["id"] for rule in index.candidates(event, rules)] == expected
+
+
+def test_candidates_keep_subset_order(rules: list[Rule]) -> None:
+    index = RuleDispatchIndex(rules)
+    subset = [rules[7], rules[1], rules[0]]
+    assert [r["id"] for r in index.candidates(_event(host="db01"), subset)] == [
+        "unspecific",
+        "host_exact",
+        "inverted",
+    ]
+
+
+def test_stats(rules: list[Rule]) -> None:
+    index = RuleDispatchIndex(rules)
+    index.candidates(_event(host="db01"), rules)
+
+    assert index.num_lookups == 1
+    assert index.num_candidates == 4
+    assert index.rules_per_kind["unspecific"] == 3
+    assert index.hits_per_kind["host_exact"] == 1
+    assert index.bucket_sizes()["message"] == 3
@@ -5,10 +5,16 @@
 
 import json
 import logging
+from pathlib import Path
+
+import pytest
 
 from cmk.checkengine.parser import SectionStore
 from cmk.fetchers import Mode
-from cmk.fetchers.filecache import MaxAge
+from cmk.fetchers._snmpcodec import serialize_raw_data
+from cmk.fetchers.filecache import FileCacheMode, MaxAge, SNMPFileCache
+from cmk.snmplib import SNMPRawData
+from cmk.utils.sectionname import SectionName
 
 
 class TestSectionStore:
@@ -39,3 +45,29 @@ class TestMaxAge:
         assert max_age.get(Mode.DISCOVERY) == 69
         assert max_age.get(Mode.INVENTORY) == 1337
         assert max_age.get(Mode.NONE) == 0
+
+
+class TestSNMPFileCache:
+    @pytest.fixture
+    def file_cache(self, tmp_path: Path) -> SNMPFileCache:
+        return SNMPFileCache(
+            path_template=str(tmp_path / "{mode}"),
+            max_age=MaxAge(checking=3600, discovery=3600, inventory=3600),
+            simulation=False,
+            use_only_cache=False,
+            file_cache_mode=FileCacheMode.READ,
+        )
+
+    def test_read(self, file_cache: SNMPFileCache) -> None:
+        raw_data: SNMPRawData = {SectionName("if64"): [[["1", "eth0"]]]}
+        Path(file_cache.path_template.format(mode="checking")).write_bytes(
+            serialize_raw_data(raw_data)
+        )
+        assert file_cache.read(Mode.CHECKING) == raw_data
+
+    @pytest.mark.parametrize("length", [4, 12, 20])
+    def test_read_truncated(self, file_cache: SNMPFileCache, length: int) -> None:
+        Path(file_cache.path_template.format(mode="checking")).write_bytes(
+            serialize_raw_data({SectionName("if64"): [[["1", "eth0"]]]})[:length]
+        )
+        assert file_cache.read(Mode.CHECKING) is None
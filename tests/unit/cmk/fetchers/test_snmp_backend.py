@@ -5,12 +5,16 @@
 
 
 import logging
+import os
 from pathlib import Path
 
 import pytest
 
 import cmk.fetchers.snmp_backend._utils as utils
+from cmk.ccc.hostaddress import HostAddress, HostName
 from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend
+from cmk.fetchers.snmp_backend._walk_index import index_path
+from cmk.snmplib import SNMPBackendEnum, SNMPHostConfig, SNMPRowInfo, SNMPVersion
 
 
 @pytest.mark.parametrize(
@@ -29,19 +33,45 @@ def test_strip_snmp_value(value: str, expected: bytes) -> None:
 @pytest.mark.usefixtures("create_files")
 class TestStoredWalkSNMPBackend:
     @pytest.mark.parametrize(
-        "a, b, result",
+        "oid, expected",
         [
-            ("1.2.3", "1.2.3", 0),
-            ("1.2.3", ".1.2.3", 0),
-            (".1.2.3", "1.2.3", 0),
-            (".1.2.3", ".1.2.3", 0),
-            ("1.2.3", "1.2.3.4", 0),
-            ("1.2.3.4", "1.2.3", 1),
-            ("1.2.3", "4.5.6", -1),
+            (".1.2.3", [(".1.2.3", b"foo")]),
+            ("1.2.3", [(".1.2.3", b"foo")]),
+            (".1.2", [(".1.2.3", b"foo"), (".1.2.4", b"bar\nfoobar")]),
+            (".1.2.*", [(".1.2.3", b"foo")]),
+            (".1.2.5", []),
+            (".1.20", []),
         ],
     )
-    def test_compare_oids(self, a: str, b: str, result: int) -> None:
-        assert StoredWalkSNMPBackend._compare_oids(a, b) == result
+    def test_walk(self, tmpdir: Path, oid: str, expected: SNMPRowInfo) -> None:
+        assert _backend(tmpdir / "walkdata" / "1.txt").walk(oid, context="") == expected
+
+    def test_walk_unsorted(self, tmp_path: Path) -> None:
+        walk = tmp_path / "walk"
+        walk.write_text('.1.3.10 "A0 FF "\n.1.3.9 nine\n.1.30 thirty\n.1.3 three\n')
+        assert _backend(walk).walk(".1.3", context="") == [
+            (".1.3", b"three"),
+            (".1.3.9", b"nine"),
+            (".1.3.10", b"\xa0\xff"),
+        ]
+
+    def test_get(self, tmpdir: Path) -> None:
+        backend = _backend(tmpdir / "walkdata" / "1.txt")
+        assert backend.get(".1.2.4", context="") == b"bar\nfoobar"
+        assert backend.get(".1.2.*", context="") == b"foo"
+        assert backend.get(".1.2", context="") is None
+
+    def test_index_is_stored_and_invalidated(self, tmp_path: Path) -> None:
+        walk = tmp_path / "walk"
+        walk.write_text(".1.2.3 foo\n")
+        # Indexes of just modified walks are not stored
+        os.utime(walk, (1700000000, 1700000000))
+        assert _backend(walk).get(".1.2.3", context="") == b"foo"
+        assert index_path(walk).exists()
+
+        walk.write_text(".1.2.3 bar\n")
+        os.utime(walk, (1700000060, 1700000060))
+        assert _backend(walk).get(".1.2.3", context="") == b"bar"
 
     def test_read_walk_data(self, tmpdir: Path) -> None:
         assert StoredWalkSNMPBackend.read_walk_from_path(
@@ -58,6 +88,28 @@ class TestStoredWalkSNMPBackend:
         ]
 
 
+def _backend(walk: Path) -> StoredWalkSNMPBackend:
+    return StoredWalkSNMPBackend(
+        SNMPHostConfig(
+            is_ipv6_primary=False,
+            hostname=HostName("walkhost"),
+            ipaddress=HostAddress("1.2.3.4"),
+            credentials="public",
+            port=161,
+            bulkwalk_enabled=True,
+            snmp_version=SNMPVersion.V2C,
+            bulk_walk_size_of=10,
+            timing={},
+            oid_range_limits={},
+            snmpv3_contexts=[],
+            character_encoding=None,
+            snmp_backend=SNMPBackendEnum.STORED_WALK,
+        ),
+        logging.getLogger("test"),
+        Path(walk),
+    )
+
+
 @pytest.fixture
 def create_files(tmpdir):
     tmpdir.mkdir("walkdata")
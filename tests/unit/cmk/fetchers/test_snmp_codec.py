@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from collections.abc import Sequence
+
+import pytest
+
+from cmk.fetchers._snmpcodec import (
+    deserialize_raw_data,
+    deserialize_single_oid_cache,
+    serialize_raw_data,
+    serialize_single_oid_cache,
+)
+from cmk.snmplib import SNMPRawData, SNMPTable
+from cmk.utils.sectionname import SectionName
+
+_IF_ROWS: Sequence[SNMPTable] = [["1", "eth0", [0, 12, 41, 255]], ["2", "ëth1", []]]
+_RAW_DATA: SNMPRawData = {
+    SectionName("if64"): [_IF_ROWS, [["1", "up"]]],
+    SectionName("empty"): [],
+}
+
+
+def test_raw_data_roundtrip() -> None:
+    assert deserialize_raw_data(serialize_raw_data(_RAW_DATA)) == _RAW_DATA
+
+
+def test_raw_data_legacy_format() -> None:
+    legacy = (repr({str(k): v for k, v in _RAW_DATA.items()}) + "\n").encode("utf-8")
+    assert deserialize_raw_data(legacy) == _RAW_DATA
+
+
+def test_raw_data_truncated() -> None:
+    with pytest.raises(ValueError):
+        deserialize_raw_data(serialize_raw_data(_RAW_DATA)[:-10])
+
+
+@pytest.mark.parametrize("length", [8, 12])
+def test_raw_data_truncated_header(length: int) -> None:
+    with pytest.raises(ValueError, match="Truncated"):
+        deserialize_raw_data(serialize_raw_data(_RAW_DATA)[:length])
+
+
+def test_unknown_version() -> None:
+    raw = bytearray(serialize_raw_data(_RAW_DATA))
+    raw[8] = 42
+    with pytest.raises(ValueError, match="version"):
+        deserialize_raw_data(bytes(raw))
+
+
+def test_single_oid_cache_roundtrip() -> None:
+    cache = {".1.3.6.1.2.1.1.1.0": "Linux", ".1.3.6.1.2.1.1.2.0": None}
+    assert deserialize_single_oid_cache(serialize_single_oid_cache(cache)) == cache
+
+
+def test_single_oid_cache_legacy_format() -> None:
+    cache = {".1.3.6.1.2.1.1.1.0": "Linux", ".1.3.6.1.2.1.1.2.0": None}
+    assert deserialize_single_oid_cache(repr(cache).encode("utf-8")) == cache
@@ -19,6 +19,7 @@ from cmk.inventory.config import (
 )
 from cmk.inventory.paths import Paths as InventoryPaths
 from cmk.inventory.paths import TreePath, TreePathGz
+from cmk.utils.structured_data import HistoryDeltaLog, HistoryEntry, ImmutableDeltaTree
 
 
 def test_nothing_to_do(tmp_path: Path) -> None:
@@ -603,3 +604,75 @@ def test_abandoned_file_age_no_history(tmp_path: Path) -> None:
     assert unknown_files.inventory_tree.exists()
     assert unknown_files.inventory_tree_gz.legacy.exists()
     assert unknown_files.status_data_tree.exists()
+
+
+def _setup_delta_log(tmp_path: Path, host_name: HostName) -> HistoryDeltaLog:
+    delta_log = HistoryDeltaLog(InventoryPaths(tmp_path).delta_log(host_name))
+    delta_log.append(
+        [
+            HistoryEntry.from_delta_tree(
+                previous_timestamp=previous_timestamp,
+                current_timestamp=current_timestamp,
+                delta_tree=ImmutableDeltaTree(),
+            )
+            for previous_timestamp, current_timestamp in [(-1, 1), (1, 2), (2, 3), (3, 4)]
+        ]
+    )
+    return delta_log
+
+
+def test_number_of_history_entries_delta_log(tmp_path: Path) -> None:
+    inv_paths = InventoryPaths(tmp_path)
+    host_name = HostName("hostname")
+    inventory_tree = inv_paths.inventory_tree(host_name)
+    inventory_tree.legacy.parent.mkdir(parents=True, exist_ok=True)
+    inventory_tree.legacy.touch()
+    os.utime(inventory_tree.legacy, (100, 100))
+    archive_trees = [inv_paths.archive_tree(host_name, ts) for ts in (1, 2, 3, 4)]
+    for archive_tree in archive_trees:
+        archive_tree.legacy.parent.mkdir(parents=True, exist_ok=True)
+        archive_tree.legacy.touch()
+    delta_log = _setup_delta_log(tmp_path, host_name)
+
+    InventoryHousekeeping(tmp_path)._run(
+        Config(
+            inventory_housekeeping=InvHousekeepingParams(
+                for_hosts=[
+                    InvHousekeepingParamsOfHosts(
+                        regex_or_explicit=["hostname"],
+                        parameters=("number_of_history_entries", 2),
+                    )
+                ],
+                default=None,
+                abandoned_file_age=100,
+            )
+        ),
+        host_names=[host_name],
+        now=100,
+    )
+    assert [a.exists() for a in archive_trees] == [False, True, True, True]
+    assert [(p.previous_timestamp, p.current_timestamp) for p in delta_log.collect_paths()] == [
+        (2, 3),
+        (3, 4),
+    ]
+
+
+def test_abandoned_delta_log(tmp_path: Path) -> None:
+    known_delta_log = _setup_delta_log(tmp_path, HostName("known"))
+    unknown_delta_log = _setup_delta_log(tmp_path, HostName("unknown"))
+    os.utime(known_delta_log.file_path, (100, 100))
+    os.utime(unknown_delta_log.file_path, (100, 100))
+
+    InventoryHousekeeping(tmp_path)._run(
+        Config(
+            inventory_housekeeping=InvHousekeepingParams(
+                for_hosts=[],
+                default=None,
+                abandoned_file_age=1,
+            )
+        ),
+        host_names=[HostName("known")],
+        now=101,
+    )
+    assert known_delta_log.file_path.exists()
+    assert not unknown_delta_log.file_path.exists()
@@ -27,6 +27,7 @@ from cmk.gui.inventory._tree import (
 from cmk.gui.watolib.groups_io import PermittedPath
 from cmk.utils.structured_data import (
     deserialize_tree,
+    HistoryDeltaLog,
     HistoryStore,
     ImmutableTree,
     SDFilterChoice,
@@ -420,23 +421,13 @@ def test_get_history(tmp_path: Path, request_context: None) -> None:
 
     assert len(corrupted_history_files) == 0
 
-    for delta_cache_filename, expected_delta_cache_filename in zip(
-        sorted(
-            [
-                fp.name
-                for fp in (tmp_path / "var/check_mk/inventory_delta_cache" / hostname).iterdir()
-            ]
-        ),
-        sorted(
-            [
-                "0_1.json",
-                "1_2.json",
-                "2_3.json",
-                "None_0.json",
-            ]
-        ),
-    ):
-        assert delta_cache_filename == expected_delta_cache_filename
+    # The delta of the current inventory tree is not cached
+    assert [
+        (p.previous_timestamp, p.current_timestamp)
+        for p in HistoryDeltaLog(
+            tmp_path / "var/check_mk/inventory_delta_log" / f"{hostname}.log"
+        ).collect_paths()
+    ] == [(-1, 0), (0, 1), (1, 2), (2, 3)]
 
 
 def test_get_history_corrupted_files(tmp_path: Path, request_context: None) -> None:
@@ -3,12 +3,23 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import socket
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
 
 import cmk.utils.paths
 from cmk.ccc.site import SiteId
 from cmk.gui import sites, user_sites
 from cmk.livestatus_client import (
+    LivestatusResponse,
+    LivestatusRow,
+    MultiSiteConnection,
     NetworkSocketDetails,
+    QueryTypes,
     SiteConfiguration,
     SiteConfigurations,
     UnixSocketDetails,
@@ -183,3 +194,177 @@ def _site_config(site_id: SiteId, alias: str) -> SiteConfiguration:
             "message_broker_port": 5672,
         }
     )
+
+
+def _response(*values: str) -> LivestatusResponse:
+    return LivestatusResponse([LivestatusRow([value]) for value in values])
+
+
+def test_query_cache_hit_returns_copy() -> None:
+    cache = sites._QueryCache(max_entries=10, max_rows=10)
+    assert cache.get("hosts", ttl=5) is None
+    cache.put("hosts", response := _response("heute"))
+    response[0].insert(0, "site")
+
+    assert (cached := cache.get("hosts", ttl=5)) == [["heute"]]
+    cached[0].insert(0, "site")
+    assert cache.get("hosts", ttl=5) == [["heute"]]
+    assert cache.statistics() == sites.QueryCacheStatistics(hits=2, misses=1, entries=1)
+
+
+def test_query_cache_expires_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = sites._QueryCache(max_entries=10, max_rows=10)
+    monkeypatch.setattr(time, "time", lambda: 1000.0)
+    cache.put("hosts", _response("heute"))
+    monkeypatch.setattr(time, "time", lambda: 1005.0)
+    assert cache.get("hosts", ttl=5) == [["heute"]]
+    monkeypatch.setattr(time, "time", lambda: 1005.1)
+    assert cache.get("hosts", ttl=5) is None
+
+
+def test_query_cache_evicts_least_recently_used() -> None:
+    cache = sites._QueryCache(max_entries=2, max_rows=10)
+    cache.put("hosts", _response("heute"))
+    cache.put("services", _response("CPU load"))
+    assert cache.get("hosts", ttl=5) is not None
+    cache.put("hostgroups", _response("linux"))
+
+    assert cache.get("services", ttl=5) is None
+    assert cache.get("hosts", ttl=5) is not None
+    assert cache.get("hostgroups", ttl=5) is not None
+
+
+def test_query_cache_skips_large_responses() -> None:
+    cache = sites._QueryCache(max_entries=10, max_rows=1)
+    cache.put("hosts", _response("heute", "morgen"))
+    assert cache.get("hosts", ttl=5) is None
+
+
+def test_query_cache_cleared_by_other_process(tmp_path: Path) -> None:
+    cache = sites._QueryCache(max_entries=10, max_rows=10, generation_file=tmp_path / "gen")
+    other_process_cache = sites._QueryCache(
+        max_entries=10, max_rows=10, generation_file=tmp_path / "gen"
+    )
+    cache.put("hosts", _response("heute"))
+
+    other_process_cache.clear()
+
+    assert cache.get("hosts", ttl=5) is None
+    cache.put("hosts", _response("heute"))
+    assert cache.get("hosts", ttl=5) == [["heute"]]
+
+
+def test_query_cache_skips_responses_of_dying_sites(monkeypatch: pytest.MonkeyPatch) -> None:
+    def query(
+        self: MultiSiteConnection, query: QueryTypes, add_headers: str = ""
+    ) -> LivestatusResponse:
+        sent_queries.append(str(query))
+        if len(sent_queries) == 1:
+            self.deadsites[SiteId("remote")] = {
+                "exception": Exception("timed out"),
+                "site": default_site_config(),
+            }
+        return _response("heute")
+
+    sent_queries: list[str] = []
+    monkeypatch.setattr(MultiSiteConnection, "query", query)
+    monkeypatch.setattr(sites, "active_config", SimpleNamespace(livestatus_query_cache_ttl=5))
+    monkeypatch.setattr(sites, "g", {})
+    monkeypatch.setattr(sites, "_query_cache", sites._QueryCache(max_entries=10, max_rows=10))
+    live = sites._CachingMultiSiteConnection(SiteConfigurations({}))
+
+    for _i in range(3):
+        assert live.query("GET hosts\nColumns: name\n") == [["heute"]]
+    # Not cached when a site died, cached afterwards
+    assert len(sent_queries) == 2
+
+
+def _serve_site(server: socket.socket, answer: bool, delay: float = 0.0) -> None:
+    with server:
+        connection, _address = server.accept()
+    with connection:
+        data = b""
+        while b"\n\n" not in data and (chunk := connection.recv(4096)):
+            data += chunk
+        if answer:
+            time.sleep(delay)
+            body = b'[["heute"]]\n'
+            connection.sendall(b"%-3d %11d\n" % (200, len(body)) + body)
+        else:
+            # Stalled: Keep the connection open without answering until the client gives up
+            connection.recv(4096)
+
+
+def test_stalled_site_is_dead_after_response_timeout(tmp_path: Path) -> None:
+    site_configs = {}
+    servers = []
+    for site_id, answer in ((SiteId("answering"), True), (SiteId("stalled"), False)):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(socket_path := tmp_path / site_id))
+        server.listen()
+        servers.append(threading.Thread(target=_serve_site, args=(server, answer), daemon=True))
+        site_configs[site_id] = SiteConfiguration(
+            {
+                **default_site_config(),
+                "id": site_id,
+                "socket": f"unix:{socket_path}",
+                "response_timeout": 1,
+            }
+        )
+    for thread in servers:
+        thread.start()
+
+    live = MultiSiteConnection(SiteConfigurations(site_configs))
+    live.set_response_timeout(sites._response_timeout(SiteConfigurations(site_configs)))
+    live.set_prepend_site(True)
+
+    assert live.query("GET hosts\nColumns: name\n") == [["answering", "heute"]]
+    assert list(live.dead_sites()) == ["stalled"]
+
+
+def test_responses_in_order_of_sites(tmp_path: Path) -> None:
+    site_configs = {}
+    servers = []
+    # The first site answers last
+    for site_id, delay in ((SiteId("slow"), 0.2), (SiteId("fast"), 0.0)):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(socket_path := tmp_path / site_id))
+        server.listen()
+        servers.append(
+            threading.Thread(target=_serve_site, args=(server, True, delay), daemon=True)
+        )
+        site_configs[site_id] = SiteConfiguration(
+            {**default_site_config(), "id": site_id, "socket": f"unix:{socket_path}"}
+        )
+    for thread in servers:
+        thread.start()
+
+    live = MultiSiteConnection(SiteConfigurations(site_configs))
+    live.set_prepend_site(True)
+
+    assert live.query("GET hosts\nColumns: name\n") == [["slow", "heute"], ["fast", "heute"]]
+
+
+@pytest.mark.parametrize(
+    "response_timeouts, expected",
+    [
+        pytest.param([], None, id="no sites"),
+        pytest.param([5, 10], 10, id="largest"),
+        pytest.param([5, None], None, id="one without limit"),
+    ],
+)
+def test_response_timeout(response_timeouts: list[int | None], expected: int | None) -> None:
+    site_configs = {
+        SiteId(f"site{index}"): SiteConfiguration(
+            {**default_site_config(), "id": SiteId(f"site{index}"), "response_timeout": timeout}
+        )
+        for index, timeout in enumerate(response_timeouts)
+    }
+    assert sites._response_timeout(SiteConfigurations(site_configs)) == expected
+
+
+def test_response_timeout_not_configured() -> None:
+    assert (
+        sites._response_timeout(SiteConfigurations({SiteId("mysite"): default_site_config()}))
+        is None
+    )
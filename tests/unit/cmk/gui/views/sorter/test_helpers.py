@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import itertools
+
+import pytest
+
+from cmk.gui.type_defs import Row, SorterFunction
+from cmk.gui.views.sorter import (
+    cmp_ip_address,
+    cmp_num_split,
+    cmp_simple_number,
+    cmp_simple_string,
+    cmp_string_list,
+)
+from cmk.gui.views.sorter.helpers import key_function_of
+
+_VALUES: dict[SorterFunction, list] = {
+    cmp_simple_number: [3, -1, 0, 2.5, 10, 3, 7],
+    cmp_num_split: ["host10", "Host2", "host2", "host1a", "abc", "10.1.1.2", "10.1.1.10"],
+    cmp_simple_string: ["b", "B", "a", "", "ab", "Ab", "c"],
+    cmp_string_list: [["b", "a"], ["B"], [], ["a"], ["ba"], ["A", "b"], ["c"]],
+    cmp_ip_address: ["10.0.0.2", "10.0.0.10", "192.168.0.1", "", "myhost", "9.9.9.9", "10.0.0.2"],
+}
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("func", list(_VALUES))
+def test_key_function_of(func: SorterFunction, reverse: bool) -> None:
+    if (key_func := key_function_of(func, reverse)) is None:
+        assert reverse
+        return
+
+    rows: list[Row] = [{"col": value} for value in _VALUES[func]]
+    for r1, r2 in itertools.product(rows, repeat=2):
+        c = -func("col", r1, r2) if reverse else func("col", r1, r2)
+        k1, k2 = key_func("col", r1), key_func("col", r2)
+        assert c == (k1 > k2) - (k1 < k2)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from collections.abc import Iterable
+
+import pytest
+
+from livestatus import LivestatusRow, OnlySites, Query
+
+from cmk.gui.type_defs import Rows, SorterSpec, VisualContext
+from cmk.gui.view import View
+from cmk.gui.views import _livestatus_query_plan
+from cmk.gui.views._livestatus_query_plan import count_rows, order_by_header
+from cmk.gui.visuals.filter import Filter
+from cmk.gui.visuals.filter.components import FilterComponent
+from cmk.utils.livestatus_helpers.testing import MockLiveStatusConnection
+
+
+class _PythonFilter(Filter):
+    def __init__(self) -> None:
+        super().__init__(
+            ident="python_filter",
+            title="Python filter",
+            sort_index=1,
+            info="host",
+            htmlvars=[],
+            link_columns=[],
+        )
+
+    def components(self) -> Iterable[FilterComponent]:
+        return []
+
+    def filter_table(self, context: VisualContext, rows: Rows) -> Rows:
+        return rows[:1]
+
+
+@pytest.mark.parametrize(
+    "sorters, row_limit, expected_header",
+    [
+        ([SorterSpec("num_services", False)], 1000, "OrderBy: host_num_services asc\n"),
+        ([SorterSpec("num_services", True)], 1000, "OrderBy: host_num_services desc\n"),
+        # Sorted in reverse by default
+        ([SorterSpec("host_next_check", False)], 1000, "OrderBy: host_next_check desc\n"),
+        ([SorterSpec("host_next_check", True)], 1000, "OrderBy: host_next_check asc\n"),
+        (
+            [SorterSpec("num_services", False), SorterSpec("site_host", False)],
+            1000,
+            "OrderBy: host_num_services asc\n",
+        ),
+        # Livestatus does not sort by number splitting
+        ([SorterSpec("site_host", False), SorterSpec("num_services", False)], 1000, ""),
+        # No limit, all rows are fetched
+        ([SorterSpec("num_services", False)], None, ""),
+    ],
+)
+def test_order_by_header(
+    view: View, sorters: list[SorterSpec], row_limit: int | None, expected_header: str
+) -> None:
+    view.user_sorters = sorters
+    view.row_limit = row_limit
+    assert order_by_header(view, "") == expected_header
+
+
+def test_order_by_header_of_stats_query(view: View) -> None:
+    view.user_sorters = [SorterSpec("num_services", False)]
+    view.row_limit = 1000
+    assert order_by_header(view, "Stats: state >= 0\n") == ""
+
+
+def test_count_rows(view: View, monkeypatch: pytest.MonkeyPatch) -> None:
+    def query_livestatus(
+        query: Query, only_sites: OnlySites, limit: int | None, auth_domain: str
+    ) -> list[LivestatusRow]:
+        assert str(query) == "GET hosts\nFilter: state = 1\nStatsAnd: 0\n"
+        assert only_sites is None
+        assert limit is None
+        return [LivestatusRow(["local", 3]), LivestatusRow(["remote", 4])]
+
+    monkeypatch.setattr(_livestatus_query_plan, "query_livestatus", query_livestatus)
+    assert count_rows(view, [], "Filter: state = 1\n") == 7
+
+
+@pytest.mark.parametrize(
+    "headers, expected_count",
+    [
+        ("", 2),
+        ("Filter: state = 1\n", 1),
+        ("Filter: state = 2\n", 0),
+    ],
+)
+def test_count_rows_of_sites(
+    view: View, mock_livestatus: MockLiveStatusConnection, headers: str, expected_count: int
+) -> None:
+    # Sites without hosts answer with a count of 0
+    mock_livestatus.expect_query(f"GET hosts\n{headers}StatsAnd: 0")
+    with mock_livestatus():
+        assert count_rows(view, [], headers) == expected_count
+
+
+def test_count_rows_filtered_after_fetching(view: View) -> None:
+    assert count_rows(view, [_PythonFilter()], "") is None
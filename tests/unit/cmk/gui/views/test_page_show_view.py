@@ -2,10 +2,18 @@
 # Copyright (C) 2019 Checkmk GmbH - License: GNU General Public License v2
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
+import functools
 from collections.abc import Iterable
 
+import pytest
+
+from cmk.gui.config import active_config
+from cmk.gui.http import request
+from cmk.gui.type_defs import Row
 from cmk.gui.view import View
-from cmk.gui.views.page_show_view import _get_needed_regular_columns
+from cmk.gui.views.page_show_view import _get_needed_regular_columns, _sort_data
+from cmk.gui.views.sorter import cmp_num_split, cmp_simple_number, Sorter, SorterEntry
+from cmk.gui.views.sorter.helpers import key_num_split, key_simple_number
 from cmk.gui.visuals.filter import Filter
 from cmk.gui.visuals.filter.components import FilterComponent
 
@@ -69,3 +77,67 @@ def test_get_needed_regular_columns(view: View) -> None:
             "some_column",
         ]
     )
+
+
+def _make_sorter(column: str, with_key: bool) -> Sorter:
+    cmp = cmp_num_split if column == "host_name" else cmp_simple_number
+    key = key_num_split if column == "host_name" else key_simple_number
+    return Sorter(
+        ident=column,
+        title=column,
+        columns=[column],
+        sort_function=lambda r1, r2, **_kwargs: cmp(column, r1, r2),
+        sort_key=(lambda row, **_kwargs: key(column, row)) if with_key else None,
+    )
+
+
+def _multisort(rows: list[Row], sorters: list[SorterEntry]) -> list[Row]:
+    # The pairwise comparison of the rows, as done before sorting by keys
+    def compare(r1: Row, r2: Row) -> int:
+        for entry in sorters:
+            e1, e2 = r1, r2
+            if entry.join_key:
+                e1, e2 = r1["JOIN"].get(entry.join_key), r2["JOIN"].get(entry.join_key)
+                if e1 is None or e2 is None:
+                    c = (e1 is not None) - (e2 is not None)
+                    if c:
+                        return -c if entry.negate else c
+                    continue
+            if c := entry.sorter.cmp(
+                e1, e2, parameters=None, config=active_config, request=request
+            ):
+                return -c if entry.negate else c
+        return 0
+
+    return sorted(rows, key=functools.cmp_to_key(compare))
+
+
+@pytest.mark.parametrize("with_key", [True, False])
+@pytest.mark.parametrize(
+    "sorters",
+    [
+        [("host_name", False, None)],
+        [("host_name", True, None)],
+        [("service_state", True, None), ("host_name", False, None)],
+        [("service_state", False, None), ("host_name", False, None), ("idx", True, None)],
+        [("service_state", False, "CPU load"), ("idx", False, None)],
+        [("service_state", True, "CPU load"), ("host_name", True, None)],
+    ],
+)
+def test_sort_data(with_key: bool, sorters: list[tuple[str, bool, str | None]]) -> None:
+    rows: list[Row] = [
+        {
+            "idx": idx,
+            "host_name": f"Host{idx % 13}",
+            "service_state": idx % 4,
+            "JOIN": {} if idx % 5 == 0 else {"CPU load": {"service_state": idx % 3}},
+        }
+        for idx in range(100)
+    ]
+    entries = [
+        SorterEntry(_make_sorter(column, with_key), negate, join_key, None)
+        for column, negate, join_key in sorters
+    ]
+    expected = _multisort(rows, entries)
+    _sort_data(rows, entries)
+    assert rows == expected
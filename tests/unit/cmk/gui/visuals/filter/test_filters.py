@@ -1136,6 +1136,23 @@ def test_filters_filter_table(
             assert filt.filter_table(context, test.rows) == test.expected_rows
 
 
+@pytest.mark.parametrize(
+    "ident",
+    sorted({test.ident for test in filter_table_tests if test.rows != test.expected_rows}),
+)
+def test_filters_need_filter_table(ident: str, request_context: None) -> None:
+    if ident not in filter_registry:
+        pytest.skip("Not available in this edition")
+    assert filter_registry[ident].need_filter_table()
+
+
+@pytest.mark.parametrize(
+    "ident", ["hostregex", "hoststate", "svcstate", "host_scheduled_downtime_depth"]
+)
+def test_filters_do_not_need_filter_table(ident: str, request_context: None) -> None:
+    assert not filter_registry[ident].need_filter_table()
+
+
 @pytest.mark.parametrize(
     "test",
     [
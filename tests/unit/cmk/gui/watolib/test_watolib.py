@@ -119,12 +119,15 @@ def test_registered_configvars() -> None:
         "housekeeping_interval",
         "sqlite_housekeeping_interval",
         "sqlite_freelist_size",
+        "sqlite_history_flush_interval",
+        "sqlite_history_flush_size",
         "user_security_notification_duration",
         "http_proxies",
         "inventory_check_autotrigger",
         "inventory_check_interval",
         "inventory_check_severity",
         "inventory_housekeeping",
+        "livestatus_query_cache_ttl",
         "log_logon_failures",
         "lock_on_logon_failures",
         "log_level",
@@ -182,6 +185,8 @@ def test_registered_configvars() -> None:
         "staleness_threshold",
         "start_url",
         "statistics_interval",
+        "syslog_parser_processes",
+        "syslog_parser_queue_len",
         "table_row_limit",
         "tcp_connect_timeout",
         "translate_snmptraps",
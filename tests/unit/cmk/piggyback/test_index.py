@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# Copyright (C) 2025 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import shutil
+from pathlib import Path
+
+from cmk.ccc.hostaddress import HostName
+from cmk.piggyback import backend
+from cmk.piggyback.backend import _index
+from cmk.piggyback.backend._index import load_index, load_piggybacked_index, PayloadInfo
+from cmk.piggyback.backend._paths import index_dir, payload_dir
+
+_REF_TIME = 1640000000.0
+
+
+def _store(omd_root: Path, source: str, *piggybacked: str, timestamp: float = _REF_TIME) -> None:
+    backend.store_piggyback_raw_data(
+        HostName(source),
+        {HostName(p): (b"payload",) for p in piggybacked},
+        message_timestamp=timestamp,
+        contact_timestamp=timestamp,
+        omd_root=omd_root,
+    )
+
+
+def test_store_updates_index(tmp_path: Path) -> None:
+    _store(tmp_path, "source1", "host1", "host2")
+    _store(tmp_path, "source1", "host2", timestamp=_REF_TIME + 60)
+    _store(tmp_path, "source2", "host1")
+
+    assert load_index(tmp_path) == {
+        HostName("source1"): {
+            HostName("host1"): PayloadInfo(int(_REF_TIME), 8),
+            HostName("host2"): PayloadInfo(int(_REF_TIME + 60), 8),
+        },
+        HostName("source2"): {HostName("host1"): PayloadInfo(int(_REF_TIME), 8)},
+    }
+    assert not backend.check_piggyback_index(tmp_path)
+
+
+def test_lookups_use_index(tmp_path: Path) -> None:
+    _store(tmp_path, "source1", "host1")
+    # Not known to the index
+    (payload_dir(tmp_path) / "host1" / "source2").write_bytes(b"payload\n")
+
+    assert [m.meta.source for m in backend.get_messages_for(HostName("host1"), tmp_path)] == [
+        "source1"
+    ]
+    assert backend.check_piggyback_index(tmp_path) == ["host1/source2: Not in the index"]
+
+    backend.rebuild_piggyback_index(tmp_path)
+    assert [m.meta.source for m in backend.get_messages_for(HostName("host1"), tmp_path)] == [
+        "source1",
+        "source2",
+    ]
+    assert not backend.check_piggyback_index(tmp_path)
+
+
+def test_missing_index_is_built(tmp_path: Path) -> None:
+    _store(tmp_path, "source1", "host1")
+    shutil.rmtree(index_dir(tmp_path))
+
+    (message,) = backend.get_messages_for(HostName("host1"), tmp_path)
+    assert message.raw_data == b"payload\n"
+    assert message.meta.last_update == int(_REF_TIME)
+
+
+def test_cleanup_updates_index(tmp_path: Path) -> None:
+    _store(tmp_path, "source1", "host1")
+    _store(tmp_path, "source1", "host2", timestamp=_REF_TIME + 60)
+
+    backend.cleanup_piggyback_files(_REF_TIME + 30, tmp_path)
+
+    assert list(backend.get_piggybacked_host_with_sources(tmp_path)) == ["host2"]
+    assert not backend.check_piggyback_index(tmp_path)
+
+
+def test_host_rename_updates_index(tmp_path: Path) -> None:
+    _store(tmp_path, "source1", "host1")
+
+    backend.move_for_host_rename(tmp_path, "host1", "host2")
+
+    assert list(backend.get_piggybacked_host_with_sources(tmp_path)) == ["host2"]
+    assert not backend.check_piggyback_index(tmp_path)
+
+
+def test_host_rename(tmp_path: Path) -> None:
+    _store(tmp_path, "source1", "host1")
+
+    backend.move_for_host_rename(tmp_path, "host1", "host2")
+
+    (message,) = backend.get_messages_for(HostName("host2"), tmp_path)
+    assert message.raw_data == b"payload\n"
+    assert not backend.get_messages_for(HostName("host1"), tmp_path)
+    assert not backend.check_piggyback_index(tmp_path)
+
+
+def test_lookup_reads_only_sources_of_host(tmp_path: Path) -> None:
+    _store(tmp_path, "source1", "host1")
+    _store(tmp_path, "source2", "host2")
+    # Would not be readable
+    (index_dir(tmp_path) / "source2").write_text("garbage")
+
+    assert load_piggybacked_index(tmp_path, HostName("host1")) == {
+        HostName("source1"): PayloadInfo(int(_REF_TIME), 8)
+    }
+
+
+def test_removed_sources_are_dropped_from_cache(tmp_path: Path) -> None:
+    _store(tmp_path, "source1", "host1")
+    _store(tmp_path, "source2", "host1")
+    assert set(load_index(tmp_path)) == {"source1", "source2"}
+
+    backend.cleanup_piggyback_files(_REF_TIME + 30, tmp_path)
+
+    assert not load_index(tmp_path)
+    assert not load_piggybacked_index(tmp_path, HostName("host1"))
+    assert not any(path.parent == index_dir(tmp_path) for path in _index._cache)
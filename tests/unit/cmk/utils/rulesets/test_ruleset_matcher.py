@@ -11,7 +11,9 @@ import pytest
 from pytest import MonkeyPatch
 
 from cmk.ccc.hostaddress import HostName
+from cmk.utils.labels import LabelGroups
 from cmk.utils.rulesets.ruleset_matcher import (
+    matches_labels,
     matches_tag_condition,
     RuleConditionsSpec,
     RulesetMatcher,
@@ -880,6 +882,99 @@ def test_ruleset_matcher_get_host_values_changed_labels() -> None:
     assert matcher.get_host_values_all(HostName("host1"), rules, those_labels) == ["value_that"]
 
 
+@pytest.mark.parametrize(
+    "label_groups",
+    [
+        pytest.param([("and", [("and", "os:linux")])], id="and"),
+        pytest.param([("and", [("not", "os:linux")])], id="not"),
+        pytest.param([("and", [("and", "os:linux"), ("or", "os:windows")])], id="or"),
+        pytest.param(
+            [("and", [("not", "os:linux"), ("or", "site:a"), ("and", "prod:yes")])],
+            id="not or and",
+        ),
+        pytest.param(
+            [("and", [("and", "os:linux")]), ("or", [("and", "site:b"), ("not", "prod:yes")])],
+            id="or group",
+        ),
+        pytest.param(
+            [("and", [("or", "site:a")]), ("not", [("and", "os:windows")]), ("and", [])],
+            id="not group",
+        ),
+    ],
+)
+def test_ruleset_matcher_label_index_same_as_matches_labels(label_groups: LabelGroups) -> None:
+    host_labels: Mapping[HostName, Mapping[str, str]] = {
+        HostName("linux-a"): {"os": "linux", "site": "a", "prod": "yes"},
+        HostName("linux-b"): {"os": "linux", "site": "b"},
+        HostName("windows-a"): {"os": "windows", "site": "a", "prod": "yes"},
+        HostName("windows-b"): {"os": "windows", "site": "b", "prod": "no"},
+        HostName("no-labels"): {},
+    }
+    matcher = RulesetMatcher(
+        host_tags={host_name: {} for host_name in host_labels},
+        host_paths={},
+        all_configured_hosts=frozenset(host_labels),
+        clusters_of={},
+        nodes_of={},
+    )
+    rules: Sequence[RuleSpec[str]] = [
+        {"id": "id0", "value": "match", "condition": {"host_label_groups": label_groups}},
+    ]
+
+    for host_name, labels in host_labels.items():
+        assert bool(
+            matcher.get_host_values_all(host_name, rules, host_labels.__getitem__)
+        ) is matches_labels(labels, label_groups)
+
+
+def test_ruleset_matcher_match_host_rulesets_in_bulk() -> None:
+    host_names = [HostName(f"host{i}") for i in range(200)]
+
+    def _make_matcher() -> RulesetMatcher:
+        return RulesetMatcher(
+            host_tags={host_name: {} for host_name in host_names},
+            host_paths={},
+            all_configured_hosts=frozenset(host_names),
+            clusters_of={},
+            nodes_of={},
+        )
+
+    def labels_of_host(host_name: HostName) -> Mapping[str, str]:
+        return {"even": "yes"} if int(host_name[4:]) % 2 == 0 else {}
+
+    label_ruleset: Sequence[RuleSpec[str]] = [
+        {
+            "id": "id0",
+            "value": "even",
+            "condition": {"host_label_groups": [("and", [("and", "even:yes")])]},
+        },
+        {"id": "id1", "value": "all", "condition": {}},
+    ]
+    rulesets = {"host_ruleset": ruleset, "label_ruleset": label_ruleset}
+
+    bulk_matcher = _make_matcher()
+    bulk_matcher.match_host_rulesets_in_bulk(rulesets)
+
+    matcher = _make_matcher()
+    for host_name in host_names:
+        for ruleset_ in rulesets.values():
+            assert bulk_matcher.get_host_values_all(
+                host_name, ruleset_, labels_of_host
+            ) == matcher.get_host_values_all(host_name, ruleset_, labels_of_host)
+
+    # Only the rulesets looked up are matched
+    assert set(bulk_matcher.host_ruleset_durations()) == set(rulesets)
+    assert not matcher.host_ruleset_durations()
+
+    # The values of hosts matching the same rules are not affected by modifying the ones of others
+    values = bulk_matcher.get_host_values_all(HostName("host2"), label_ruleset, labels_of_host)
+    assert isinstance(values, list)
+    values.append("modified")
+    assert bulk_matcher.get_host_values_all(
+        HostName("host4"), label_ruleset, labels_of_host
+    ) == matcher.get_host_values_all(HostName("host4"), label_ruleset, labels_of_host)
+
+
 class TestSingleRulesetMatcher:
     @staticmethod
     def _make_matcher() -> RulesetMatcher:
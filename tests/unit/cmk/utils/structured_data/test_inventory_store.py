@@ -12,14 +12,19 @@ import cmk.ccc.store
 from cmk.ccc.hostaddress import HostName
 from cmk.utils.structured_data import (
     deserialize_tree,
+    HistoryArchivePath,
+    HistoryDeltaLog,
+    HistoryDeltaLogPath,
     HistoryStore,
     InventoryStore,
+    iter_history,
     load_history,
     make_meta,
     SDKey,
     SDMetaAndRawTree,
     SDNodeName,
     SDRawTree,
+    serialize_delta_tree,
 )
 
 
@@ -227,9 +232,110 @@ def test_load_history(tmp_path: Path) -> None:
     for archive_file_path in archive_file_paths:
         assert archive_file_path.suffixes == []
 
-    delta_cache_file_paths = list(
-        (tmp_path / "var/check_mk/inventory_delta_cache/hostname").iterdir()
+    # The delta of the current inventory tree is not cached
+    assert not (tmp_path / "var/check_mk/inventory_delta_cache/hostname").exists()
+    assert [
+        (p.previous_timestamp, p.current_timestamp)
+        for p in HistoryDeltaLog(
+            tmp_path / "var/check_mk/inventory_delta_log/hostname.log"
+        ).collect_paths()
+    ] == [(-1, 0), (0, 1), (1, 2), (2, 3), (3, 4)]
+
+
+def _save_history_archive(tmp_path: Path, count: int) -> None:
+    for idx in range(count):
+        cmk.ccc.store.save_text_to_file(
+            tmp_path / f"var/check_mk/inventory_archive/hostname/{idx}.json",
+            json.dumps(_raw_tree(f"val-{idx}")),
+        )
+
+
+def test_load_history_from_delta_log(tmp_path: Path) -> None:
+    host_name = HostName("hostname")
+    _save_history_archive(tmp_path, 3)
+    history = load_history(
+        HistoryStore(tmp_path),
+        host_name,
+        filter_history_paths=lambda paths: paths,
+        filter_delta_tree=None,
     )
-    assert delta_cache_file_paths
-    for delta_cache_file_path in delta_cache_file_paths:
-        assert delta_cache_file_path.suffixes == [".json"]
+
+    # A new archive only adds its own delta to the log
+    _save_history_archive(tmp_path, 4)
+    history_store = HistoryStore(tmp_path)
+    paths = [r.ok for r in history_store.collect_history_paths(host_name=host_name)]
+    assert [type(p) for p in paths] == [HistoryDeltaLogPath] * 3 + [HistoryArchivePath]
+
+    assert [
+        (e.current_timestamp, serialize_delta_tree(e.delta_tree))
+        for e in load_history(
+            history_store,
+            host_name,
+            filter_history_paths=lambda paths: paths,
+            filter_delta_tree=None,
+        ).entries[:3]
+    ] == [(e.current_timestamp, serialize_delta_tree(e.delta_tree)) for e in history.entries]
+    assert [
+        type(r.ok) for r in HistoryStore(tmp_path).collect_history_paths(host_name=host_name)
+    ] == [HistoryDeltaLogPath] * 4
+
+
+def test_iter_history(tmp_path: Path) -> None:
+    host_name = HostName("hostname")
+    _save_history_archive(tmp_path, 5)
+    history_store = HistoryStore(tmp_path)
+
+    def _timestamps(**kwargs: int) -> list[int]:
+        return [
+            r.ok.current_timestamp
+            for r in iter_history(history_store, host_name, filter_delta_tree=None, **kwargs)
+        ]
+
+    assert _timestamps() == [4, 3, 2, 1, 0]
+    assert _timestamps(latest=2) == [4, 3]
+    assert _timestamps(latest=0) == []
+    assert _timestamps(since=1, until=3) == [3, 2, 1]
+    assert _timestamps(since=2, latest=10) == [4, 3, 2]
+    assert _timestamps(until=0) == [0]
+
+    # Only the entries which have been asked for are computed
+    assert [
+        (p.previous_timestamp, p.current_timestamp)
+        for p in HistoryDeltaLog(
+            tmp_path / "var/check_mk/inventory_delta_log/hostname.log"
+        ).collect_paths()
+    ] == [(3, 4), (2, 3), (1, 2), (0, 1), (-1, 0)]
+
+
+def test_delta_log_skips_broken_lines(tmp_path: Path) -> None:
+    host_name = HostName("hostname")
+    _save_history_archive(tmp_path, 2)
+    history_store = HistoryStore(tmp_path)
+    list(iter_history(history_store, host_name, latest=1, filter_delta_tree=None))
+
+    # An interrupted append
+    delta_log_path = tmp_path / "var/check_mk/inventory_delta_log/hostname.log"
+    with delta_log_path.open("ab") as f:
+        f.write(b"-1 0 [1, 0")
+
+    entries = [r.ok for r in iter_history(history_store, host_name, filter_delta_tree=None)]
+    assert [e.current_timestamp for e in entries] == [1, 0]
+    assert len(delta_log_path.read_bytes().splitlines()) == 3
+
+    delta_log = HistoryDeltaLog(delta_log_path)
+    delta_log.compact()
+    assert [(p.previous_timestamp, p.current_timestamp) for p in delta_log.collect_paths()] == [
+        (-1, 0),
+        (0, 1),
+    ]
+    assert [
+        r.ok for r in iter_history(HistoryStore(tmp_path), host_name, filter_delta_tree=None)
+    ] == entries
+
+    delta_log.compact(keep=lambda previous, current: current != 0)
+    assert [(p.previous_timestamp, p.current_timestamp) for p in delta_log.collect_paths()] == [
+        (0, 1)
+    ]
+
+    delta_log.compact(keep=lambda previous, current: False)
+    assert not delta_log_path.exists()
@@ -12,6 +12,7 @@ import pytest
 
 from cmk.ccc.hostaddress import HostName
 from cmk.utils.structured_data import (
+    _ColumnarRows,
     _DeltaDict,
     _deserialize_retention_interval,
     _parse_from_unzipped,
@@ -38,6 +39,8 @@ from cmk.utils.structured_data import (
     SDRawDeltaTree,
     SDRawTree,
     SDRetentionFilterChoices,
+    SDRowIdent,
+    SDValue,
     serialize_delta_tree,
     serialize_tree,
 )
@@ -1404,6 +1407,47 @@ def test_merge_with_empty_right_table() -> None:
     )
 
 
+def _make_rows(*rows: Mapping[str, SDValue]) -> Mapping[SDRowIdent, Mapping[SDKey, SDValue]]:
+    return {(row["name"],): {SDKey(k): v for k, v in row.items()} for row in rows}
+
+
+def test_columnar_table() -> None:
+    rows_by_ident = _make_rows(
+        {"name": "a", "version": 1},
+        {"name": "b", "vendor": "x"},
+        {"name": "c", "version": 3, "vendor": "y"},
+    )
+    table = deserialize_tree(
+        {
+            "Attributes": {},
+            "Table": {"KeyColumns": ["name"], "Rows": list(rows_by_ident.values())},
+            "Nodes": {},
+        }
+    ).table
+    assert isinstance(table.rows_by_ident, _ColumnarRows)
+    assert dict(table.rows_by_ident) == rows_by_ident
+    assert table == ImmutableTable(key_columns=[SDKey("name")], rows_by_ident=rows_by_ident)
+    assert len(table) == 7
+
+    filtered = table.rows_by_ident.filter_keys(lambda k: k == "version")
+    assert dict(filtered) == {("a",): {"version": 1}, ("c",): {"version": 3}}
+
+    other = _ColumnarRows.make(
+        _make_rows(
+            {"name": "b", "vendor": "x"},
+            {"name": "c", "version": 4},
+            {"name": "d"},
+        )
+    )
+    assert dict(table.rows_by_ident.merge(other)) == _make_rows(
+        {"name": "a", "version": 1},
+        {"name": "b", "vendor": "x"},
+        {"name": "c", "version": 4, "vendor": "y"},
+        {"name": "d"},
+    )
+    assert table.rows_by_ident.differing_idents(other, [("b",), ("c",)]) == {("c",)}
+
+
 @pytest.mark.parametrize(
     "filters, unavail",
     [
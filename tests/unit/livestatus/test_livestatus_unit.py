@@ -253,6 +253,56 @@ def test_local_connection(patch_omd_site: None, mock_livestatus: MockLiveStatusC
         livestatus.LocalConnection().query_value("GET status\nColumns: program_start")
 
 
+def test_local_connection_iter_query(
+    patch_omd_site: None, mock_livestatus: MockLiveStatusConnection
+) -> None:
+    live = mock_livestatus
+    live.set_sites(["NO_SITE"])
+    live.add_table("hosts", [{"name": "heute"}, {"name": "morgen"}])
+    live.expect_query("GET hosts\nColumns: name")
+    with mock_livestatus(expect_status_query=False):
+        connection = livestatus.LocalConnection()
+        connection.set_prepend_site(True)
+        assert list(connection.iter_query("GET hosts\nColumns: name")) == [
+            [b"", "heute"],
+            [b"", "morgen"],
+        ]
+
+
+# As written by livestatus: Every row on a separate line
+_JSON_RESPONSE = '[["heute","Ümlaut"],\n["morgen",[1,2.5,null]],\n["übermorgen",{"a":"]"}]]\n'
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, len(_JSON_RESPONSE.encode("utf-8"))])
+def test_parse_response_chunks(chunk_size: int) -> None:
+    data = _JSON_RESPONSE.encode("utf-8")
+    live = livestatus.SingleSiteConnection("unix:/tmp/xyz")
+    query = livestatus.Query(livestatus.QuerySpecification(table="hosts", columns=["name"]))
+    assert list(
+        live.parse_response_chunks(
+            (data[idx : idx + chunk_size] for idx in range(0, len(data), chunk_size)), query
+        )
+    ) == live.parse_raw_response(data, query)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b'[["heute"],\n',
+        b'[["heute"],\n]\n',
+        b'[["heute"]\n["morgen"]]\n',
+        b'[["heute"]]\n[]\n',
+        b'{"heute": 1}\n',
+    ],
+)
+def test_parse_response_chunks_malformed(data: bytes) -> None:
+    live = livestatus.SingleSiteConnection("unix:/tmp/xyz")
+    query = livestatus.Query(livestatus.QuerySpecification(table="hosts", columns=["name"]))
+    with pytest.raises(livestatus.MKLivestatusQueryError):
+        list(live.parse_response_chunks([data], query))
+
+
 # Regression test for Werk 14384
 @pytest.mark.parametrize(
     "user_id,allowed",